@@ -0,0 +1,3 @@
+"""
+Performance benchmarks: load test, benchmark data and baselines
+"""
@@ -0,0 +1,615 @@
+"""
+Benchmark dataset generator
+Builds a deterministic, campus-scale dataset for benchmarks and load tests with COPY,
+one worker process per block of program sections.
+
+Scale 1 is roughly today's campus (BASE_STUDENTS students in 8 programs); --scale 10
+and --scale 100 multiply the students and grow programs by sqrt(scale). Each run
+writes programs, courses, evaluation periods (the last one active), program_sections
+and section_students, class sections per period, period-tagged enrollments and one
+evaluation row per enrollment - completed with 31 answers, comment, sentiment and
+injected anomalies (--anomaly-rate), or pending like the enrollment endpoints create.
+
+Every ID is assigned up front from the tables' current maximum, so workers COPY
+independently and the same --seed on the same starting database gives the same
+rows whatever --workers is. All accounts get the load-test password
+(benchmarks.load_test.LOAD_TEST_PASSWORD).
+
+Usage:
+    python -m benchmarks.generate_data --dry-run --scale 10             # print row counts only
+    python -m benchmarks.generate_data --truncate --scale 1             # rebuild a benchmark database
+    python -m benchmarks.generate_data --truncate --scale 100 --workers 8 --periods 6
+    python -m benchmarks.generate_data --students 20000 --anomaly-rate 0.05
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import random
+import string
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, NamedTuple, Sequence, Tuple
+
+from benchmarks.load_test import LOAD_TEST_PASSWORD
+from services.evaluation_answers import QUESTION_KEYS
+
+BASE_STUDENTS = 2400
+BASE_PROGRAMS = 8
+PROGRAMS_PER_DEPARTMENT = 4
+YEAR_LEVELS = 4
+STUDENTS_PER_SECTION = 40
+COURSES_PER_TERM = 6
+# Students per worker task (rounded to whole program sections)
+CHUNK_STUDENTS = 1000
+EMAIL_DOMAIN = "lpubatangas.edu.ph"
+
+# Tables written here, in dependency order (--truncate empties them)
+GENERATED_TABLES = (
+    "programs", "users", "secretaries", "department_heads", "courses", "evaluation_periods",
+    "program_sections", "students", "section_students", "class_sections", "enrollments",
+    "period_enrollments", "period_program_sections", "evaluations",
+)
+
+DEPARTMENTS = [
+    ("CCS", "College of Computer Studies"),
+    ("CBA", "College of Business Administration"),
+    ("COE", "College of Engineering"),
+    ("CAS", "College of Arts and Sciences"),
+    ("CON", "College of Nursing"),
+    ("CITHM", "College of International Tourism and Hospitality Management"),
+    ("COED", "College of Education"),
+    ("CCJE", "College of Criminal Justice Education"),
+]
+
+FIRST_NAMES = [
+    "Juan", "Maria", "Jose", "Ana", "Mark", "Angela", "John Paul", "Kristine", "Carlo", "Nicole",
+    "Miguel", "Patricia", "Paolo", "Camille", "Rafael", "Bea", "Gabriel", "Andrea", "Joshua", "Jasmine",
+    "Christian", "Samantha", "Daniel", "Erika", "Adrian", "Frances", "Kevin", "Hannah", "Lorenzo", "Isabel",
+]
+LAST_NAMES = [
+    "Dela Cruz", "Santos", "Reyes", "Garcia", "Mendoza", "Bautista", "Villanueva", "Ramos", "Castillo", "Aquino",
+    "Navarro", "Torres", "Flores", "Gonzales", "Lopez", "Hernandez", "Perez", "Rivera", "Cruz", "Manalo",
+    "Panganiban", "Macaraeg", "Dimaculangan", "Marasigan", "Katigbak", "Ilagan", "Atienza", "Magsino", "Comia", "Aguila",
+]
+SUBJECT_TOPICS = [
+    "Fundamentals", "Data Structures", "Applied Statistics", "Systems Analysis", "Research Methods",
+    "Professional Ethics", "Technical Writing", "Networks", "Accounting Principles", "Management",
+    "Operations", "Quality Assurance", "Laboratory Practice", "Seminar", "Capstone Project", "Practicum",
+]
+
+# Rating profile: (weight, weights of ratings 1-4, comment tone)
+RATING_PROFILES = {
+    "excellent": (35, (0, 1, 14, 85), "positive"),
+    "very_good": (40, (0, 5, 50, 45), "positive"),
+    "good": (15, (1, 12, 67, 20), "neutral"),
+    "average": (8, (5, 40, 45, 10), "neutral"),
+    "needs_improvement": (2, (25, 50, 20, 5), "negative"),
+}
+COMMENT_RATE = 0.6
+
+COMMENT_PARTS = {
+    "positive": (
+        ["The instructor explains the lessons clearly", "Very approachable and knowledgeable professor",
+         "The class discussions were engaging", "Lessons were well organized", "Ma'am/Sir always came prepared"],
+        ["and the activities helped us apply the concepts.", "and feedback on our outputs was quick and useful.",
+         "and the examples were related to real industry work.", "and consultation hours were really helpful."],
+        ["", " Highly recommended!", " I learned a lot this semester.", " Thank you for the patience."],
+    ),
+    "neutral": (
+        ["The course was okay overall", "Lessons were informative", "The instructor knows the subject",
+         "The requirements were manageable", "Some topics were interesting"],
+        ["but the pacing was sometimes too fast.", "but the examples could be more practical.",
+         "though some lectures were hard to follow.", "but the laboratory equipment was limited."],
+        ["", " Could be improved next semester.", " More consultations would help."],
+    ),
+    "negative": (
+        ["Lessons were hard to understand", "The course lacked organization", "Classes often started late",
+         "The materials were outdated", "Grading criteria were unclear"],
+        ["and questions were not answered properly.", "and feedback on outputs came very late.",
+         "and the workload was too heavy for the units.", "and the internet in the laboratory rarely worked."],
+        ["", " Needs a lot of improvement.", " Hope this gets addressed."],
+    ),
+}
+
+# ===========================
+# LAYOUT
+# ===========================
+
+class SectionLayout(NamedTuple):
+    """One program section and the contiguous block of students in it"""
+    index: int            # 0-based position among program sections
+    section_id: int
+    program_id: int
+    year_level: int
+    name: str
+    first_student: int    # 0-based global student index
+    size: int
+
+class PeriodLayout(NamedTuple):
+    index: int
+    period_id: int
+    name: str
+    semester: int         # 1 or 2
+    academic_year: str
+    status: str
+    start_date: datetime
+    end_date: datetime
+
+def section_letters(index: int) -> str:
+    """0 -> A, 25 -> Z, 26 -> AA"""
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = string.ascii_uppercase[remainder] + letters
+    return letters
+
+def plan_counts(scale: float, students: int = None) -> Dict[str, int]:
+    total_students = students or int(BASE_STUDENTS * scale)
+    programs = max(2, round(BASE_PROGRAMS * math.sqrt(students / BASE_STUDENTS if students else scale)))
+    return {"students": total_students, "programs": programs}
+
+def build_periods(count: int, period_offset: int, today: datetime) -> List[PeriodLayout]:
+    """count terms ending with the current one (active, open today); earlier ones closed"""
+    year = today.year if today.month >= 8 else today.year - 1
+    semester = 1 if today.month >= 8 else 2
+    terms = []
+    for _ in range(count):
+        terms.append((year, semester))
+        year, semester = (year, 1) if semester == 2 else (year - 1, 2)
+    terms.reverse()
+
+    active_start = (today - timedelta(days=7)).replace(hour=0, minute=0, second=0, microsecond=0)
+    periods = []
+    for index, (start_year, semester) in enumerate(terms):
+        start = active_start - timedelta(days=182 * (count - 1 - index))
+        academic_year = f"{start_year}-{start_year + 1}"
+        label = "First Semester" if semester == 1 else "Second Semester"
+        periods.append(PeriodLayout(
+            index=index,
+            period_id=period_offset + index + 1,
+            name=f"{label} {academic_year} Evaluation",
+            semester=semester,
+            academic_year=academic_year,
+            status="active" if index == count - 1 else "closed",
+            start_date=start,
+            end_date=start + timedelta(days=14, hours=23, minutes=59),
+        ))
+    return periods
+
+def build_sections(total_students: int, programs: List[Tuple[int, str]], section_offset: int) -> List[SectionLayout]:
+    """Spread students evenly over programs x year levels, in sections of STUDENTS_PER_SECTION"""
+    groups = len(programs) * YEAR_LEVELS
+    sections = []
+    next_student = 0
+    for group in range(groups):
+        program_id, program_code = programs[group // YEAR_LEVELS]
+        year_level = group % YEAR_LEVELS + 1
+        group_size = total_students // groups + (1 if group < total_students % groups else 0)
+        count = max(1, math.ceil(group_size / STUDENTS_PER_SECTION))
+        for position in range(count):
+            size = group_size // count + (1 if position < group_size % count else 0)
+            sections.append(SectionLayout(
+                index=len(sections),
+                section_id=section_offset + len(sections) + 1,
+                program_id=program_id,
+                year_level=year_level,
+                name=f"{program_code}-{year_level}{section_letters(position)}",
+                first_student=next_student,
+                size=size,
+            ))
+            next_student += size
+    return sections
+
+def course_id_for(course_offset: int, program_position: int, year_level: int, semester: int, slot: int) -> int:
+    """Courses are laid out program x year x semester x COURSES_PER_TERM"""
+    return course_offset + 1 + ((program_position * YEAR_LEVELS + year_level - 1) * 2 + semester - 1) * COURSES_PER_TERM + slot
+
+def class_section_id_for(class_section_offset: int, period_index: int, section_index: int, slot: int, section_count: int) -> int:
+    """Class sections are laid out period x program section x COURSES_PER_TERM"""
+    return class_section_offset + 1 + (period_index * section_count + section_index) * COURSES_PER_TERM + slot
+
+# ===========================
+# ROWS
+# ===========================
+
+def pg_array(values: Iterable[int]) -> str:
+    return "{" + ",".join(str(value) for value in values) + "}"
+
+def make_comment(rng: random.Random, tone: str) -> str:
+    openers, details, closers = COMMENT_PARTS[tone]
+    return f"{rng.choice(openers)} {rng.choice(details)}{rng.choice(closers)}"
+
+def make_answers(rng: random.Random, anomaly_rate: float) -> Tuple[List[int], str, str, str]:
+    """
+    31 ratings, comment, sentiment tone and injected anomaly kind ("" when normal)
+
+    Anomalies mirror what the detector looks for: straight-lining (one value for
+    every question), ratings contradicting the comment, and random answering.
+    """
+    if rng.random() < anomaly_rate:
+        kind = rng.choice(("straight_line", "contradiction", "random"))
+        if kind == "straight_line":
+            value = rng.choice((1, 4, 4))
+            answers = [value] * len(QUESTION_KEYS)
+            tone = "positive" if value == 4 else "negative"
+        elif kind == "contradiction":
+            high = rng.random() < 0.5
+            answers = [rng.choice((3, 4, 4)) if high else rng.choice((1, 1, 2)) for _ in QUESTION_KEYS]
+            tone = "negative" if high else "positive"
+        else:
+            answers = [rng.randint(1, 4) for _ in QUESTION_KEYS]
+            tone = "neutral"
+        return answers, make_comment(rng, tone), tone, kind
+
+    profiles = list(RATING_PROFILES)
+    profile = rng.choices(profiles, weights=[RATING_PROFILES[name][0] for name in profiles])[0]
+    _, rating_weights, tone = RATING_PROFILES[profile]
+    answers = rng.choices((1, 2, 3, 4), weights=rating_weights, k=len(QUESTION_KEYS))
+    comment = make_comment(rng, tone) if rng.random() < COMMENT_RATE else ""
+    return answers, comment, tone, ""
+
+def sentiment_for(average: float) -> Tuple[str, float]:
+    """Same rating-based labels the submit endpoint falls back to"""
+    if average >= 3.5:
+        return "positive", 0.8
+    if average >= 2.5:
+        return "neutral", 0.7
+    return "negative", 0.8
+
+ANOMALY_REASONS = {
+    "straight_line": "Straight-lining: identical rating on all questions",
+    "contradiction": "Ratings contradict the written feedback",
+    "random": "Inconsistent ratings within categories",
+}
+
+USER_COLUMNS = ("id", "email", "password_hash", "role", "first_name", "last_name", "department", "school_id",
+                "is_active", "must_change_password", "first_login", "created_at", "updated_at")
+EVALUATION_COLUMNS = (
+    "id", "student_id", "class_section_id", "evaluation_period_id",
+    "rating_teaching", "rating_content", "rating_engagement", "rating_overall",
+    "text_feedback", "ratings", "answers", "sentiment", "sentiment_score", "sentiment_confidence",
+    "is_anomaly", "anomaly_score", "anomaly_reason", "metadata",
+    "status", "processing_status", "processed_at", "submission_date", "submission_ip", "created_at",
+)
+
+def copy_rows(conn, table: str, columns: Sequence[str], rows: Iterable[Sequence[Any]]) -> int:
+    """COPY rows into table; returns the row count"""
+    count = 0
+    with conn.cursor() as cursor:
+        with cursor.copy(f"COPY {table} ({', '.join(columns)}) FROM STDIN") as copy:
+            for row in rows:
+                copy.write_row(row)
+                count += 1
+    return count
+
+def generate_chunk(task: Dict[str, Any]) -> Dict[str, int]:
+    """
+    Worker: COPY the users, students, section memberships, enrollments and
+    evaluations of a block of program sections in one transaction
+    """
+    import psycopg
+
+    sections = [SectionLayout(*section) for section in task["sections"]]
+    periods = [PeriodLayout(*period) for period in task["periods"]]
+    offsets = task["offsets"]
+    seed = task["seed"]
+    now = task["now"]
+    counts = {}
+
+    # Per-student draws come from a per-section RNG, so chunking and worker count don't change the data
+    students = []
+    for section in sections:
+        rng = random.Random(f"{seed}:section:{section.index}")
+        for position in range(section.size):
+            global_index = section.first_student + position
+            students.append((section, global_index, rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES),
+                             min(0.99, max(0.3, rng.gauss(task["completion_rate"], 0.12)))))
+
+    with psycopg.connect(task["conninfo"]) as conn:
+        counts["users"] = copy_rows(conn, "users", USER_COLUMNS, (
+            (offsets["users"] + global_index + 1,
+             f"bx.student{offsets['users'] + global_index + 1}@{EMAIL_DOMAIN}",
+             task["password_hash"], "student", first_name, last_name, None,
+             f"{periods[-1].academic_year[:4]}{global_index + 1:06d}",
+             True, False, False, now, now)
+            for section, global_index, first_name, last_name, _ in students
+        ))
+        counts["students"] = copy_rows(conn, "students", ("id", "user_id", "student_number", "program_id", "year_level", "is_active", "created_at"), (
+            (offsets["students"] + global_index + 1, offsets["users"] + global_index + 1,
+             f"BX{offsets['students'] + global_index + 1:08d}", section.program_id, section.year_level, True, now)
+            for section, global_index, _, _, _ in students
+        ))
+        counts["section_students"] = copy_rows(conn, "section_students", ("id", "section_id", "student_id", "created_at"), (
+            (offsets["section_students"] + global_index + 1, section.section_id, offsets["users"] + global_index + 1, now)
+            for section, global_index, _, _, _ in students
+        ))
+
+        # Enrollment i and evaluation i describe the same (student, class section, period)
+        def enrollment_keys():
+            row_id = task["first_enrollment"]
+            for section, global_index, _, _, completion in students:
+                for period in periods:
+                    for slot in range(COURSES_PER_TERM):
+                        class_section_id = class_section_id_for(
+                            offsets["class_sections"], period.index, section.index, slot, task["section_count"]
+                        )
+                        yield row_id, offsets["students"] + global_index + 1, class_section_id, period, completion
+                        row_id += 1
+
+        counts["enrollments"] = copy_rows(conn, "enrollments", ("id", "student_id", "class_section_id", "evaluation_period_id", "enrolled_at", "status"), (
+            (offsets["enrollments"] + row_id, student_id, class_section_id, period.period_id, period.start_date, "active")
+            for row_id, student_id, class_section_id, period, _ in enrollment_keys()
+        ))
+
+        def evaluation_rows():
+            rng = None
+            current_student = None
+            for row_id, student_id, class_section_id, period, completion in enrollment_keys():
+                if student_id != current_student:
+                    rng = random.Random(f"{seed}:student:{student_id - offsets['students']}")
+                    current_student = student_id
+                rate = completion if period.status != "active" else completion * task["active_completion"] / task["completion_rate"]
+                if rng.random() >= rate:
+                    yield (offsets["evaluations"] + row_id, student_id, class_section_id, period.period_id,
+                           None, None, None, None, None, None, None, None, None, None,
+                           False, None, None, None, "pending", "pending", None, None, None, period.start_date)
+                    continue
+
+                answers, comment, _, anomaly = make_answers(rng, task["anomaly_rate"])
+                average = sum(answers) / len(answers)
+                rounded = int(round(average))
+                sentiment, confidence = sentiment_for(average)
+                submitted = period.start_date + timedelta(
+                    seconds=rng.randint(0, int(((min(period.end_date, now) - period.start_date).total_seconds())))
+                )
+                yield (offsets["evaluations"] + row_id, student_id, class_section_id, period.period_id,
+                       rounded, rounded, rounded, rounded,
+                       comment, json.dumps(dict(zip(QUESTION_KEYS, answers))), pg_array(answers),
+                       sentiment, confidence, confidence,
+                       bool(anomaly), round(rng.uniform(0.75, 0.98), 3) if anomaly else round(rng.uniform(0.0, 0.3), 3),
+                       ANOMALY_REASONS.get(anomaly),
+                       json.dumps({"synthetic": True, "injected_anomaly": anomaly or None}),
+                       "completed", "completed", submitted, submitted, None, period.start_date)
+
+        counts["evaluations"] = copy_rows(conn, "evaluations", EVALUATION_COLUMNS, evaluation_rows())
+        conn.commit()
+    return counts
+
+# ===========================
+# RUN
+# ===========================
+
+def conninfo_from_engine() -> str:
+    from database.connection import engine
+    return engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+def ensure_local(conninfo: str, allow_remote: bool):
+    from sqlalchemy.engine import make_url
+    url = make_url(conninfo)
+    host = url.host or url.query.get("host", "")
+    if not allow_remote and host not in ("localhost", "127.0.0.1", "::1", "") and not str(host).startswith("/"):
+        raise SystemExit(f"Refusing to write benchmark data to {host}; pass --allow-remote for a disposable database")
+
+def current_offsets(conn) -> Dict[str, int]:
+    offsets = {}
+    with conn.cursor() as cursor:
+        for table in GENERATED_TABLES:
+            cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}")
+            offsets[table] = cursor.fetchone()[0]
+    return offsets
+
+def generate(args) -> Dict[str, Any]:
+    import bcrypt
+    import psycopg
+    from database.connection import SessionLocal
+    from services.period_partitions import PeriodPartitionService
+    from services.period_progress import PeriodProgressService
+    from sqlalchemy import text
+
+    conninfo = conninfo_from_engine()
+    ensure_local(conninfo, args.allow_remote)
+    counts = plan_counts(args.scale, args.students)
+    started = time.perf_counter()
+    now = datetime.now().replace(microsecond=0)
+    rng = random.Random(f"{args.seed}:catalog")
+    totals: Dict[str, int] = {}
+
+    with psycopg.connect(conninfo) as conn:
+        if args.truncate:
+            conn.execute(f"TRUNCATE {', '.join(GENERATED_TABLES)} RESTART IDENTITY CASCADE")
+        offsets = current_offsets(conn)
+
+        # Catalog: programs, staff, courses, periods, program sections, class sections
+        programs = []
+        for position in range(counts["programs"]):
+            program_id = offsets["programs"] + position + 1
+            programs.append((program_id, f"BX{program_id:03d}", DEPARTMENTS[(position // PROGRAMS_PER_DEPARTMENT) % len(DEPARTMENTS)]))
+        totals["programs"] = copy_rows(conn, "programs", ("id", "program_code", "program_name", "department", "is_active", "created_at"), (
+            (program_id, code, f"Bachelor of Science Program {code}", department[1], True, now)
+            for program_id, code, department in programs
+        ))
+
+        password_hash = bcrypt.hashpw(args.password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+        departments = sorted({department for _, _, department in programs}, key=DEPARTMENTS.index)
+        staff = []  # (user_id, role, department, program ids)
+        for department in departments:
+            department_programs = [program_id for program_id, _, program_department in programs if program_department == department]
+            for role in ("department_head", "secretary"):
+                staff.append((offsets["users"] + len(staff) + 1, role, department, department_programs))
+        staff.append((offsets["users"] + len(staff) + 1, "admin", None, []))
+        staff_names = [(rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)) for _ in staff]
+        totals["users"] = copy_rows(conn, "users", USER_COLUMNS, (
+            (user_id, f"bx.{role.replace('_', '')}{user_id}@{EMAIL_DOMAIN}", password_hash, role, first, last,
+             department[1] if department else None, None, True, False, False, now, now)
+            for (user_id, role, department, _), (first, last) in zip(staff, staff_names)
+        ))
+        heads = [(user_id, department, program_ids, name) for (user_id, role, department, program_ids), name in zip(staff, staff_names) if role == "department_head"]
+        secretaries = [(user_id, department, program_ids, name) for (user_id, role, department, program_ids), name in zip(staff, staff_names) if role == "secretary"]
+        totals["department_heads"] = copy_rows(conn, "department_heads", ("id", "user_id", "first_name", "last_name", "department", "programs", "created_at"), (
+            (offsets["department_heads"] + index + 1, user_id, first, last, department[1], pg_array(program_ids), now)
+            for index, (user_id, department, program_ids, (first, last)) in enumerate(heads)
+        ))
+        totals["secretaries"] = copy_rows(conn, "secretaries", ("id", "user_id", "name", "department", "programs", "created_at"), (
+            (offsets["secretaries"] + index + 1, user_id, f"{first} {last}", department[1], pg_array(program_ids), now)
+            for index, (user_id, department, program_ids, (first, last)) in enumerate(secretaries)
+        ))
+        offsets["users"] += len(staff)
+
+        def course_rows():
+            for position, (program_id, code, _) in enumerate(programs):
+                for year_level in range(1, YEAR_LEVELS + 1):
+                    for semester in (1, 2):
+                        for slot in range(COURSES_PER_TERM):
+                            course_id = course_id_for(offsets["courses"], position, year_level, semester, slot)
+                            topic = SUBJECT_TOPICS[(year_level * 7 + semester * 3 + slot) % len(SUBJECT_TOPICS)]
+                            yield (course_id, f"{code}-{year_level}{semester}{slot + 1}", f"{topic} {year_level}{semester}{slot + 1}",
+                                   program_id, year_level, semester, 3.0, True, now)
+        totals["courses"] = copy_rows(conn, "courses", ("id", "subject_code", "subject_name", "program_id", "year_level", "semester", "units", "is_active", "created_at"), course_rows())
+
+        # Only one period may be active
+        conn.execute("UPDATE evaluation_periods SET status = 'closed' WHERE status = 'active'")
+        periods = build_periods(args.periods, offsets["evaluation_periods"], now)
+        totals["evaluation_periods"] = copy_rows(conn, "evaluation_periods", ("id", "name", "semester", "academic_year", "start_date", "end_date", "status", "created_at", "updated_at"), (
+            (period.period_id, period.name, "First Semester" if period.semester == 1 else "Second Semester",
+             period.academic_year, period.start_date, period.end_date, period.status, period.start_date, now)
+            for period in periods
+        ))
+
+        sections = build_sections(counts["students"], [(program_id, code) for program_id, code, _ in programs], offsets["program_sections"])
+        active = periods[-1]
+        totals["program_sections"] = copy_rows(conn, "program_sections", ("id", "section_name", "program_id", "year_level", "semester", "school_year", "is_active", "created_at", "updated_at"), (
+            (section.section_id, section.name, section.program_id, section.year_level, active.semester, active.academic_year, True, now, now)
+            for section in sections
+        ))
+
+        program_position = {program_id: position for position, (program_id, _, _) in enumerate(programs)}
+        program_code = {program_id: code for program_id, code, _ in programs}
+
+        def class_section_rows():
+            for period in periods:
+                for section in sections:
+                    for slot in range(COURSES_PER_TERM):
+                        course_id = course_id_for(offsets["courses"], program_position[section.program_id], section.year_level, period.semester, slot)
+                        yield (class_section_id_for(offsets["class_sections"], period.index, section.index, slot, len(sections)),
+                               course_id, f"{program_code[section.program_id]}-{section.year_level}{period.semester}{slot + 1}-{section.name.rsplit('-', 1)[1]}",
+                               str(period.semester), period.academic_year, STUDENTS_PER_SECTION, period.start_date)
+        totals["class_sections"] = copy_rows(conn, "class_sections", ("id", "course_id", "class_code", "semester", "academic_year", "max_students", "created_at"), class_section_rows())
+        conn.commit()
+
+    # evaluations/enrollments are partitioned per period (migration 26)
+    db = SessionLocal()
+    try:
+        PeriodPartitionService.ensure_partitions(db)
+        db.commit()
+    finally:
+        db.close()
+    print(f"   catalog written in {time.perf_counter() - started:.1f}s")
+
+    # Students, enrollments and evaluations: one task per block of sections
+    per_student = len(periods) * COURSES_PER_TERM
+    tasks = []
+    block: List[SectionLayout] = []
+    for section in sections + [None]:
+        if section is not None:
+            block.append(section)
+        block_size = sum(item.size for item in block)
+        if block and (section is None or block_size >= CHUNK_STUDENTS):
+            tasks.append({
+                "sections": [tuple(item) for item in block],
+                "periods": [tuple(period) for period in periods],
+                "offsets": offsets,
+                "first_enrollment": block[0].first_student * per_student + 1,
+                "section_count": len(sections),
+                "password_hash": password_hash,
+                "seed": args.seed,
+                "now": now,
+                "completion_rate": args.completion_rate,
+                "active_completion": args.active_completion,
+                "anomaly_rate": args.anomaly_rate,
+                "conninfo": conninfo,
+            })
+            block = []
+
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = [pool.submit(generate_chunk, task) for task in tasks]
+        for done, future in enumerate(as_completed(futures), start=1):
+            for table, count in future.result().items():
+                totals[table] = totals.get(table, 0) + count
+            print(f"   chunk {done}/{len(tasks)} done ({time.perf_counter() - started:.1f}s)")
+
+    # Derived tables, sequences and statistics
+    db = SessionLocal()
+    try:
+        period_ids = [period.period_id for period in periods]
+        totals["period_enrollments"] = db.execute(text("""
+            INSERT INTO period_enrollments (evaluation_period_id, class_section_id, enrolled_count, created_at)
+            SELECT evaluation_period_id, class_section_id, COUNT(*), MIN(enrolled_at)
+            FROM enrollments
+            WHERE evaluation_period_id = ANY(:period_ids)
+            GROUP BY evaluation_period_id, class_section_id
+        """), {"period_ids": period_ids}).rowcount
+        totals["period_program_sections"] = db.execute(text("""
+            INSERT INTO period_program_sections (evaluation_period_id, program_section_id, enrolled_count, created_at)
+            SELECT p.id, ps.id, COUNT(ss.id), p.start_date
+            FROM evaluation_periods p
+            CROSS JOIN program_sections ps
+            JOIN section_students ss ON ss.section_id = ps.id
+            WHERE p.id = ANY(:period_ids) AND ps.id BETWEEN :first_section AND :last_section
+            GROUP BY p.id, ps.id
+        """), {"period_ids": period_ids, "first_section": sections[0].section_id, "last_section": sections[-1].section_id}).rowcount
+
+        for table in GENERATED_TABLES:
+            db.execute(text(f"""
+                SELECT setval(
+                    COALESCE(pg_get_serial_sequence('{table}', 'id'), '{table}_id_seq'),
+                    GREATEST((SELECT COALESCE(MAX(id), 0) FROM {table}), 1)
+                )
+            """))
+        for period_id in period_ids:
+            PeriodProgressService.rebuild(db, period_id)
+        db.commit()
+    finally:
+        db.close()
+
+    with psycopg.connect(conninfo, autocommit=True) as conn:
+        for table in GENERATED_TABLES:
+            conn.execute(f"ANALYZE {table}")
+
+    return {"counts": totals, "duration_s": round(time.perf_counter() - started, 1), "periods": [period.period_id for period in periods]}
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a deterministic benchmark dataset with COPY")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiple of today's size (1, 10, 100)")
+    parser.add_argument("--students", type=int, help="Exact number of students (overrides --scale)")
+    parser.add_argument("--periods", type=int, default=4, help="Semesters of evaluations; the last one is active")
+    parser.add_argument("--completion-rate", type=float, default=0.85, help="Share of evaluations submitted in closed periods")
+    parser.add_argument("--active-completion", type=float, default=0.35, help="Share already submitted in the active period")
+    parser.add_argument("--anomaly-rate", type=float, default=0.03, help="Share of submitted evaluations with an injected anomaly")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=max(1, min(8, (multiprocessing.cpu_count() or 2) - 1)))
+    parser.add_argument("--password", default=LOAD_TEST_PASSWORD, help="Password of every generated account")
+    parser.add_argument("--truncate", action="store_true", help="Empty the generated tables first (ids restart at 1)")
+    parser.add_argument("--allow-remote", action="store_true", help="Allow writing to a non-local database")
+    parser.add_argument("--dry-run", action="store_true", help="Print the row counts and exit")
+    args = parser.parse_args()
+
+    counts = plan_counts(args.scale, args.students)
+    sections = build_sections(counts["students"], [(index, f"BX{index:03d}") for index in range(counts["programs"])], 0)
+    enrollments = counts["students"] * args.periods * COURSES_PER_TERM
+    print(f"📦 Benchmark dataset: {counts['students']:,} students, {counts['programs']} programs, "
+          f"{len(sections):,} program sections, {len(sections) * args.periods * COURSES_PER_TERM:,} class sections, "
+          f"{enrollments:,} enrollments/evaluations over {args.periods} periods (seed {args.seed})")
+    if args.dry_run:
+        return
+
+    result = generate(args)
+    print(f"\n✅ Generated in {result['duration_s']}s (periods {result['periods']}):")
+    for table, count in result["counts"].items():
+        print(f"   {table:<24} {count:>12,}")
+
+if __name__ == "__main__":
+    main()
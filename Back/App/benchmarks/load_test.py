@@ -0,0 +1,431 @@
+"""
+Evaluation-week load test
+Drives a running API with an evaluation-week mix of students and staff and reports
+latency percentiles per endpoint, errors and connection pool saturation.
+
+Students log in, open their course list, submit every pending evaluation and
+reload the list. Secretaries and department heads log in and keep refreshing
+their dashboard bundle, completion rates and non-respondents, exporting the
+evaluations every few rounds. Think times and ratings come from --seed, so runs
+against the same database are comparable. Every student account and staff user
+sends its own X-Forwarded-For address, so the per-client rate limits apply to
+each of them as they would to real clients. Pool saturation is sampled from
+/metrics and per-request DB time from the Server-Timing header.
+
+Run it against a local database only: --prepare-accounts overwrites passwords.
+
+Usage:
+    # API under test
+    uvicorn main:app --port 8000 --workers 4
+
+    python -m benchmarks.generate_data --truncate --scale 10           # benchmark database (accounts use the load-test password)
+    python -m benchmarks.load_test --prepare-accounts                  # or set the password on sampled accounts of another local DB
+    python -m benchmarks.load_test --students 200 --secretaries 5 --dept-heads 5 --duration 120
+    python -m benchmarks.load_test --save-baseline peak                # store benchmarks/baselines/load_peak.json
+    python -m benchmarks.load_test --compare peak                      # exit 1 when p95 or errors regressed
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+# Password given to the load-test accounts (--prepare-accounts) and to generated benchmark users
+LOAD_TEST_PASSWORD = os.getenv("LOAD_TEST_PASSWORD", "LoadTest#2024")
+
+COMMENTS = [
+    "The instructor explains the lessons clearly and is always prepared.",
+    "Very helpful and approachable, the activities were engaging.",
+    "Good course overall but the pacing was too fast at times.",
+    "The materials were outdated and the lectures were hard to follow.",
+    "Assessments matched the lessons. I learned a lot this semester.",
+    "Feedback on our outputs came late and was not very detailed.",
+    "",
+]
+
+def client_address(group: int, index: int) -> str:
+    """Distinct X-Forwarded-For address of one simulated client (the rate limiter keys on it)"""
+    return f"10.{group}.{(index >> 8) & 255}.{index & 255}"
+
+_SERVER_TIMING_DB = re.compile(r'db;dur=([\d.]+);desc="(\d+) queries"')
+_POOL_SAMPLE = re.compile(r'^db_pool_connections\{pool="(\w+)",state="(\w+)"\} ([\d.e+-]+)$', re.MULTILINE)
+
+# ===========================
+# RESULTS
+# ===========================
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (0 for no values)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+class Recorder:
+    """Latencies, errors and Server-Timing DB numbers per endpoint"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, Counter] = defaultdict(Counter)
+        self.db_ms: Dict[str, List[float]] = defaultdict(list)
+        self.queries: Dict[str, List[int]] = defaultdict(list)
+        self.pool_samples: List[Dict[str, float]] = []
+
+    def record(self, endpoint: str, elapsed_ms: float, response: Optional[httpx.Response], error: Optional[str] = None):
+        self.latencies[endpoint].append(elapsed_ms)
+        if response is None:
+            self.errors[endpoint][error or "connection"] += 1
+            return
+        if response.status_code >= 400:
+            self.errors[endpoint][str(response.status_code)] += 1
+        timing = _SERVER_TIMING_DB.search(response.headers.get("server-timing", ""))
+        if timing:
+            self.db_ms[endpoint].append(float(timing.group(1)))
+            self.queries[endpoint].append(int(timing.group(2)))
+
+    def summary(self, duration_s: float) -> Dict[str, Any]:
+        endpoints = {}
+        for endpoint in sorted(self.latencies):
+            latencies = self.latencies[endpoint]
+            errors = sum(self.errors[endpoint].values())
+            endpoints[endpoint] = {
+                "requests": len(latencies),
+                "errors": errors,
+                "error_rate": round(errors / len(latencies), 4) if latencies else 0,
+                "error_statuses": dict(self.errors[endpoint]),
+                "rps": round(len(latencies) / duration_s, 2) if duration_s else 0,
+                "p50_ms": round(percentile(latencies, 50), 1),
+                "p95_ms": round(percentile(latencies, 95), 1),
+                "p99_ms": round(percentile(latencies, 99), 1),
+                "max_ms": round(max(latencies), 1) if latencies else 0,
+                "avg_db_ms": round(sum(self.db_ms[endpoint]) / len(self.db_ms[endpoint]), 1) if self.db_ms[endpoint] else None,
+                "avg_queries": round(sum(self.queries[endpoint]) / len(self.queries[endpoint]), 1) if self.queries[endpoint] else None,
+            }
+
+        pool = {}
+        if self.pool_samples:
+            checked_out = [sample.get("checked_out", 0) for sample in self.pool_samples]
+            overflow = [sample.get("overflow", 0) for sample in self.pool_samples]
+            size = max(sample.get("size", 0) for sample in self.pool_samples)
+            pool = {
+                "samples": len(self.pool_samples),
+                "size": size,
+                "peak_checked_out": max(checked_out),
+                "avg_checked_out": round(sum(checked_out) / len(checked_out), 1),
+                "peak_overflow": max(overflow),
+                "saturated_share": round(sum(1 for value in checked_out if size and value >= size) / len(checked_out), 3),
+            }
+
+        total = sum(len(values) for values in self.latencies.values())
+        return {
+            "duration_s": round(duration_s, 1),
+            "total_requests": total,
+            "total_errors": sum(sum(counter.values()) for counter in self.errors.values()),
+            "throughput_rps": round(total / duration_s, 2) if duration_s else 0,
+            "endpoints": endpoints,
+            "db_pool": pool,
+        }
+
+# ===========================
+# VIRTUAL USERS
+# ===========================
+
+async def call(client: httpx.AsyncClient, recorder: Recorder, endpoint: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+    """Send one request and record it under its endpoint template"""
+    started = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+    except httpx.HTTPError as e:
+        recorder.record(endpoint, (time.perf_counter() - started) * 1000, None, type(e).__name__)
+        return None
+    recorder.record(endpoint, (time.perf_counter() - started) * 1000, response)
+    return response
+
+async def login(client: httpx.AsyncClient, recorder: Recorder, email: str, password: str) -> Optional[Dict[str, Any]]:
+    """Log in and set the bearer token on the client; returns the user payload"""
+    response = await call(client, recorder, "POST /api/auth/login", "POST", "/api/auth/login",
+                          json={"email": email, "password": password})
+    if response is None or response.status_code != 200:
+        return None
+    body = response.json()
+    if not body.get("success"):
+        recorder.errors["POST /api/auth/login"]["rejected"] += 1
+        return None
+    client.headers["Authorization"] = f"Bearer {body['token']}"
+    return body["user"]
+
+async def think(rng: random.Random, think_time: float):
+    if think_time > 0:
+        await asyncio.sleep(rng.uniform(0.5, 1.5) * think_time)
+
+async def student_user(base_url: str, accounts: asyncio.Queue, recorder: Recorder, rng: random.Random,
+                       deadline: float, password: str, think_time: float, question_keys: List[str]):
+    """Take student accounts off the queue until the deadline: login, courses, submit pending, courses"""
+    while time.monotonic() < deadline:
+        email, address = await accounts.get()
+        accounts.put_nowait((email, address))
+        async with httpx.AsyncClient(base_url=base_url, timeout=60, headers={"X-Forwarded-For": address}) as client:
+            user = await login(client, recorder, email, password)
+            if not user:
+                await think(rng, think_time)
+                continue
+
+            courses_url = f"/api/student/{user['id']}/courses"
+            response = await call(client, recorder, "GET /api/student/{id}/courses", "GET", courses_url)
+            courses = response.json().get("data", []) if response is not None and response.status_code == 200 else []
+
+            for course in [course for course in courses if course.get("can_evaluate")]:
+                if time.monotonic() >= deadline:
+                    return
+                await think(rng, think_time)
+                base = rng.choice([2, 3, 3, 4, 4])
+                await call(client, recorder, "POST /api/student/evaluations", "POST", "/api/student/evaluations", json={
+                    "student_id": user["id"],
+                    "class_section_id": course["class_section_id"],
+                    "ratings": {key: min(4, max(1, base + rng.choice([-1, 0, 0, 1]))) for key in question_keys},
+                    "comment": rng.choice(COMMENTS),
+                })
+
+            await call(client, recorder, "GET /api/student/{id}/courses", "GET", courses_url)
+        await think(rng, think_time)
+
+async def staff_user(base_url: str, email: str, address: str, prefix: str, recorder: Recorder, rng: random.Random,
+                     deadline: float, password: str, think_time: float, export_every: int):
+    """Refresh the dashboards until the deadline, exporting every export_every rounds"""
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, headers={"X-Forwarded-For": address}) as client:
+        user = await login(client, recorder, email, password)
+        if not user:
+            return
+        rounds = 0
+        while time.monotonic() < deadline:
+            await call(client, recorder, f"GET {prefix}/dashboard-bundle", "GET", f"{prefix}/dashboard-bundle")
+            await call(client, recorder, f"GET {prefix}/completion-rates", "GET", f"{prefix}/completion-rates",
+                       params={"user_id": user["id"]})
+            await call(client, recorder, f"GET {prefix}/non-respondents", "GET", f"{prefix}/non-respondents")
+            rounds += 1
+            if export_every and rounds % export_every == 0:
+                await call(client, recorder, "GET /api/admin/export/evaluations", "GET", "/api/admin/export/evaluations",
+                           params={"format": "csv", "limit": 2000})
+            await think(rng, think_time * 3)
+
+async def sample_pool(base_url: str, recorder: Recorder, deadline: float, interval: float, metrics_token: Optional[str]):
+    """Poll /metrics for the primary pool state"""
+    headers = {"Authorization": f"Bearer {metrics_token}"} if metrics_token else {}
+    async with httpx.AsyncClient(base_url=base_url, timeout=10, headers=headers) as client:
+        while time.monotonic() < deadline:
+            try:
+                response = await client.get("/metrics")
+                if response.status_code == 200:
+                    sample = {state: float(value) for pool, state, value in _POOL_SAMPLE.findall(response.text) if pool == "primary"}
+                    if sample:
+                        recorder.pool_samples.append(sample)
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(interval)
+
+# ===========================
+# ACCOUNTS
+# ===========================
+
+def load_accounts(students: int, staff: int) -> Dict[str, List[str]]:
+    """Emails of students with pending evaluations in the active period, and of active staff"""
+    from sqlalchemy import text
+    from database.connection import SessionLocal
+
+    db = SessionLocal()
+    try:
+        student_emails = [row[0] for row in db.execute(text("""
+            SELECT u.email
+            FROM users u
+            JOIN students s ON s.user_id = u.id
+            JOIN enrollments enr ON enr.student_id = s.id
+            JOIN evaluation_periods ep ON enr.evaluation_period_id = ep.id AND ep.status = 'active'
+            WHERE u.is_active = true AND enr.status = 'active'
+            GROUP BY u.id, u.email
+            ORDER BY u.id
+            LIMIT :limit
+        """), {"limit": students}).fetchall()]
+
+        staff_emails = {}
+        for role in ("secretary", "department_head"):
+            staff_emails[role] = [row[0] for row in db.execute(text("""
+                SELECT email FROM users WHERE role = :role AND is_active = true ORDER BY id LIMIT :limit
+            """), {"role": role, "limit": staff}).fetchall()]
+
+        return {"student": student_emails, **staff_emails}
+    finally:
+        db.close()
+
+def prepare_accounts(accounts: Dict[str, List[str]], password: str, allow_remote: bool = False) -> int:
+    """Give the sampled accounts the load-test password (local databases only)"""
+    import bcrypt
+    from sqlalchemy import text
+    from database.connection import SessionLocal, engine
+
+    host = engine.url.host or engine.url.query.get("host", "")
+    if not allow_remote and host not in ("localhost", "127.0.0.1", "::1", "") and not str(host).startswith("/"):
+        raise SystemExit(f"Refusing to change passwords on {host}; pass --allow-remote for a disposable database")
+
+    emails = [email for group in accounts.values() for email in group]
+    password_hash = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=4)).decode("utf-8")
+    db = SessionLocal()
+    try:
+        result = db.execute(text("""
+            UPDATE users
+            SET password_hash = :password_hash, must_change_password = false, first_login = false
+            WHERE email = ANY(:emails)
+        """), {"password_hash": password_hash, "emails": emails})
+        db.commit()
+        return result.rowcount
+    finally:
+        db.close()
+
+# ===========================
+# BASELINES
+# ===========================
+
+def save_baseline(name: str, report: Dict[str, Any]) -> Path:
+    BASELINE_DIR.mkdir(parents=True, exist_ok=True)
+    path = BASELINE_DIR / f"load_{name}.json"
+    path.write_text(json.dumps(report, indent=2))
+    return path
+
+def compare_baseline(name: str, report: Dict[str, Any], max_regression: float) -> List[str]:
+    """Regressions against a saved baseline: p95 up by more than max_regression, or a higher error rate"""
+    path = BASELINE_DIR / f"load_{name}.json"
+    if not path.exists():
+        raise SystemExit(f"No baseline {path}")
+    baseline = json.loads(path.read_text())
+
+    regressions = []
+    for endpoint, current in report["endpoints"].items():
+        previous = baseline["endpoints"].get(endpoint)
+        if not previous or not previous["requests"]:
+            continue
+        if previous["p95_ms"] and current["p95_ms"] > previous["p95_ms"] * (1 + max_regression):
+            regressions.append(f"{endpoint}: p95 {previous['p95_ms']} -> {current['p95_ms']} ms")
+        if current["error_rate"] > previous["error_rate"] + 0.01:
+            regressions.append(f"{endpoint}: error rate {previous['error_rate']:.2%} -> {current['error_rate']:.2%}")
+    return regressions
+
+def print_report(report: Dict[str, Any]):
+    print(f"\n{'Endpoint':48} {'reqs':>6} {'err':>5} {'rps':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'db ms':>7} {'queries':>7}")
+    for endpoint, row in report["endpoints"].items():
+        print(f"{endpoint:48} {row['requests']:>6} {row['errors']:>5} {row['rps']:>7} {row['p50_ms']:>8} {row['p95_ms']:>8} "
+              f"{row['p99_ms']:>8} {row['avg_db_ms'] if row['avg_db_ms'] is not None else '-':>7} "
+              f"{row['avg_queries'] if row['avg_queries'] is not None else '-':>7}")
+    print(f"\nTotal: {report['total_requests']} requests, {report['total_errors']} errors, "
+          f"{report['throughput_rps']} req/s over {report['duration_s']} s")
+    pool = report["db_pool"]
+    if pool:
+        print(f"DB pool (per-worker sum): size {pool['size']:.0f}, peak checked out {pool['peak_checked_out']:.0f}, "
+              f"peak overflow {pool['peak_overflow']:.0f}, saturated {pool['saturated_share']:.1%} of samples")
+    else:
+        print("DB pool: no samples (is /metrics enabled?)")
+
+# ===========================
+# RUN
+# ===========================
+
+async def run(args) -> Dict[str, Any]:
+    from services.evaluation_answers import QUESTION_KEYS
+
+    accounts = load_accounts(args.students * args.accounts_per_student, max(args.secretaries, args.dept_heads))
+    if not accounts["student"]:
+        raise SystemExit("No students enrolled in an active period - seed the database first")
+
+    recorder = Recorder()
+    student_queue: asyncio.Queue = asyncio.Queue()
+    # Each account is one student, so it keeps one client address across its sessions
+    for index, email in enumerate(accounts["student"]):
+        student_queue.put_nowait((email, client_address(1, index)))
+
+    started = time.monotonic()
+    deadline = started + args.duration
+    tasks = [asyncio.create_task(sample_pool(args.base_url, recorder, deadline, 1.0, args.metrics_token))]
+
+    staff = [(email, "/api/secretary") for email in accounts["secretary"][:args.secretaries]]
+    staff += [(email, "/api/dept-head") for email in accounts["department_head"][:args.dept_heads]]
+    for index, (email, prefix) in enumerate(staff):
+        tasks.append(asyncio.create_task(staff_user(
+            args.base_url, email, client_address(2, index), prefix, recorder, random.Random(args.seed * 1000 + index),
+            deadline, args.password, args.think_time, args.export_every
+        )))
+
+    for index in range(args.students):
+        # Ramp students up evenly over --ramp-up seconds
+        if args.ramp_up and args.students > 1:
+            await asyncio.sleep(args.ramp_up / args.students)
+        tasks.append(asyncio.create_task(student_user(
+            args.base_url, student_queue, recorder, random.Random(args.seed * 100000 + index),
+            deadline, args.password, args.think_time, list(QUESTION_KEYS)
+        )))
+
+    await asyncio.gather(*tasks)
+    report = recorder.summary(time.monotonic() - started)
+    report["scenario"] = {key: getattr(args, key) for key in (
+        "students", "secretaries", "dept_heads", "duration", "ramp_up", "think_time", "export_every", "seed"
+    )}
+    report["finished_at"] = datetime.now().isoformat(timespec="seconds")
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluation-week load test")
+    parser.add_argument("--base-url", default=os.getenv("LOAD_TEST_BASE_URL", "http://127.0.0.1:8000"))
+    parser.add_argument("--students", type=int, default=100, help="Concurrent virtual students")
+    parser.add_argument("--accounts-per-student", type=int, default=3, help="Student accounts sampled per virtual student")
+    parser.add_argument("--secretaries", type=int, default=3)
+    parser.add_argument("--dept-heads", type=int, default=3)
+    parser.add_argument("--duration", type=int, default=60, help="Seconds")
+    parser.add_argument("--ramp-up", type=int, default=10, help="Seconds to start every virtual student")
+    parser.add_argument("--think-time", type=float, default=1.0, help="Mean seconds between a user's actions")
+    parser.add_argument("--export-every", type=int, default=5, help="Staff export once per N dashboard rounds (0 = never)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--password", default=LOAD_TEST_PASSWORD)
+    parser.add_argument("--metrics-token", default=os.getenv("METRICS_TOKEN"))
+    parser.add_argument("--prepare-accounts", action="store_true", help="Set --password on the sampled accounts and exit")
+    parser.add_argument("--allow-remote", action="store_true", help="Allow --prepare-accounts on a non-local database")
+    parser.add_argument("--output", help="Also write the report to this JSON file")
+    parser.add_argument("--save-baseline", metavar="NAME")
+    parser.add_argument("--compare", metavar="NAME", help="Compare with a saved baseline; exit 1 on regression")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="Allowed p95 increase (0.25 = +25%%)")
+    args = parser.parse_args()
+
+    if args.prepare_accounts:
+        accounts = load_accounts(args.students * args.accounts_per_student, max(args.secretaries, args.dept_heads))
+        updated = prepare_accounts(accounts, args.password, args.allow_remote)
+        print(f"✅ Load-test password set on {updated} accounts")
+        return
+
+    print(f"🚦 Load test: {args.students} students, {args.secretaries} secretaries, {args.dept_heads} department heads "
+          f"for {args.duration}s against {args.base_url}")
+    report = asyncio.run(run(args))
+    print_report(report)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    if args.save_baseline:
+        print(f"💾 Baseline saved: {save_baseline(args.save_baseline, report)}")
+    if args.compare:
+        regressions = compare_baseline(args.compare, report, args.max_regression)
+        if regressions:
+            print("❌ Regressions against baseline:")
+            for regression in regressions:
+                print(f"   - {regression}")
+            sys.exit(1)
+        print("✅ No regressions against baseline")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+ML and aggregation micro-benchmarks
+Times the sentiment and anomaly services and the answer aggregations against tracked baselines.
+
+Cases cover SentimentAnalyzer.predict/predict_batch at several batch sizes and model
+load from pickle, AnomalyDetector.extract_features/detect_batch/fit, and the
+Python-side aggregation behind the secretary and department head category-average
+and question-distribution endpoints (EvaluationAnswerService). Inputs come from the
+benchmark data generator with a fixed seed; the sentiment model is trained on the
+bundled starter data so results don't depend on a pickle from another sklearn version.
+
+Each case is timed with timeit (auto-ranged loops, median of --repeat runs) and
+compared with benchmarks/baselines/micro.json: a case regresses when its median is
+more than its threshold (e.g. 0.25 = +25%) above the baseline. Baselines are only
+comparable on the machine that recorded them - refresh them with --save-baseline
+when the reference machine or library versions change.
+
+Usage:
+    python -m benchmarks.micro                           # run and compare with the baseline
+    python -m benchmarks.micro --filter sentiment        # only cases whose name contains "sentiment"
+    python -m benchmarks.micro --check                   # exit 1 on regression (CI)
+    python -m benchmarks.micro --save-baseline           # record the current numbers
+"""
+
+import argparse
+import json
+import logging
+import os
+import pickle
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import timeit
+import warnings
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple
+
+from benchmarks.generate_data import COMMENT_PARTS, make_answers, make_comment
+from services.evaluation_answers import (
+    QUESTION_KEYS, RATING_SCALE, EvaluationAnswerService, answers_to_ratings, ratings_to_answers,
+)
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines" / "micro.json"
+SENTIMENT_BATCH_SIZES = (1, 10, 100, 1000)
+ANOMALY_BATCH_SIZES = (10, 100, 1000)
+ANOMALY_FIT_SIZES = (500, 2000)
+SEED = 42
+
+class BenchCase(NamedTuple):
+    name: str
+    func: Callable[[], Any]
+    items: int          # Work items per call, for the per-item column
+    threshold: float    # Allowed slowdown against the baseline (0.25 = +25%)
+
+# ===========================
+# INPUTS
+# ===========================
+
+def sample_comments(count: int, rng: random.Random) -> List[str]:
+    """Generated non-empty comments of mixed tone"""
+    tones = list(COMMENT_PARTS)
+    return [make_comment(rng, rng.choice(tones)) for _ in range(count)]
+
+def sample_ratings(count: int, rng: random.Random, anomaly_rate: float = 0.03) -> List[Dict[str, int]]:
+    """Submitted ratings dicts (descriptive keys, as the student form sends them)"""
+    return [dict(zip(QUESTION_KEYS, make_answers(rng, anomaly_rate)[0])) for _ in range(count)]
+
+def sample_counts(evaluations: int, rng: random.Random) -> Dict[str, Dict[str, int]]:
+    """answer_counts()["counts"] for a section of the given size"""
+    counts = {str(number): {rating: 0 for rating in RATING_SCALE} for number in range(1, len(QUESTION_KEYS) + 1)}
+    for ratings in sample_ratings(evaluations, rng):
+        for number, answer in enumerate(ratings_to_answers(ratings), start=1):
+            counts[str(number)][str(answer)] += 1
+    return counts
+
+def trained_sentiment_analyzer():
+    from ml_services.sentiment_analyzer import SentimentAnalyzer, create_training_data
+    analyzer = SentimentAnalyzer()
+    texts, labels = create_training_data()
+    with warnings.catch_warnings():
+        # The starter set is tiny; its classification report warns about ill-defined precision
+        warnings.simplefilter("ignore")
+        analyzer.train(texts, labels)
+    return analyzer
+
+# ===========================
+# CASES
+# ===========================
+
+def build_cases(workdir: Path) -> List[BenchCase]:
+    """All cases, with inputs prepared up front; model pickles are written to workdir"""
+    from ml_services.anomaly_detector import AnomalyDetector
+    from ml_services.sentiment_analyzer import SentimentAnalyzer
+
+    rng = random.Random(SEED)
+    cases: List[BenchCase] = []
+
+    # Sentiment
+    analyzer = trained_sentiment_analyzer()
+    comments = sample_comments(max(SENTIMENT_BATCH_SIZES), rng)
+    cases.append(BenchCase("sentiment.predict", lambda: analyzer.predict(comments[0]), 1, 0.3))
+    for size in SENTIMENT_BATCH_SIZES:
+        batch = comments[:size]
+        cases.append(BenchCase(f"sentiment.predict_batch[{size}]", lambda batch=batch: analyzer.predict_batch(batch), size, 0.3))
+
+    sentiment_model = workdir / "svm_sentiment_model.pkl"
+    with open(sentiment_model, "wb") as f:
+        pickle.dump({"vectorizer": analyzer.vectorizer, "classifier": analyzer.classifier, "is_trained": True}, f)
+    cases.append(BenchCase("sentiment.load_model", lambda: SentimentAnalyzer(model_path=str(sentiment_model)), 1, 0.5))
+
+    # Anomaly detection
+    detector = AnomalyDetector()
+    ratings = sample_ratings(max(ANOMALY_BATCH_SIZES + ANOMALY_FIT_SIZES), rng)
+    cases.append(BenchCase("anomaly.extract_features", lambda: detector.extract_features(ratings[0]), 1, 0.25))
+    for size in ANOMALY_BATCH_SIZES:
+        batch = ratings[:size]
+        cases.append(BenchCase(f"anomaly.detect_batch[{size}]", lambda batch=batch: detector.detect_batch(batch), size, 0.25))
+    for size in ANOMALY_FIT_SIZES:
+        batch = ratings[:size]
+        cases.append(BenchCase(f"anomaly.fit[{size}]", lambda batch=batch: AnomalyDetector().fit(batch), size, 0.5))
+
+    fitted = AnomalyDetector()
+    fitted.fit(ratings[:ANOMALY_FIT_SIZES[0]])
+    anomaly_model = workdir / "dbscan_anomaly_model.pkl"
+    with open(anomaly_model, "wb") as f:
+        pickle.dump({"scaler": fitted.scaler, "dbscan": fitted.dbscan, "eps": fitted.eps,
+                     "min_samples": fitted.min_samples, "is_fitted": True}, f)
+    cases.append(BenchCase("anomaly.load_model", lambda: AnomalyDetector().load_model(str(anomaly_model)), 1, 0.5))
+
+    # Answer aggregation (submit path and secretary/department head endpoints)
+    submitted = ratings[0]
+    answers = ratings_to_answers(submitted)
+    cases.append(BenchCase("aggregation.ratings_to_answers", lambda: ratings_to_answers(submitted), 1, 0.25))
+    cases.append(BenchCase("aggregation.answers_to_ratings", lambda: answers_to_ratings(answers), 1, 0.25))
+    counts = sample_counts(40, rng)
+    cases.append(BenchCase("aggregation.question_distribution", lambda: EvaluationAnswerService.question_distribution(counts), 1, 0.25))
+    cases.append(BenchCase("aggregation.category_totals", lambda: EvaluationAnswerService.category_totals(counts), 1, 0.25))
+
+    return cases
+
+# ===========================
+# TIMING
+# ===========================
+
+def run_case(case: BenchCase, repeat: int, min_time: float) -> Dict[str, Any]:
+    """Median/min milliseconds per call over repeat runs of an auto-ranged loop"""
+    timer = timeit.Timer(case.func)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9)))
+    per_call = [elapsed * 1000 / number for elapsed in timer.repeat(repeat=repeat, number=number)]
+    median = statistics.median(per_call)
+    return {
+        "median_ms": round(median, 4),
+        "min_ms": round(min(per_call), 4),
+        "stdev_ms": round(statistics.stdev(per_call), 4) if len(per_call) > 1 else 0.0,
+        "per_item_us": round(median * 1000 / case.items, 2),
+        "loops": number,
+        "threshold": case.threshold,
+    }
+
+def machine_info() -> Dict[str, Any]:
+    import numpy
+    import sklearn
+    return {
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": numpy.__version__,
+        "sklearn": sklearn.__version__,
+    }
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Any]) -> List[str]:
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get("cases", {}).get(name)
+        if not previous or not previous["median_ms"]:
+            continue
+        change = result["median_ms"] / previous["median_ms"] - 1
+        result["change"] = round(change, 3)
+        if change > result["threshold"]:
+            regressions.append(f"{name}: {previous['median_ms']} -> {result['median_ms']} ms "
+                               f"(+{change:.0%}, threshold +{result['threshold']:.0%})")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="ML and aggregation micro-benchmarks")
+    parser.add_argument("--filter", help="Only run cases whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=7, help="Timed runs per case (median reported)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds per timed run (loops are auto-ranged)")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results to --baseline")
+    parser.add_argument("--check", action="store_true", help="Exit 1 when a case regressed past its threshold")
+    parser.add_argument("--output", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    # Training and fitting log at INFO on every call
+    logging.disable(logging.INFO)
+
+    baseline_path = Path(args.baseline)
+    baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+    if baseline and baseline.get("machine", {}).get("platform") != platform.platform():
+        print(f"⚠️  Baseline recorded on {baseline.get('machine', {}).get('platform')} - comparisons are indicative only")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        cases = build_cases(Path(workdir))
+        if args.filter:
+            cases = [case for case in cases if args.filter in case.name]
+
+        print(f"{'Case':40} {'median ms':>11} {'min ms':>10} {'per item µs':>12} {'vs base':>8}")
+        for case in cases:
+            result = run_case(case, args.repeat, args.min_time)
+            results[case.name] = result
+            previous = baseline.get("cases", {}).get(case.name)
+            change = f"{result['median_ms'] / previous['median_ms'] - 1:+.0%}" if previous and previous["median_ms"] else "-"
+            print(f"{case.name:40} {result['median_ms']:>11.4f} {result['min_ms']:>10.4f} {result['per_item_us']:>12.2f} {change:>8}")
+
+    regressions = compare(results, baseline) if baseline else []
+    report = {"machine": machine_info(), "recorded_at": datetime.now().isoformat(timespec="seconds"), "cases": results}
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    if args.save_baseline:
+        if args.filter and baseline:
+            # Keep the cases that weren't run
+            report["cases"] = {**baseline.get("cases", {}), **results}
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"💾 Baseline saved: {baseline_path}")
+
+    if regressions:
+        print("❌ Regressions against baseline:")
+        for regression in regressions:
+            print(f"   - {regression}")
+        if args.check:
+            sys.exit(1)
+    elif baseline:
+        print("✅ No regressions against baseline")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+ML inference worker throughput
+Submits generated evaluations from several client processes and reports scoring throughput and latency.
+
+Modes:
+- in-process:  each client scores its own requests (score_batch of one, in a thread), as a
+               web worker does without the inference worker
+- worker-1:    services.ml_inference with --max-batch 1 (one model call per request)
+- worker-N:    services.ml_inference with --max-batch N (micro-batched)
+
+Each client process stands in for one web worker and keeps --concurrency requests in
+flight. The mean batch size comes from the worker's shutdown log line. Models are
+trained into a temporary directory (benchmarks.worker_memory.train_models); no
+database is needed.
+
+Usage:
+    python -m benchmarks.ml_inference                               # in-process, worker-1, worker-64
+    python -m benchmarks.ml_inference --clients 4 --concurrency 16 --requests 2000
+    python -m benchmarks.ml_inference --modes worker-1,worker-32 --max-wait-ms 10
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import re
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from benchmarks.generate_data import COMMENT_PARTS, make_comment
+from benchmarks.micro import sample_ratings
+from benchmarks.worker_memory import APP_DIR, SEED, train_models
+
+DEFAULT_MODES = ("in-process", "worker-1", "worker-64")
+
+def make_requests(count: int, seed: int) -> List[tuple]:
+    rng = random.Random(seed)
+    tones = list(COMMENT_PARTS)
+    return [(make_comment(rng, rng.choice(tones)), ratings) for ratings in sample_ratings(count, rng)]
+
+def run_client(requests: List[tuple], concurrency: int, use_worker: bool, start, results) -> None:
+    """One web worker stand-in: `concurrency` coroutines working through `requests`"""
+    from services import ml_inference
+    from ml_services.loader import warm_up
+    if not use_worker:
+        # No socket at ML_INFERENCE_SOCKET: score_evaluation scores in-process
+        warm_up()
+    # Imports and model loading stay out of the timed part
+    start.wait()
+
+    async def main() -> List[float]:
+        queue = list(reversed(requests))
+        latencies = []
+
+        async def loop():
+            while queue:
+                comment, ratings = queue.pop()
+                started = time.perf_counter()
+                await ml_inference.score_evaluation(comment, ratings)
+                latencies.append(time.perf_counter() - started)
+        await asyncio.gather(*(loop() for _ in range(concurrency)))
+        return latencies
+    results.put(asyncio.run(main()))
+
+def start_worker(socket_path: str, max_batch: int, max_wait_ms: int, env: Dict[str, str]) -> subprocess.Popen:
+    worker = subprocess.Popen([sys.executable, "-m", "services.ml_inference", "--socket", socket_path,
+                               "--max-batch", str(max_batch), "--max-wait-ms", str(max_wait_ms)],
+                              cwd=APP_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    deadline = time.monotonic() + 60
+    while not os.path.exists(socket_path):
+        if worker.poll() is not None or time.monotonic() > deadline:
+            worker.kill()
+            raise SystemExit(f"inference worker did not start:\n{worker.stderr.read().decode()[-2000:]}")
+        time.sleep(0.1)
+    return worker
+
+def stop_worker(worker: subprocess.Popen) -> Optional[float]:
+    """Stop the worker and return its mean batch size"""
+    worker.send_signal(signal.SIGTERM)
+    _, stderr = worker.communicate(timeout=30)
+    match = re.search(r"after (\d+) evaluations in (\d+) batches", stderr.decode())
+    if not match or not int(match.group(2)):
+        return None
+    return int(match.group(1)) / int(match.group(2))
+
+def measure(mode: str, args, model_dir: Path, workdir: Path) -> Dict[str, object]:
+    socket_path = str(workdir / f"{mode}.sock")
+    env = dict(os.environ, ML_MODEL_DIR=str(model_dir), ML_INFERENCE_SOCKET=socket_path,
+               ML_INFERENCE_TIMEOUT_MS="30000")
+    os.environ.update(env)
+
+    worker = None
+    if mode != "in-process":
+        worker = start_worker(socket_path, int(mode.split("-", 1)[1]), args.max_wait_ms, env)
+
+    per_client = args.requests // args.clients
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    start = context.Barrier(args.clients + 1)
+    clients = [context.Process(target=run_client, args=(make_requests(per_client, SEED + index), args.concurrency,
+                                                         worker is not None, start, results))
+               for index in range(args.clients)]
+    for client in clients:
+        client.start()
+    start.wait()
+    started = time.perf_counter()
+    latencies = [latency for _ in clients for latency in results.get()]
+    elapsed = time.perf_counter() - started
+    for client in clients:
+        client.join()
+
+    mean_batch = stop_worker(worker) if worker else None
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2),
+        "mean_batch": round(mean_batch, 1) if mean_batch else None,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="ML inference worker throughput")
+    parser.add_argument("--modes", default=",".join(DEFAULT_MODES), help="Comma-separated: in-process, worker-<max batch>")
+    parser.add_argument("--clients", type=int, default=4, help="Client processes (web workers)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Requests in flight per client")
+    parser.add_argument("--requests", type=int, default=4000, help="Total requests per mode")
+    parser.add_argument("--max-wait-ms", type=int, default=5)
+    parser.add_argument("--train-samples", type=int, default=2000, help="Generated comments/ratings to train on")
+    parser.add_argument("--output", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+    for mode in modes:
+        if mode != "in-process" and not re.fullmatch(r"worker-\d+", mode):
+            parser.error(f"unknown mode: {mode}")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        model_dir = Path(workdir) / "models"
+        model_dir.mkdir()
+        print(f"Training models on {args.train_samples} generated samples...")
+        train_models(model_dir, args.train_samples)
+
+        print(f"\n{args.clients} clients x {args.concurrency} in flight, {args.requests} requests per mode")
+        print(f"{'mode':12} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'mean batch':>11}")
+        for mode in modes:
+            result = measure(mode, args, model_dir, Path(workdir))
+            results[mode] = result
+            batch = f"{result['mean_batch']:.1f}" if result["mean_batch"] else "-"
+            print(f"{mode:12} {result['throughput_rps']:>9.1f} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {batch:>11}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
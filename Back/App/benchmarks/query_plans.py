@@ -0,0 +1,378 @@
+"""
+Query plan regression checks
+EXPLAINs the SQL behind the heavy analytics endpoints and checks the plans keep using indexes.
+
+Each registered hot endpoint (completion rates, non-respondents, exports, sentiment
+trends, dashboards) is called in-process with a token of a generated staff or student
+account while every SELECT it issues is captured. Each distinct statement is then
+re-run as EXPLAIN (FORMAT JSON) with the same parameters - so the checked SQL is
+always the SQL the route currently sends, not a copy that can drift.
+
+Checks per endpoint:
+- no Seq Scan on evaluations/enrollments (or their period partitions) holding more
+  than --seq-scan-rows rows that filters out most of them, unless the query lists
+  the table in allow_seq_scan (reading a whole pruned period partition is fine)
+- estimated cost no more than --cost-threshold above the recorded baseline
+  (benchmarks/baselines/query_plans.json), which acts as the cost ceiling
+
+Finally, indexes with no scans in pg_stat_user_indexes and indexes on the watched
+tables that no hot plan uses are reported. Run against a local database seeded with
+benchmarks.generate_data; tests/test_query_plans.py runs the same checks under pytest.
+
+Usage:
+    python -m benchmarks.generate_data --truncate --scale 10
+    python -m benchmarks.query_plans                       # check plans, report indexes
+    python -m benchmarks.query_plans --filter non_respondents --show-plans
+    python -m benchmarks.query_plans --save-baseline       # record costs after an intended change
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines" / "query_plans.json"
+# Tables that must be reached through indexes once they are big
+WATCHED_TABLES = ("evaluations", "enrollments")
+SEQ_SCAN_ROWS = 10000
+# A Seq Scan keeping more than this share of its relation (e.g. the whole partition of
+# the selected period after pruning) is cheaper than an index and is not flagged
+SEQ_SCAN_SELECTIVITY = 0.5
+COST_THRESHOLD = 0.5
+
+class HotQuery(NamedTuple):
+    name: str
+    role: str                          # Account used to call the endpoint
+    path: str                          # {user_id} is replaced by that account's users.id
+    allow_seq_scan: Tuple[str, ...] = ()
+
+HOT_QUERIES = (
+    HotQuery("completion_rates.secretary", "secretary", "/api/secretary/completion-rates?user_id={user_id}"),
+    HotQuery("completion_rates.dept_head", "department_head", "/api/dept-head/completion-rates?user_id={user_id}"),
+    HotQuery("non_respondents.secretary", "secretary", "/api/secretary/non-respondents"),
+    HotQuery("non_respondents.dept_head", "department_head", "/api/dept-head/non-respondents"),
+    HotQuery("non_respondents.admin", "admin", "/api/admin/non-respondents"),
+    HotQuery("sentiment_trends.secretary", "secretary", "/api/secretary/sentiment-analysis?user_id={user_id}&time_range=semester"),
+    HotQuery("sentiment_trends.dept_head", "department_head", "/api/dept-head/sentiment-analysis?user_id={user_id}&time_range=semester"),
+    # Six-month aggregate across periods: reads a third or more of each partition it touches
+    HotQuery("trends.dept_head", "department_head", "/api/dept-head/trends?user_id={user_id}", allow_seq_scan=("evaluations",)),
+    HotQuery("dashboard.secretary", "secretary", "/api/secretary/dashboard?user_id={user_id}"),
+    HotQuery("dashboard.dept_head", "department_head", "/api/dept-head/dashboard?user_id={user_id}"),
+    # Exports read every evaluation of the selection by design
+    HotQuery("export.evaluations", "admin", "/api/admin/export/evaluations?format=csv&limit=5000", allow_seq_scan=("evaluations",)),
+    HotQuery("export.analytics", "admin", "/api/admin/export/analytics?format=json", allow_seq_scan=("evaluations",)),
+    HotQuery("student.courses", "student", "/api/student/{user_id}/courses"),
+)
+
+class StatementPlan(NamedTuple):
+    shape: str
+    total_cost: float
+    plan_rows: float
+    seq_scans: List[Tuple[str, str, float, float]]  # (relation, table it belongs to, rows in relation, rows kept)
+    indexes: Set[str]
+    plan: Dict[str, Any]
+
+class QueryPlanResult(NamedTuple):
+    query: HotQuery
+    status_code: int
+    statements: List[StatementPlan]
+
+    @property
+    def total_cost(self) -> float:
+        return round(sum(statement.total_cost for statement in self.statements), 2)
+
+    @property
+    def indexes(self) -> Set[str]:
+        return set().union(*(statement.indexes for statement in self.statements)) if self.statements else set()
+
+# ===========================
+# PLANS
+# ===========================
+
+def walk(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Every node of an EXPLAIN (FORMAT JSON) plan tree"""
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from walk(child)
+
+def relation_info(db) -> Dict[str, Tuple[str, float]]:
+    """relation -> (parent table for partitions, else itself; estimated rows)"""
+    from sqlalchemy import text
+    rows = db.execute(text("""
+        SELECT c.relname, COALESCE(parent.relname, c.relname), GREATEST(c.reltuples, 0)
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace AND n.nspname = current_schema()
+        LEFT JOIN pg_inherits i ON i.inhrelid = c.oid
+        LEFT JOIN pg_class parent ON parent.oid = i.inhparent
+        WHERE c.relkind IN ('r', 'p')
+    """)).fetchall()
+    return {name: (parent, rows) for name, parent, rows in rows}
+
+def explain(connection, statement: str, parameters, relations: Dict[str, Tuple[str, float]]) -> StatementPlan:
+    """EXPLAIN one captured statement with its parameters"""
+    from middleware.query_tracker import statement_shape
+
+    cursor = connection.cursor()
+    try:
+        cursor.execute("EXPLAIN (FORMAT JSON) " + statement, parameters)
+        plan = cursor.fetchone()[0]
+    finally:
+        cursor.close()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    root = plan[0]["Plan"]
+
+    seq_scans = []
+    indexes = set()
+    for node in walk(root):
+        if node.get("Index Name"):
+            indexes.add(node["Index Name"])
+        if node["Node Type"] == "Seq Scan":
+            relation = node.get("Relation Name", "")
+            table, rows = relations.get(relation, (relation, 0.0))
+            seq_scans.append((relation, table, rows, float(node["Plan Rows"])))
+
+    return StatementPlan(
+        shape=statement_shape(statement),
+        total_cost=float(root["Total Cost"]),
+        plan_rows=float(root["Plan Rows"]),
+        seq_scans=seq_scans,
+        indexes=indexes,
+        plan=root,
+    )
+
+class StatementCapture:
+    """before_cursor_execute listener collecting distinct SELECT statements"""
+
+    def __init__(self):
+        self.statements: List[Tuple[str, Any]] = []
+        self._shapes: Set[str] = set()
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        from middleware.query_tracker import statement_shape
+        keyword = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+        if executemany or keyword not in ("SELECT", "WITH"):
+            return
+        shape = statement_shape(statement)
+        if shape not in self._shapes:
+            self._shapes.add(shape)
+            self.statements.append((statement, parameters))
+
+# ===========================
+# RUN
+# ===========================
+
+def load_accounts(db) -> Dict[str, int]:
+    """users.id of one active account per role (staff with their role rows, a student with enrollments)"""
+    from sqlalchemy import text
+    accounts = {}
+    queries = {
+        "secretary": "SELECT u.id FROM users u JOIN secretaries s ON s.user_id = u.id WHERE u.is_active ORDER BY u.id LIMIT 1",
+        "department_head": "SELECT u.id FROM users u JOIN department_heads d ON d.user_id = u.id WHERE u.is_active ORDER BY u.id LIMIT 1",
+        "admin": "SELECT id FROM users WHERE role = 'admin' AND is_active ORDER BY id LIMIT 1",
+        "student": """
+            SELECT u.id FROM users u
+            JOIN students s ON s.user_id = u.id
+            JOIN enrollments enr ON enr.student_id = s.id
+            JOIN evaluation_periods ep ON ep.id = enr.evaluation_period_id AND ep.status = 'active'
+            WHERE u.is_active ORDER BY u.id LIMIT 1
+        """,
+    }
+    for role, sql in queries.items():
+        user_id = db.execute(text(sql)).scalar()
+        if user_id:
+            accounts[role] = user_id
+    return accounts
+
+def check_local_database():
+    from database.connection import engine
+    host = engine.url.host or engine.url.query.get("host", "")
+    if host not in ("localhost", "127.0.0.1", "::1", "") and not str(host).startswith("/"):
+        raise SystemExit(f"Query plan checks run against a seeded local database, not {host}")
+
+def run_plans(queries=HOT_QUERIES) -> List[QueryPlanResult]:
+    """Call each hot endpoint, capture its SELECTs and EXPLAIN them"""
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event, text
+    from database.connection import SessionLocal, engine, read_engine
+    from routes.auth import create_access_token
+    from utils.cache import clear_all_caches
+    import main
+
+    check_local_database()
+    db = SessionLocal()
+    try:
+        accounts = load_accounts(db)
+        relations = relation_info(db)
+        emails = dict(db.execute(text("SELECT id, email FROM users WHERE id = ANY(:ids)"),
+                                 {"ids": list(accounts.values())}).fetchall())
+    finally:
+        db.close()
+
+    client = TestClient(main.app)
+    results = []
+    for query in queries:
+        user_id = accounts.get(query.role)
+        if not user_id:
+            raise SystemExit(f"No {query.role} account - seed the database with benchmarks.generate_data")
+        token = create_access_token({"user_id": user_id, "email": emails[user_id], "role": query.role})
+
+        # Cached responses would skip the SQL under test
+        clear_all_caches()
+        capture = StatementCapture()
+        engines = {engine, read_engine}
+        for bound in engines:
+            event.listen(bound, "before_cursor_execute", capture)
+        try:
+            response = client.get(query.path.format(user_id=user_id), headers={"Authorization": f"Bearer {token}"})
+        finally:
+            for bound in engines:
+                event.remove(bound, "before_cursor_execute", capture)
+
+        connection = engine.raw_connection()
+        try:
+            statements = [explain(connection, statement, parameters, relations) for statement, parameters in capture.statements]
+            connection.rollback()
+        finally:
+            connection.close()
+        results.append(QueryPlanResult(query, response.status_code, statements))
+    return results
+
+def plan_violations(result: QueryPlanResult, seq_scan_rows: int = SEQ_SCAN_ROWS) -> List[str]:
+    """Selective seq scans on big watched tables (partitions count as their parent table)"""
+    violations = []
+    for statement in result.statements:
+        for relation, table, rows, kept in statement.seq_scans:
+            if table not in WATCHED_TABLES or table in result.query.allow_seq_scan or rows <= seq_scan_rows:
+                continue
+            if kept >= rows * SEQ_SCAN_SELECTIVITY:
+                continue
+            violations.append(f"Seq Scan on {relation} ({kept:,.0f} of {rows:,.0f} rows): {statement.shape[:160]}")
+    return violations
+
+def cost_regression(result: QueryPlanResult, baseline: Dict[str, Any], threshold: float = COST_THRESHOLD) -> Optional[str]:
+    """Total estimated cost above the baseline ceiling"""
+    previous = baseline.get("queries", {}).get(result.query.name)
+    if not previous or not previous.get("total_cost"):
+        return None
+    ceiling = previous["total_cost"] * (1 + threshold)
+    if result.total_cost > ceiling:
+        return f"estimated cost {result.total_cost:,.0f} > ceiling {ceiling:,.0f} (baseline {previous['total_cost']:,.0f})"
+    return None
+
+def relation_rows() -> Dict[str, Tuple[str, float]]:
+    from database.connection import SessionLocal
+    db = SessionLocal()
+    try:
+        return relation_info(db)
+    finally:
+        db.close()
+
+def load_baseline(path: Path = BASELINE_PATH) -> Dict[str, Any]:
+    return json.loads(path.read_text()) if path.exists() else {}
+
+def index_report(results: List[QueryPlanResult]) -> Dict[str, List[Dict[str, Any]]]:
+    """Indexes never scanned (pg_stat_user_indexes) and watched-table indexes no hot plan uses"""
+    from sqlalchemy import text
+    from database.connection import SessionLocal
+
+    used = set().union(*(result.indexes for result in results)) if results else set()
+    db = SessionLocal()
+    try:
+        rows = db.execute(text("""
+            SELECT
+                s.relname,
+                COALESCE(parent_table.relname, s.relname) AS table_name,
+                s.indexrelname,
+                COALESCE(parent_index.relname, s.indexrelname) AS parent_index,
+                s.idx_scan,
+                pg_relation_size(s.indexrelid) AS size_bytes,
+                i.indisunique OR i.indisprimary AS enforces_constraint
+            FROM pg_stat_user_indexes s
+            JOIN pg_index i ON i.indexrelid = s.indexrelid
+            LEFT JOIN pg_inherits ti ON ti.inhrelid = s.relid
+            LEFT JOIN pg_class parent_table ON parent_table.oid = ti.inhparent
+            LEFT JOIN pg_inherits ii ON ii.inhrelid = s.indexrelid
+            LEFT JOIN pg_class parent_index ON parent_index.oid = ii.inhparent
+            ORDER BY pg_relation_size(s.indexrelid) DESC
+        """)).fetchall()
+    finally:
+        db.close()
+
+    # Partition indexes are summed into their partitioned (parent) index
+    by_index = {}
+    unused_by_hot_queries = {}
+    for relation, table, index, parent_index, scans, size, enforces_constraint in rows:
+        if enforces_constraint:
+            continue
+        entry = by_index.setdefault(parent_index, {"table": table, "index": parent_index, "scans": 0, "size_bytes": 0})
+        entry["scans"] += scans or 0
+        entry["size_bytes"] += size or 0
+        if table in WATCHED_TABLES and index not in used and parent_index not in used:
+            unused = unused_by_hot_queries.setdefault(parent_index, {"table": table, "index": parent_index, "size_bytes": 0})
+            unused["size_bytes"] += size or 0
+    return {
+        "never_scanned": [entry for entry in by_index.values() if not entry["scans"]],
+        "unused_by_hot_queries": list(unused_by_hot_queries.values()),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Query plan regression checks for the hot analytics endpoints")
+    parser.add_argument("--filter", help="Only queries whose name contains this text")
+    parser.add_argument("--seq-scan-rows", type=int, default=SEQ_SCAN_ROWS, help="Allowed rows for a Seq Scan on a watched table")
+    parser.add_argument("--cost-threshold", type=float, default=COST_THRESHOLD, help="Allowed cost growth over the baseline (0.5 = +50%%)")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--show-plans", action="store_true", help="Print every statement's plan")
+    args = parser.parse_args()
+
+    queries = [query for query in HOT_QUERIES if not args.filter or args.filter in query.name]
+    results = run_plans(queries)
+    baseline_path = Path(args.baseline)
+    baseline = load_baseline(baseline_path)
+
+    failures = 0
+    print(f"{'Query':32} {'HTTP':>4} {'stmts':>5} {'total cost':>12} {'baseline':>10}  result")
+    for result in results:
+        problems = plan_violations(result, args.seq_scan_rows)
+        regression = cost_regression(result, baseline, args.cost_threshold)
+        if regression:
+            problems.append(regression)
+        if result.status_code != 200:
+            problems.append(f"HTTP {result.status_code}")
+        previous = baseline.get("queries", {}).get(result.query.name, {}).get("total_cost")
+        print(f"{result.query.name:32} {result.status_code:>4} {len(result.statements):>5} {result.total_cost:>12,.0f} "
+              f"{previous if previous is not None else '-':>10}  {'❌' if problems else '✅'}")
+        for problem in problems:
+            print(f"      - {problem}")
+        if args.show_plans:
+            for statement in result.statements:
+                print(f"      [{statement.total_cost:,.0f}] {statement.shape[:200]}")
+                print("        " + json.dumps(statement.plan, indent=1).replace("\n", "\n        "))
+        failures += bool(problems)
+
+    report = index_report(results)
+    print("\nIndexes never scanned (pg_stat_user_indexes since the last stats reset):")
+    for entry in report["never_scanned"] or [{"table": "-", "index": "none", "size_bytes": 0}]:
+        print(f"   {entry['table']:24} {entry['index']:48} {entry['size_bytes'] / 1024:>10,.0f} KB")
+    print(f"\nIndexes on {'/'.join(WATCHED_TABLES)} not used by any hot query plan:")
+    for entry in report["unused_by_hot_queries"] or [{"table": "-", "index": "none", "size_bytes": 0}]:
+        print(f"   {entry['table']:24} {entry['index']:48} {entry['size_bytes'] / 1024:>10,.0f} KB")
+
+    if args.save_baseline:
+        saved = baseline.get("queries", {}) if args.filter else {}
+        saved.update({result.query.name: {"total_cost": result.total_cost, "statements": len(result.statements)} for result in results})
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        # Costs depend on the data volume, so record what they were measured against
+        relations = relation_rows()
+        # ANALYZE also estimates the partitioned parent, so read its own row count
+        dataset = {table: int(relations.get(table, (table, 0))[1]) for table in WATCHED_TABLES}
+        baseline_path.write_text(json.dumps({"dataset": dataset, "queries": saved}, indent=2) + "\n")
+        print(f"\n💾 Baseline saved: {baseline_path}")
+    elif failures:
+        print(f"\n❌ {failures} quer{'y' if failures == 1 else 'ies'} failed the plan checks")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -41,8 +41,7 @@ if not DATABASE_URL:
 # - Increase max_overflow to 20-30
 # - Monitor with: SELECT count(*) FROM pg_stat_activity WHERE datname='your_db';
 #
-engine = create_engine(
-    DATABASE_URL,
+ENGINE_OPTIONS = dict(
     pool_pre_ping=True,      # Verify connections before use (detect stale connections)
     pool_recycle=300,        # Recycle connections every 5 minutes (Railway-optimized)
     pool_size=5,             # Reduced for Railway (each worker gets its own pool)
@@ -59,8 +58,17 @@ engine = create_engine(
     }
 )
 
+engine = create_engine(DATABASE_URL, **ENGINE_OPTIONS)
+
+# Read pool for dashboard/report queries
+# READ_DATABASE_URL may point at a read replica (e.g. Supabase read replica);
+# when unset, reads share the primary engine and its pool.
+READ_DATABASE_URL = os.getenv("READ_DATABASE_URL")
+read_engine = create_engine(READ_DATABASE_URL, **ENGINE_OPTIONS) if READ_DATABASE_URL else engine
+
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 # Database dependency
 def get_db() -> Generator:
@@ -74,6 +82,17 @@ def get_db() -> Generator:
     finally:
         db.close()
 
+def get_read_db() -> Generator:
+    """
+    Read-only database dependency
+    Uses the read pool (replica when READ_DATABASE_URL is set)
+    """
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
 # Test database connection
 def test_connection():
     """Test database connection"""
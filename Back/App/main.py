@@ -1,40 +1,29 @@
 # Course Feedback System Backend
+# Startup is timed per phase (utils.startup) and kept free of blocking work:
+# the database probe and the optional ML warm-up run after the app is serving.
+from utils.startup import end_startup_phase, startup_phases, startup_summary, startup_total, publish_startup_metrics
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
-from fastapi.responses import JSONResponse
-import uvicorn
-import threading
+from fastapi.responses import JSONResponse, Response
 import logging
 from logging.handlers import RotatingFileHandler
 import os
 import asyncio
 from datetime import datetime
+end_startup_phase("framework")
 
-# Import database components
+# Test the database connection once the app is serving (0 disables)
+STARTUP_DB_CHECK = os.getenv("STARTUP_DB_CHECK", "1") == "1"
+# Print every registered route at startup (debugging aid)
+LOG_ROUTES = os.getenv("LOG_ROUTES", "0") == "1"
+
+# Import database components (creates the engines; no connection is opened here)
 try:
     from database.connection import engine, test_connection
-    print("[DB] Testing database connection...")
-    
-    # Test connection with timeout
-    connection_success = False
-    def test_db():
-        global connection_success
-        connection_success = test_connection()
-    
-    test_thread = threading.Thread(target=test_db)
-    test_thread.daemon = True
-    test_thread.start()
-    test_thread.join(timeout=5)  # Wait max 5 seconds
-    
-    if test_thread.is_alive():
-        print("[WARN] Database connection timeout - server will start anyway")
-    elif connection_success:
-        print("[OK] Database ready!")
-    else:
-        print("[WARN] Database connection failed - server will start anyway")
 except ImportError as e:
     print(f"[WARN] Database not configured: {e}")
+end_startup_phase("database")
 
 # Import routes if they exist
 try:
@@ -53,6 +42,7 @@ try:
 except ImportError as e:
     print(f"[WARN] Routes not available: {e}")
     ROUTES_AVAILABLE = False
+end_startup_phase("routes")
 
 # Configure comprehensive logging
 log_dir = "logs"
@@ -129,12 +119,13 @@ if ROUTES_AVAILABLE:
     app.include_router(notifications_router, prefix="/api", tags=["notifications"])
     print("[OK] API routes registered: auth, student, admin (users + dashboard + enrollment), dept-head, secretary, evaluation-periods, student-advancement, notifications")
     
-    # Debug: Print all registered routes
-    print("\n[INFO] Registered API Routes:")
-    for route in app.routes:
-        if hasattr(route, 'methods') and hasattr(route, 'path'):
-            methods = ', '.join(route.methods) if route.methods else 'N/A'
-            print(f"  {methods:10} {route.path}")
+    if LOG_ROUTES:
+        print("\n[INFO] Registered API Routes:")
+        for route in app.routes:
+            if hasattr(route, 'methods') and hasattr(route, 'path'):
+                methods = ', '.join(route.methods) if route.methods else 'N/A'
+                print(f"  {methods:10} {route.path}")
+end_startup_phase("app")
 
 # Security headers middleware
 @app.middleware("http")
@@ -179,6 +170,16 @@ try:
 except ImportError:
     print("[WARN] Rate limiter not available")
 
+# Query tracking middleware (query count / DB time per request, Server-Timing, N+1 warnings)
+from database.connection import engine, read_engine
+from middleware.query_tracker import install_query_tracking, query_tracking_middleware
+install_query_tracking(engine, read_engine)
+app.middleware("http")(query_tracking_middleware)
+
+# Request metrics middleware (latency per route template, requests in flight) - outermost of the HTTP middleware
+from middleware.request_metrics import request_metrics_middleware
+app.middleware("http")(request_metrics_middleware)
+
 # GZIP Compression middleware (compress responses > 1KB)
 app.add_middleware(GZipMiddleware, minimum_size=1000)
 
@@ -195,7 +196,67 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-logger.info("Middleware configured: Security Headers, Rate Limiting, GZIP, CORS")
+logger.info("Middleware configured: Security Headers, Rate Limiting, Query Tracking, Metrics, GZIP, CORS")
+end_startup_phase("middleware")
+
+@app.on_event("startup")
+async def report_startup_time():
+    """Log and export how long building the app took in this worker"""
+    publish_startup_metrics()
+    logger.info(f"Startup phases: {startup_summary()}")
+
+@app.on_event("startup")
+async def schedule_database_check():
+    """Probe the database in the background - the app serves (and /health reports) meanwhile"""
+    async def check():
+        if await asyncio.to_thread(test_connection):
+            print("[OK] Database ready!")
+        else:
+            print("[WARN] Database connection failed - requests needing it will fail until it is reachable")
+    if STARTUP_DB_CHECK:
+        app.state.database_check = asyncio.create_task(check())
+
+@app.on_event("startup")
+async def schedule_ml_warmup():
+    """Load the ML models in a thread when ML_WARMUP_ON_STARTUP=1 (otherwise on first use)"""
+    from ml_services.loader import ML_WARMUP_ON_STARTUP, warm_up
+    if ML_WARMUP_ON_STARTUP:
+        app.state.ml_warmup = asyncio.create_task(asyncio.to_thread(warm_up))
+
+@app.on_event("startup")
+async def schedule_audit_log_maintenance():
+    """Audit log maintenance in this process - only when AUDIT_LOG_MAINTENANCE_IN_APP=1 (gunicorn runs one scheduler)"""
+    from services.audit_partitions import (
+        audit_log_maintenance_loop, AUDIT_LOG_MAINTENANCE_IN_APP, AUDIT_LOG_MAINTENANCE_INTERVAL_HOURS
+    )
+    if AUDIT_LOG_MAINTENANCE_IN_APP and AUDIT_LOG_MAINTENANCE_INTERVAL_HOURS > 0:
+        app.state.audit_log_maintenance = asyncio.create_task(audit_log_maintenance_loop())
+
+@app.on_event("startup")
+async def schedule_cache_warmup():
+    """Precompute the active period's dashboards without delaying startup"""
+    from services.cache_warmup import warm_caches_in_background, CACHE_WARMUP_ON_STARTUP
+    if CACHE_WARMUP_ON_STARTUP:
+        app.state.cache_warmup = asyncio.create_task(warm_caches_in_background())
+
+@app.on_event("shutdown")
+async def stop_audit_log_maintenance():
+    """Stop the scheduled partition maintenance"""
+    task = getattr(app.state, "audit_log_maintenance", None)
+    if task:
+        task.cancel()
+
+@app.on_event("shutdown")
+async def remove_worker_metrics():
+    """Drop this worker's live gauges from PROMETHEUS_MULTIPROC_DIR"""
+    from utils.metrics import mark_worker_dead
+    mark_worker_dead()
+
+@app.on_event("shutdown")
+async def flush_audit_logs():
+    """Write any audit log events still queued on the batched writer"""
+    from services.audit_writer import audit_writer
+    audit_writer.shutdown()
 
 @app.get("/")
 async def root():
@@ -243,25 +304,38 @@ async def health_check():
         "count": len(app.routes)
     }
     
-    # Check ML services
-    try:
-        from ml_services.sentiment_analyzer import sentiment_analyzer
-        health_status["components"]["ml_sentiment"] = {
-            "status": "available",
-            "message": "Sentiment analysis model loaded"
-        }
-    except Exception as e:
-        health_status["components"]["ml_sentiment"] = {
-            "status": "unavailable",
-            "message": str(e)
-        }
+    # ML models load on first use - report their state without loading them here
+    from ml_services.loader import model_status
+    health_status["components"]["ml_models"] = model_status()
+    
+    health_status["components"]["startup"] = {
+        "total_ms": round(startup_total() * 1000, 1),
+        "phases_ms": {name: round(seconds * 1000, 1) for name, seconds in startup_phases.items()}
+    }
     
     return health_status
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """Prometheus scrape endpoint (OpenMetrics text, aggregated over all workers)"""
+    from utils.metrics import render_metrics, update_pool_metrics, METRICS_TOKEN, CONTENT_TYPE_LATEST
+    if METRICS_TOKEN and request.headers.get("Authorization") != f"Bearer {METRICS_TOKEN}":
+        return JSONResponse(status_code=status.HTTP_401_UNAUTHORIZED, content={"detail": "Invalid metrics token"})
+
+    update_pool_metrics()
+    payload = render_metrics()
+    if payload is None:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": "prometheus_client is not installed"}
+        )
+    return Response(content=payload, media_type=CONTENT_TYPE_LATEST)
+
 # Note: Login endpoint removed from main.py - use /api/auth/login from routes/auth.py instead
 # This prevents code duplication and ensures consistent authentication handling
 
 logger.info("=== Course Feedback System Ready ===")
 
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run("main:app", host="127.0.0.1", port=8000, reload=False)
\ No newline at end of file
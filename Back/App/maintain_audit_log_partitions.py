@@ -0,0 +1,94 @@
+"""
+Audit log partition maintenance
+Creates upcoming monthly audit_logs partitions and archives partitions past the
+retention window to Database_Backups/audit_logs (gzipped CSV). The API runs this
+daily through this script's --loop mode (started once by gunicorn.conf.py);
+use it from cron or after restoring old data.
+
+Usage:
+    python maintain_audit_log_partitions.py                  # create + retention
+    python maintain_audit_log_partitions.py --dry-run        # report only
+    python maintain_audit_log_partitions.py --retention 24   # keep 24 months
+    python maintain_audit_log_partitions.py --list           # show partitions
+    python maintain_audit_log_partitions.py --loop           # scheduler: every AUDIT_LOG_MAINTENANCE_INTERVAL_HOURS
+"""
+
+import argparse
+import logging
+from database.connection import get_db
+from services.audit_partitions import (
+    AuditLogPartitionService,
+    AUDIT_LOG_PARTITION_MONTHS_AHEAD,
+    AUDIT_LOG_RETENTION_MONTHS,
+    AUDIT_LOG_ARCHIVE_DIR,
+    AUDIT_LOG_MAINTENANCE_INTERVAL_HOURS,
+    run_maintenance_forever
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def maintain_audit_log_partitions(months_ahead, retention_months, archive_dir, dry_run=False):
+    """Create partitions, apply retention and log the outcome"""
+    db = next(get_db())
+
+    try:
+        result = AuditLogPartitionService.run_maintenance(
+            db,
+            months_ahead=months_ahead,
+            retention_months=retention_months,
+            archive_dir=archive_dir,
+            dry_run=dry_run
+        )
+
+        if result["skipped"]:
+            logger.info("⏭️  Maintenance is already running in another process")
+            return result
+
+        retention = result["retention"]
+        logger.info(f"✅ Partition maintenance complete{' (dry run)' if dry_run else ''}:")
+        logger.info(f"   - Partitions created: {result['partitions_created']}")
+        logger.info(f"   - Retention cutoff: {retention['cutoff'] or 'disabled'}")
+        for partition in retention["archived"]:
+            if dry_run:
+                logger.info(f"   - Would archive {partition['name']} (~{partition['estimated_rows']} rows)")
+            else:
+                logger.info(f"   - Archived {partition['name']}: {partition['rows']} rows -> {partition['file']}")
+
+        return result
+
+    except Exception as e:
+        logger.error(f"❌ Error during partition maintenance: {e}")
+        raise
+    finally:
+        db.close()
+
+def list_partitions():
+    """Print every monthly audit log partition"""
+    db = next(get_db())
+    try:
+        for partition in AuditLogPartitionService.list_partitions(db):
+            state = "attached" if partition["attached"] else "DETACHED"
+            print(f"{partition['name']:28} {state:9} ~{partition['estimated_rows']:>10} rows  {partition['size_bytes'] / 1024:>10.0f} KB")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain monthly audit_logs partitions")
+    parser.add_argument("--months-ahead", type=int, default=AUDIT_LOG_PARTITION_MONTHS_AHEAD, help="Partitions to create ahead of the current month")
+    parser.add_argument("--retention", type=int, default=AUDIT_LOG_RETENTION_MONTHS, help="Months to keep before archiving (0 = keep all)")
+    parser.add_argument("--archive-dir", default=AUDIT_LOG_ARCHIVE_DIR, help="Directory for .csv.gz archives")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be archived without changing anything")
+    parser.add_argument("--list", action="store_true", help="List partitions and exit")
+    parser.add_argument("--loop", action="store_true", help="Run every AUDIT_LOG_MAINTENANCE_INTERVAL_HOURS until stopped")
+    args = parser.parse_args()
+
+    if args.list:
+        list_partitions()
+    elif args.loop:
+        if AUDIT_LOG_MAINTENANCE_INTERVAL_HOURS <= 0:
+            raise SystemExit("AUDIT_LOG_MAINTENANCE_INTERVAL_HOURS is 0 - nothing to schedule")
+        run_maintenance_forever()
+    else:
+        print("🗂️  Maintaining audit log partitions...")
+        maintain_audit_log_partitions(args.months_ahead, args.retention, args.archive_dir, args.dry_run)
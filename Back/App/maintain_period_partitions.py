@@ -0,0 +1,87 @@
+"""
+Evaluation period partition maintenance
+Creates missing per-period partitions of evaluations and enrollments and moves
+closed periods to the archive tablespace (PERIOD_ARCHIVE_TABLESPACE). The API
+does both when periods are created or closed; use this script after importing
+periods directly or when enabling the archive tablespace for existing periods.
+
+Usage:
+    python maintain_period_partitions.py                          # create missing partitions
+    python maintain_period_partitions.py --archive-closed         # + archive closed periods
+    python maintain_period_partitions.py --archive-closed --tablespace cold
+    python maintain_period_partitions.py --restore 12             # make period 12 writable again
+    python maintain_period_partitions.py --list                   # show partitions
+"""
+
+import argparse
+import logging
+from database.connection import get_db
+from services.period_partitions import PeriodPartitionService, PERIOD_ARCHIVE_TABLESPACE
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def maintain_period_partitions(archive_closed=False, tablespace=PERIOD_ARCHIVE_TABLESPACE):
+    """Create missing partitions, optionally archive closed periods, and log the outcome"""
+    db = next(get_db())
+
+    try:
+        if not PeriodPartitionService.is_partitioned(db):
+            logger.warning("⚠️  evaluations is not partitioned - apply database_schema/26_PARTITION_EVALUATIONS_BY_PERIOD.sql first")
+            return None
+
+        created = PeriodPartitionService.ensure_partitions(db)
+        db.commit()
+        logger.info(f"✅ Partitions created: {created}")
+
+        if archive_closed:
+            if not tablespace:
+                logger.warning("⚠️  No archive tablespace configured (PERIOD_ARCHIVE_TABLESPACE or --tablespace)")
+                return created
+            for result in PeriodPartitionService.archive_closed_periods(db, tablespace):
+                moved = ", ".join(result["moved"]) or "already archived"
+                logger.info(f"   - Period {result['period_id']}: {moved}")
+
+        return created
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"❌ Error during period partition maintenance: {e}")
+        raise
+    finally:
+        db.close()
+
+def restore_period(period_id):
+    """Make an archived period writable again and move it back to pg_default"""
+    db = next(get_db())
+    try:
+        result = PeriodPartitionService.restore_period(db, period_id)
+        logger.info(f"✅ Period {period_id} restored: {', '.join(result['moved']) or 'nothing to move'}")
+    finally:
+        db.close()
+
+def list_partitions():
+    """Print every per-period partition"""
+    db = next(get_db())
+    try:
+        for partition in PeriodPartitionService.list_partitions(db):
+            state = "read-only" if partition["read_only"] else ""
+            print(f"{partition['name']:28} {partition['tablespace']:12} {state:9} ~{partition['estimated_rows']:>10} rows  {partition['size_bytes'] / 1024:>10.0f} KB")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain per-period evaluations/enrollments partitions")
+    parser.add_argument("--archive-closed", action="store_true", help="Move closed periods to the archive tablespace and make them read-only")
+    parser.add_argument("--tablespace", default=PERIOD_ARCHIVE_TABLESPACE, help="Archive tablespace (default: PERIOD_ARCHIVE_TABLESPACE)")
+    parser.add_argument("--restore", type=int, metavar="PERIOD_ID", help="Make an archived period writable again and exit")
+    parser.add_argument("--list", action="store_true", help="List partitions and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        list_partitions()
+    elif args.restore:
+        restore_period(args.restore)
+    else:
+        print("🗂️  Maintaining evaluation period partitions...")
+        maintain_period_partitions(args.archive_closed, args.tablespace)
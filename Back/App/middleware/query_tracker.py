@@ -0,0 +1,143 @@
+"""
+Query Tracking Middleware
+Counts SQL statements and database time per request and flags probable N+1 loops
+
+SQLAlchemy before/after_cursor_execute events on the primary and read engines
+time every statement into db_query_duration_seconds and record it against the
+current request (a ContextVar, so dashboard bundle worker threads are included).
+Each response gets a Server-Timing header; requests over QUERY_COUNT_WARN_THRESHOLD
+statements or QUERY_TIME_WARN_MS of DB time are logged with their slowest
+statement, and a statement shape repeated N_PLUS_ONE_THRESHOLD times within one
+request is logged as a probable N+1.
+"""
+from fastapi import Request
+from sqlalchemy import event
+from utils.metrics import DB_QUERY_DURATION
+from contextvars import ContextVar
+from collections import Counter
+from typing import List, Optional, Tuple
+import logging
+import os
+import re
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+QUERY_TRACKING_ENABLED = os.getenv("QUERY_TRACKING_ENABLED", "1") == "1"
+# Log requests issuing more statements / spending more DB time than this
+QUERY_COUNT_WARN_THRESHOLD = int(os.getenv("QUERY_COUNT_WARN_THRESHOLD", "30"))
+QUERY_TIME_WARN_MS = int(os.getenv("QUERY_TIME_WARN_MS", "500"))
+# Same statement shape executed this many times in one request = probable N+1
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+
+# Literals are stripped so f-string SQL inside a loop still maps to one shape
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+def statement_shape(statement: str) -> str:
+    """Normalize a SQL statement: literals -> ?, IN lists collapsed, whitespace squeezed"""
+    shape = _STRING_LITERAL.sub("?", statement)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _IN_LIST.sub("(?...)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+class RequestQueryStats:
+    """Statements executed while handling one request"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.slowest_ms = 0.0
+        self.slowest_statement: Optional[str] = None
+        self.shapes: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.total_ms += elapsed_ms
+            self.shapes[statement_shape(statement)] += 1
+            if elapsed_ms > self.slowest_ms:
+                self.slowest_ms = elapsed_ms
+                self.slowest_statement = statement
+
+    def repeated_shapes(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> List[Tuple[str, int]]:
+        """Statement shapes executed at least threshold times, most frequent first"""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+_request_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+def current_query_stats() -> Optional[RequestQueryStats]:
+    """Stats of the request being handled (None outside a request)"""
+    return _request_stats.get()
+
+_OPERATIONS = ("select", "insert", "update", "delete")
+
+def _operation(statement: str) -> str:
+    """Metric label for a statement: select/insert/update/delete/other (CTEs count as select)"""
+    keyword = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else ""
+    if keyword == "with":
+        return "select"
+    return keyword if keyword in _OPERATIONS else "other"
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("query_started_at")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    DB_QUERY_DURATION.labels(operation=_operation(statement)).observe(elapsed)
+
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed * 1000)
+
+def install_query_tracking(*engines) -> None:
+    """Attach the cursor events to each engine (once per engine)"""
+    for engine in set(engines):
+        if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+            event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+def _truncate(statement: Optional[str], length: int = 200) -> str:
+    statement = _WHITESPACE.sub(" ", statement or "").strip()
+    return statement if len(statement) <= length else statement[:length] + "..."
+
+async def query_tracking_middleware(request: Request, call_next):
+    """
+    Middleware to count the SQL statements of each request
+    Adds Server-Timing (db, db-slowest, app) and logs slow or chatty requests
+    """
+    if not QUERY_TRACKING_ENABLED:
+        return await call_next(request)
+
+    stats = RequestQueryStats()
+    token = _request_stats.set(stats)
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        _request_stats.reset(token)
+    app_ms = (time.perf_counter() - started) * 1000
+
+    response.headers["Server-Timing"] = (
+        f'db;dur={stats.total_ms:.1f};desc="{stats.count} queries", '
+        f'db-slowest;dur={stats.slowest_ms:.1f}, '
+        f'app;dur={app_ms:.1f}'
+    )
+
+    endpoint = f"{request.method} {request.url.path}"
+    if stats.count > QUERY_COUNT_WARN_THRESHOLD or stats.total_ms > QUERY_TIME_WARN_MS:
+        logger.warning(
+            f"[QUERIES] {endpoint}: {stats.count} queries, {stats.total_ms:.1f} ms DB of {app_ms:.1f} ms; "
+            f"slowest {stats.slowest_ms:.1f} ms: {_truncate(stats.slowest_statement)}"
+        )
+    for shape, count in stats.repeated_shapes():
+        logger.warning(f"[N+1] {endpoint}: {count}x {_truncate(shape)}")
+
+    return response
@@ -7,6 +7,7 @@ from collections import defaultdict
 from datetime import datetime, timedelta
 from typing import Dict, Tuple
 import asyncio
+from utils.metrics import RATE_LIMIT_REJECTIONS
 
 class RateLimiter:
     """Simple in-memory rate limiter"""
@@ -108,7 +109,7 @@ async def rate_limit_middleware(request: Request, call_next):
     rate_limiter.start_cleanup()
     
     # Skip rate limiting for health check and root endpoints
-    if request.url.path in ["/", "/health", "/docs", "/openapi.json", "/redoc"]:
+    if request.url.path in ["/", "/health", "/metrics", "/docs", "/openapi.json", "/redoc"]:
         return await call_next(request)
     
     # Get rate limit for this endpoint
@@ -121,6 +122,7 @@ async def rate_limit_middleware(request: Request, call_next):
     )
     
     if is_limited:
+        RATE_LIMIT_REJECTIONS.labels(limit=endpoint if endpoint in RATE_LIMITS else "default").inc()
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail={
@@ -0,0 +1,33 @@
+"""
+Request Metrics Middleware
+Records request latency per route template and status, and requests in flight
+
+Latency is labelled with the matched route template (/api/student/{student_id}/courses),
+not the raw path, so the number of series stays bounded. The connection pool gauges
+are refreshed after every request so each worker's latest state is exported.
+"""
+from fastapi import Request
+from utils.metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS_IN_PROGRESS, update_pool_metrics
+import time
+
+async def request_metrics_middleware(request: Request, call_next):
+    """
+    Middleware to observe http_request_duration_seconds and http_requests_in_progress
+    """
+    in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method=request.method)
+    in_progress.inc()
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        in_progress.dec()
+        route = request.scope.get("route")
+        HTTP_REQUEST_DURATION.labels(
+            method=request.method,
+            route=getattr(route, "path", None) or "unmatched",
+            status=str(status_code)
+        ).observe(time.perf_counter() - started)
+        update_pool_metrics()
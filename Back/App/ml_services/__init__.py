@@ -1,9 +1,18 @@
 """
 Machine Learning Services Package
 Contains SVM sentiment analysis and DBSCAN anomaly detection
-"""
 
-from .sentiment_analyzer import SentimentAnalyzer
-from .anomaly_detector import AnomalyDetector
+The classes are imported on first access so that importing the package (or
+ml_services.loader) does not pull in sklearn and numpy.
+"""
 
 __all__ = ['SentimentAnalyzer', 'AnomalyDetector']
+
+def __getattr__(name):
+    if name == 'SentimentAnalyzer':
+        from .sentiment_analyzer import SentimentAnalyzer
+        return SentimentAnalyzer
+    if name == 'AnomalyDetector':
+        from .anomaly_detector import AnomalyDetector
+        return AnomalyDetector
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -313,20 +313,26 @@ class AnomalyDetector:
         logger.info(f"Model saved to {model_path}")
         return str(model_path)
     
-    def load_model(self, path: str):
+    def load_model(self, path: str, mmap_mode: str = None):
         """
         Load fitted model from disk
         
         Args:
-            path: Path to the saved model file
+            path: Path to the saved model file (.pkl or .joblib)
+            mmap_mode: For .joblib files, e.g. 'r' to memory-map the arrays so that
+                processes loading the same file share their pages
         """
         model_path = Path(path)
         
         if not model_path.exists():
             raise FileNotFoundError(f"Model file not found: {path}")
         
-        with open(model_path, 'rb') as f:
-            model_data = pickle.load(f)
+        if model_path.suffix == '.joblib':
+            import joblib
+            model_data = joblib.load(model_path, mmap_mode=mmap_mode)
+        else:
+            with open(model_path, 'rb') as f:
+                model_data = pickle.load(f)
         
         self.scaler = model_data['scaler']
         self.dbscan = model_data['dbscan']
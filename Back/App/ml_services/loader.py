@@ -0,0 +1,151 @@
+"""
+Lazy ML model loading
+Loads the sentiment and anomaly models once per process, on first use.
+
+Importing sklearn/numpy and unpickling the models takes about a second, so nothing
+in the import path of main.py touches them: the first caller of
+get_sentiment_analyzer()/get_anomaly_detector() pays the load, or warm_up() does it
+in the background at startup when ML_WARMUP_ON_STARTUP=1.
+
+Sharing between workers (each uvicorn/gunicorn worker is its own process):
+- gunicorn with preload_app (Back/gunicorn.conf.py) calls preload_models() in the
+  master before forking, so the workers inherit sklearn, numpy and the model arrays
+  copy-on-write instead of loading their own copies.
+- ML_MODEL_MMAP=1 loads the .joblib artifacts written by export_mmap_artifacts()
+  with mmap_mode='r': the arrays stay in the page cache and every process mapping
+  the file shares them, which also works with plain `uvicorn --workers`.
+"""
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import gc
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+ML_MODEL_DIR = Path(os.getenv("ML_MODEL_DIR", str(Path(__file__).resolve().parent / "models")))
+SENTIMENT_MODEL_PATH = ML_MODEL_DIR / "svm_sentiment_model.pkl"
+ANOMALY_MODEL_PATH = ML_MODEL_DIR / "dbscan_anomaly_model.pkl"
+
+# Load the models in a background thread when the API starts (0 = on first use)
+ML_WARMUP_ON_STARTUP = os.getenv("ML_WARMUP_ON_STARTUP", "0") == "1"
+# Memory-map the model arrays from the .joblib artifacts when they exist
+ML_MODEL_MMAP = os.getenv("ML_MODEL_MMAP", "0") == "1"
+
+_lock = threading.Lock()
+_models: Dict[str, Any] = {}
+_load_seconds: Dict[str, float] = {}
+_load_errors: Dict[str, str] = {}
+_sources: Dict[str, str] = {}
+
+def _load(name: str, factory) -> Optional[Any]:
+    """Build a model once; a failed load is remembered and returns None"""
+    if name in _models or name in _load_errors:
+        return _models.get(name)
+    with _lock:
+        if name in _models or name in _load_errors:
+            return _models.get(name)
+        started = time.perf_counter()
+        try:
+            _models[name] = factory()
+        except Exception as e:
+            logger.warning(f"[ML] {name} model unavailable: {e}")
+            _load_errors[name] = str(e)
+        _load_seconds[name] = time.perf_counter() - started
+        return _models.get(name)
+
+def mmap_artifact(path: Path) -> Path:
+    """The memory-mappable joblib artifact next to a pickled model"""
+    return path.with_suffix(".joblib")
+
+def _model_file(name: str, path: Path) -> Optional[Path]:
+    """The file to load for a model (mmap artifact when enabled and present)"""
+    artifact = mmap_artifact(path)
+    if ML_MODEL_MMAP and artifact.exists():
+        _sources[name] = f"{artifact.name} (mmap)"
+        return artifact
+    if path.exists():
+        _sources[name] = path.name
+        return path
+    return None
+
+def _sentiment_factory():
+    from ml_services.sentiment_analyzer import SentimentAnalyzer
+    path = _model_file("sentiment", SENTIMENT_MODEL_PATH)
+    if path is None:
+        raise FileNotFoundError(f"Model file not found: {SENTIMENT_MODEL_PATH}")
+    analyzer = SentimentAnalyzer()
+    analyzer.load_model(str(path), mmap_mode="r" if path.suffix == ".joblib" else None)
+    return analyzer
+
+def _anomaly_factory():
+    from ml_services.anomaly_detector import AnomalyDetector
+    detector = AnomalyDetector()
+    # The detector also works unfitted (rule-based checks); a saved fit is optional
+    path = _model_file("anomaly", ANOMALY_MODEL_PATH)
+    if path is not None:
+        detector.load_model(str(path), mmap_mode="r" if path.suffix == ".joblib" else None)
+    return detector
+
+def get_sentiment_analyzer():
+    """The process-wide SentimentAnalyzer, or None when the model can't be loaded"""
+    return _load("sentiment", _sentiment_factory)
+
+def get_anomaly_detector():
+    """The process-wide AnomalyDetector, or None when sklearn is unavailable"""
+    return _load("anomaly", _anomaly_factory)
+
+def warm_up() -> Dict[str, Any]:
+    """Load every model now (call from a thread - this blocks for the import and unpickling)"""
+    get_sentiment_analyzer()
+    get_anomaly_detector()
+    status = model_status()
+    logger.info(f"[ML] Warm-up finished: {status}")
+    return status
+
+def preload_models() -> Dict[str, Any]:
+    """
+    Load the models in a pre-fork master process
+
+    gc.freeze() moves everything allocated so far into the permanent generation, so
+    the workers' garbage collector doesn't write to (and un-share) those pages.
+    """
+    status = warm_up()
+    gc.collect()
+    gc.freeze()
+    return status
+
+def export_mmap_artifacts(model_dir: Optional[Path] = None) -> List[str]:
+    """Write the .joblib artifact next to every pickled model (run after training)"""
+    import joblib
+    import pickle
+
+    written = []
+    for path in (SENTIMENT_MODEL_PATH, ANOMALY_MODEL_PATH):
+        if model_dir is not None:
+            path = Path(model_dir) / path.name
+        if not path.exists():
+            continue
+        with open(path, "rb") as f:
+            model_data = pickle.load(f)
+        # Uncompressed, so the arrays can be memory-mapped on load
+        joblib.dump(model_data, mmap_artifact(path))
+        written.append(str(mmap_artifact(path)))
+    return written
+
+def model_status() -> Dict[str, Any]:
+    """Per model: loaded / unavailable / not_loaded (lazy, nothing asked for it yet)"""
+    status = {}
+    for name in ("sentiment", "anomaly"):
+        if name in _models:
+            status[name] = {"status": "loaded", "load_ms": round(_load_seconds[name] * 1000, 1),
+                            "source": _sources.get(name, "defaults")}
+            if name == "sentiment":
+                status[name]["engine"] = _models[name].engine
+        elif name in _load_errors:
+            status[name] = {"status": "unavailable", "message": _load_errors[name]}
+        else:
+            status[name] = {"status": "not_loaded"}
+    return status
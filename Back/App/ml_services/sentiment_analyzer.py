@@ -1,37 +1,49 @@
 """
 SVM Sentiment Analyzer for Course Evaluations
 Uses TF-IDF vectorization and Support Vector Machine classification
+
+Engines (chosen when training, saved with the model):
+- svc:             RBF kernel SVC with Platt-scaled probabilities (default)
+- linear:          LinearSVC calibrated with CalibratedClassifierCV - trains in one
+                   pass per fold and scores with a dot product instead of a kernel
+                   evaluation against every support vector
+- linear-hashing:  the same on a HashingVectorizer, so no vocabulary is fitted or stored
 """
 
 import pickle
 import numpy as np
 from pathlib import Path
 from typing import Dict, Tuple
-from sklearn.svm import SVC
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.svm import SVC, LinearSVC
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, accuracy_score
 import logging
 
 logger = logging.getLogger(__name__)
 
+ENGINES = ('svc', 'linear', 'linear-hashing')
+
 class SentimentAnalyzer:
     """
     SVM-based sentiment analyzer for course evaluation text feedback
     
     Features:
-    - TF-IDF text vectorization
-    - RBF kernel SVM classifier
+    - TF-IDF text vectorization (or feature hashing)
+    - RBF kernel SVM or calibrated linear SVM classifier
     - Confidence score calculation
     - Model persistence (save/load)
     """
     
-    def __init__(self, model_path: str = None):
+    def __init__(self, model_path: str = None, engine: str = 'svc'):
         """
         Initialize sentiment analyzer
         
         Args:
             model_path: Path to saved model file. If None, creates new model.
+            engine: Classifier for a new model, one of ENGINES (a loaded model
+                keeps the engine it was trained with)
         """
         self.model_dir = Path(__file__).parent / "models"
         self.model_dir.mkdir(exist_ok=True)
@@ -39,22 +51,44 @@ class SentimentAnalyzer:
         if model_path:
             self.load_model(model_path)
         else:
+            if engine not in ENGINES:
+                raise ValueError(f"Unknown sentiment engine '{engine}', expected one of {ENGINES}")
+            self.engine = engine
+            
             # Initialize with default parameters
-            self.vectorizer = TfidfVectorizer(
-                max_features=1000,
-                ngram_range=(1, 2),  # Unigrams and bigrams
-                min_df=2,
-                max_df=0.8,
-                stop_words='english'
-            )
+            if engine == 'linear-hashing':
+                self.vectorizer = HashingVectorizer(
+                    n_features=2 ** 15,
+                    ngram_range=(1, 2),
+                    stop_words='english',
+                    alternate_sign=False
+                )
+            else:
+                self.vectorizer = TfidfVectorizer(
+                    max_features=1000,
+                    ngram_range=(1, 2),  # Unigrams and bigrams
+                    min_df=2,
+                    max_df=0.8,
+                    stop_words='english'
+                )
             
-            self.classifier = SVC(
-                kernel='rbf',
-                C=1.0,
-                gamma='scale',
-                probability=True,  # Enable probability estimates
-                random_state=42
-            )
+            if engine == 'svc':
+                self.classifier = SVC(
+                    kernel='rbf',
+                    C=1.0,
+                    gamma='scale',
+                    probability=True,  # Enable probability estimates
+                    random_state=42
+                )
+            else:
+                # Sigmoid calibration on 3 folds; ensemble=False keeps a single
+                # LinearSVC fitted on all the data for prediction
+                self.classifier = CalibratedClassifierCV(
+                    LinearSVC(C=1.0, random_state=42),
+                    method='sigmoid',
+                    cv=3,
+                    ensemble=False
+                )
             
             self.is_trained = False
     
@@ -120,14 +154,23 @@ class SentimentAnalyzer:
         text_vec = self.vectorizer.transform([text])
         
         # Predict
-        sentiment = self.classifier.predict(text_vec)[0]
-        probabilities = self.classifier.predict_proba(text_vec)[0]
+        sentiments, probabilities = self._classify(text_vec)
+        sentiment = sentiments[0]
         
         # Get confidence (probability of predicted class)
         class_idx = list(self.classifier.classes_).index(sentiment)
-        confidence = probabilities[class_idx]
+        confidence = probabilities[0][class_idx]
         
         return sentiment, float(confidence)
+    
+    def _classify(self, text_vec) -> Tuple[np.ndarray, np.ndarray]:
+        """Predicted labels and class probabilities for vectorized texts"""
+        probabilities = self.classifier.predict_proba(text_vec)
+        if self.engine == 'svc':
+            # Platt-scaled probabilities can disagree with the SVC decision - keep its label
+            return self.classifier.predict(text_vec), probabilities
+        # A calibrated classifier predicts the most probable class: one pass is enough
+        return self.classifier.classes_[probabilities.argmax(axis=1)], probabilities
 
     # Compatibility alias used by integration tests
     def predict_sentiment(self, text: str) -> Tuple[str, float]:
@@ -149,16 +192,35 @@ class SentimentAnalyzer:
     def predict_batch(self, texts: list) -> list:
         """
         Predict sentiment for multiple texts
-        
+
+        The non-empty texts are vectorized and classified in one call, which costs
+        little more than a single predict(); results match predict() item by item.
+
         Args:
             texts: List of text feedback strings
-            
+
         Returns:
             List of tuples (sentiment, confidence)
         """
         if not self.is_trained:
             raise ValueError("Model not trained.")
-        
+
+        results = [('neutral', 0.5)] * len(texts)
+        positions = [index for index, text in enumerate(texts) if text and text.strip()]
+        if not positions:
+            return results
+
+        try:
+            text_vec = self.vectorizer.transform([texts[index] for index in positions])
+            sentiments, probabilities = self._classify(text_vec)
+            classes = list(self.classifier.classes_)
+            for row, index in enumerate(positions):
+                sentiment = sentiments[row]
+                results[index] = (sentiment, float(probabilities[row][classes.index(sentiment)]))
+            return results
+        except Exception as e:
+            logger.error(f"Batch sentiment prediction failed, predicting one by one: {e}")
+
         results = []
         for text in texts:
             try:
@@ -185,7 +247,8 @@ class SentimentAnalyzer:
         model_data = {
             'vectorizer': self.vectorizer,
             'classifier': self.classifier,
-            'is_trained': self.is_trained
+            'is_trained': self.is_trained,
+            'engine': self.engine
         }
         
         with open(model_path, 'wb') as f:
@@ -194,26 +257,34 @@ class SentimentAnalyzer:
         logger.info(f"Model saved to {model_path}")
         return str(model_path)
     
-    def load_model(self, path: str):
+    def load_model(self, path: str, mmap_mode: str = None):
         """
         Load trained model from disk
         
         Args:
-            path: Path to the saved model file
+            path: Path to the saved model file (.pkl or .joblib)
+            mmap_mode: For .joblib files, e.g. 'r' to memory-map the arrays so that
+                processes loading the same file share their pages
         """
         model_path = Path(path)
         
         if not model_path.exists():
             raise FileNotFoundError(f"Model file not found: {path}")
         
-        with open(model_path, 'rb') as f:
-            model_data = pickle.load(f)
+        if model_path.suffix == '.joblib':
+            import joblib
+            model_data = joblib.load(model_path, mmap_mode=mmap_mode)
+        else:
+            with open(model_path, 'rb') as f:
+                model_data = pickle.load(f)
         
         self.vectorizer = model_data['vectorizer']
         self.classifier = model_data['classifier']
         self.is_trained = model_data['is_trained']
+        # Models saved before engines existed are RBF SVCs
+        self.engine = model_data.get('engine', 'svc')
         
-        logger.info(f"Model loaded from {model_path}")
+        logger.info(f"Model loaded from {model_path} ({self.engine})")
     
     def get_feature_importance(self, top_n: int = 20) -> Dict[str, list]:
         """
@@ -228,15 +299,23 @@ class SentimentAnalyzer:
         if not self.is_trained:
             raise ValueError("Model not trained")
         
+        if not hasattr(self.vectorizer, 'get_feature_names_out'):
+            # Hashed features can't be mapped back to words
+            return {}
         feature_names = self.vectorizer.get_feature_names_out()
         
+        classifier = self.classifier
+        if isinstance(classifier, CalibratedClassifierCV):
+            # The LinearSVC inside the calibration wrapper
+            classifier = classifier.calibrated_classifiers_[0].estimator
+        
         # Get coefficients for each class
         importance_dict = {}
         
         for i, class_name in enumerate(self.classifier.classes_):
-            if hasattr(self.classifier, 'coef_'):
+            if hasattr(classifier, 'coef_'):
                 # For linear kernels
-                coef = self.classifier.coef_[i]
+                coef = classifier.coef_[i]
             else:
                 # For non-linear kernels, use feature importance approximation
                 continue
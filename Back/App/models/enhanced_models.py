@@ -1,7 +1,7 @@
 # Enhanced Database Models for Course Feedback System
 # Matching your existing PostgreSQL schema with ML and Firebase enhancements
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Float, ForeignKey, Index, ARRAY
+from sqlalchemy import Column, Integer, SmallInteger, String, Text, DateTime, Boolean, Float, ForeignKey, Index, ARRAY, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import JSONB
@@ -100,6 +100,7 @@ class ClassSection(Base):
 
 class Enrollment(Base):
     __tablename__ = "enrollments"
+    # Partitioned by LIST (evaluation_period_id) in the database (migration 26)
     
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
@@ -115,6 +116,7 @@ class Enrollment(Base):
 
 class Evaluation(Base):
     __tablename__ = "evaluations"
+    # Partitioned by LIST (evaluation_period_id) in the database (migration 26)
     
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
@@ -133,7 +135,8 @@ class Evaluation(Base):
     
     # JSONB field for extended ratings (if needed)
     ratings = Column(JSONB, nullable=True)  # Stores additional ratings: {"1": 4, "2": 3, ...}
-    
+    answers = Column(ARRAY(SmallInteger), nullable=True)  # Same ratings in question order (1-31), see migration 25
+
     # Sentiment analysis fields
     sentiment = Column(String(20), nullable=True)  # positive, neutral, negative
     sentiment_score = Column(Float, nullable=True)
@@ -219,8 +222,13 @@ class EvaluationPeriod(Base):
     start_date = Column(DateTime, nullable=False)
     end_date = Column(DateTime, nullable=False)
     status = Column(String(20), default='draft')  # draft, active, closed
-    total_students = Column(Integer, default=0)
-    completed_evaluations = Column(Integer, default=0)
+    total_students = Column(Integer, default=0)          # Maintained by PeriodProgressService
+    total_evaluations = Column(Integer, default=0)       # Pending + submitted evaluation records
+    completed_evaluations = Column(Integer, default=0)   # Submitted evaluation records
+    progress_reconciled_at = Column(DateTime, nullable=True)
+    finalization_status = Column(String(20), nullable=True)  # queued, running, completed, failed
+    finalization_progress = Column(JSONB, nullable=True)     # Stage and counts, see PeriodFinalizationService
+    finalized_at = Column(DateTime, nullable=True)           # Results frozen in period_result_snapshots
     created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
     created_at = Column(DateTime, default=now_local)
     updated_at = Column(DateTime, default=now_local, onupdate=now_local)
@@ -233,10 +241,50 @@ class EvaluationPeriod(Base):
         Index('idx_evaluation_periods_status', 'status', 'start_date', 'end_date'),
     )
 
+class PeriodProgress(Base):
+    __tablename__ = "period_progress"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    evaluation_period_id = Column(Integer, ForeignKey("evaluation_periods.id", ondelete="CASCADE"), nullable=False)
+    program_id = Column(Integer, nullable=False, default=0)  # 0 = student without program
+    year_level = Column(Integer, nullable=False, default=0)
+    total_students = Column(Integer, default=0)
+    total_evaluations = Column(Integer, default=0)
+    completed_evaluations = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=now_local, onupdate=now_local)
+    
+    # Relationships
+    evaluation_period = relationship("EvaluationPeriod")
+    
+    # Indexes
+    __table_args__ = (
+        UniqueConstraint('evaluation_period_id', 'program_id', 'year_level'),
+        Index('idx_period_progress_period', 'evaluation_period_id'),
+    )
+
+class AdvancementSnapshot(Base):
+    __tablename__ = "advancement_snapshots"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    description = Column(String(200), nullable=True)
+    created_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    student_count = Column(Integer, nullable=False, default=0)
+    # Parallel arrays: student_ids[i] had year_levels[i] / is_active[i] when the snapshot was taken
+    student_ids = Column(ARRAY(Integer), nullable=False, default=list)
+    year_levels = Column(ARRAY(SmallInteger), nullable=False, default=list)
+    is_active = Column(ARRAY(Boolean), nullable=False, default=list)
+    created_at = Column(DateTime, default=now_local)
+    restored_at = Column(DateTime, nullable=True)
+    
+    # Indexes
+    __table_args__ = (
+        Index('idx_advancement_snapshots_created_at', 'created_at'),
+    )
+
 class AuditLog(Base):
     __tablename__ = "audit_logs"
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     action = Column(String(100), nullable=False)  # USER_CREATED, LOGIN, SETTINGS_CHANGED, etc.
     category = Column(String(50), nullable=False)  # User Management, Authentication, System Settings, etc.
@@ -244,7 +292,7 @@ class AuditLog(Base):
     status = Column(String(20), default='Success')  # Success, Failed, Blocked
     ip_address = Column(String(50), nullable=True)
     details = Column(JSONB, nullable=True)  # Additional context in JSON
-    created_at = Column(DateTime, default=now_local, index=True)
+    created_at = Column(DateTime, primary_key=True, default=now_local, index=True)  # Monthly partition key (migration 23)
     
     # Relationships
     user = relationship("User")
@@ -284,7 +332,8 @@ class AnalysisResult(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     class_section_id = Column(Integer, ForeignKey("class_sections.id"), nullable=False)
-    analysis_type = Column(String(50), nullable=False)  # sentiment, anomaly, trend
+    evaluation_period_id = Column(Integer, ForeignKey("evaluation_periods.id", ondelete="CASCADE"), nullable=True)
+    analysis_type = Column(String(50), nullable=False)  # sentiment, anomaly, trend, period_final
     
     # Aggregated statistics
     total_evaluations = Column(Integer, default=0)
@@ -314,6 +363,33 @@ class AnalysisResult(Base):
         Index('idx_analysis_results_date', 'analysis_date'),
     )
 
+class PeriodResultSnapshot(Base):
+    __tablename__ = "period_result_snapshots"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    evaluation_period_id = Column(Integer, ForeignKey("evaluation_periods.id", ondelete="CASCADE"), nullable=False)
+    scope = Column(String(20), nullable=False)  # section, course, program, period
+    scope_id = Column(Integer, nullable=False, default=0)  # 0 = no program / whole period
+    total_evaluations = Column(Integer, default=0)
+    enrolled_students = Column(Integer, default=0)
+    positive_count = Column(Integer, default=0)
+    neutral_count = Column(Integer, default=0)
+    negative_count = Column(Integer, default=0)
+    anomaly_count = Column(Integer, default=0)
+    avg_overall_rating = Column(Float, nullable=True)
+    avg_sentiment_score = Column(Float, nullable=True)
+    question_counts = Column(JSONB, nullable=False, default=dict)     # {"1": {"1": n, ..., "4": n}, ...}
+    category_averages = Column(JSONB, nullable=False, default=list)
+    created_at = Column(DateTime, default=now_local)
+    
+    # Relationships
+    evaluation_period = relationship("EvaluationPeriod")
+    
+    # Indexes
+    __table_args__ = (
+        UniqueConstraint('evaluation_period_id', 'scope', 'scope_id'),
+    )
+
 class ProgramSection(Base):
     __tablename__ = "program_sections"
     
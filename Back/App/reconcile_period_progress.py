@@ -0,0 +1,46 @@
+"""
+Reconcile evaluation period progress counters
+Rebuilds evaluation_periods / period_progress counters from the evaluations table
+and reports any drift. Run periodically (e.g. nightly) or after manual data fixes.
+
+Usage:
+    python reconcile_period_progress.py              # all periods
+    python reconcile_period_progress.py --period 12  # one period
+"""
+
+import argparse
+import logging
+from database.connection import get_db
+from services.period_progress import PeriodProgressService
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def reconcile_period_progress(period_id=None):
+    """Rebuild progress counters and log drift"""
+    db = next(get_db())
+
+    try:
+        result = PeriodProgressService.reconcile(db, period_id)
+
+        logger.info(f"✅ Reconciliation complete:")
+        logger.info(f"   - Periods checked: {result['periods_checked']}")
+        logger.info(f"   - Periods repaired: {result['periods_repaired']}")
+        for drift in result["drift"]:
+            logger.info(f"   - Period {drift['period_id']}: stored {drift['stored']} -> actual {drift['actual']}")
+
+        return result
+
+    except Exception as e:
+        logger.error(f"❌ Error during reconciliation: {e}")
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconcile evaluation period progress counters")
+    parser.add_argument("--period", type=int, default=None, help="Evaluation period ID (default: all)")
+    args = parser.parse_args()
+
+    print("🔄 Reconciling evaluation period progress counters...")
+    reconcile_period_progress(args.period)
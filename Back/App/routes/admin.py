@@ -9,6 +9,9 @@ from sqlalchemy.orm import Session
 from sqlalchemy import text, func
 from database.connection import get_db
 from models.enhanced_models import User
+from services.dashboard_stats import DashboardStatsService
+from services.active_period import ActivePeriodResolver
+from services.evaluation_answers import EvaluationAnswerService
 from typing import Optional, List
 from pydantic import BaseModel
 from datetime import datetime
@@ -24,95 +27,30 @@ async def get_dashboard_stats(
     db: Session = Depends(get_db)):
     """Get comprehensive dashboard statistics for admin (filtered by evaluation period)"""
     try:
-        from models.enhanced_models import EvaluationPeriod
-        
-        # Get evaluation period (active by default)
-        if period_id:
-            period = db.query(EvaluationPeriod).filter(EvaluationPeriod.id == period_id).first()
-            if not period:
-                raise HTTPException(status_code=404, detail="Evaluation period not found")
-        else:
-            # Default to active period
-            period = db.query(EvaluationPeriod).filter(EvaluationPeriod.status == 'active').first()
+        # Counts, per-program rows and sentiment in one statement (active period by default)
+        stats = DashboardStatsService.get_stats(db, period_id=period_id)
         
-        period_id = period.id if period else None
+        if period_id and stats.period_id is None:
+            raise HTTPException(status_code=404, detail="Evaluation period not found")
         
-        # Get overall counts (users, courses, programs not period-specific)
-        counts_query = text("""
-            SELECT 
-                (SELECT COUNT(*) FROM users) as total_users,
-                (SELECT COUNT(*) FROM users WHERE role = 'student') as total_students,
-                (SELECT COUNT(*) FROM users WHERE role = 'instructor') as total_instructors,
-                (SELECT COUNT(*) FROM users WHERE role = 'secretary') as total_secretaries,
-                (SELECT COUNT(*) FROM users WHERE role = 'admin') as total_admins,
-                (SELECT COUNT(*) FROM courses) as total_courses,
-                (SELECT COUNT(*) FROM evaluations WHERE evaluation_period_id = :period_id AND status = 'completed') as total_evaluations,
-                (SELECT COUNT(*) FROM programs) as total_programs,
-                (SELECT COUNT(*) FROM class_sections) as total_class_sections
-        """)
+        period_id = stats.period_id
         
-        counts_result = db.execute(counts_query, {"period_id": period_id}).fetchone()
-        
-        # Get program statistics (filtered by period) - only completed evaluations
-        program_stats_query = text("""
-            SELECT 
-                p.program_code,
-                p.program_name,
-                COUNT(DISTINCT c.id) as courses,
-                COUNT(DISTINCT s.id) as students,
-                COUNT(DISTINCT e.id) as evaluations
-            FROM programs p
-            LEFT JOIN courses c ON p.id = c.program_id
-            LEFT JOIN students s ON p.id = s.program_id
-            LEFT JOIN enrollments en ON s.id = en.student_id AND (:period_id IS NULL OR en.evaluation_period_id = :period_id)
-            LEFT JOIN evaluations e ON en.class_section_id = e.class_section_id AND en.student_id = e.student_id 
-                AND (:period_id IS NULL OR e.evaluation_period_id = :period_id)
-                AND e.status = 'completed'
-            GROUP BY p.id, p.program_code, p.program_name
-            ORDER BY p.program_code
-        """)
-        
-        program_results = db.execute(program_stats_query, {"period_id": period_id})
-        program_stats = {}
-        for row in program_results:
-            program_stats[row[0]] = {
-                "name": row[1],
-                "courses": row[2] or 0,
-                "students": row[3] or 0,
-                "evaluations": row[4] or 0
+        program_stats = {
+            program.program_code: {
+                "name": program.program_name,
+                "courses": program.courses,
+                "students": program.students,
+                "evaluations": program.evaluations
             }
-        
-        # Get sentiment statistics (filtered by period)
-        sentiment_query = text("""
-            SELECT 
-                sentiment,
-                COUNT(*) as count
-            FROM evaluations
-            WHERE sentiment IS NOT NULL
-            AND (:period_id IS NULL OR evaluation_period_id = :period_id)
-            GROUP BY sentiment
-        """)
-        
-        try:
-            sentiment_results = db.execute(sentiment_query, {"period_id": period_id})
-            sentiment_stats = {
-                "positive": 0,
-                "neutral": 0,
-                "negative": 0
-            }
-            for row in sentiment_results:
-                sentiment = row[0].lower() if row[0] else "neutral"
-                if sentiment in sentiment_stats:
-                    sentiment_stats[sentiment] = row[1]
-        except:
-            # If sentiment column doesn't exist, return zeros
-            sentiment_stats = {"positive": 0, "neutral": 0, "negative": 0}
+            for program in stats.programs
+        }
+        sentiment_stats = stats.sentiment.model_dump()
         
         # Get recent evaluations (filtered by period)
         recent_query = text("""
             SELECT 
                 e.id,
-                e.submitted_at,
+                e.submission_date,
                 u.email as student_email,
                 c.subject_name,
                 e.rating_overall
@@ -121,8 +59,9 @@ async def get_dashboard_stats(
             JOIN users u ON s.user_id = u.id
             JOIN class_sections cs ON e.class_section_id = cs.id
             JOIN courses c ON cs.course_id = c.id
-            WHERE (:period_id IS NULL OR e.evaluation_period_id = :period_id)
-            ORDER BY e.submitted_at DESC
+            WHERE e.submission_date IS NOT NULL
+            AND (CAST(:period_id AS INTEGER) IS NULL OR e.evaluation_period_id = :period_id)
+            ORDER BY e.submission_date DESC
             LIMIT 10
         """)
         
@@ -141,27 +80,29 @@ async def get_dashboard_stats(
         return {
             "success": True,
             "data": {
-                "period_id": period.id if period else None,
-                "period_name": period.name if period else None,
-                "period_status": period.status if period else None,
-                "totalUsers": counts_result[0] if counts_result else 0,
-                "totalCourses": counts_result[5] if counts_result else 0,
-                "totalEvaluations": counts_result[6] if counts_result else 0,
-                "totalPrograms": counts_result[7] if counts_result else 0,
+                "period_id": stats.period_id,
+                "period_name": stats.period_name,
+                "period_status": stats.period_status,
+                "totalUsers": stats.total_users,
+                "totalCourses": stats.total_courses,
+                "totalEvaluations": stats.total_evaluations,
+                "totalPrograms": stats.total_programs,
                 "userRoles": {
-                    "students": counts_result[1] if counts_result else 0,
-                    "instructors": counts_result[2] if counts_result else 0,
-                    "secretaries": counts_result[3] if counts_result else 0,
-                    "admins": counts_result[4] if counts_result else 0,
-                    "departmentHeads": 0  # Legacy field
+                    "students": stats.user_roles.students,
+                    "instructors": stats.user_roles.instructors,
+                    "secretaries": stats.user_roles.secretaries,
+                    "admins": stats.user_roles.admins,
+                    "departmentHeads": stats.user_roles.department_heads
                 },
                 "programStats": program_stats,
                 "sentimentStats": sentiment_stats,
                 "recentEvaluations": recent_evaluations,
-                "classSections": counts_result[8] if counts_result else 0
+                "classSections": stats.total_class_sections
             }
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting dashboard stats: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to fetch dashboard statistics: {str(e)}")
@@ -181,7 +122,7 @@ async def get_department_overview(
             if not period:
                 raise HTTPException(status_code=404, detail="Evaluation period not found")
         else:
-            period = db.query(EvaluationPeriod).filter(EvaluationPeriod.status == 'active').first()
+            period = ActivePeriodResolver.get(db)
         
         period_id = period.id if period else None
         
@@ -375,7 +316,7 @@ async def get_all_evaluations(
             if not period:
                 raise HTTPException(status_code=404, detail="Evaluation period not found")
         else:
-            period = db.query(EvaluationPeriod).filter(EvaluationPeriod.status == 'active').first()
+            period = ActivePeriodResolver.get(db)
         
         period_id = period.id if period else None
         
@@ -473,21 +414,17 @@ async def get_course_category_averages(
     Admin can access all courses.
     """
     try:
-        from models.enhanced_models import Course, ClassSection, Evaluation
+        from models.enhanced_models import Course
         
         # Verify course exists
         course = db.query(Course).filter(Course.id == course_id).first()
         if not course:
             raise HTTPException(status_code=404, detail="Course not found")
         
-        # Get all evaluations for this course
-        evaluations = db.query(Evaluation).join(
-            ClassSection, Evaluation.class_section_id == ClassSection.id
-        ).filter(
-            ClassSection.course_id == course_id
-        ).all()
+        # Rating counts per question of all the course's evaluations, aggregated from evaluations.answers
+        answer_counts = EvaluationAnswerService.answer_counts(db, course_id=course_id)
         
-        if not evaluations:
+        if not answer_counts["total_evaluations"]:
             return {
                 "success": True,
                 "data": {
@@ -498,63 +435,16 @@ async def get_course_category_averages(
                 }
             }
         
-        # Define category question mappings
-        categories = {
-            "relevance_of_course": {
-                "name": "Relevance of Course",
-                "questions": ["1", "2", "3", "4", "5", "6"],
-                "description": "Development of skills and knowledge"
-            },
-            "course_organization": {
-                "name": "Course Organization and ILOs",
-                "questions": ["7", "8", "9", "10", "11"],
-                "description": "Course structure and learning outcomes"
-            },
-            "teaching_learning": {
-                "name": "Teaching - Learning",
-                "questions": ["12", "13", "14", "15", "16", "17", "18"],
-                "description": "Teaching methods and activities"
-            },
-            "assessment": {
-                "name": "Assessment",
-                "questions": ["19", "20", "21", "22", "23", "24"],
-                "description": "Assessment methods and feedback"
-            },
-            "learning_environment": {
-                "name": "Learning Environment",
-                "questions": ["25", "26", "27", "28", "29", "30"],
-                "description": "Facilities and learning resources"
-            },
-            "counseling": {
-                "name": "Counseling",
-                "questions": ["31"],
-                "description": "Consultation and support"
-            }
-        }
+        counts = answer_counts["counts"]
         
-        # Calculate averages for each category
-        category_results = []
-        for cat_id, cat_info in categories.items():
-            all_ratings = []
-            
-            for evaluation in evaluations:
-                if evaluation.ratings and isinstance(evaluation.ratings, dict):
-                    # Extract ratings for this category's questions
-                    for q_num in cat_info["questions"]:
-                        rating = evaluation.ratings.get(q_num)
-                        if rating is not None and isinstance(rating, (int, float)):
-                            all_ratings.append(float(rating))
-            
-            if all_ratings:
-                average = sum(all_ratings) / len(all_ratings)
-                category_results.append({
-                    "category_id": cat_id,
-                    "category_name": cat_info["name"],
-                    "description": cat_info["description"],
-                    "average": round(average, 2),
-                    "total_responses": len(all_ratings),
-                    "question_count": len(cat_info["questions"])
-                })
+        category_results = [{
+            "category_id": cat_id,
+            "category_name": cat_info["name"],
+            "description": cat_info["description"],
+            "average": round(average, 2),
+            "total_responses": rating_count,
+            "question_count": len(cat_info["questions"])
+        } for cat_id, cat_info, rating_count, average in EvaluationAnswerService.category_totals(counts)]
         
         return {
             "success": True,
@@ -562,7 +452,7 @@ async def get_course_category_averages(
                 "course_id": course_id,
                 "course_name": course.subject_name,
                 "course_code": course.subject_code,
-                "total_evaluations": len(evaluations),
+                "total_evaluations": answer_counts["total_evaluations"],
                 "categories": category_results
             }
         }
@@ -585,21 +475,17 @@ async def get_question_distribution(
     Returns count and percentage for each rating (1-4) per question.
     """
     try:
-        from models.enhanced_models import Course, ClassSection, Evaluation
+        from models.enhanced_models import Course
         
         # Verify course exists
         course = db.query(Course).filter(Course.id == course_id).first()
         if not course:
             raise HTTPException(status_code=404, detail="Course not found")
         
-        # Get all evaluations for this course
-        evaluations = db.query(Evaluation).join(
-            ClassSection, Evaluation.class_section_id == ClassSection.id
-        ).filter(
-            ClassSection.course_id == course_id
-        ).all()
+        # Rating counts per question of all the course's evaluations, aggregated from evaluations.answers
+        answer_counts = EvaluationAnswerService.answer_counts(db, course_id=course_id)
         
-        if not evaluations:
+        if not answer_counts["total_evaluations"]:
             return {
                 "success": True,
                 "data": {
@@ -610,120 +496,8 @@ async def get_question_distribution(
                 }
             }
         
-        # Map descriptive keys to question numbers
-        jsonb_key_mapping = {
-            "relevance_subject_knowledge": "1",
-            "relevance_practical_skills": "2",
-            "relevance_team_work": "3",
-            "relevance_leadership": "4",
-            "relevance_communication": "5",
-            "relevance_positive_attitude": "6",
-            "org_curriculum": "7",
-            "org_ilos_known": "8",
-            "org_ilos_clear": "9",
-            "org_ilos_relevant": "10",
-            "org_no_overlapping": "11",
-            "teaching_tlas_useful": "12",
-            "teaching_ila_useful": "13",
-            "teaching_tlas_sequenced": "14",
-            "teaching_applicable": "15",
-            "teaching_motivated": "16",
-            "teaching_team_work": "17",
-            "teaching_independent": "18",
-            "assessment_start": "19",
-            "assessment_all_topics": "20",
-            "assessment_number": "21",
-            "assessment_distribution": "22",
-            "assessment_allocation": "23",
-            "assessment_feedback": "24",
-            "environment_classrooms": "25",
-            "environment_library": "26",
-            "environment_laboratory": "27",
-            "environment_computer": "28",
-            "environment_internet": "29",
-            "environment_facilities_availability": "30",
-            "counseling_available": "31"
-        }
-        
-        # Question texts for all 31 questions
-        question_texts = {
-            "1": "The course helped me to develop relevant subject knowledge",
-            "2": "The course helped me to develop related practical skills",
-            "3": "The course helped me to develop team working skills",
-            "4": "The course helped me to develop leadership skills",
-            "5": "The course helped me to develop communication skills",
-            "6": "The course helped me to develop positive attitude on my program of study",
-            "7": "The course was implemented according to the approved curriculum",
-            "8": "Intended Learning Outcomes (ILOs) of the course were made known from the beginning",
-            "9": "Intended Learning Outcomes (ILOs) of the course were clear",
-            "10": "Intended Learning Outcomes (ILOs) of the course were relevant",
-            "11": "There were no overlapping of contents within a course",
-            "12": "Teaching - Learning Activities (TLAs) such as practical, educational tour etc. were useful and relevant",
-            "13": "Independent Learning (ILs) activities such as journal reading, research work, project, etc. were useful and relevant",
-            "14": "The TLAs within a course were sequenced in a logical manner",
-            "15": "Team teaching is done applicable",
-            "16": "The teachers motivated the students to learn",
-            "17": "The teachers provided adequate opportunities for team work",
-            "18": "The teachers provided adequate opportunities for independent learning",
-            "19": "Assessment methods to be used were told at the beginning of the course",
-            "20": "Assessments covered all the topics taught in the course",
-            "21": "The number of assessments was appropriate and adequate",
-            "22": "Distribution of assessments over a semester was appropriate",
-            "23": "Allocation of marks/grade among assessments was satisfactory",
-            "24": "The teachers provided timely feedback on student performance",
-            "25": "Available facilities in the classrooms were satisfactory",
-            "26": "Available library facilities were adequate",
-            "27": "Available laboratory facilities were adequate",
-            "28": "Access to computer facilities were sufficient",
-            "29": "There was sufficient access to internet and electronic databases",
-            "30": "Availability of facilities for recreation was adequate",
-            "31": "The teachers were available for consultation whenever needed"
-        }
-        
-        # Initialize distribution for all 31 questions
-        question_distribution = {}
-        for q_num in range(1, 32):
-            question_distribution[str(q_num)] = {
-                "question_number": q_num,
-                "question_text": question_texts[str(q_num)],
-                "distribution": {
-                    "1": {"count": 0, "percentage": 0.0},
-                    "2": {"count": 0, "percentage": 0.0},
-                    "3": {"count": 0, "percentage": 0.0},
-                    "4": {"count": 0, "percentage": 0.0}
-                },
-                "total_responses": 0,
-                "average": 0.0
-            }
-        
-        # Count responses for each question
-        for evaluation in evaluations:
-            if evaluation.ratings and isinstance(evaluation.ratings, dict):
-                for key, rating in evaluation.ratings.items():
-                    # Convert descriptive key to question number if needed
-                    q_num = jsonb_key_mapping.get(key) if key in jsonb_key_mapping else (key if key.isdigit() else None)
-                    if q_num and q_num in question_distribution and rating in [1, 2, 3, 4]:
-                        question_distribution[q_num]["distribution"][str(rating)]["count"] += 1
-                        question_distribution[q_num]["total_responses"] += 1
-        
-        # Calculate percentages and averages
-        for q_num, data in question_distribution.items():
-            total = data["total_responses"]
-            if total > 0:
-                # Calculate percentages
-                for rating in ["1", "2", "3", "4"]:
-                    count = data["distribution"][rating]["count"]
-                    data["distribution"][rating]["percentage"] = round((count / total) * 100, 1)
-                
-                # Calculate average
-                weighted_sum = sum(
-                    int(rating) * data["distribution"][rating]["count"]
-                    for rating in ["1", "2", "3", "4"]
-                )
-                data["average"] = round(weighted_sum / total, 2)
-        
-        # Convert to list format
-        questions_list = list(question_distribution.values())
+        counts = answer_counts["counts"]
+        questions_list = EvaluationAnswerService.question_distribution(counts)
         
         return {
             "success": True,
@@ -731,7 +505,7 @@ async def get_question_distribution(
                 "course_id": course_id,
                 "course_name": course.subject_name,
                 "course_code": course.subject_code,
-                "total_evaluations": len(evaluations),
+                "total_evaluations": answer_counts["total_evaluations"],
                 "questions": questions_list
             }
         }
@@ -11,6 +11,7 @@ from datetime import datetime, timedelta
 from jose import jwt, JWTError
 from database.connection import get_db
 from config import now_local
+from services.audit_writer import audit_writer
 
 logger = logging.getLogger(__name__)
 
@@ -121,9 +122,10 @@ async def login(request: LoginRequest, db = Depends(get_db)):
             "user_id": user_data.id
         })
         
-        # Create audit log for login
-        from models.enhanced_models import AuditLog
-        audit_log = AuditLog(
+        db.commit()
+        
+        # Create audit log for login (batched off the request path)
+        audit_writer.write(
             user_id=user_data.id,
             action="LOGIN",
             category="Authentication",
@@ -132,8 +134,6 @@ async def login(request: LoginRequest, db = Depends(get_db)):
             details={"email": user_data.email, "role": user_data.role},
             ip_address=None  # Can be added from request if needed
         )
-        db.add(audit_log)
-        db.commit()
         
         # Generate JWT token
         token_data = {
@@ -7,7 +7,7 @@ from fastapi import APIRouter, HTTPException, Depends, Query, UploadFile, File
 from middleware.auth import require_admin
 from sqlalchemy.orm import Session
 from database.connection import get_db
-from services.enrollment_validation import EnrollmentValidationService
+from services.enrollment_validation import EnrollmentValidationService, invalidate_enrollment_index
 from typing import Optional
 from pydantic import BaseModel
 import logging
@@ -364,6 +364,7 @@ async def upload_enrollment_list(
                 skipped += 1
         
         db.commit()
+        invalidate_enrollment_index()
         
         return {
             "success": True,
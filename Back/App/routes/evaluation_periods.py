@@ -8,6 +8,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import or_, desc
 from database.connection import get_db
 from models.enhanced_models import EvaluationPeriod
+from services.active_period import ActivePeriodResolver
 from typing import Optional
 import logging
 
@@ -85,9 +86,7 @@ async def get_active_period(
     Returns the period with status='active', or None if no active period.
     """
     try:
-        period = db.query(EvaluationPeriod).filter(
-            EvaluationPeriod.status == 'active'
-        ).first()
+        period = ActivePeriodResolver.get(db)
         
         if not period:
             return {
@@ -8,9 +8,14 @@ Handles secretary operations including:
 
 from fastapi import APIRouter, HTTPException, Depends, Query, Body
 from middleware.auth import require_staff
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, defer
 from sqlalchemy import text, func, and_, or_
-from database.connection import get_db
+from database.connection import get_db, get_read_db
+from services.dashboard_bundle import build_dashboard_bundle, parse_widgets, resolve_period_id
+from services.active_period import ActivePeriodResolver
+from services.evaluation_answers import EvaluationAnswerService, answers_to_ratings
+from services.period_finalization import PeriodFinalizationService, FINAL_ANALYSIS_TYPE
+from utils.cache import dashboard_cache, stats_cache
 from models.enhanced_models import (
     User, Secretary, Course, ClassSection, Program, Evaluation, EvaluationPeriod, Enrollment, Student, AnalysisResult
 )
@@ -43,11 +48,16 @@ class ClassSectionCreate(BaseModel):
     semester: str
     academic_year: str
 
+def get_secretary_by_user(db: Session, user_id: int) -> Optional[Secretary]:
+    """Secretary record of a user (None if the user is not a secretary)"""
+    return db.query(Secretary).filter(Secretary.user_id == user_id).first()
+
 # ===========================
 # DASHBOARD
 # ===========================
 
 @router.get("/dashboard")
+@dashboard_cache
 async def get_secretary_dashboard(
     user_id: int = Query(...),
     period_id: Optional[int] = Query(None),
@@ -62,9 +72,7 @@ async def get_secretary_dashboard(
                 raise HTTPException(status_code=404, detail="Evaluation period not found")
         else:
             # Default to active period
-            period = db.query(EvaluationPeriod).filter(
-                EvaluationPeriod.status == 'active'
-            ).first()
+            period = ActivePeriodResolver.get(db)
         
         # If no period, return empty dashboard
         if not period:
@@ -214,7 +222,7 @@ async def get_courses(
                 raise HTTPException(status_code=404, detail="Evaluation period not found")
         else:
             # Default to active period
-            period = db.query(EvaluationPeriod).filter(EvaluationPeriod.status == 'active').first()
+            period = ActivePeriodResolver.get(db)
         
         period_id = period.id if period else None
         
@@ -657,9 +665,12 @@ async def get_programs(
     db: Session = Depends(get_db)
 ):
     """Get all programs (secretary has department-wide access)"""
+    return await _programs_widget(get_secretary_by_user(db, user_id), db=db)
+
+async def _programs_widget(principal: Optional[Secretary], db: Session):
+    """Programs for an already resolved secretary (also the bundle's "programs" widget)"""
     try:
-        secretary = db.query(Secretary).filter(Secretary.user_id == user_id).first()
-        if not secretary:
+        if not principal:
             raise HTTPException(status_code=404, detail="Secretary not found")
         
         # Secretary can access ALL programs in the department
@@ -689,9 +700,12 @@ async def get_year_levels(
     db: Session = Depends(get_db)
 ):
     """Get year levels for filtering"""
+    return await _year_levels_widget(get_secretary_by_user(db, user_id), db=db)
+
+async def _year_levels_widget(principal: Optional[Secretary], db: Session):
+    """Year levels for an already resolved secretary (also the bundle's "year-levels" widget)"""
     try:
-        secretary = db.query(Secretary).filter(Secretary.user_id == user_id).first()
-        if not secretary:
+        if not principal:
             raise HTTPException(status_code=404, detail="Secretary not found")
         
         year_levels = [
@@ -730,7 +744,7 @@ async def get_evaluations_summary(
             if not period:
                 raise HTTPException(status_code=404, detail="Evaluation period not found")
         else:
-            period = db.query(EvaluationPeriod).filter(EvaluationPeriod.status == 'active').first()
+            period = ActivePeriodResolver.get(db)
         
         period_id = period.id if period else None
         
@@ -811,7 +825,7 @@ async def get_secretary_evaluations(
             if not period:
                 raise HTTPException(status_code=404, detail="Evaluation period not found")
         else:
-            period = db.query(EvaluationPeriod).filter(EvaluationPeriod.status == 'active').first()
+            period = ActivePeriodResolver.get(db)
         
         # If no period, return empty
         if not period:
@@ -842,7 +856,7 @@ async def get_secretary_evaluations(
         total = query.count()
         
         # Apply pagination
-        evaluations = query.order_by(Evaluation.submission_date.desc()).offset(
+        evaluations = query.options(defer(Evaluation.ratings)).order_by(Evaluation.submission_date.desc()).offset(
             (page - 1) * page_size
         ).limit(page_size).all()
         
@@ -865,38 +879,15 @@ async def get_secretary_evaluations(
                 else:
                     student_name = student.student_number or "Unknown Student"
             
-            # Get ratings - prefer JSONB ratings column over individual rating columns
-            ratings_data = evaluation.ratings if hasattr(evaluation, 'ratings') and evaluation.ratings else {
+            # Ratings keyed by question number ("1".."31") from the compact answers array,
+            # falling back to the individual rating columns
+            ratings_data = answers_to_ratings(evaluation.answers) if evaluation.answers else {
                 "overall": evaluation.rating_overall if hasattr(evaluation, 'rating_overall') else 0,
                 "teaching": evaluation.rating_teaching if hasattr(evaluation, 'rating_teaching') else 0,
                 "content": evaluation.rating_content if hasattr(evaluation, 'rating_content') else 0,
                 "engagement": evaluation.rating_engagement if hasattr(evaluation, 'rating_engagement') else 0
             }
             
-            # Transform ratings from descriptive keys to question numbers for frontend
-            jsonb_key_mapping = {
-                "relevance_subject_knowledge": "1", "relevance_practical_skills": "2", "relevance_team_work": "3",
-                "relevance_leadership": "4", "relevance_communication": "5", "relevance_positive_attitude": "6",
-                "org_curriculum": "7", "org_ilos_known": "8", "org_ilos_clear": "9",
-                "org_ilos_relevant": "10", "org_no_overlapping": "11",
-                "teaching_tlas_useful": "12", "teaching_ila_useful": "13", "teaching_tlas_sequenced": "14",
-                "teaching_applicable": "15", "teaching_motivated": "16", "teaching_team_work": "17", "teaching_independent": "18",
-                "assessment_start": "19", "assessment_all_topics": "20", "assessment_number": "21",
-                "assessment_distribution": "22", "assessment_allocation": "23", "assessment_feedback": "24",
-                "environment_classrooms": "25", "environment_library": "26", "environment_laboratory": "27",
-                "environment_computer": "28", "environment_internet": "29", "environment_facilities_availability": "30",
-                "counseling_available": "31"
-            }
-            
-            # Convert ratings keys if they use descriptive names
-            if ratings_data and isinstance(ratings_data, dict):
-                transformed_ratings = {}
-                for key, value in ratings_data.items():
-                    # If key is in mapping, use the question number; otherwise keep original key
-                    new_key = jsonb_key_mapping.get(key, key)
-                    transformed_ratings[new_key] = value
-                ratings_data = transformed_ratings
-            
             result.append({
                 "id": evaluation.id,
                 "courseId": course.id if course else None,
@@ -959,9 +950,7 @@ async def get_sentiment_analysis(
         
         # Get active period if not specified
         if not period_id:
-            active_period = db.query(EvaluationPeriod).filter(
-                EvaluationPeriod.status == 'active'
-            ).first()
+            active_period = ActivePeriodResolver.get(db)
             period_id = active_period.id if active_period else None
         
         # Calculate date range
@@ -1080,9 +1069,7 @@ async def get_anomalies(
     try:
         # Get active period if not specified
         if not period_id:
-            active_period = db.query(EvaluationPeriod).filter(
-                EvaluationPeriod.status == 'active'
-            ).first()
+            active_period = ActivePeriodResolver.get(db)
             period_id = active_period.id if active_period else None
         
         # Query evaluations with anomaly scores (not just is_anomaly flag)
@@ -1194,9 +1181,7 @@ async def get_course_category_averages(
     try:
         # Get active period if not specified
         if not period_id:
-            active_period = db.query(EvaluationPeriod).filter(
-                EvaluationPeriod.status == 'active'
-            ).first()
+            active_period = ActivePeriodResolver.get(db)
             period_id = active_period.id if active_period else None
         
         # Check if course_id is actually a section_id (frontend sends section.id as courseId)
@@ -1216,235 +1201,68 @@ async def get_course_category_averages(
         if not course:
             raise HTTPException(status_code=404, detail="Course not found")
         
-        # Get evaluations for this section or all sections of the course, filtered by period
-        # CRITICAL: Only count completed evaluations
-        if section_id:
-            # Get evaluations for specific section with period filter
-            query = db.query(Evaluation).join(
-                Enrollment, and_(
-                    Evaluation.class_section_id == Enrollment.class_section_id,
-                    Evaluation.student_id == Enrollment.student_id
-                )
-            ).filter(
-                Evaluation.class_section_id == section_id,
-                Evaluation.status == 'completed'  # Only completed evaluations
-            )
-            if period_id:
-                query = query.filter(Enrollment.evaluation_period_id == period_id)
-            evaluations = query.all()
+        # Finalized (closed) periods: frozen results written when the period was closed
+        snapshot = PeriodFinalizationService.get_snapshot(
+            db, period_id, "section" if section_id else "course", section_id or actual_course_id
+        )
+        
+        if snapshot:
+            answer_counts = snapshot
+            enrolled_count = snapshot["enrolled_students"]
         else:
-            # Get all evaluations for this course with period filter
-            query = db.query(Evaluation).join(
-                ClassSection, Evaluation.class_section_id == ClassSection.id
-            ).join(
-                Enrollment, and_(
-                    Evaluation.class_section_id == Enrollment.class_section_id,
-                    Evaluation.student_id == Enrollment.student_id
-                )
-            ).filter(
-                ClassSection.course_id == actual_course_id,
-                Evaluation.status == 'completed'  # Only completed evaluations
+            # Rating counts per question of the completed, enrolled evaluations of the section
+            # or of all sections of the course, filtered by period - aggregated in one statement
+            answer_counts = EvaluationAnswerService.answer_counts(
+                db,
+                section_id=section_id,
+                course_id=None if section_id else actual_course_id,
+                period_id=period_id,
+                completed_only=True,
+                enrolled_only=True
             )
-            if period_id:
-                query = query.filter(Enrollment.evaluation_period_id == period_id)
-            evaluations = query.all()
         
-        logger.info(f"[CATEGORY-AVERAGES] Found {len(evaluations)} evaluations for section_id={section_id}")
-        if evaluations and len(evaluations) > 0:
-            first_eval = evaluations[0]
-            logger.info(f"[CATEGORY-AVERAGES] First evaluation ID={first_eval.id}")
-            logger.info(f"[CATEGORY-AVERAGES] ratings column value: {first_eval.ratings}")
-            logger.info(f"[CATEGORY-AVERAGES] ratings type: {type(first_eval.ratings)}")
-            logger.info(f"[CATEGORY-AVERAGES] rating_teaching={first_eval.rating_teaching}, rating_content={first_eval.rating_content}")
+            logger.info(f"[CATEGORY-AVERAGES] Found {answer_counts['total_evaluations']} evaluations for section_id={section_id}")
         
-        if not evaluations:
-            return {
-                "success": True,
-                "data": {
-                    "course_id": course_id,
-                    "course_name": course.subject_name,
-                    "total_evaluations": 0,
-                    "categories": []
+            if not answer_counts["total_evaluations"]:
+                return {
+                    "success": True,
+                    "data": {
+                        "course_id": course_id,
+                        "course_name": course.subject_name,
+                        "total_evaluations": 0,
+                        "categories": []
+                    }
                 }
-            }
-        
-        # Map actual JSONB keys to question numbers
-        # The database uses descriptive keys like 'relevance_subject_knowledge' instead of '1', '2', etc.
-        jsonb_key_mapping = {
-            # Relevance of Course (1-6)
-            "relevance_subject_knowledge": "1",
-            "relevance_practical_skills": "2",
-            "relevance_team_work": "3",
-            "relevance_leadership": "4",
-            "relevance_communication": "5",
-            "relevance_positive_attitude": "6",
-            # Course Organization (7-11)
-            "org_curriculum": "7",
-            "org_ilos_known": "8",
-            "org_ilos_clear": "9",
-            "org_ilos_relevant": "10",
-            "org_no_overlapping": "11",
-            # Teaching-Learning (12-18)
-            "teaching_tlas_useful": "12",
-            "teaching_ila_useful": "13",
-            "teaching_tlas_sequenced": "14",
-            "teaching_applicable": "15",
-            "teaching_motivated": "16",
-            "teaching_team_work": "17",
-            "teaching_independent": "18",
-            # Assessment (19-24)
-            "assessment_start": "19",
-            "assessment_all_topics": "20",
-            "assessment_number": "21",
-            "assessment_distribution": "22",
-            "assessment_allocation": "23",
-            "assessment_feedback": "24",
-            # Learning Environment (25-30)
-            "environment_classrooms": "25",
-            "environment_library": "26",
-            "environment_laboratory": "27",
-            "environment_computer": "28",
-            "environment_internet": "29",
-            "environment_facilities_availability": "30",
-            # Counseling (31)
-            "counseling_available": "31"
-        }
-        
-        # Define category question mappings with actual question texts
-        question_texts = {
-            "1": "The course helped me to develop relevant subject knowledge",
-            "2": "The course helped me to develop related practical skills",
-            "3": "The course helped me to develop team working skills",
-            "4": "The course helped me to develop leadership skills",
-            "5": "The course helped me to develop communication skills",
-            "6": "The course helped me to develop positive attitude on my program of study",
-            "7": "The course was implemented according to the approved curriculum",
-            "8": "Intended Learning Outcomes (ILOs) of the course were made known from the beginning",
-            "9": "Intended Learning Outcomes (ILOs) of the course were clear",
-            "10": "Intended Learning Outcomes (ILOs) of the course were relevant",
-            "11": "There were no overlapping of contents within a course",
-            "12": "Teaching - Learning Activities (TLAs) such as practical, educational tour etc. were useful and relevant",
-            "13": "Independent Learning (ILs) activities such as journal reading, research work, project, etc. were useful and relevant",
-            "14": "The TLAs within a course were sequenced in a logical manner",
-            "15": "Team teaching is done applicable",
-            "16": "The teachers motivated the students to learn",
-            "17": "The teachers provided adequate opportunities for team work",
-            "18": "The teachers provided adequate opportunities for independent learning",
-            "19": "Assessment methods to be used were told at the beginning of the course",
-            "20": "Assessments covered all the topics taught in the course",
-            "21": "The number of assessments was appropriate and adequate",
-            "22": "Distribution of assessments over a semester was appropriate",
-            "23": "Allocation of marks/grade among assessments was satisfactory",
-            "24": "The teachers provided timely feedback on student performance",
-            "25": "Available facilities in the classrooms were satisfactory",
-            "26": "Available library facilities were adequate",
-            "27": "Available laboratory facilities were adequate",
-            "28": "Access to computer facilities were sufficient",
-            "29": "There was sufficient access to internet and electronic databases",
-            "30": "Availability of facilities for recreation was adequate",
-            "31": "The teachers were available for consultation whenever needed"
-        }
-        
-        categories = {
-            "relevance_of_course": {
-                "name": "Relevance of Course",
-                "questions": ["1", "2", "3", "4", "5", "6"],
-                "description": "Development of skills and knowledge"
-            },
-            "course_organization": {
-                "name": "Course Organization and ILOs",
-                "questions": ["7", "8", "9", "10", "11"],
-                "description": "Course structure and learning outcomes"
-            },
-            "teaching_learning": {
-                "name": "Teaching - Learning",
-                "questions": ["12", "13", "14", "15", "16", "17", "18"],
-                "description": "Teaching methods and activities"
-            },
-            "assessment": {
-                "name": "Assessment",
-                "questions": ["19", "20", "21", "22", "23", "24"],
-                "description": "Assessment methods and feedback"
-            },
-            "learning_environment": {
-                "name": "Learning Environment",
-                "questions": ["25", "26", "27", "28", "29", "30"],
-                "description": "Facilities and learning resources"
-            },
-            "counseling": {
-                "name": "Counseling",
-                "questions": ["31"],
-                "description": "Consultation and support"
-            }
-        }
+            
+            # Get enrollment count for this section
+            enrolled_count = 0
+            if section_id:
+                enrolled_count = db.query(func.count(Enrollment.id)).filter(
+                    Enrollment.class_section_id == section_id,
+                    Enrollment.status == 'active'
+                ).scalar() or 0
         
-        # Helper function to get real ratings from JSONB column
-        def get_real_ratings(eval_obj):
-            """Get actual ratings from JSONB ratings column and normalize keys"""
-            if eval_obj.ratings and isinstance(eval_obj.ratings, dict) and len(eval_obj.ratings) > 0:
-                # Convert descriptive keys to question numbers
-                normalized = {}
-                for jsonb_key, rating_value in eval_obj.ratings.items():
-                    # Map jsonb key to question number
-                    question_num = jsonb_key_mapping.get(jsonb_key)
-                    if question_num:
-                        normalized[question_num] = rating_value
-                
-                logger.info(f"[REAL-DATA] Eval ID={eval_obj.id}: {len(eval_obj.ratings)} JSONB keys → {len(normalized)} question numbers")
-                return normalized
-            else:
-                logger.warning(f"[REAL-DATA] Eval ID={eval_obj.id} has no ratings data")
-                return {}
+        total_students_evaluated = answer_counts["total_evaluations"]
         
-        # Calculate averages for each category using REAL data only
+        # Calculate averages for each category
         category_results = []
-        total_students_evaluated = len(evaluations)
-        
-        for cat_id, cat_info in categories.items():
-            all_ratings = []
-            
-            for evaluation in evaluations:
-                # Get REAL ratings from JSONB column - no fake data
-                eval_ratings = get_real_ratings(evaluation)
-                
-                # Extract ratings for this category's questions
-                for q_num in cat_info["questions"]:
-                    rating = eval_ratings.get(q_num)
-                    if rating is not None and isinstance(rating, (int, float)):
-                        all_ratings.append(float(rating))
+        for cat_id, cat_info, rating_count, average in EvaluationAnswerService.category_totals(answer_counts["counts"]):
+            # Actual response count (total ratings / questions in category)
+            actual_responses = rating_count // len(cat_info["questions"])
+            percentage = (actual_responses / total_students_evaluated * 100) if total_students_evaluated > 0 else 0
             
-            if all_ratings:
-                average = sum(all_ratings) / len(all_ratings)
-                # Calculate actual response count (total ratings / questions in category)
-                actual_responses = len(all_ratings) // len(cat_info["questions"]) if len(cat_info["questions"]) > 0 else 0
-                percentage = (actual_responses / total_students_evaluated * 100) if total_students_evaluated > 0 else 0
-                
-                category_results.append({
-                    "category_id": cat_id,
-                    "category_name": cat_info["name"],
-                    "description": cat_info["description"],
-                    "average": round(average, 2),
-                    "total_responses": actual_responses,  # Actual student count
-                    "question_count": len(cat_info["questions"]),
-                    "response_percentage": round(percentage, 1)
-                })
-                logger.info(f"Category {cat_id}: {actual_responses}/{total_students_evaluated} students, avg={round(average, 2)}")
-            else:
-                logger.warning(f"Category {cat_id}: No ratings found")
-        
-        # Calculate overall rating from actual evaluations
-        overall_rating = 0.0
-        if evaluations:
-            ratings = [e.rating_overall for e in evaluations if e.rating_overall is not None]
-            overall_rating = sum(ratings) / len(ratings) if ratings else 0.0
-        
-        # Get enrollment count for this section
-        enrolled_count = 0
-        if section_id:
-            enrolled_count = db.query(func.count(Enrollment.id)).filter(
-                Enrollment.class_section_id == section_id,
-                Enrollment.status == 'active'
-            ).scalar() or 0
+            category_results.append({
+                "category_id": cat_id,
+                "category_name": cat_info["name"],
+                "description": cat_info["description"],
+                "average": round(average, 2),
+                "total_responses": actual_responses,  # Actual student count
+                "question_count": len(cat_info["questions"]),
+                "response_percentage": round(percentage, 1)
+            })
+        
+        # Overall rating from actual evaluations
+        overall_rating = answer_counts["average_overall"] or 0.0
         
         return {
             "success": True,
@@ -1453,9 +1271,9 @@ async def get_course_category_averages(
                 "section_id": section_id,
                 "course_name": course.subject_name,
                 "course_code": course.subject_code,
-                "total_evaluations": len(evaluations),
+                "total_evaluations": total_students_evaluated,
                 "enrolled_students": enrolled_count,
-                "response_rate": round((len(evaluations) / enrolled_count * 100), 0) if enrolled_count > 0 else 0,
+                "response_rate": round((total_students_evaluated / enrolled_count * 100), 0) if enrolled_count > 0 else 0,
                 "overall_rating": round(overall_rating, 2),
                 "categories": category_results
             }
@@ -1472,11 +1290,13 @@ async def get_course_category_averages(
 async def get_question_distribution(
     course_id: int,
     user_id: int = Query(...),
+    period_id: Optional[int] = Query(None),
     db: Session = Depends(get_db)
 ):
     """
     Get response distribution for all 31 questions in a course/section.
     Returns count and percentage for each rating (1-4) per question.
+    With period_id of a finalized period, served from the frozen period results.
     
     Note: Frontend sends section.id as course_id parameter
     """
@@ -1498,167 +1318,40 @@ async def get_question_distribution(
         if not course:
             raise HTTPException(status_code=404, detail="Course not found")
         
-        # Get evaluations for this section or all sections of the course
-        if section_id:
-            # Get evaluations for specific section
-            evaluations = db.query(Evaluation).filter(
-                Evaluation.class_section_id == section_id
-            ).all()
-        else:
-            # Get all evaluations for this course
-            evaluations = db.query(Evaluation).join(
-                ClassSection, Evaluation.class_section_id == ClassSection.id
-            ).filter(
-                ClassSection.course_id == actual_course_id
-            ).all()
-        
-        if not evaluations:
+        # Finalized (closed) periods: frozen results written when the period was closed
+        snapshot = PeriodFinalizationService.get_snapshot(
+            db, period_id, "section" if section_id else "course", section_id or actual_course_id
+        )
+        if snapshot:
             return {
                 "success": True,
                 "data": {
                     "course_id": course_id,
                     "course_name": course.subject_name,
-                    "total_evaluations": 0,
-                    "questions": []
+                    "course_code": course.subject_code,
+                    "total_evaluations": snapshot["total_evaluations"],
+                    "questions": EvaluationAnswerService.question_distribution(snapshot["counts"]) if snapshot["total_evaluations"] else []
                 }
             }
         
-        # Map descriptive keys to question numbers (same as category-averages)
-        jsonb_key_mapping = {
-            # Relevance of Course (1-6)
-            "relevance_subject_knowledge": "1",
-            "relevance_practical_skills": "2",
-            "relevance_team_work": "3",
-            "relevance_leadership": "4",
-            "relevance_communication": "5",
-            "relevance_positive_attitude": "6",
-            # Course Organization (7-11)
-            "org_curriculum": "7",
-            "org_ilos_known": "8",
-            "org_ilos_clear": "9",
-            "org_ilos_relevant": "10",
-            "org_no_overlapping": "11",
-            # Teaching-Learning (12-18)
-            "teaching_tlas_useful": "12",
-            "teaching_ila_useful": "13",
-            "teaching_tlas_sequenced": "14",
-            "teaching_applicable": "15",
-            "teaching_motivated": "16",
-            "teaching_team_work": "17",
-            "teaching_independent": "18",
-            # Assessment (19-24)
-            "assessment_start": "19",
-            "assessment_all_topics": "20",
-            "assessment_number": "21",
-            "assessment_distribution": "22",
-            "assessment_allocation": "23",
-            "assessment_feedback": "24",
-            # Learning Environment (25-30)
-            "environment_classrooms": "25",
-            "environment_library": "26",
-            "environment_laboratory": "27",
-            "environment_computer": "28",
-            "environment_internet": "29",
-            "environment_facilities_availability": "30",
-            # Counseling (31)
-            "counseling_available": "31"
-        }
-        
-        # Helper function to normalize ratings to question numbers
-        def get_normalized_ratings(eval_obj):
-            """Convert descriptive keys to question numbers"""
-            if eval_obj.ratings and isinstance(eval_obj.ratings, dict) and len(eval_obj.ratings) > 0:
-                normalized = {}
-                for jsonb_key, rating_value in eval_obj.ratings.items():
-                    # Try to map descriptive key to question number
-                    question_num = jsonb_key_mapping.get(jsonb_key)
-                    if question_num:
-                        normalized[question_num] = rating_value
-                    elif jsonb_key.isdigit():
-                        # Already a numeric key
-                        normalized[jsonb_key] = rating_value
-                return normalized
-            return {}
-        
-        # Question texts
-        question_texts = {
-            "1": "The course helped me to develop relevant subject knowledge",
-            "2": "The course helped me to develop related practical skills",
-            "3": "The course helped me to develop team working skills",
-            "4": "The course helped me to develop leadership skills",
-            "5": "The course helped me to develop communication skills",
-            "6": "The course helped me to develop positive attitude on my program of study",
-            "7": "The course was implemented according to the approved curriculum",
-            "8": "Intended Learning Outcomes (ILOs) of the course were made known from the beginning",
-            "9": "Intended Learning Outcomes (ILOs) of the course were clear",
-            "10": "Intended Learning Outcomes (ILOs) of the course were relevant",
-            "11": "There were no overlapping of contents within a course",
-            "12": "Teaching - Learning Activities (TLAs) such as practical, educational tour etc. were useful and relevant",
-            "13": "Independent Learning (ILs) activities such as journal reading, research work, project, etc. were useful and relevant",
-            "14": "The TLAs within a course were sequenced in a logical manner",
-            "15": "Team teaching is done applicable",
-            "16": "The teachers motivated the students to learn",
-            "17": "The teachers provided adequate opportunities for team work",
-            "18": "The teachers provided adequate opportunities for independent learning",
-            "19": "Assessment methods to be used were told at the beginning of the course",
-            "20": "Assessments covered all the topics taught in the course",
-            "21": "The number of assessments was appropriate and adequate",
-            "22": "Distribution of assessments over a semester was appropriate",
-            "23": "Allocation of marks/grade among assessments was satisfactory",
-            "24": "The teachers provided timely feedback on student performance",
-            "25": "Available facilities in the classrooms were satisfactory",
-            "26": "Available library facilities were adequate",
-            "27": "Available laboratory facilities were adequate",
-            "28": "Access to computer facilities were sufficient",
-            "29": "There was sufficient access to internet and electronic databases",
-            "30": "Availability of facilities for recreation was adequate",
-            "31": "The teachers were available for consultation whenever needed"
-        }
+        # Per-question rating counts of the section or of all sections of the course,
+        # aggregated in SQL from evaluations.answers
+        answer_counts = EvaluationAnswerService.answer_counts(
+            db, section_id=section_id, course_id=None if section_id else actual_course_id
+        )
         
-        # Initialize distribution for all 31 questions
-        question_distribution = {}
-        for q_num in range(1, 32):
-            question_distribution[str(q_num)] = {
-                "question_number": q_num,
-                "question_text": question_texts[str(q_num)],
-                "distribution": {
-                    "1": {"count": 0, "percentage": 0.0},
-                    "2": {"count": 0, "percentage": 0.0},
-                    "3": {"count": 0, "percentage": 0.0},
-                    "4": {"count": 0, "percentage": 0.0}
-                },
-                "total_responses": 0,
-                "average": 0.0
+        if not answer_counts["total_evaluations"]:
+            return {
+                "success": True,
+                "data": {
+                    "course_id": course_id,
+                    "course_name": course.subject_name,
+                    "total_evaluations": 0,
+                    "questions": []
+                }
             }
         
-        # Count responses for each question
-        for evaluation in evaluations:
-            # Get ratings normalized to question numbers
-            eval_ratings = get_normalized_ratings(evaluation)
-            
-            for q_num, rating in eval_ratings.items():
-                if q_num in question_distribution and rating in [1, 2, 3, 4]:
-                    question_distribution[q_num]["distribution"][str(rating)]["count"] += 1
-                    question_distribution[q_num]["total_responses"] += 1
-        
-        # Calculate percentages and averages
-        for q_num, data in question_distribution.items():
-            total = data["total_responses"]
-            if total > 0:
-                # Calculate percentages
-                for rating in ["1", "2", "3", "4"]:
-                    count = data["distribution"][rating]["count"]
-                    data["distribution"][rating]["percentage"] = round((count / total) * 100, 1)
-                
-                # Calculate average
-                weighted_sum = sum(
-                    int(rating) * data["distribution"][rating]["count"]
-                    for rating in ["1", "2", "3", "4"]
-                )
-                data["average"] = round(weighted_sum / total, 2)
-        
-        # Convert to list format
-        questions_list = list(question_distribution.values())
+        questions_list = EvaluationAnswerService.question_distribution(answer_counts["counts"])
         
         return {
             "success": True,
@@ -1666,7 +1359,7 @@ async def get_question_distribution(
                 "course_id": course_id,
                 "course_name": course.subject_name,
                 "course_code": course.subject_code,
-                "total_evaluations": len(evaluations),
+                "total_evaluations": answer_counts["total_evaluations"],
                 "questions": questions_list
             }
         }
@@ -1683,6 +1376,7 @@ async def get_question_distribution(
 # ===========================
 
 @router.get("/completion-rates")
+@stats_cache
 async def get_completion_rates(
     user_id: int = Query(...),
     period_id: Optional[int] = Query(None),
@@ -1696,9 +1390,7 @@ async def get_completion_rates(
     try:
         # Get active period if not specified
         if not period_id:
-            active_period = db.query(EvaluationPeriod).filter(
-                EvaluationPeriod.status == 'active'
-            ).first()
+            active_period = ActivePeriodResolver.get(db)
             period_id = active_period.id if active_period else None
         
         # Get all class sections with enrollment and evaluation counts, filtered by period
@@ -1830,11 +1522,9 @@ async def get_ml_analysis_results(
                 "anomaly_count": result.anomaly_count,
                 "avg_overall_rating": result.avg_overall_rating,
                 "avg_sentiment_score": result.avg_sentiment_score,
-                "confidence_interval": result.confidence_interval,
+                "evaluation_period_id": result.evaluation_period_id,
                 "detailed_results": result.detailed_results,
-                "analysis_date": result.analysis_date.isoformat() if result.analysis_date else None,
-                "model_version": result.model_version,
-                "processing_time_ms": result.processing_time_ms
+                "analysis_date": result.analysis_date.isoformat() if result.analysis_date else None
             })
         
         return {
@@ -1867,21 +1557,28 @@ async def get_ml_insights_summary(
     try:
         # Get active period if not specified
         if not period_id:
-            active_period = db.query(EvaluationPeriod).filter(
-                EvaluationPeriod.status == 'active'
-            ).first()
+            active_period = ActivePeriodResolver.get(db)
             period_id = active_period.id if active_period else None
         
-        # Get all analysis results for sections in this period
-        query = db.query(AnalysisResult).join(
-            ClassSection, AnalysisResult.class_section_id == ClassSection.id
-        ).join(
-            Enrollment, ClassSection.id == Enrollment.class_section_id
-        )
+        # Finalized (closed) periods have one result per section for the period
+        all_results = []
         if period_id:
-            query = query.filter(Enrollment.evaluation_period_id == period_id)
+            all_results = db.query(AnalysisResult).filter(
+                AnalysisResult.evaluation_period_id == period_id,
+                AnalysisResult.analysis_type == FINAL_ANALYSIS_TYPE
+            ).all()
         
-        all_results = query.all()
+        if not all_results:
+            # Get all analysis results for sections in this period
+            query = db.query(AnalysisResult).join(
+                ClassSection, AnalysisResult.class_section_id == ClassSection.id
+            ).join(
+                Enrollment, ClassSection.id == Enrollment.class_section_id
+            )
+            if period_id:
+                query = query.filter(Enrollment.evaluation_period_id == period_id)
+            
+            all_results = query.all()
         
         if not all_results:
             return {
@@ -2033,9 +1730,7 @@ async def get_non_respondents(
         
         # Get active period if not specified
         if not evaluation_period_id:
-            active_period = db.query(EvaluationPeriod).filter(
-                EvaluationPeriod.status == 'active'
-            ).first()
+            active_period = ActivePeriodResolver.get(db)
             
             if not active_period:
                 return {
@@ -2235,4 +1930,66 @@ async def get_non_respondents(
         logger.error(f"Error fetching non-respondents: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch non-respondents: {str(e)}")
 
+# ===========================
+# DASHBOARD BUNDLE
+# ===========================
+
+async def _evaluation_periods_widget(db: Session):
+    """Every evaluation period, as GET /api/admin/evaluation-periods lists them (the bundle's "evaluation-periods" widget)"""
+    from routes.system_admin import get_evaluation_periods
+    return await get_evaluation_periods(status=None, current_user=None, db=db)
+
+DASHBOARD_WIDGETS = {
+    "dashboard": {"handler": get_secretary_dashboard},
+    "completion-rates": {"handler": get_completion_rates},
+    "sentiment-analysis": {"handler": get_sentiment_analysis},
+    "anomalies": {"handler": get_anomalies},
+    "ml-insights-summary": {"handler": get_ml_insights_summary},
+    "programs": {"handler": _programs_widget},
+    "year-levels": {"handler": _year_levels_widget},
+    "evaluations": {"handler": get_secretary_evaluations},
+    "evaluation-periods": {"handler": _evaluation_periods_widget}
+}
+
+@router.get("/dashboard-bundle")
+async def get_dashboard_bundle(
+    widgets: Optional[str] = Query(None, description="Comma-separated widget names (default: all)"),
+    period_id: Optional[int] = Query(None),
+    time_range: str = Query("month", regex="^(week|month|semester|year)$"),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_read_db),
+    current_user: dict = Depends(require_staff)
+):
+    """
+    Get several dashboard widgets in one request.
+    The caller and evaluation period are resolved once and shared; widgets are
+    built concurrently on the read pool. A failing widget is reported under
+    "errors" without failing the whole bundle.
+    """
+    try:
+        names = parse_widgets(widgets, DASHBOARD_WIDGETS)
+        resolved_period_id = resolve_period_id(db, period_id)
+
+        bundle = await build_dashboard_bundle(DASHBOARD_WIDGETS, names, {
+            "user_id": current_user['id'],
+            "principal": get_secretary_by_user(db, current_user['id']),
+            "period_id": resolved_period_id,
+            "time_range": time_range,
+            "page": page,
+            "page_size": page_size
+        })
 
+        return {
+            "success": True,
+            "data": {
+                "period_id": resolved_period_id,
+                **bundle
+            }
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error building dashboard bundle: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -13,10 +13,26 @@ from datetime import datetime
 import json
 import logging
 from database.connection import get_db
+from services.period_progress import PeriodProgressService
+from services.audit_writer import audit_writer
+from services.evaluation_answers import ratings_to_answers
+from services.ml_inference import score_evaluation
+from services.active_period import ActivePeriod, ActivePeriodResolver, get_open_period
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Re-checked by the submission write itself: the period was resolved from a worker's
+# cached copy, and FOR SHARE makes a concurrent close wait for the submission (or
+# the submission see the close)
+PERIOD_ACCEPTS_SUBMISSIONS = """EXISTS (
+    SELECT 1 FROM evaluation_periods
+    WHERE id = :period_id
+    AND status = 'active'
+    AND CURRENT_DATE BETWEEN start_date::date AND end_date::date
+    FOR SHARE
+)"""
+
 def verify_student_ownership(student_id: int, current_user: dict, db: Session):
     """
     Verify that the current user can only access their own student data.
@@ -42,18 +58,6 @@ def verify_student_ownership(student_id: int, current_user: dict, db: Session):
             detail="Access denied: You can only access your own data"
         )
 
-def _rating_based_sentiment(avg_rating: float):
-    """
-    Fallback sentiment analysis based on average rating
-    Returns (sentiment, confidence_score)
-    """
-    if avg_rating >= 3.5:
-        return "positive", 0.8
-    elif avg_rating >= 2.5:
-        return "neutral", 0.7
-    else:
-        return "negative", 0.8
-
 class EvaluationSubmission(BaseModel):
     class_section_id: int
     student_id: int
@@ -61,6 +65,106 @@ class EvaluationSubmission(BaseModel):
     ratings: Dict[str, Any]
     comment: Optional[str] = None
 
+def load_student_courses(student_id: int, db: Session) -> Dict[str, Any]:
+    """
+    Course list payload for GET /{student_id}/courses (student or user ID)
+    Not cached: can_evaluate must change as soon as the student submits.
+    """
+    # First get student record to find user_id
+    student_query = text("""
+        SELECT s.id, s.student_number, s.program_id, s.year_level, s.user_id
+        FROM students s
+        WHERE s.id = :student_id OR s.user_id = :student_id
+    """)
+    
+    student_result = db.execute(student_query, {"student_id": student_id})
+    student_data = student_result.fetchone()
+    
+    if not student_data:
+        raise HTTPException(status_code=404, detail="Student not found")
+    
+    actual_student_id = student_data[0]  # Get the actual student table ID
+    
+    # Get enrolled courses for this student that are in an active evaluation period
+    # CRITICAL: Only show courses that are enrolled in an active evaluation period
+    courses_result = db.execute(text("""
+        SELECT DISTINCT
+            c.id, c.subject_code, c.subject_name,
+            cs.id as class_section_id, cs.class_code,
+            cs.semester, cs.academic_year,
+            p.program_name,
+            CASE 
+                WHEN e.id IS NOT NULL AND e.submission_date IS NOT NULL THEN true 
+                ELSE false 
+            END as already_evaluated,
+            e.id as evaluation_id,
+            ep.id as evaluation_period_id,
+            ep.name as evaluation_period_name,
+            ep.end_date as period_end_date,
+            true as in_active_period
+        FROM enrollments enr
+        JOIN class_sections cs ON enr.class_section_id = cs.id
+        JOIN courses c ON cs.course_id = c.id
+        JOIN evaluation_periods ep ON enr.evaluation_period_id = ep.id
+        LEFT JOIN programs p ON c.program_id = p.id
+        LEFT JOIN evaluations e ON cs.id = e.class_section_id 
+            AND e.student_id = :student_id
+            AND e.evaluation_period_id = ep.id
+        WHERE enr.student_id = :student_id
+        AND enr.status = 'active'
+        AND enr.evaluation_period_id IS NOT NULL
+        AND ep.status = 'active'
+        AND CURRENT_DATE BETWEEN ep.start_date AND ep.end_date
+        ORDER BY c.subject_name
+    """), {"student_id": actual_student_id})
+    
+    courses = []
+    evaluable_count = 0
+    for row in courses_result:
+        course_data = {
+            "id": row[0],
+            "code": row[1], 
+            "name": row[2],
+            "class_section_id": row[3],
+            "class_code": row[4],
+            "semester": row[5],
+            "academic_year": row[6],
+            "program_name": row[7] or "Unknown",
+            "already_evaluated": row[8],
+            "evaluation_id": row[9],
+            "evaluation_period_id": row[10],
+            "evaluation_period_name": row[11],
+            "period_end_date": row[12].strftime("%Y-%m-%d") if row[12] else None,
+            "in_active_period": row[13],
+            "can_evaluate": row[13] and not row[8]  # In active period and not yet evaluated
+        }
+        courses.append(course_data)
+        if course_data["can_evaluate"]:
+            evaluable_count += 1
+    
+    # Check if there's an active evaluation period
+    active_period = ActivePeriodResolver.get_open(db)
+    
+    return {
+        "success": True,
+        "data": courses,
+        "student_info": {
+            "student_id": actual_student_id,
+            "student_number": student_data[1],
+            "program_id": student_data[2],
+            "year_level": student_data[3]
+        },
+        "evaluation_status": {
+            "active_period_exists": active_period is not None,
+            "active_period_name": active_period.name if active_period else None,
+            "period_end_date": active_period.end_date.strftime("%Y-%m-%d") if active_period else None,
+            "total_courses": len(courses),
+            "evaluable_courses": evaluable_count,
+            "message": f"You have {evaluable_count} course(s) available for evaluation" if evaluable_count > 0 
+                      else "No courses available for evaluation at this time"
+        }
+    }
+
 @router.get("/{student_id}/courses")
 async def get_student_courses(student_id: int, 
     current_user: dict = Depends(require_student),
@@ -70,106 +174,7 @@ async def get_student_courses(student_id: int,
     verify_student_ownership(student_id, current_user, db)
     
     try:
-        # First get student record to find user_id
-        student_query = text("""
-            SELECT s.id, s.student_number, s.program_id, s.year_level, s.user_id
-            FROM students s
-            WHERE s.id = :student_id OR s.user_id = :student_id
-        """)
-        
-        student_result = db.execute(student_query, {"student_id": student_id})
-        student_data = student_result.fetchone()
-        
-        if not student_data:
-            raise HTTPException(status_code=404, detail="Student not found")
-        
-        actual_student_id = student_data[0]  # Get the actual student table ID
-        
-        # Get enrolled courses for this student that are in an active evaluation period
-        # CRITICAL: Only show courses that are enrolled in an active evaluation period
-        courses_result = db.execute(text("""
-            SELECT DISTINCT
-                c.id, c.subject_code, c.subject_name,
-                cs.id as class_section_id, cs.class_code,
-                cs.semester, cs.academic_year,
-                p.program_name,
-                CASE 
-                    WHEN e.id IS NOT NULL AND e.submission_date IS NOT NULL THEN true 
-                    ELSE false 
-                END as already_evaluated,
-                e.id as evaluation_id,
-                ep.id as evaluation_period_id,
-                ep.name as evaluation_period_name,
-                ep.end_date as period_end_date,
-                true as in_active_period
-            FROM enrollments enr
-            JOIN class_sections cs ON enr.class_section_id = cs.id
-            JOIN courses c ON cs.course_id = c.id
-            JOIN evaluation_periods ep ON enr.evaluation_period_id = ep.id
-            LEFT JOIN programs p ON c.program_id = p.id
-            LEFT JOIN evaluations e ON cs.id = e.class_section_id 
-                AND e.student_id = :student_id
-                AND e.evaluation_period_id = ep.id
-            WHERE enr.student_id = :student_id
-            AND enr.status = 'active'
-            AND enr.evaluation_period_id IS NOT NULL
-            AND ep.status = 'active'
-            AND CURRENT_DATE BETWEEN ep.start_date AND ep.end_date
-            ORDER BY c.subject_name
-        """), {"student_id": actual_student_id})
-        
-        courses = []
-        evaluable_count = 0
-        for row in courses_result:
-            course_data = {
-                "id": row[0],
-                "code": row[1], 
-                "name": row[2],
-                "class_section_id": row[3],
-                "class_code": row[4],
-                "semester": row[5],
-                "academic_year": row[6],
-                "program_name": row[7] or "Unknown",
-                "already_evaluated": row[8],
-                "evaluation_id": row[9],
-                "evaluation_period_id": row[10],
-                "evaluation_period_name": row[11],
-                "period_end_date": row[12].strftime("%Y-%m-%d") if row[12] else None,
-                "in_active_period": row[13],
-                "can_evaluate": row[13] and not row[8]  # In active period and not yet evaluated
-            }
-            courses.append(course_data)
-            if course_data["can_evaluate"]:
-                evaluable_count += 1
-        
-        # Check if there's an active evaluation period
-        active_period = db.execute(text("""
-            SELECT id, name, start_date, end_date
-            FROM evaluation_periods
-            WHERE status = 'active'
-            AND CURRENT_DATE BETWEEN start_date AND end_date
-            LIMIT 1
-        """)).fetchone()
-        
-        return {
-            "success": True,
-            "data": courses,
-            "student_info": {
-                "student_id": actual_student_id,
-                "student_number": student_data[1],
-                "program_id": student_data[2],
-                "year_level": student_data[3]
-            },
-            "evaluation_status": {
-                "active_period_exists": active_period is not None,
-                "active_period_name": active_period[1] if active_period else None,
-                "period_end_date": active_period[3].strftime("%Y-%m-%d") if active_period else None,
-                "total_courses": len(courses),
-                "evaluable_courses": evaluable_count,
-                "message": f"You have {evaluable_count} course(s) available for evaluation" if evaluable_count > 0 
-                          else "No courses available for evaluation at this time"
-            }
-        }
+        return load_student_courses(student_id, db)
         
     except HTTPException:
         raise
@@ -415,6 +420,7 @@ async def get_student_evaluation_history(
 @router.post("/evaluations")
 async def submit_evaluation(evaluation: EvaluationSubmission, 
     current_user: dict = Depends(require_student),
+    active_period: Optional[ActivePeriod] = Depends(get_open_period),
     db: Session = Depends(get_db)):
     """
     Submit a course evaluation with full evaluation period validation
@@ -424,16 +430,7 @@ async def submit_evaluation(evaluation: EvaluationSubmission,
         # ============================================
         # STEP 1: CHECK ACTIVE EVALUATION PERIOD
         # ============================================
-        active_period = db.execute(text("""
-            SELECT 
-                id, name, start_date, end_date, semester, academic_year
-            FROM evaluation_periods
-            WHERE status = 'active'
-            AND CURRENT_DATE BETWEEN start_date AND end_date
-            ORDER BY created_at DESC
-            LIMIT 1
-        """)).fetchone()
-        
+        # active_period comes from ActivePeriodResolver (no query unless the cached copy expired)
         if not active_period:
             # Check if there's an active period that hasn't started yet
             upcoming_period = db.execute(text("""
@@ -456,9 +453,9 @@ async def submit_evaluation(evaluation: EvaluationSubmission,
                 detail="No active evaluation period. Evaluations are currently closed. Please contact your administrator."
             )
         
-        period_id = active_period[0]
-        period_name = active_period[1]
-        period_end = active_period[3]
+        period_id = active_period.id
+        period_name = active_period.name
+        period_end = active_period.end_date
         
         logger.info(f"[EVAL-SUBMIT] Active period found: {period_name} (ID: {period_id})")
         
@@ -577,49 +574,21 @@ async def submit_evaluation(evaluation: EvaluationSubmission,
         # Calculate average rating
         avg_rating = sum(rating_values) / len(rating_values)
         
-        # Try ML sentiment analysis
-        sentiment = "neutral"
-        sentiment_score = 0.5
-        ml_used = False
-        
-        try:
-            from ml_models.sentiment_analyzer import SentimentAnalyzer
-            sentiment_analyzer = SentimentAnalyzer()
-            comment_text = evaluation.comment or ""
-            if comment_text:
-                ml_result = sentiment_analyzer.analyze(comment_text)
-                sentiment = ml_result["sentiment"]
-                sentiment_score = ml_result["confidence"]
-                ml_used = True
-        except:
-            sentiment, sentiment_score = _rating_based_sentiment(avg_rating)
-        
-        # Try anomaly detection
-        is_anomaly = False
-        anomaly_score = 0.0
-        anomaly_reason = None
-        
-        try:
-            from ml_models.anomaly_detector import AnomalyDetector
-            anomaly_detector = AnomalyDetector()
-            anomaly_result = anomaly_detector.detect({
-                "ratings": rating_values,
-                "avg_rating": avg_rating,
-                "sentiment": sentiment
-            })
-            is_anomaly = anomaly_result["is_anomaly"]
-            anomaly_score = anomaly_result["anomaly_score"]
-            anomaly_reason = anomaly_result.get("reason")
-        except:
-            pass
+        # Sentiment + anomaly scoring (inference worker, in-process fallback)
+        score = await score_evaluation(evaluation.comment, ratings)
+        sentiment, sentiment_score = score.sentiment, score.sentiment_score
+        is_anomaly, anomaly_score = score.is_anomaly, score.anomaly_score
+        # Scored submissions are skipped by the re-scoring pass of period finalization
+        processing_status = ("flagged" if is_anomaly else "processed") if score.processed else "pending"
         
         # Prepare metadata for response
         metadata = {
-            "ml_sentiment_used": ml_used
+            "ml_sentiment_used": score.ml_used
         }
         
-        # Insert evaluation with ratings stored in JSONB column
+        # Insert evaluation with ratings stored in JSONB column (plus the compact answers array)
         ratings_json = json.dumps(ratings)
+        answers = ratings_to_answers(ratings)
         
         # Calculate summary ratings for legacy columns
         rating_teaching = avg_rating  # Overall average for teaching
@@ -630,9 +599,10 @@ async def submit_evaluation(evaluation: EvaluationSubmission,
         # Update existing pending evaluation or insert new one
         if existing_eval_id:
             # UPDATE the pending evaluation with actual data
-            db.execute(text("""
+            update_result = db.execute(text(f"""
                 UPDATE evaluations SET
                     ratings = CAST(:ratings AS jsonb),
+                    answers = CAST(:answers AS smallint[]),
                     text_feedback = :text_feedback,
                     sentiment = :sentiment,
                     sentiment_score = :sentiment_score,
@@ -642,12 +612,18 @@ async def submit_evaluation(evaluation: EvaluationSubmission,
                     rating_content = :rating_content,
                     rating_engagement = :rating_engagement,
                     rating_overall = :rating_overall,
+                    processing_status = :processing_status,
+                    processed_at = CASE WHEN :scored THEN NOW() END,
                     status = 'completed',
                     submission_date = NOW()
                 WHERE id = :eval_id
+                AND submission_date IS NULL
+                AND {PERIOD_ACCEPTS_SUBMISSIONS}
             """), {
                 "eval_id": existing_eval_id,
+                "period_id": period_id,
                 "ratings": ratings_json,
+                "answers": answers,
                 "text_feedback": evaluation.comment or '',
                 "sentiment": sentiment,
                 "sentiment_score": sentiment_score,
@@ -656,18 +632,33 @@ async def submit_evaluation(evaluation: EvaluationSubmission,
                 "rating_teaching": int(round(rating_teaching)),
                 "rating_content": int(round(rating_content)),
                 "rating_engagement": int(round(rating_engagement)),
-                "rating_overall": int(round(rating_overall))
+                "rating_overall": int(round(rating_overall)),
+                "processing_status": processing_status,
+                "scored": score.processed
             })
+            if update_result.rowcount == 0:
+                db.rollback()
+                if not db.execute(text(f"SELECT {PERIOD_ACCEPTS_SUBMISSIONS}"), {"period_id": period_id}).scalar():
+                    raise HTTPException(
+                        status_code=403,
+                        detail=f"Evaluation period '{period_name}' is no longer accepting evaluations."
+                    )
+                # A concurrent request completed it first
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"You have already submitted an evaluation for '{section_name}' in {period_name}."
+                )
             evaluation_id = existing_eval_id
             logger.info(f"[EVAL-SUBMIT] Updated pending evaluation {existing_eval_id}")
         else:
             # INSERT new evaluation
-            db.execute(text("""
+            insert_result = db.execute(text(f"""
                 INSERT INTO evaluations (
                     student_id, 
                     class_section_id,
                     evaluation_period_id,
                     ratings,
+                    answers,
                     text_feedback,
                     sentiment,
                     sentiment_score,
@@ -677,13 +668,17 @@ async def submit_evaluation(evaluation: EvaluationSubmission,
                     rating_content,
                     rating_engagement,
                     rating_overall,
+                    processing_status,
+                    processed_at,
                     status,
                     submission_date
-                ) VALUES (
+                )
+                SELECT
                     :student_id, 
                     :class_section_id,
                     :period_id,
                     CAST(:ratings AS jsonb),
+                    CAST(:answers AS smallint[]),
                     :text_feedback,
                     :sentiment,
                     :sentiment_score,
@@ -693,14 +688,17 @@ async def submit_evaluation(evaluation: EvaluationSubmission,
                     :rating_content,
                     :rating_engagement,
                     :rating_overall,
+                    :processing_status,
+                    CASE WHEN :scored THEN NOW() END,
                     'completed',
                     NOW()
-                )
+                WHERE {PERIOD_ACCEPTS_SUBMISSIONS}
             """), {
                 "student_id": actual_student_id,
                 "class_section_id": evaluation.class_section_id,
                 "period_id": period_id,
                 "ratings": ratings_json,
+                "answers": answers,
                 "text_feedback": evaluation.comment or '',
                 "sentiment": sentiment,
                 "sentiment_score": sentiment_score,
@@ -709,8 +707,16 @@ async def submit_evaluation(evaluation: EvaluationSubmission,
                 "rating_teaching": int(round(rating_teaching)),
                 "rating_content": int(round(rating_content)),
                 "rating_engagement": int(round(rating_engagement)),
-                "rating_overall": int(round(rating_overall))
+                "rating_overall": int(round(rating_overall)),
+                "processing_status": processing_status,
+                "scored": score.processed
             })
+            if insert_result.rowcount == 0:
+                db.rollback()
+                raise HTTPException(
+                    status_code=403,
+                    detail=f"Evaluation period '{period_name}' is no longer accepting evaluations."
+                )
             
             # Get the newly created evaluation ID
             eval_result = db.execute(text("""
@@ -728,30 +734,28 @@ async def submit_evaluation(evaluation: EvaluationSubmission,
             evaluation_id = eval_result[0] if eval_result else None
             logger.info(f"[EVAL-SUBMIT] Created new evaluation {evaluation_id}")
         
+        # Keep period progress counters current in the same transaction
+        PeriodProgressService.record_submission(
+            db, period_id, actual_student_id, created=existing_eval_id is None
+        )
+        
         db.commit()
         
         # === CREATE AUDIT LOG ===
-        try:
-            from models.enhanced_models import AuditLog
-            audit_log = AuditLog(
-                user_id=actual_student_id,
-                action="EVALUATION_SUBMITTED",
-                category="Evaluation",
-                severity="Info",
-                status="Success",
-                details={
-                    "evaluation_id": evaluation_id,
-                    "section_name": section_name,
-                    "period_name": period_name
-                },
-                ip_address=None
-            )
-            db.add(audit_log)
-            db.commit()
-            logger.info(f"Audit log created for evaluation submission {evaluation_id}")
-        except Exception as e:
-            logger.error(f"Failed to create audit log: {e}")
-            # Don't fail the evaluation if audit log fails
+        # Queued on the batched audit writer; failures are logged there and never fail the evaluation
+        audit_writer.write(
+            user_id=actual_student_id,
+            action="EVALUATION_SUBMITTED",
+            category="Evaluation",
+            severity="Info",
+            status="Success",
+            details={
+                "evaluation_id": evaluation_id,
+                "section_name": section_name,
+                "period_name": period_name
+            },
+            ip_address=None
+        )
         
         logger.info(f"[EVAL-SUBMIT] Successfully submitted evaluation for student {actual_student_id}, section {evaluation.class_section_id}, period {period_id}")
         
@@ -904,42 +908,17 @@ async def update_evaluation(
         # Calculate average rating and sentiment
         avg_rating = sum(rating_values) / len(rating_values)
         
-        # Try ML sentiment analysis
-        sentiment = "neutral"
-        sentiment_score = 0.5
-        ml_used = False
-        
-        try:
-            sentiment_analyzer = SentimentAnalyzer()
-            comment_text = evaluation.comment or ""
-            if comment_text:
-                ml_result = sentiment_analyzer.analyze(comment_text)
-                sentiment = ml_result["sentiment"]
-                sentiment_score = ml_result["confidence"]
-                ml_used = True
-        except:
-            sentiment, sentiment_score = _rating_based_sentiment(avg_rating)
-        
-        # Try anomaly detection
-        is_anomaly = False
-        anomaly_score = 0.0
-        anomaly_reason = None
-        
-        try:
-            anomaly_detector = AnomalyDetector()
-            anomaly_result = anomaly_detector.detect({
-                "ratings": rating_values,
-                "avg_rating": avg_rating,
-                "sentiment": sentiment
-            })
-            is_anomaly = anomaly_result["is_anomaly"]
-            anomaly_score = anomaly_result["anomaly_score"]
-            anomaly_reason = anomaly_result.get("reason")
-        except:
-            pass
+        # Sentiment + anomaly scoring (inference worker, in-process fallback)
+        score = await score_evaluation(evaluation.comment, ratings)
+        sentiment, sentiment_score = score.sentiment, score.sentiment_score
+        is_anomaly, anomaly_score = score.is_anomaly, score.anomaly_score
+        # Scored submissions are skipped by the re-scoring pass of period finalization
+        processing_status = ("flagged" if is_anomaly else "processed") if score.processed else "pending"
+        ml_used = score.ml_used
         
         # Update evaluation in database with new ratings
         ratings_json = json.dumps(ratings)
+        answers = ratings_to_answers(ratings)
         
         # Calculate summary ratings
         rating_teaching = avg_rating
@@ -951,6 +930,7 @@ async def update_evaluation(
             UPDATE evaluations
             SET 
                 ratings = CAST(:ratings AS jsonb),
+                answers = CAST(:answers AS smallint[]),
                 text_feedback = :text_feedback,
                 sentiment = :sentiment,
                 sentiment_score = :sentiment_score,
@@ -960,11 +940,14 @@ async def update_evaluation(
                 rating_content = :rating_content,
                 rating_engagement = :rating_engagement,
                 rating_overall = :rating_overall,
+                processing_status = :processing_status,
+                processed_at = CASE WHEN :scored THEN NOW() END,
                 submission_date = NOW()
             WHERE id = :evaluation_id
         """), {
             "evaluation_id": evaluation_id,
             "ratings": ratings_json,
+            "answers": answers,
             "text_feedback": evaluation.comment or '',
             "sentiment": sentiment,
             "sentiment_score": sentiment_score,
@@ -973,7 +956,9 @@ async def update_evaluation(
             "rating_teaching": int(round(rating_teaching)),
             "rating_content": int(round(rating_content)),
             "rating_engagement": int(round(rating_engagement)),
-            "rating_overall": int(round(rating_overall))
+            "rating_overall": int(round(rating_overall)),
+            "processing_status": processing_status,
+            "scored": score.processed
         })
         
         db.commit()
@@ -1068,29 +1053,9 @@ async def get_course_details(course_id: int,
                 COUNT(DISTINCT CASE WHEN e.submission_date IS NOT NULL THEN e.id END) as evaluation_count,
                 AVG(
                     CASE WHEN e.submission_date IS NOT NULL THEN
-                    (e.ratings::jsonb->>'1')::numeric + 
-                    (e.ratings::jsonb->>'2')::numeric + 
-                    (e.ratings::jsonb->>'3')::numeric +
-                    (e.ratings::jsonb->>'4')::numeric +
-                    (e.ratings::jsonb->>'5')::numeric +
-                    (e.ratings::jsonb->>'6')::numeric +
-                    (e.ratings::jsonb->>'7')::numeric +
-                    (e.ratings::jsonb->>'8')::numeric +
-                    (e.ratings::jsonb->>'9')::numeric +
-                    (e.ratings::jsonb->>'10')::numeric +
-                    (e.ratings::jsonb->>'11')::numeric +
-                    (e.ratings::jsonb->>'12')::numeric +
-                    (e.ratings::jsonb->>'13')::numeric +
-                    (e.ratings::jsonb->>'14')::numeric +
-                    (e.ratings::jsonb->>'15')::numeric +
-                    (e.ratings::jsonb->>'16')::numeric +
-                    (e.ratings::jsonb->>'17')::numeric +
-                    (e.ratings::jsonb->>'18')::numeric +
-                    (e.ratings::jsonb->>'19')::numeric +
-                    (e.ratings::jsonb->>'20')::numeric +
-                    (e.ratings::jsonb->>'21')::numeric
+                    (SELECT AVG(a) FROM unnest(e.answers) a)
                     END
-                ) / 21.0 as average_rating
+                ) as average_rating
             FROM courses c
             LEFT JOIN programs p ON c.program_id = p.id
             LEFT JOIN class_sections cs ON cs.course_id = c.id
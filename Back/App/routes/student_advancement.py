@@ -81,7 +81,8 @@ async def advance_students(
             db=db,
             program_id=request.program_id,
             current_year_level=request.current_year_level,
-            dry_run=request.dry_run
+            dry_run=request.dry_run,
+            created_by=current_user.get('id')
         )
         
         if not result["success"]:
@@ -289,7 +290,8 @@ async def rollback_student_advancement(
         result = service.rollback_advancement(
             db,
             snapshot_id=request.snapshot_id,
-            dry_run=request.dry_run
+            dry_run=request.dry_run,
+            user_id=current_user.get('id')
         )
         
         if not result["success"]:
@@ -328,7 +330,11 @@ async def create_advancement_snapshot(
     
     try:
         service = StudentAdvancementService()
-        result = service.create_advancement_snapshot(db, description=description)
+        result = service.create_advancement_snapshot(
+            db,
+            description=description,
+            created_by=current_user.get('id')
+        )
         
         return {
             "success": True,
@@ -28,6 +28,17 @@ import json
 import asyncio
 from config import now_local
 from services.welcome_email_service import send_welcome_email, send_bulk_welcome_emails
+from services.period_progress import PeriodProgressService
+from services.dashboard_stats import DashboardStatsService
+from services.audit_logs import AuditLogService
+from services.audit_writer import audit_writer
+from services.people_search import PeopleSearchService
+from services.period_partitions import PeriodPartitionService, apply_period_status_in_background, ARCHIVED_STATUSES
+from services.period_finalization import PeriodFinalizationService, finalize_period_in_background
+from services.active_period import ActivePeriodResolver
+from services.cache_warmup import CacheWarmupService, warm_caches_in_background
+from utils.cache import clear_all_caches, get_cache_stats
+from utils.metrics import EMAIL_QUEUE_DEPTH
 from utils.validation import InputValidator, validate_export_filters, ValidationError
 
 logger = logging.getLogger(__name__)
@@ -42,6 +53,7 @@ _email_queue_lock = asyncio.Lock()
 async def send_email_background_async(email: str, first_name: str, last_name: str, school_id: str, role: str, temp_password: str):
     """Async wrapper for background email sending via Gmail SMTP with rate limiting"""
     global _email_queue_position
+    EMAIL_QUEUE_DEPTH.inc()
     try:
         # Get queue position and increment for next email
         async with _email_queue_lock:
@@ -66,6 +78,8 @@ async def send_email_background_async(email: str, first_name: str, last_name: st
         logger.info(f"📧 Background email for {email}: {result.get('message', 'Unknown')}")
     except Exception as e:
         logger.error(f"❌ Background email failed for {email}: {e}")
+    finally:
+        EMAIL_QUEUE_DEPTH.dec()
 
 # ===========================
 # Pydantic Models for Requests
@@ -131,22 +145,22 @@ async def create_audit_log(
     ip_address: Optional[str] = None,
     details: Optional[dict] = None
 ):
-    """Create an audit log entry"""
-    try:
-        audit_log = AuditLog(
-            user_id=user_id,
-            action=action,
-            category=category,
-            severity=severity,
-            status=status,
-            ip_address=ip_address,
-            details=details
-        )
-        db.add(audit_log)
-        db.commit()
-    except Exception as e:
-        logger.error(f"Failed to create audit log: {e}")
-        db.rollback()
+    """
+    Create an audit log entry
+
+    Queued on the batched audit writer (Critical events are written immediately).
+    The entry is written on its own connection, so the caller's session is not
+    committed - commit your own changes before logging them.
+    """
+    audit_writer.write(
+        user_id=user_id,
+        action=action,
+        category=category,
+        severity=severity,
+        status=status,
+        ip_address=ip_address,
+        details=details
+    )
 
 # ===========================
 # USER MANAGEMENT ENDPOINTS
@@ -178,15 +192,10 @@ async def get_all_users(
         query = db.query(User)
         
         # Apply filters
-        if search:
-            search_filter = f"%{search}%"
-            query = query.filter(
-                or_(
-                    User.email.ilike(search_filter),
-                    User.first_name.ilike(search_filter),
-                    User.last_name.ilike(search_filter)
-                )
-            )
+        search_clause = PeopleSearchService.user_clause(db, search)
+        if search_clause:
+            search_condition, search_order, search_params = search_clause
+            query = query.filter(text(search_condition)).params(**search_params)
         
         if role:
             query = query.filter(User.role == role)
@@ -228,6 +237,10 @@ async def get_all_users(
         total = query.count()
         logger.info(f"Total users after filters: {total}")
         
+        # Best matches first when searching
+        if search_clause:
+            query = query.order_by(text(search_order))
+        
         # Apply pagination
         offset = (page - 1) * page_size
         users = query.offset(offset).limit(page_size).all()
@@ -520,7 +533,7 @@ async def bulk_import_users(
     """
     global _email_queue_position
     try:
-        from services.enrollment_validation import EnrollmentValidationService
+        from services.enrollment_validation import EnrollmentValidationService, get_enrollment_index
         current_user_id = current_user['id']
         
         # Reset email queue position for this bulk import
@@ -536,6 +549,20 @@ async def bulk_import_users(
         enrollment_service = EnrollmentValidationService()
         has_enrollment_list = enrollment_service.check_enrollment_list_exists(db)
         
+        # Validate every row against the in-memory enrollment index up front
+        # Don't pass program_id if it's None - let validation accept enrolled program
+        validations = []
+        if has_enrollment_list:
+            validations = get_enrollment_index(db).validate_batch([
+                (user_data.school_id, user_data.program_id if user_data.program_id else None, user_data.first_name, user_data.last_name)
+                for user_data in users
+            ])
+        
+        # Look up existing emails once instead of per row
+        existing_emails = {
+            email for (email,) in db.query(User.email).filter(User.email.in_([u.email for u in users])).all()
+        }
+        
         results = {
             "success": 0,
             "failed": 0,
@@ -554,9 +581,8 @@ async def bulk_import_users(
                     })
                     continue
                 
-                # Check if email already exists
-                existing_user = db.query(User).filter(User.email == user_data.email).first()
-                if existing_user:
+                # Check if email already exists (in the database or earlier in this import)
+                if user_data.email in existing_emails:
                     results["failed"] += 1
                     results["errors"].append({
                         "row": idx + 1,
@@ -576,14 +602,7 @@ async def bulk_import_users(
                         })
                         continue
                     
-                    # Don't pass program_id if it's None - let validation accept enrolled program
-                    validation = enrollment_service.validate_student_enrollment(
-                        db,
-                        student_number=user_data.school_id,
-                        program_id=user_data.program_id if user_data.program_id else None,
-                        first_name=user_data.first_name,
-                        last_name=user_data.last_name
-                    )
+                    validation = validations[idx]
                     
                     if not validation["valid"]:
                         results["failed"] += 1
@@ -641,6 +660,7 @@ async def bulk_import_users(
                 )
                 db.add(new_user)
                 db.flush()  # Get user ID without committing
+                existing_emails.add(user_data.email)
                 
                 # Create role-specific record
                 if user_data.role == "student":
@@ -1008,20 +1028,9 @@ async def get_evaluation_periods(
         
         periods_data = []
         for p in periods:
-            # Calculate total evaluation records for this period (pending + completed)
-            total_evaluations = db.execute(text("""
-                SELECT COUNT(*)
-                FROM evaluations
-                WHERE evaluation_period_id = :period_id
-            """), {"period_id": p.id}).scalar() or 0
-            
-            # Calculate completed evaluations (those with submission_date)
-            completed_evaluations = db.execute(text("""
-                SELECT COUNT(*)
-                FROM evaluations
-                WHERE evaluation_period_id = :period_id
-                AND submission_date IS NOT NULL
-            """), {"period_id": p.id}).scalar() or 0
+            # Progress counters are maintained by PeriodProgressService
+            total_evaluations = p.total_evaluations or 0
+            completed_evaluations = p.completed_evaluations or 0
             
             # Calculate participation rate
             participation_rate = round((completed_evaluations / total_evaluations * 100), 1) if total_evaluations > 0 else 0
@@ -1050,6 +1059,8 @@ async def get_evaluation_periods(
                 "completedEvaluations": completed_evaluations,
                 "participationRate": participation_rate,
                 "daysRemaining": days_remaining,
+                "finalizationStatus": p.finalization_status,
+                "finalizedAt": p.finalized_at.isoformat() if p.finalized_at else None,
                 "createdAt": p.created_at.isoformat()
             })
         
@@ -1065,6 +1076,7 @@ async def get_evaluation_periods(
 @router.post("/evaluation-periods")
 async def create_evaluation_period(
     period_data: EvaluationPeriodCreate,
+    background_tasks: BackgroundTasks,
     current_user: dict = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
@@ -1085,10 +1097,10 @@ async def create_evaluation_period(
                 detail=f"Period '{period_data.name}' already exists for {period_data.semester} {period_data.academic_year}"
             )
         
-        # Get total students for this period
-        total_students = db.query(func.count(Student.id)).scalar() or 0
-        
         # Close any currently open periods
+        closed_period_ids = [
+            period_id for (period_id,) in db.query(EvaluationPeriod.id).filter(EvaluationPeriod.status == "Open").all()
+        ]
         db.query(EvaluationPeriod).filter(
             EvaluationPeriod.status == "Open"
         ).update({"status": "Closed"})
@@ -1100,12 +1112,26 @@ async def create_evaluation_period(
             start_date=period_data.start_date,
             end_date=period_data.end_date,
             status="Open",
-            total_students=total_students,
+            total_students=0,  # Counters grow as sections are enrolled into the period
+            total_evaluations=0,
+            completed_evaluations=0,
             created_by=current_user_id
         )
         db.add(new_period)
+        db.flush()
+        
+        # Give the period its own evaluations/enrollments partitions in the same transaction
+        PeriodPartitionService.ensure_partitions(db, new_period.id)
+        for period_id in closed_period_ids:
+            PeriodFinalizationService.queue(db, period_id)
         db.commit()
         
+        # Freeze the results of the periods that were just closed
+        for period_id in closed_period_ids:
+            background_tasks.add_task(finalize_period_in_background, period_id)
+        ActivePeriodResolver.invalidate()
+        clear_all_caches()
+        
         # Log audit event
         await create_audit_log(
             db, current_user_id, "PERIOD_CREATED", "Evaluation Management",
@@ -1162,6 +1188,8 @@ async def update_evaluation_period(
             
         period.updated_at = now_local()
         db.commit()
+        ActivePeriodResolver.invalidate()
+        clear_all_caches()
         db.refresh(period)
         
         logger.info(f"[PERIOD-UPDATE] Period {period_id} updated successfully")
@@ -1200,6 +1228,7 @@ async def update_evaluation_period(
 @router.put("/evaluation-periods/{period_id}/status")
 async def update_period_status(
     period_id: int,
+    background_tasks: BackgroundTasks,
     status: str = Body(..., embed=True),
     current_user: dict = Depends(require_admin),
     db: Session = Depends(get_db)
@@ -1245,17 +1274,60 @@ async def update_period_status(
                 )
             
             # Close other active periods
+            closed_period_ids = [
+                other_id for (other_id,) in db.query(EvaluationPeriod.id).filter(
+                    EvaluationPeriod.status == "active",
+                    EvaluationPeriod.id != period_id
+                ).all()
+            ]
             db.query(EvaluationPeriod).filter(
                 EvaluationPeriod.status == "active",
                 EvaluationPeriod.id != period_id
             ).update({"status": "closed", "updated_at": now_local()})
+            for other_id in closed_period_ids:
+                PeriodFinalizationService.queue(db, other_id)
+                background_tasks.add_task(finalize_period_in_background, other_id)
             
             logger.info(f"[PERIOD-STATUS] Closing other active periods, activating period {period_id}")
         
         old_status = period.status
+        was_finalized = period.finalization_status is not None
         period.status = db_status
         period.updated_at = now_local()
-        db.commit()
+        
+        if db_status in ARCHIVED_STATUSES and (
+            period.finalization_status in (None, "failed") or PeriodFinalizationService.is_stale(db, period_id)
+        ):
+            # Score, aggregate and freeze the period's results, then archive its partitions
+            # (again when an earlier run's worker died)
+            PeriodFinalizationService.queue(db, period_id)
+            db.commit()
+            background_tasks.add_task(finalize_period_in_background, period_id)
+        elif db_status in ARCHIVED_STATUSES:
+            # Already finalized, or queued/running (the run archives the partitions when done)
+            finalization_status = period.finalization_status
+            db.commit()
+            if finalization_status == "completed":
+                background_tasks.add_task(apply_period_status_in_background, period_id, db_status)
+        elif was_finalized:
+            # Reopened: frozen results no longer apply (committed together with the status)
+            if not PeriodFinalizationService.reopen(db, period_id):
+                db.rollback()
+                raise HTTPException(
+                    status_code=409,
+                    detail="The period's results are being finalized. Try again when finalization finishes."
+                )
+            background_tasks.add_task(apply_period_status_in_background, period_id, db_status)
+        else:
+            db.commit()
+            # Move the period's partitions back from the archive tablespace (if configured)
+            background_tasks.add_task(apply_period_status_in_background, period_id, db_status)
+        
+        # Cached dashboards describe the previous active period; precompute the new one
+        ActivePeriodResolver.invalidate()
+        clear_all_caches(activated_period_id=period_id if db_status == "active" else None)
+        if db_status == "active":
+            background_tasks.add_task(warm_caches_in_background, period_id)
         
         logger.info(f"[PERIOD-STATUS] Period {period_id} status changed from '{old_status}' to '{db_status}'")
         
@@ -1292,6 +1364,72 @@ async def update_period_status(
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/evaluation-periods/{period_id}/finalization")
+async def get_period_finalization(
+    period_id: int,
+    current_user: dict = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """Progress of the close-of-period pipeline (scoring, aggregation, freeze)"""
+    try:
+        finalization = PeriodFinalizationService.get_status(db, period_id)
+        if not finalization:
+            raise HTTPException(status_code=404, detail="Evaluation period not found")
+
+        return {"success": True, "data": finalization}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching period finalization: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/evaluation-periods/{period_id}/finalize")
+async def finalize_evaluation_period(
+    period_id: int,
+    background_tasks: BackgroundTasks,
+    current_user: dict = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """Re-run the close-of-period pipeline for a closed period (e.g. after a failed run)"""
+    try:
+        period = db.query(EvaluationPeriod).filter(EvaluationPeriod.id == period_id).first()
+        if not period:
+            raise HTTPException(status_code=404, detail="Evaluation period not found")
+
+        if (period.status or "").lower() not in ARCHIVED_STATUSES:
+            raise HTTPException(status_code=400, detail="Only closed periods can be finalized")
+
+        # A queued/running run that stopped reporting progress died with its worker
+        if period.finalization_status in ("queued", "running") and not PeriodFinalizationService.is_stale(db, period_id):
+            raise HTTPException(status_code=409, detail=f"Finalization is already {period.finalization_status}")
+
+        # Recomputing needs the evaluations writable again
+        if period.finalization_status == "completed" and not PeriodFinalizationService.reopen(db, period_id):
+            raise HTTPException(status_code=409, detail="Finalization is already running")
+
+        PeriodFinalizationService.queue(db, period_id)
+        db.commit()
+        background_tasks.add_task(finalize_period_in_background, period_id)
+
+        await create_audit_log(
+            db, current_user['id'], "PERIOD_FINALIZE", "Evaluation Management",
+            details={"period_id": period_id, "period_name": period.name}
+        )
+
+        return {
+            "success": True,
+            "message": "Evaluation period finalization queued",
+            "data": PeriodFinalizationService.get_status(db, period_id)
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error queueing period finalization: {e}")
+        db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.delete("/evaluation-periods/{period_id}")
 async def delete_evaluation_period(
     period_id: int,
@@ -1310,6 +1448,12 @@ async def delete_evaluation_period(
         if not period:
             raise HTTPException(status_code=404, detail="Evaluation period not found")
         
+        if period_id in PeriodPartitionService.read_only_period_ids(db):
+            raise HTTPException(
+                status_code=409,
+                detail="The evaluations of this period are archived and read-only. Reopen the period first."
+            )
+        
         # Check if there are any SUBMITTED evaluations for this period
         # Only count evaluations that have been submitted (submission_date IS NOT NULL)
         submitted_evaluation_count = db.execute(text("""
@@ -1354,9 +1498,12 @@ async def delete_evaluation_period(
             WHERE evaluation_period_id = :period_id
         """), {"period_id": period_id})
         
-        # Delete the period
+        # Delete the period and its (now empty) partitions
         db.delete(period)
+        PeriodPartitionService.drop_partitions(db, period_id)
         db.commit()
+        ActivePeriodResolver.invalidate()
+        clear_all_caches()
         
         logger.info(f"[PERIOD-DELETE] Period {period_id} '{period_name}' deleted by user {current_user_id}")
         
@@ -1402,12 +1549,9 @@ async def get_active_period(
                 "message": "No active evaluation period"
             }
         
-        # Calculate stats - filter by this period's ID, not all evaluations
-        completed = db.query(func.count(Evaluation.id)).filter(
-            Evaluation.evaluation_period_id == period.id
-        ).scalar() or 0
-        period.completed_evaluations = completed
-        db.commit()
+        # Progress counters are maintained on enrollment and submission
+        completed = period.completed_evaluations or 0
+        total_evaluations = period.total_evaluations or 0
         
         # Calculate days remaining properly
         today = date.today()
@@ -1427,9 +1571,10 @@ async def get_active_period(
                 "start_date": period.start_date.isoformat(),
                 "end_date": period.end_date.isoformat(),
                 "status": "Open",  # Normalize to 'Open' for frontend
-                "total_students": period.total_students,
-                "completed_evaluations": period.completed_evaluations,
-                "participation_rate": (completed / period.total_students * 100) if period.total_students > 0 else 0,
+                "total_students": period.total_students or 0,
+                "total_evaluations": total_evaluations,
+                "completed_evaluations": completed,
+                "participation_rate": (completed / total_evaluations * 100) if total_evaluations > 0 else 0,
                 "days_remaining": days_remaining
             }
         }
@@ -1438,6 +1583,62 @@ async def get_active_period(
         logger.error(f"Error fetching active period: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/evaluation-periods/{period_id}/progress")
+async def get_period_progress(
+    period_id: int,
+    breakdown: bool = Query(True),
+    current_user: dict = Depends(require_staff),
+    db: Session = Depends(get_db)
+):
+    """Get evaluation progress for a period from the maintained counters"""
+    try:
+        progress = PeriodProgressService.get_progress(db, period_id, include_breakdown=breakdown)
+        if not progress:
+            raise HTTPException(status_code=404, detail="Evaluation period not found")
+        
+        return {
+            "success": True,
+            "data": progress
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching period progress: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/evaluation-periods/{period_id}/progress/reconcile")
+async def reconcile_period_progress(
+    period_id: int,
+    current_user: dict = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """Rebuild a period's progress counters from evaluation records and report drift"""
+    try:
+        period = db.query(EvaluationPeriod).filter(EvaluationPeriod.id == period_id).first()
+        if not period:
+            raise HTTPException(status_code=404, detail="Evaluation period not found")
+        
+        result = PeriodProgressService.reconcile(db, period_id)
+        
+        if result["periods_repaired"]:
+            await create_audit_log(
+                db, current_user['id'], "PERIOD_PROGRESS_RECONCILED", "Evaluation Management",
+                severity="Warning",
+                details={"period_id": period_id, "drift": result["drift"]}
+            )
+        
+        return {
+            "success": True,
+            "data": result
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error reconciling period progress: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 # ===========================
 # PERIOD ENROLLMENT MANAGEMENT
 # ===========================
@@ -1513,7 +1714,7 @@ async def enroll_section_in_period(
         
         # Create evaluation records for all enrolled students
         # This allows students to see pending evaluations when the period becomes active
-        db.execute(text("""
+        result = db.execute(text("""
             INSERT INTO evaluations (
                 student_id, class_section_id, evaluation_period_id, status, created_at
             )
@@ -1532,10 +1733,15 @@ async def enroll_section_in_period(
                 AND ev.class_section_id = e.class_section_id
                 AND ev.evaluation_period_id = :period_id
             )
+            RETURNING id
         """), {
             "period_id": period_id,
             "section_id": section_id
         })
+        evaluation_ids = [row[0] for row in result.fetchall()]
+        
+        # Keep period progress counters current in the same transaction
+        PeriodProgressService.record_new_evaluations(db, period_id, evaluation_ids)
         
         # Record this section enrollment for tracking
         db.execute(text("""
@@ -1550,6 +1756,7 @@ async def enroll_section_in_period(
         })
         
         db.commit()
+        clear_all_caches()  # Course lists and completion rates changed
         
         # Log audit event
         await create_audit_log(
@@ -1675,7 +1882,9 @@ async def remove_period_enrollment(
             WHERE id = :enrollment_id AND evaluation_period_id = :period_id
         """), {"enrollment_id": enrollment_id, "period_id": period_id})
         
+        PeriodProgressService.rebuild(db, period_id)
         db.commit()
+        clear_all_caches()  # Course lists and completion rates changed
         
         # Log audit event
         await create_audit_log(
@@ -1797,6 +2006,12 @@ async def remove_program_section_enrollment(
         if not enrollment_info:
             raise HTTPException(status_code=404, detail="Program section enrollment not found")
         
+        if period_id in PeriodPartitionService.read_only_period_ids(db):
+            raise HTTPException(
+                status_code=409,
+                detail="The evaluations of this period are archived and read-only. Reopen the period first."
+            )
+        
         program_section_id = enrollment_info[0]
         section_name = enrollment_info[1]
         program_name = enrollment_info[2]
@@ -1843,7 +2058,10 @@ async def remove_program_section_enrollment(
             "period_id": period_id
         })
         
+        # Evaluations were deleted, so recompute this period's counters
+        PeriodProgressService.rebuild(db, period_id)
         db.commit()
+        clear_all_caches()  # Course lists and completion rates changed
         
         # Log audit event
         await create_audit_log(
@@ -2023,9 +2241,12 @@ async def enroll_program_section_in_period(
             "class_section_ids": class_section_ids
         })
         
-        evaluation_ids = result.fetchall()
+        evaluation_ids = [row[0] for row in result.fetchall()]
         evaluations_created = len(evaluation_ids)
         
+        # Keep period progress counters current in the same transaction
+        PeriodProgressService.record_new_evaluations(db, period_id, evaluation_ids)
+        
         # Record this program section enrollment for tracking
         db.execute(text("""
             INSERT INTO period_program_sections (
@@ -2075,6 +2296,7 @@ async def enroll_program_section_in_period(
                 })
         
         db.commit()
+        clear_all_caches()  # Course lists and completion rates changed
         
         # Log audit event
         await create_audit_log(
@@ -2968,6 +3190,20 @@ async def delete_section(
                 detail=f"Cannot delete section '{class_code}' with {submitted_evaluation_count} submitted evaluations. The evaluation data must be preserved."
             )
         
+        # Pending evaluations of an archived period can't be deleted until it is reopened
+        read_only_period_ids = PeriodPartitionService.read_only_period_ids(db)
+        if read_only_period_ids and db.execute(text("""
+            SELECT EXISTS (
+                SELECT 1 FROM evaluations
+                WHERE class_section_id = :section_id
+                AND evaluation_period_id = ANY(:period_ids)
+            )
+        """), {"section_id": section_id, "period_ids": read_only_period_ids}).scalar():
+            raise HTTPException(
+                status_code=409,
+                detail=f"Section '{class_code}' has evaluations in an archived, read-only period. Reopen the period first."
+            )
+        
         # Delete related records in order (to avoid foreign key constraint errors)
         # Use raw SQL to avoid ORM model issues with missing columns
         
@@ -3159,15 +3395,8 @@ async def enroll_students(
             raise HTTPException(status_code=404, detail="Section not found")
         
         # Get active evaluation period
-        active_period = db.execute(
-            text("""
-                SELECT id FROM evaluation_periods 
-                WHERE status = 'active' 
-                AND CURRENT_DATE BETWEEN start_date AND end_date 
-                LIMIT 1
-            """)
-        ).fetchone()
-        active_period_id = active_period[0] if active_period else None
+        active_period = ActivePeriodResolver.get_open(db)
+        active_period_id = active_period.id if active_period else None
         
         enrolled_count = 0
         skipped_count = 0
@@ -3303,15 +3532,8 @@ async def bulk_enroll_student(
             )
         
         # Get active evaluation period
-        active_period = db.execute(
-            text("""
-                SELECT id FROM evaluation_periods 
-                WHERE status = 'active' 
-                AND CURRENT_DATE BETWEEN start_date AND end_date 
-                LIMIT 1
-            """)
-        ).fetchone()
-        active_period_id = active_period[0] if active_period else None
+        active_period = ActivePeriodResolver.get_open(db)
+        active_period_id = active_period.id if active_period else None
         
         # Create enrollment with evaluation period
         new_enrollment = Enrollment(
@@ -3431,118 +3653,47 @@ async def get_audit_logs(
     user_id: Optional[int] = None,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (keyset paging; page is ignored)"),
+    count_mode: str = Query("auto", regex="^(exact|estimated|auto)$"),
     db: Session = Depends(get_db)
 ):
-    """Get paginated audit logs with filters"""
+    """
+    Get paginated audit logs with filters.
+    Pass cursor (pagination.next_cursor) for keyset paging through deep result sets;
+    count_mode=estimated/auto avoids exact counts over large result sets.
+    """
     try:
-        # Build query using raw SQL for flexibility
-        conditions = ["1=1"]
-        params = {}
-        
-        if action:
-            conditions.append("al.action = :action")
-            params["action"] = action
-        
-        if severity:
-            conditions.append("al.severity = :severity")
-            params["severity"] = severity
-        
-        if category:
-            conditions.append("al.category = :category")
-            params["category"] = category
-        
-        if status:
-            conditions.append("al.status = :status")
-            params["status"] = status
-        
-        if user_id:
-            conditions.append("al.user_id = :user_id")
-            params["user_id"] = user_id
-        
-        # Handle user filter (can be user_id as string or email/name search)
-        if user:
-            if user.isdigit():
-                conditions.append("al.user_id = :user_filter_id")
-                params["user_filter_id"] = int(user)
-            else:
-                conditions.append("(u.email ILIKE :user_search OR u.first_name ILIKE :user_search OR u.last_name ILIKE :user_search)")
-                params["user_search"] = f"%{user}%"
-        
-        if search:
-            conditions.append("(al.action ILIKE :search OR al.category ILIKE :search OR CAST(al.details AS TEXT) ILIKE :search)")
-            params["search"] = f"%{search}%"
-        
-        if start_date:
-            conditions.append("al.created_at >= :start_date")
-            params["start_date"] = start_date
-        
-        if end_date:
-            conditions.append("al.created_at <= :end_date")
-            params["end_date"] = end_date
-        
-        where_clause = " AND ".join(conditions)
-        
-        # Get total count (include LEFT JOIN for user search)
-        count_query = text(f"""
-            SELECT COUNT(*) FROM audit_logs al
-            LEFT JOIN users u ON al.user_id = u.id
-            WHERE {where_clause}
-        """)
-        total = db.execute(count_query, params).scalar()
-        
-        # Get paginated logs with user info
-        offset = (page - 1) * page_size
-        params["offset"] = offset
-        params["limit"] = page_size
-        
-        logs_query = text(f"""
-            SELECT 
-                al.id,
-                al.user_id,
-                COALESCE(u.email, 'System') as user_email,
-                COALESCE(u.first_name || ' ' || u.last_name, 'System') as user_name,
-                al.action,
-                al.category,
-                al.severity,
-                al.status,
-                al.ip_address,
-                al.details,
-                al.created_at
-            FROM audit_logs al
-            LEFT JOIN users u ON al.user_id = u.id
-            WHERE {where_clause}
-            ORDER BY al.created_at DESC
-            LIMIT :limit OFFSET :offset
-        """)
-        
-        result = db.execute(logs_query, params)
-        logs_data = []
+        conditions, params, needs_user_join = AuditLogService.build_filters(
+            action=action,
+            severity=severity,
+            category=category,
+            status=status,
+            user_id=user_id,
+            user=user,
+            search=search,
+            start_date=start_date,
+            end_date=end_date
+        )
         
-        for row in result:
-            logs_data.append({
-                "id": row[0],
-                "user_id": row[1],
-                "user": row[3] if row[1] else "System",
-                "action": row[4],
-                "category": row[5],
-                "severity": row[6],
-                "status": row[7],
-                "ipAddress": row[8],
-                "details": row[9] if isinstance(row[9], dict) else {},
-                "timestamp": row[10].isoformat() if row[10] else None
-            })
+        result = AuditLogService.get_logs(
+            db,
+            conditions,
+            params,
+            needs_user_join=needs_user_join,
+            page=page,
+            page_size=page_size,
+            cursor=cursor,
+            count_mode=count_mode
+        )
         
         return {
             "success": True,
-            "data": logs_data,
-            "pagination": {
-                "total": total,
-                "page": page,
-                "page_size": page_size,
-                "total_pages": (total + page_size - 1) // page_size
-            }
+            "data": result["logs"],
+            "pagination": result["pagination"]
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching audit logs: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -3552,28 +3703,11 @@ async def get_audit_log_stats(
     current_user: dict = Depends(require_staff),
     db: Session = Depends(get_db)
 ):
-    """Get audit log statistics"""
+    """Get audit log statistics (daily rollups + live counts for today)"""
     try:
-        # Use raw SQL for better performance
-        stats_query = text("""
-            SELECT 
-                COUNT(*) as total_logs,
-                COUNT(*) FILTER (WHERE created_at >= CURRENT_TIMESTAMP - INTERVAL '24 hours') as last_24h,
-                COUNT(*) FILTER (WHERE severity = 'Critical') as critical_events,
-                COUNT(*) FILTER (WHERE status IN ('Failed', 'Blocked')) as failed_blocked
-            FROM audit_logs
-        """)
-        
-        result = db.execute(stats_query).fetchone()
-        
         return {
             "success": True,
-            "data": {
-                "total_logs": result[0] or 0,
-                "last_24h": result[1] or 0,
-                "critical_events": result[2] or 0,
-                "failed_blocked": result[3] or 0
-            }
+            "data": AuditLogService.get_stats(db)
         }
         
     except Exception as e:
@@ -4254,101 +4388,90 @@ async def export_custom(
 
 @router.get("/dashboard-stats")
 async def get_dashboard_stats(
+    period_id: Optional[int] = Query(None),
+    all_periods: bool = Query(False),
     current_user: dict = Depends(require_staff),
     db: Session = Depends(get_db)
 ):
-    """Get overall dashboard statistics for system admin"""
+    """
+    Get overall dashboard statistics for system admin
+    Evaluation/enrollment/sentiment numbers are scoped to the active period
+    unless period_id is given or all_periods=true
+    """
     try:
-        # User stats
-        total_users = db.query(func.count(User.id)).scalar() or 0
-        active_users = db.query(func.count(User.id)).filter(User.is_active == True).scalar() or 0
-        
-        # User roles breakdown
-        students_count = db.query(func.count(User.id)).filter(User.role == 'student').scalar() or 0
-        dept_heads_count = db.query(func.count(User.id)).filter(User.role == 'department_head').scalar() or 0
-        secretaries_count = db.query(func.count(User.id)).filter(User.role == 'secretary').scalar() or 0
-        admins_count = db.query(func.count(User.id)).filter(User.role == 'admin').scalar() or 0
-        # instructors_count removed - not needed for course evaluation
-        
-        # Course stats
-        total_courses = db.query(func.count(Course.id)).scalar() or 0
-        total_programs = db.query(func.count(func.distinct(Program.id))).scalar() or 0
-        
-        # Evaluation stats - only count SUBMITTED evaluations (submission_date IS NOT NULL)
-        total_evaluations = db.query(func.count(Evaluation.id)).filter(
-            Evaluation.submission_date.isnot(None)
-        ).scalar() or 0
-        
-        # Calculate participation rate based on submitted evaluations
-        total_possible_evaluations = db.query(func.count(Enrollment.id)).scalar() or 0
-        participation_rate = round((total_evaluations / total_possible_evaluations * 100), 1) if total_possible_evaluations > 0 else 0
-        
-        # Program stats - only count submitted evaluations
-        program_stats_query = text("""
-            SELECT 
-                p.program_code as program,
-                COUNT(DISTINCT c.id) as courses,
-                COUNT(DISTINCT s.id) as students,
-                COUNT(DISTINCT CASE WHEN e.submission_date IS NOT NULL THEN e.id END) as evaluations
-            FROM programs p
-            LEFT JOIN courses c ON p.id = c.program_id
-            LEFT JOIN students s ON p.id = s.program_id
-            LEFT JOIN enrollments enr ON s.id = enr.student_id
-            LEFT JOIN evaluations e ON enr.class_section_id = e.class_section_id AND s.id = e.student_id
-            GROUP BY p.program_code, p.id
-            ORDER BY p.program_code
-        """)
-        
-        program_stats_result = db.execute(program_stats_query)
-        program_stats = {}
-        for row in program_stats_result:
-            program_stats[row[0]] = {
-                "courses": row[1] or 0,
-                "students": row[2] or 0,
-                "evaluations": row[3] or 0
-            }
+        stats = DashboardStatsService.get_stats(
+            db, period_id=period_id, use_active_period=not all_periods
+        )
         
-        # Sentiment stats (if sentiment analysis is available) - only count submitted evaluations
-        sentiment_stats = {
-            "positive": db.query(func.count(Evaluation.id)).filter(
-                Evaluation.sentiment_score > 0.3,
-                Evaluation.submission_date.isnot(None)
-            ).scalar() or 0,
-            "neutral": db.query(func.count(Evaluation.id)).filter(
-                and_(Evaluation.sentiment_score >= -0.3, Evaluation.sentiment_score <= 0.3),
-                Evaluation.submission_date.isnot(None)
-            ).scalar() or 0,
-            "negative": db.query(func.count(Evaluation.id)).filter(
-                Evaluation.sentiment_score < -0.3,
-                Evaluation.submission_date.isnot(None)
-            ).scalar() or 0
-        }
+        if period_id and stats.period_id is None:
+            raise HTTPException(status_code=404, detail="Evaluation period not found")
         
         return {
             "success": True,
             "data": {
-                "totalUsers": total_users,
-                "activeUsers": active_users,
-                "totalCourses": total_courses,
-                "totalPrograms": total_programs,
-                "totalEvaluations": total_evaluations,
-                "participationRate": participation_rate,
+                "periodId": stats.period_id,
+                "periodName": stats.period_name,
+                "totalUsers": stats.total_users,
+                "activeUsers": stats.active_users,
+                "totalCourses": stats.total_courses,
+                "totalPrograms": stats.total_programs,
+                "totalEvaluations": stats.total_evaluations,
+                "participationRate": stats.participation_rate,
                 "userRoles": {
-                    "students": students_count,
-                    "departmentHeads": dept_heads_count,
-                    "secretaries": secretaries_count,
-                    "admins": admins_count,
+                    "students": stats.user_roles.students,
+                    "departmentHeads": stats.user_roles.department_heads,
+                    "secretaries": stats.user_roles.secretaries,
+                    "admins": stats.user_roles.admins,
                     # instructors removed from stats
                 },
-                "programStats": program_stats,
-                "sentimentStats": sentiment_stats
+                "programStats": {
+                    program.program_code: {
+                        "courses": program.courses,
+                        "students": program.students,
+                        "evaluations": program.evaluations
+                    }
+                    for program in stats.programs
+                },
+                "sentimentStats": stats.sentiment.model_dump()
             }
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching dashboard stats: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/cache/warmup")
+async def get_cache_warmup(
+    current_user: dict = Depends(require_admin)
+):
+    """Report of the last cache warm-up (warmed keys, failures, duration) and cache sizes"""
+    return {
+        "success": True,
+        "data": {
+            "lastWarmup": CacheWarmupService.last_report(),
+            "cache": get_cache_stats()
+        }
+    }
+
+@router.post("/cache/warmup")
+async def run_cache_warmup(
+    period_id: Optional[int] = Query(None),
+    current_user: dict = Depends(require_admin)
+):
+    """Clear the dashboard caches and warm them for the active (or given) period"""
+    try:
+        clear_all_caches()
+        report = await CacheWarmupService.warm_period_caches(period_id)
+        return {"success": True, "data": report}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error warming caches: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 
 # ===========================
 # Email Notification Endpoints
@@ -5501,9 +5624,7 @@ async def get_non_respondents(
     try:
         # Get active period if not specified
         if not evaluation_period_id:
-            active_period = db.query(EvaluationPeriod).filter(
-                EvaluationPeriod.status == 'active'
-            ).first()
+            active_period = ActivePeriodResolver.get(db)
             
             if not active_period:
                 return {
@@ -0,0 +1,127 @@
+"""
+Active Period Resolver
+Serves the active evaluation period from memory instead of querying it per request.
+
+Nearly every handler starts from the active period. The resolver loads it once,
+keeps an immutable copy, and is invalidated by the endpoints that create, update,
+change the status of or delete periods. Those endpoints also call clear_all_caches(),
+whose cache_generation bump makes every other worker drop its copy on its next
+lookup (within CACHE_GENERATION_CHECK_SECONDS); ACTIVE_PERIOD_CACHE_SECONDS bounds
+a copy's age when that signal can't be read. Writes that depend on the period
+being open (submit_evaluation) re-check it in the same statement.
+"""
+
+from fastapi import Depends
+from sqlalchemy.orm import Session
+from database.connection import get_db
+from models.enhanced_models import EvaluationPeriod
+from config import now_local
+from utils.cache import on_clear, sync_generation
+from utils.metrics import CACHE_REQUESTS, CACHE_EVICTIONS
+from datetime import date, datetime
+from typing import NamedTuple, Optional
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on a cached active period when another process changed it
+ACTIVE_PERIOD_CACHE_SECONDS = int(os.getenv("ACTIVE_PERIOD_CACHE_SECONDS", "30"))
+
+class ActivePeriod(NamedTuple):
+    """Detached copy of the active evaluation_periods row"""
+    id: int
+    name: str
+    semester: Optional[str]
+    academic_year: Optional[str]
+    status: str
+    start_date: Optional[datetime]
+    end_date: Optional[datetime]
+
+    def is_open(self, today: Optional[date] = None) -> bool:
+        """Whether today falls inside the period's date window (evaluations accepted)"""
+        today = today or now_local().date()
+        if self.start_date is None or self.end_date is None:
+            return False
+        return self.start_date.date() <= today <= self.end_date.date()
+
+_lock = threading.Lock()
+_cached_period: Optional[ActivePeriod] = None
+_loaded_at: Optional[float] = None
+
+class ActivePeriodResolver:
+    """Cached lookups of the active evaluation period"""
+
+    @staticmethod
+    def get(db: Session) -> Optional[ActivePeriod]:
+        """
+        Active period (status = 'active'), regardless of its dates
+
+        Args:
+            db: Session used only when the cached copy is missing or expired
+
+        Returns:
+            ActivePeriod, or None when no period is active
+        """
+        global _cached_period, _loaded_at
+        # Drops the copy (via on_clear) when another worker changed the periods
+        sync_generation()
+        with _lock:
+            if _loaded_at is not None and time.monotonic() - _loaded_at < ACTIVE_PERIOD_CACHE_SECONDS:
+                CACHE_REQUESTS.labels(namespace="active_period", result="hit").inc()
+                return _cached_period
+        CACHE_REQUESTS.labels(namespace="active_period", result="miss").inc()
+
+        period = db.query(EvaluationPeriod).filter(
+            EvaluationPeriod.status == 'active'
+        ).order_by(EvaluationPeriod.created_at.desc().nullslast(), EvaluationPeriod.id.desc()).first()
+        resolved = ActivePeriod(
+            id=period.id,
+            name=period.name,
+            semester=period.semester,
+            academic_year=period.academic_year,
+            status=period.status,
+            start_date=period.start_date,
+            end_date=period.end_date
+        ) if period else None
+
+        with _lock:
+            _cached_period = resolved
+            _loaded_at = time.monotonic()
+        return resolved
+
+    @staticmethod
+    def get_open(db: Session, today: Optional[date] = None) -> Optional[ActivePeriod]:
+        """Active period only while today is inside its start/end dates"""
+        period = ActivePeriodResolver.get(db)
+        return period if period and period.is_open(today) else None
+
+    @staticmethod
+    def resolve_id(db: Session, period_id: Optional[int] = None) -> Optional[int]:
+        """period_id when given, otherwise the active period's ID (None if there is none)"""
+        if period_id:
+            return period_id
+        period = ActivePeriodResolver.get(db)
+        return period.id if period else None
+
+    @staticmethod
+    def invalidate() -> None:
+        """Forget the cached period - call after creating, updating or deleting periods"""
+        global _cached_period, _loaded_at
+        with _lock:
+            if _loaded_at is not None:
+                CACHE_EVICTIONS.labels(namespace="active_period", reason="invalidated").inc()
+            _cached_period = None
+            _loaded_at = None
+
+on_clear(ActivePeriodResolver.invalidate)
+
+def get_active_period(db: Session = Depends(get_db)) -> Optional[ActivePeriod]:
+    """FastAPI dependency: the active period, or None"""
+    return ActivePeriodResolver.get(db)
+
+def get_open_period(db: Session = Depends(get_db)) -> Optional[ActivePeriod]:
+    """FastAPI dependency: the active period while it is accepting evaluations, or None"""
+    return ActivePeriodResolver.get_open(db)
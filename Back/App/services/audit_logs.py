@@ -0,0 +1,367 @@
+"""
+Audit Log Query Service
+Paging, search and statistics for the audit log viewer.
+
+Pages are keyset-paginated on (created_at, id) - the partition key of the monthly
+audit_logs partitions, so date ranges and cursors prune partitions; totals can be exact, planner
+estimates, or exact only when the estimate is small. Free-text search uses the
+GIN-indexed audit_log_search_vector() document (migration 22). Statistics are
+read from the audit_log_daily_stats rollups plus live counts after the last
+rolled-up day; the rollups are refreshed by the scheduled audit log maintenance
+(services/audit_partitions.py), never by a read.
+"""
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import base64
+import json
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+# "auto" count mode: results estimated above this many rows are not counted exactly
+AUDIT_LOG_EXACT_COUNT_THRESHOLD = int(os.getenv("AUDIT_LOG_EXACT_COUNT_THRESHOLD", "10000"))
+
+COUNT_MODES = ("exact", "estimated", "auto")
+
+# pg_try_advisory_xact_lock key for refresh_daily_stats
+DAILY_STATS_LOCK_KEY = 7303101
+
+# Must match the expression of idx_audit_logs_search
+SEARCH_VECTOR = "audit_log_search_vector(al.action, al.category, al.details)"
+
+def encode_cursor(created_at: datetime, log_id: int) -> str:
+    """Opaque cursor for the row after which the next page starts"""
+    raw = json.dumps({"t": created_at.isoformat(), "id": log_id})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor produced by encode_cursor
+
+    Raises:
+        HTTPException 400 for malformed cursors
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        return datetime.fromisoformat(data["t"]), int(data["id"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def build_search_query(search: str) -> Optional[str]:
+    """
+    Turn free text into a prefix-matching tsquery ("user creat" -> "user:* & creat:*")
+
+    Split on punctuation like the indexed document, so only letters and digits
+    survive and the result is always valid tsquery syntax.
+    """
+    terms = re.findall(r"[^\W_]+", search.lower())
+    if not terms:
+        return None
+    return " & ".join(f"{term}:*" for term in terms)
+
+class AuditLogService:
+    """
+    Audit log listing and statistics
+    """
+
+    @staticmethod
+    def build_filters(
+        action: Optional[str] = None,
+        severity: Optional[str] = None,
+        category: Optional[str] = None,
+        status: Optional[str] = None,
+        user_id: Optional[int] = None,
+        user: Optional[str] = None,
+        search: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> Tuple[List[str], Dict[str, Any], bool]:
+        """
+        Build WHERE conditions for an audit log query
+
+        Returns:
+            (conditions, params, needs_user_join) - needs_user_join is True when a
+            condition references the users table (alias u)
+        """
+        conditions = ["1=1"]
+        params: Dict[str, Any] = {}
+        needs_user_join = False
+
+        if action:
+            conditions.append("al.action = :action")
+            params["action"] = action
+
+        if severity:
+            conditions.append("al.severity = :severity")
+            params["severity"] = severity
+
+        if category:
+            conditions.append("al.category = :category")
+            params["category"] = category
+
+        if status:
+            conditions.append("al.status = :status")
+            params["status"] = status
+
+        if user_id:
+            conditions.append("al.user_id = :user_id")
+            params["user_id"] = user_id
+
+        # Handle user filter (can be user_id as string or email/name search)
+        if user:
+            if user.isdigit():
+                conditions.append("al.user_id = :user_filter_id")
+                params["user_filter_id"] = int(user)
+            else:
+                conditions.append("(u.email ILIKE :user_search OR u.first_name ILIKE :user_search OR u.last_name ILIKE :user_search)")
+                params["user_search"] = f"%{user}%"
+                needs_user_join = True
+
+        if search:
+            search_query = build_search_query(search)
+            if search_query:
+                conditions.append(f"{SEARCH_VECTOR} @@ to_tsquery('simple', :search_query)")
+                params["search_query"] = search_query
+
+        if start_date:
+            conditions.append("al.created_at >= :start_date")
+            params["start_date"] = start_date
+
+        if end_date:
+            conditions.append("al.created_at <= :end_date")
+            params["end_date"] = end_date
+
+        return conditions, params, needs_user_join
+
+    @staticmethod
+    def estimate_count(db: Session, from_clause: str, params: Dict[str, Any]) -> int:
+        """Planner row estimate for a FROM ... WHERE clause (no rows are read)"""
+        plan = db.execute(text(f"EXPLAIN (FORMAT JSON) SELECT 1 {from_clause}"), params).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    @staticmethod
+    def count(db: Session, from_clause: str, params: Dict[str, Any], count_mode: str = "auto") -> Tuple[int, bool]:
+        """
+        Count matching rows
+
+        Args:
+            db: Database session
+            from_clause: "FROM ... WHERE ..." clause
+            params: Bind parameters
+            count_mode: exact | estimated | auto (exact unless the estimate exceeds
+                        AUDIT_LOG_EXACT_COUNT_THRESHOLD)
+
+        Returns:
+            (total, is_estimate)
+        """
+        if count_mode in ("estimated", "auto"):
+            estimate = AuditLogService.estimate_count(db, from_clause, params)
+            if count_mode == "estimated" or estimate > AUDIT_LOG_EXACT_COUNT_THRESHOLD:
+                return estimate, True
+
+        total = db.execute(text(f"SELECT COUNT(*) {from_clause}"), params).scalar() or 0
+        return total, False
+
+    @staticmethod
+    def get_logs(
+        db: Session,
+        conditions: List[str],
+        params: Dict[str, Any],
+        needs_user_join: bool = False,
+        page: int = 1,
+        page_size: int = 15,
+        cursor: Optional[str] = None,
+        count_mode: str = "auto"
+    ) -> Dict[str, Any]:
+        """
+        Fetch one page of audit logs, newest first
+
+        Args:
+            db: Database session
+            conditions / params / needs_user_join: From build_filters
+            page: Page number (offset paging, used when no cursor is given)
+            page_size: Rows per page
+            cursor: next_cursor from the previous page (keyset paging)
+            count_mode: See count()
+
+        Returns:
+            {"logs": [...], "pagination": {...}}
+        """
+        if count_mode not in COUNT_MODES:
+            raise HTTPException(status_code=400, detail=f"count_mode must be one of: {', '.join(COUNT_MODES)}")
+
+        user_join = "LEFT JOIN users u ON al.user_id = u.id" if needs_user_join else ""
+        where_clause = " AND ".join(conditions)
+        total, is_estimate = AuditLogService.count(
+            db,
+            f"FROM audit_logs al {user_join} WHERE {where_clause}",
+            params,
+            count_mode
+        )
+
+        page_params = dict(params)
+        page_conditions = list(conditions)
+        page_params["limit"] = page_size + 1  # one extra row tells us whether there is a next page
+
+        if cursor:
+            cursor_created_at, cursor_id = decode_cursor(cursor)
+            page_conditions.append("(al.created_at, al.id) < (:cursor_created_at, :cursor_id)")
+            # Plain bound as well: row comparisons don't prune partitions (migration 23)
+            page_conditions.append("al.created_at <= :cursor_created_at")
+            page_params["cursor_created_at"] = cursor_created_at
+            page_params["cursor_id"] = cursor_id
+            offset_clause = ""
+        else:
+            page_params["offset"] = (page - 1) * page_size
+            offset_clause = "OFFSET :offset"
+
+        rows = db.execute(text(f"""
+            SELECT
+                al.id,
+                al.user_id,
+                COALESCE(u.email, 'System') as user_email,
+                COALESCE(u.first_name || ' ' || u.last_name, 'System') as user_name,
+                al.action,
+                al.category,
+                al.severity,
+                al.status,
+                al.ip_address,
+                al.details,
+                al.created_at
+            FROM audit_logs al
+            LEFT JOIN users u ON al.user_id = u.id
+            WHERE {" AND ".join(page_conditions)}
+            ORDER BY al.created_at DESC, al.id DESC
+            LIMIT :limit {offset_clause}
+        """), page_params).fetchall()
+
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+
+        logs = [{
+            "id": row[0],
+            "user_id": row[1],
+            "user": row[3] if row[1] else "System",
+            "action": row[4],
+            "category": row[5],
+            "severity": row[6],
+            "status": row[7],
+            "ipAddress": row[8],
+            "details": row[9] if isinstance(row[9], dict) else {},
+            "timestamp": row[10].isoformat() if row[10] else None
+        } for row in rows]
+
+        last = rows[-1] if rows else None
+        next_cursor = encode_cursor(last.created_at, last.id) if has_more and last.created_at else None
+
+        return {
+            "logs": logs,
+            "pagination": {
+                "total": total,
+                "total_is_estimate": is_estimate,
+                "page": page,
+                "page_size": page_size,
+                "total_pages": (total + page_size - 1) // page_size,
+                "has_more": has_more,
+                "next_cursor": next_cursor
+            }
+        }
+
+    @staticmethod
+    def refresh_daily_stats(db: Session, force: bool = False) -> int:
+        """
+        Bring audit_log_daily_stats up to date for closed days (before today)
+
+        Re-rolls from the last rolled-up day onwards so late writes to that day are
+        picked up. Does nothing when yesterday is already rolled up (unless force)
+        or when another process is refreshing.
+
+        Returns:
+            Number of rollup rows written
+        """
+        locked = db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": DAILY_STATS_LOCK_KEY}).scalar()
+        if not locked:
+            db.rollback()
+            return 0
+
+        last_day = db.execute(text("SELECT MAX(day) FROM audit_log_daily_stats")).scalar()
+        is_current = db.execute(
+            text("SELECT CAST(:last_day AS DATE) >= CURRENT_DATE - 1"),
+            {"last_day": last_day}
+        ).scalar()
+        if is_current and not force:
+            db.rollback()
+            return 0
+
+        params = {"since": last_day}
+        written = db.execute(text("""
+            INSERT INTO audit_log_daily_stats (day, category, severity, status, event_count)
+            SELECT
+                CAST(created_at AS DATE),
+                COALESCE(category, ''),
+                COALESCE(severity, ''),
+                COALESCE(status, ''),
+                COUNT(*)
+            FROM audit_logs
+            WHERE created_at < CURRENT_DATE
+            AND (CAST(:since AS DATE) IS NULL OR created_at >= CAST(:since AS DATE))
+            GROUP BY 1, 2, 3, 4
+            ON CONFLICT (day, category, severity, status)
+            DO UPDATE SET event_count = EXCLUDED.event_count
+        """), params).rowcount
+        db.commit()
+
+        logger.info(f"Refreshed audit log daily stats from {last_day or 'the beginning'} ({written} rows)")
+        return written
+
+    @staticmethod
+    def get_stats(db: Session) -> Dict[str, int]:
+        """
+        Headline audit statistics: rolled-up days plus live counts after the last of them
+
+        Read-only - when the rollups lag behind (maintenance not run yet today), the
+        days they are missing are counted live instead.
+
+        Returns:
+            total_logs, last_24h, critical_events, failed_blocked
+        """
+        row = db.execute(text("""
+            WITH rolled AS (
+                SELECT
+                    MAX(day) AS last_day,
+                    COALESCE(SUM(event_count), 0) AS total_logs,
+                    COALESCE(SUM(event_count) FILTER (WHERE severity = 'Critical'), 0) AS critical_events,
+                    COALESCE(SUM(event_count) FILTER (WHERE status IN ('Failed', 'Blocked')), 0) AS failed_blocked
+                FROM audit_log_daily_stats
+            ),
+            today AS (
+                SELECT
+                    COUNT(*) AS total_logs,
+                    COUNT(*) FILTER (WHERE severity = 'Critical') AS critical_events,
+                    COUNT(*) FILTER (WHERE status IN ('Failed', 'Blocked')) AS failed_blocked
+                FROM audit_logs
+                WHERE created_at >= COALESCE((SELECT last_day FROM rolled) + 1, '-infinity'::date)
+            )
+            SELECT
+                rolled.total_logs + today.total_logs,
+                (SELECT COUNT(*) FROM audit_logs WHERE created_at >= CURRENT_TIMESTAMP - INTERVAL '24 hours'),
+                rolled.critical_events + today.critical_events,
+                rolled.failed_blocked + today.failed_blocked
+            FROM rolled, today
+        """)).fetchone()
+
+        return {
+            "total_logs": int(row[0] or 0),
+            "last_24h": int(row[1] or 0),
+            "critical_events": int(row[2] or 0),
+            "failed_blocked": int(row[3] or 0)
+        }
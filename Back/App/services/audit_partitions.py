@@ -0,0 +1,264 @@
+"""
+Audit Log Partition Maintenance
+Keeps the monthly audit_logs partitions (migration 23) ahead of time and applies retention.
+
+Each run creates partitions AUDIT_LOG_PARTITION_MONTHS_AHEAD months ahead, then
+detaches partitions older than AUDIT_LOG_RETENTION_MONTHS, archives each one to a
+gzipped CSV under AUDIT_LOG_ARCHIVE_DIR and drops it. Runs are serialized across
+processes with an advisory lock. Scheduled every AUDIT_LOG_MAINTENANCE_INTERVAL_HOURS
+by one scheduler process (`maintain_audit_log_partitions.py --loop`, started by
+gunicorn.conf.py) - not by every web worker. Single-process runs (`python main.py`)
+can schedule it in the API instead with AUDIT_LOG_MAINTENANCE_IN_APP=1. The
+scheduled run also refreshes the audit_log_daily_stats rollups.
+"""
+
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from database.connection import SessionLocal
+from services.audit_writer import audit_writer
+import asyncio
+import gzip
+import logging
+import os
+import re
+import subprocess
+import sys
+import time
+
+logger = logging.getLogger(__name__)
+
+AUDIT_LOG_PARTITION_MONTHS_AHEAD = int(os.getenv("AUDIT_LOG_PARTITION_MONTHS_AHEAD", "3"))
+AUDIT_LOG_RETENTION_MONTHS = int(os.getenv("AUDIT_LOG_RETENTION_MONTHS", "12"))  # 0 = keep everything
+AUDIT_LOG_MAINTENANCE_INTERVAL_HOURS = int(os.getenv("AUDIT_LOG_MAINTENANCE_INTERVAL_HOURS", "24"))  # 0 = not scheduled
+# Schedule it inside the API process (only for single-process runs - every worker would run it)
+AUDIT_LOG_MAINTENANCE_IN_APP = os.getenv("AUDIT_LOG_MAINTENANCE_IN_APP", "0") == "1"
+AUDIT_LOG_ARCHIVE_DIR = os.getenv(
+    "AUDIT_LOG_ARCHIVE_DIR",
+    str(Path(__file__).resolve().parents[3] / "Database_Backups" / "audit_logs")
+)
+
+PARTITION_NAME = re.compile(r"^audit_logs_p(\d{4})_(\d{2})$")
+
+# pg_try_advisory_xact_lock key shared by every process
+MAINTENANCE_LOCK_KEY = 7303301
+
+def partition_month(name: str) -> Optional[date]:
+    """First day of the month stored in a partition (None for non-monthly tables)"""
+    match = PARTITION_NAME.match(name)
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+class AuditLogPartitionService:
+    """
+    Partition creation, retention and archival for audit_logs
+    """
+
+    @staticmethod
+    def list_partitions(db: Session) -> List[Dict[str, Any]]:
+        """
+        Monthly audit log tables, attached or detached, oldest first
+
+        Returns:
+            [{"name", "month", "attached", "estimated_rows", "size_bytes"}]
+        """
+        rows = db.execute(text("""
+            SELECT
+                c.relname,
+                c.relispartition,
+                GREATEST(c.reltuples, 0)::BIGINT,
+                pg_total_relation_size(c.oid)
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = current_schema()
+            AND c.relkind = 'r'
+            AND (c.relname ~ '^audit_logs_p[0-9]{4}_[0-9]{2}$' OR c.relname = 'audit_logs_default')
+            ORDER BY c.relname
+        """)).fetchall()
+
+        return [{
+            "name": row[0],
+            "month": partition_month(row[0]),
+            "attached": row[1],
+            "estimated_rows": row[2],
+            "size_bytes": row[3]
+        } for row in rows]
+
+    @staticmethod
+    def ensure_partitions(db: Session, months_ahead: int = AUDIT_LOG_PARTITION_MONTHS_AHEAD) -> int:
+        """
+        Create any missing partitions from the current month through months_ahead
+
+        Returns:
+            Number of partitions created
+        """
+        created = db.execute(
+            text("SELECT create_audit_log_partitions(CURRENT_DATE, :months_ahead)"),
+            {"months_ahead": months_ahead}
+        ).scalar() or 0
+        db.commit()
+
+        if created:
+            logger.info(f"Created {created} audit log partition(s)")
+        return created
+
+    @staticmethod
+    def archive_partition(db: Session, name: str, archive_dir: str = AUDIT_LOG_ARCHIVE_DIR) -> Dict[str, Any]:
+        """
+        Write one partition to <archive_dir>/<name>.csv.gz (CSV with header)
+
+        The file is written under a temporary name and only renamed once the
+        number of rows written matches the table.
+
+        Returns:
+            {"file", "rows", "size_bytes"}
+        """
+        if not PARTITION_NAME.match(name):
+            raise ValueError(f"Not an audit log partition: {name}")
+
+        target = Path(archive_dir) / f"{name}.csv.gz"
+        partial = target.with_name(target.name + ".part")
+        target.parent.mkdir(parents=True, exist_ok=True)
+
+        expected = db.execute(text(f'SELECT COUNT(*) FROM "{name}"')).scalar()
+        raw = db.connection().connection.driver_connection
+        with gzip.open(partial, "wb") as archive, raw.cursor() as cursor:
+            with cursor.copy(f'COPY (SELECT * FROM "{name}" ORDER BY created_at, id) TO STDOUT WITH (FORMAT csv, HEADER)') as copy:
+                for block in copy:
+                    archive.write(block)
+            written = cursor.rowcount
+
+        if written != expected:
+            partial.unlink(missing_ok=True)
+            raise RuntimeError(f"Archive of {name} wrote {written} rows, expected {expected}")
+
+        partial.replace(target)
+        return {"file": str(target), "rows": written, "size_bytes": target.stat().st_size}
+
+    @staticmethod
+    def apply_retention(
+        db: Session,
+        retention_months: int = AUDIT_LOG_RETENTION_MONTHS,
+        archive_dir: str = AUDIT_LOG_ARCHIVE_DIR,
+        dry_run: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Detach, archive and drop partitions older than the retention window
+
+        A partition is expired once its whole month lies before the first day of
+        the month retention_months ago. Detached partitions left behind by an
+        interrupted run are archived and dropped too.
+
+        Args:
+            db: Database session
+            retention_months: Months to keep in addition to the current one (0 = keep all)
+            archive_dir: Directory for the .csv.gz archives
+            dry_run: Only report what would be archived
+
+        Returns:
+            {"cutoff", "archived": [...], "dry_run"}
+        """
+        if retention_months <= 0:
+            return {"cutoff": None, "archived": [], "dry_run": dry_run}
+
+        cutoff = db.execute(
+            text("SELECT CAST(date_trunc('month', CURRENT_DATE) - make_interval(months => :months) AS DATE)"),
+            {"months": retention_months}
+        ).scalar()
+
+        expired = [
+            partition for partition in AuditLogPartitionService.list_partitions(db)
+            if partition["month"] and partition["month"] < cutoff
+        ]
+        if dry_run:
+            return {"cutoff": cutoff, "archived": expired, "dry_run": True}
+
+        archived = []
+        for partition in expired:
+            name = partition["name"]
+            if partition["attached"]:
+                db.execute(text(f'ALTER TABLE audit_logs DETACH PARTITION "{name}"'))
+                db.commit()
+
+            result = AuditLogPartitionService.archive_partition(db, name, archive_dir)
+            db.execute(text(f'DROP TABLE "{name}"'))
+            db.commit()
+
+            logger.info(f"Archived audit log partition {name}: {result['rows']} rows -> {result['file']}")
+            audit_writer.write(
+                user_id=None,
+                action="AUDIT_LOGS_ARCHIVED",
+                category="System Maintenance",
+                details={"partition": name, **result}
+            )
+            archived.append({"name": name, **result})
+
+        return {"cutoff": cutoff, "archived": archived, "dry_run": False}
+
+    @staticmethod
+    def run_maintenance(
+        db: Session,
+        months_ahead: int = AUDIT_LOG_PARTITION_MONTHS_AHEAD,
+        retention_months: int = AUDIT_LOG_RETENTION_MONTHS,
+        archive_dir: str = AUDIT_LOG_ARCHIVE_DIR,
+        dry_run: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Create upcoming partitions and apply retention (skipped if another worker is running it)
+
+        Returns:
+            {"skipped", "partitions_created", "retention"}
+        """
+        # The work commits step by step, so the session may use a different pooled
+        # connection (or, behind a transaction pooler, backend) after each commit. The
+        # lock is a transaction-level lock in a transaction of its own, kept open on one
+        # connection for the whole run and released when that connection closes.
+        lock = db.get_bind().connect()
+        try:
+            locked = lock.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": MAINTENANCE_LOCK_KEY}).scalar()
+            if not locked:
+                logger.info("Audit log partition maintenance already running elsewhere - skipped")
+                return {"skipped": True, "partitions_created": 0, "retention": None}
+
+            try:
+                created = 0 if dry_run else AuditLogPartitionService.ensure_partitions(db, months_ahead)
+                retention = AuditLogPartitionService.apply_retention(db, retention_months, archive_dir, dry_run)
+                return {"skipped": False, "partitions_created": created, "retention": retention}
+            except Exception:
+                db.rollback()
+                raise
+        finally:
+            lock.close()
+
+def _run_scheduled_maintenance() -> None:
+    from services.audit_logs import AuditLogService
+    db = SessionLocal()
+    try:
+        AuditLogPartitionService.run_maintenance(db)
+    except Exception as e:
+        logger.error(f"Audit log partition maintenance failed: {e}")
+    try:
+        AuditLogService.refresh_daily_stats(db)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Audit log daily stats refresh failed: {e}")
+    finally:
+        db.close()
+
+def run_maintenance_forever(interval_hours: int = AUDIT_LOG_MAINTENANCE_INTERVAL_HOURS) -> None:
+    """Scheduler process: run partition maintenance now and then every interval_hours"""
+    while True:
+        _run_scheduled_maintenance()
+        time.sleep(interval_hours * 3600)
+
+async def audit_log_maintenance_loop(interval_hours: int = AUDIT_LOG_MAINTENANCE_INTERVAL_HOURS) -> None:
+    """In-app schedule (AUDIT_LOG_MAINTENANCE_IN_APP=1): the same, in a worker thread"""
+    while True:
+        await asyncio.to_thread(_run_scheduled_maintenance)
+        await asyncio.sleep(interval_hours * 3600)
+
+def start_scheduler_process() -> subprocess.Popen:
+    """Start the maintenance scheduler next to the API (gunicorn.conf.py); stop it with terminate()"""
+    app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return subprocess.Popen([sys.executable, "maintain_audit_log_partitions.py", "--loop"], cwd=app_dir)
@@ -0,0 +1,175 @@
+"""
+Audit Log Writer
+Batches audit log inserts off the request path.
+
+Events are queued in memory (bounded) and a background thread writes them with a
+single multi-row INSERT every AUDIT_LOG_FLUSH_INTERVAL_MS or AUDIT_LOG_BATCH_SIZE
+events, whichever comes first. Critical events, and events arriving while the
+queue is full, are written synchronously. Each write uses its own connection, so
+the caller's session is never committed as a side effect. Pending events are
+flushed on application shutdown (and at interpreter exit for scripts).
+"""
+
+from sqlalchemy import insert
+from typing import Any, Dict, List, Optional
+from config import now_local
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+AUDIT_LOG_ASYNC = os.getenv("AUDIT_LOG_ASYNC", "true").lower() == "true"
+AUDIT_LOG_BATCH_SIZE = int(os.getenv("AUDIT_LOG_BATCH_SIZE", "100"))
+AUDIT_LOG_FLUSH_INTERVAL_MS = int(os.getenv("AUDIT_LOG_FLUSH_INTERVAL_MS", "500"))
+AUDIT_LOG_QUEUE_SIZE = int(os.getenv("AUDIT_LOG_QUEUE_SIZE", "10000"))
+
+class AuditLogWriter:
+    """Queue-backed, batching writer for audit_logs"""
+
+    def __init__(
+        self,
+        enabled: bool = AUDIT_LOG_ASYNC,
+        batch_size: int = AUDIT_LOG_BATCH_SIZE,
+        flush_interval_ms: int = AUDIT_LOG_FLUSH_INTERVAL_MS,
+        max_queue: int = AUDIT_LOG_QUEUE_SIZE
+    ):
+        self.enabled = enabled
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(flush_interval_ms, 1) / 1000
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {
+            "queued": 0,
+            "written": 0,
+            "batches": 0,
+            "sync_writes": 0,
+            "queue_full": 0,
+            "failed": 0
+        }
+
+    def write(
+        self,
+        user_id: Optional[int],
+        action: str,
+        category: str,
+        severity: str = "Info",
+        status: str = "Success",
+        ip_address: Optional[str] = None,
+        details: Optional[dict] = None
+    ) -> None:
+        """
+        Record an audit event
+
+        The timestamp is taken now, not when the batch is flushed. Never raises:
+        audit failures are logged and must not fail the audited operation.
+        """
+        event = {
+            "user_id": user_id,
+            "action": action,
+            "category": category,
+            "severity": severity,
+            "status": status,
+            "ip_address": ip_address,
+            "details": details,
+            "created_at": now_local()
+        }
+
+        if not self.enabled or severity == "Critical" or self._stop.is_set():
+            self.stats["sync_writes"] += 1
+            self._insert([event])
+            return
+
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(event)
+            self.stats["queued"] += 1
+        except queue.Full:
+            # Backpressure: write in the caller rather than drop the event
+            self.stats["queue_full"] += 1
+            self.stats["sync_writes"] += 1
+            self._insert([event])
+
+    def flush(self) -> int:
+        """Write every queued event now; returns the number of events taken off the queue"""
+        flushed = 0
+        while True:
+            batch = self._take(self.batch_size, timeout=0)
+            if not batch:
+                return flushed
+            self._insert(batch)
+            flushed += len(batch)
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Stop the background thread and flush whatever is still queued"""
+        self._stop.set()
+        thread = self._thread
+        if thread and thread.is_alive():
+            thread.join(timeout=timeout)
+        flushed = self.flush()
+        if flushed:
+            logger.info(f"Flushed {flushed} pending audit log events on shutdown")
+
+    def pending(self) -> int:
+        """Events waiting to be written"""
+        return self._queue.qsize()
+
+    def _ensure_started(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            batch = self._take(self.batch_size, timeout=self.flush_interval)
+            if batch:
+                self._insert(batch)
+
+    def _take(self, limit: int, timeout: float) -> List[Dict[str, Any]]:
+        """Collect up to limit events, waiting at most timeout seconds in total"""
+        batch: List[Dict[str, Any]] = []
+        deadline = time.monotonic() + timeout
+        while len(batch) < limit:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _insert(self, events: List[Dict[str, Any]]) -> None:
+        """Insert events in one statement; on failure retry row by row so one bad event doesn't lose the batch"""
+        from database.connection import engine
+        from models.enhanced_models import AuditLog
+
+        try:
+            with engine.begin() as conn:
+                conn.execute(insert(AuditLog.__table__), events)
+            self.stats["written"] += len(events)
+            self.stats["batches"] += 1
+            return
+        except Exception as e:
+            if len(events) == 1:
+                self.stats["failed"] += 1
+                logger.error(f"Failed to write audit log {events[0]['action']}: {e}")
+                return
+            logger.error(f"Failed to write batch of {len(events)} audit logs, retrying individually: {e}")
+
+        for event in events:
+            self._insert([event])
+
+# Global writer instance
+audit_writer = AuditLogWriter()
+atexit.register(audit_writer.shutdown)
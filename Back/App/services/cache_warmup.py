@@ -0,0 +1,157 @@
+"""
+Cache Warm-up Service
+Precomputes the dashboards and completion rates of the active period.
+
+Activating an evaluation period (or starting the API) sends every secretary and
+department head to the same few endpoints at once. The warm-up runs those route
+handlers ahead of time through the dashboard bundle runner - capped by
+CACHE_WARMUP_CONCURRENCY read-pool sessions - so the first requests are served
+from utils.cache. The cache lives in the API process: the worker handling the
+activation warms its own, and every other worker starts a warm-up when it picks
+up the activation from cache_generation (on its next cached lookup).
+Student course lists are not cached (they change with every submission).
+"""
+
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from database.connection import ReadSessionLocal
+from services.dashboard_bundle import build_dashboard_bundle, resolve_period_id
+from utils.cache import on_activation
+from typing import Any, Dict, Optional, Set
+import asyncio
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Handlers run at the same time while warming (each holds one read-pool connection)
+CACHE_WARMUP_CONCURRENCY = int(os.getenv("CACHE_WARMUP_CONCURRENCY", "4"))
+# Warm the active period when the API starts (0 disables)
+CACHE_WARMUP_ON_STARTUP = os.getenv("CACHE_WARMUP_ON_STARTUP", "1") == "1"
+
+# Report of the most recent warm-up in this process
+last_warmup_report: Optional[Dict[str, Any]] = None
+
+# Warm-ups started after another worker's activation (referenced until done)
+_remote_warmups: Set[asyncio.Task] = set()
+
+class CacheWarmupService:
+    """Fill the dashboard caches for the active evaluation period"""
+
+    @staticmethod
+    def last_report() -> Optional[Dict[str, Any]]:
+        """Report of the most recent warm-up in this process (None if none ran yet)"""
+        return last_warmup_report
+
+    @staticmethod
+    def build_registry(db: Session, period_id: int) -> Dict[str, Dict[str, Any]]:
+        """
+        One entry per cache key to warm, named "<role>:<user id>:<widget>"
+
+        Each handler is called the way the frontend calls it - without a period
+        (defaults to the active one) and with the period ID the bundles resolve -
+        so both variants are cached.
+        """
+        from routes import secretary, department_head
+
+        registry: Dict[str, Dict[str, Any]] = {}
+
+        def add(name: str, handler, params: Dict[str, Any]):
+            registry[name] = {"handler": handler, "params": {**params, "period_id": None}}
+            registry[f"{name}@{period_id}"] = {"handler": handler, "params": {**params, "period_id": period_id}}
+
+        secretaries = db.execute(text("""
+            SELECT u.id FROM secretaries s
+            JOIN users u ON s.user_id = u.id
+            WHERE u.is_active = true
+        """)).fetchall()
+        for (user_id,) in secretaries:
+            add(f"secretary:{user_id}:dashboard", secretary.get_secretary_dashboard, {"user_id": user_id})
+            add(f"secretary:{user_id}:completion-rates", secretary.get_completion_rates, {"user_id": user_id})
+
+        department_heads = db.execute(text("""
+            SELECT u.id, u.department FROM department_heads dh
+            JOIN users u ON dh.user_id = u.id
+            WHERE u.is_active = true
+        """)).fetchall()
+        for user_id, department in department_heads:
+            add(f"dept-head:{user_id}:dashboard", department_head.get_department_head_dashboard,
+                {"user_id": user_id, "department": department})
+            add(f"dept-head:{user_id}:completion-rates", department_head.get_completion_rates, {"user_id": user_id})
+
+        return registry
+
+    @staticmethod
+    async def warm_period_caches(
+        period_id: Optional[int] = None,
+        concurrency: int = CACHE_WARMUP_CONCURRENCY
+    ) -> Dict[str, Any]:
+        """
+        Warm the caches of an evaluation period
+
+        Args:
+            period_id: Period to warm (None = the active period)
+            concurrency: Maximum handlers run at once
+
+        Returns:
+            {"period_id", "warmed": [cache key names], "failed": {name: error},
+             "total": n, "duration_ms": ms}
+        """
+        global last_warmup_report
+        started = time.perf_counter()
+
+        db = ReadSessionLocal()
+        try:
+            period_id = resolve_period_id(db, period_id)
+            registry = CacheWarmupService.build_registry(db, period_id) if period_id else {}
+        finally:
+            db.close()
+
+        bundle = await build_dashboard_bundle(registry, list(registry), {}, concurrency) if registry else None
+
+        report = {
+            "period_id": period_id,
+            "warmed": list(bundle["widgets"]) if bundle else [],
+            "failed": bundle["errors"] if bundle else {},
+            "total": len(registry),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S")
+        }
+        last_warmup_report = report
+
+        if period_id is None:
+            logger.info("[CACHE-WARMUP] No active evaluation period - nothing to warm")
+        else:
+            logger.info(
+                f"[CACHE-WARMUP] Period {period_id}: warmed {len(report['warmed'])}/{report['total']} "
+                f"keys in {report['duration_ms']} ms ({len(report['failed'])} failed)"
+            )
+            for name, error in report["failed"].items():
+                logger.warning(f"[CACHE-WARMUP] {name}: {error['status_code']} {error['detail']}")
+        return report
+
+async def warm_caches_in_background(period_id: Optional[int] = None) -> None:
+    """Background task entry point - a failed warm-up only costs cold caches"""
+    try:
+        await CacheWarmupService.warm_period_caches(period_id)
+    except Exception as e:
+        logger.error(f"[CACHE-WARMUP] Failed: {e}")
+
+def _warm_after_remote_activation(period_id: int) -> None:
+    """on_activation callback: warm this worker's caches for a period activated elsewhere"""
+    logger.info(f"[CACHE-WARMUP] Period {period_id} was activated by another worker - warming this one")
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # Called from a threadpool handler: run the warm-up on its own loop
+        threading.Thread(
+            target=asyncio.run, args=(warm_caches_in_background(period_id),), daemon=True
+        ).start()
+        return
+    task = loop.create_task(warm_caches_in_background(period_id))
+    _remote_warmups.add(task)
+    task.add_done_callback(_remote_warmups.discard)
+
+on_activation(_warm_after_remote_activation)
@@ -0,0 +1,160 @@
+"""
+Dashboard Bundle Service
+Builds several dashboard widgets in one request.
+
+Each widget is an existing route handler, or the part of one that runs after the
+caller's Secretary/DepartmentHead row is looked up (it takes that row as
+`principal`). The bundle resolves the caller and the evaluation period once, then
+runs the handlers concurrently on the read pool -
+one session per widget, capped by DASHBOARD_BUNDLE_CONCURRENCY - and returns all
+widget payloads together so the frontend makes a single (gzipped) round-trip.
+"""
+
+from fastapi import HTTPException
+from fastapi.params import Param
+from sqlalchemy.orm import Session
+from database.connection import ReadSessionLocal
+from models.enhanced_models import EvaluationPeriod
+from services.active_period import ActivePeriodResolver
+from typing import Any, Callable, Dict, List, Optional
+import asyncio
+import inspect
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# Widgets built at the same time per bundle (each holds one read-pool connection)
+DASHBOARD_BUNDLE_CONCURRENCY = int(os.getenv("DASHBOARD_BUNDLE_CONCURRENCY", "4"))
+
+# Handler argument for the caller's resolved row, passed as is (None = no such row)
+PRINCIPAL_ARG = "principal"
+
+def parse_widgets(widgets: Optional[str], registry: Dict[str, Dict[str, Any]]) -> List[str]:
+    """
+    Parse a comma-separated widget list against a registry
+
+    Args:
+        widgets: e.g. "dashboard,completion-rates" (None/empty = every widget)
+        registry: Widget name -> {"handler": ..., "params": {...}}
+
+    Returns:
+        Requested widget names in request order, without duplicates
+
+    Raises:
+        HTTPException 400 for unknown widget names
+    """
+    if not widgets:
+        return list(registry.keys())
+
+    names = []
+    for name in widgets.split(","):
+        name = name.strip()
+        if name and name not in names:
+            names.append(name)
+
+    unknown = [name for name in names if name not in registry]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown widget(s): {', '.join(unknown)}. Available: {', '.join(registry.keys())}"
+        )
+    return names
+
+def resolve_period_id(db: Session, period_id: Optional[int] = None) -> Optional[int]:
+    """
+    Resolve the evaluation period shared by every widget in a bundle
+
+    Args:
+        db: Database session
+        period_id: Explicit period (validated), or None for the active period
+
+    Returns:
+        Period ID, or None when no period is active
+    """
+    if period_id:
+        period = db.query(EvaluationPeriod.id).filter(EvaluationPeriod.id == period_id).first()
+        if not period:
+            raise HTTPException(status_code=404, detail="Evaluation period not found")
+        return period.id
+
+    return ActivePeriodResolver.resolve_id(db)
+
+def _handler_kwargs(handler: Callable, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Build handler arguments from bundle params, falling back to the route's Query defaults"""
+    kwargs = {}
+    for name, parameter in inspect.signature(handler).parameters.items():
+        if name == "db":
+            continue
+        if name == PRINCIPAL_ARG:
+            kwargs[name] = params.get(name)
+            continue
+        if params.get(name) is not None:
+            kwargs[name] = params[name]
+            continue
+
+        default = parameter.default
+        if isinstance(default, Param):
+            if default.is_required():
+                raise HTTPException(status_code=400, detail=f"Missing required parameter: {name}")
+            default = default.default
+        elif default is inspect.Parameter.empty:
+            raise HTTPException(status_code=400, detail=f"Missing required parameter: {name}")
+        kwargs[name] = default
+    return kwargs
+
+def _run_widget(handler: Callable, kwargs: Dict[str, Any]) -> Any:
+    """Run one async route handler to completion with its own read session (worker thread)"""
+    db = ReadSessionLocal()
+    try:
+        return asyncio.run(handler(db=db, **kwargs))
+    finally:
+        db.close()
+
+async def build_dashboard_bundle(
+    registry: Dict[str, Dict[str, Any]],
+    widgets: List[str],
+    params: Dict[str, Any],
+    concurrency: int = DASHBOARD_BUNDLE_CONCURRENCY
+) -> Dict[str, Any]:
+    """
+    Build the requested widgets concurrently
+
+    Args:
+        registry: Widget name -> {"handler": route handler, "params": per-widget overrides}
+        widgets: Widget names to build (see parse_widgets)
+        params: Shared handler arguments (user_id, principal, period_id, filters)
+        concurrency: Maximum widgets built at once
+
+    Returns:
+        {"widgets": {name: payload}, "errors": {name: {...}}, "timings_ms": {name: ms}}
+        A failing widget is reported under "errors" without failing the bundle.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    results: Dict[str, Any] = {}
+    errors: Dict[str, Any] = {}
+    timings: Dict[str, float] = {}
+
+    async def build(name: str):
+        entry = registry[name]
+        started = time.perf_counter()
+        try:
+            kwargs = _handler_kwargs(entry["handler"], {**params, **entry.get("params", {})})
+            async with semaphore:
+                results[name] = await asyncio.to_thread(_run_widget, entry["handler"], kwargs)
+        except HTTPException as e:
+            errors[name] = {"status_code": e.status_code, "detail": e.detail}
+        except Exception as e:
+            logger.error(f"Error building dashboard widget {name}: {e}")
+            errors[name] = {"status_code": 500, "detail": str(e)}
+        finally:
+            timings[name] = round((time.perf_counter() - started) * 1000, 1)
+
+    await asyncio.gather(*(build(name) for name in widgets))
+
+    return {
+        "widgets": {name: results[name] for name in widgets if name in results},
+        "errors": errors,
+        "timings_ms": timings
+    }
@@ -0,0 +1,223 @@
+"""
+Dashboard Statistics Engine
+Computes the admin dashboard headline numbers in a single statement.
+
+User, catalog, evaluation, enrollment and sentiment counts use FILTER (WHERE ...)
+aggregates; per-program rows and their grand totals come from GROUPING SETS.
+Results are scoped to an evaluation period - the active one unless told otherwise.
+"""
+
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from pydantic import BaseModel
+from typing import Optional, List
+import logging
+
+logger = logging.getLogger(__name__)
+
+class UserRoleStats(BaseModel):
+    students: int = 0
+    department_heads: int = 0
+    secretaries: int = 0
+    admins: int = 0
+    instructors: int = 0
+
+class SentimentStats(BaseModel):
+    positive: int = 0
+    neutral: int = 0
+    negative: int = 0
+
+class ProgramStats(BaseModel):
+    program_id: int
+    program_code: str
+    program_name: Optional[str] = None
+    courses: int = 0
+    students: int = 0
+    evaluations: int = 0
+    enrollments: int = 0
+
+class DashboardStats(BaseModel):
+    period_id: Optional[int] = None
+    period_name: Optional[str] = None
+    period_status: Optional[str] = None
+    total_users: int = 0
+    active_users: int = 0
+    user_roles: UserRoleStats = UserRoleStats()
+    total_courses: int = 0
+    total_programs: int = 0
+    total_class_sections: int = 0
+    total_evaluations: int = 0
+    total_enrollments: int = 0
+    participation_rate: float = 0
+    sentiment: SentimentStats = SentimentStats()
+    programs: List[ProgramStats] = []
+
+# Rows with scope = 'program' carry per-program numbers; the single 'total' row
+# carries grand totals plus the user and catalog counts.
+# :period_id NULL with :use_active = true resolves the active period in-query.
+DASHBOARD_STATS_QUERY = text("""
+    WITH scope_period AS (
+        SELECT id, name, status
+        FROM evaluation_periods
+        WHERE id = COALESCE(
+            CAST(:period_id AS INTEGER),
+            CASE WHEN :use_active THEN (
+                SELECT id FROM evaluation_periods
+                WHERE status IN ('active', 'Open')
+                ORDER BY start_date DESC
+                LIMIT 1
+            ) END
+        )
+    ),
+    user_counts AS (
+        SELECT
+            COUNT(*) AS total_users,
+            COUNT(*) FILTER (WHERE is_active) AS active_users,
+            COUNT(*) FILTER (WHERE role = 'student') AS students,
+            COUNT(*) FILTER (WHERE role = 'department_head') AS department_heads,
+            COUNT(*) FILTER (WHERE role = 'secretary') AS secretaries,
+            COUNT(*) FILTER (WHERE role = 'admin') AS admins,
+            COUNT(*) FILTER (WHERE role = 'instructor') AS instructors
+        FROM users
+    ),
+    course_counts AS (
+        SELECT program_id, GROUPING(program_id) AS is_total, COUNT(*) AS courses
+        FROM courses
+        GROUP BY GROUPING SETS ((program_id), ())
+    ),
+    student_counts AS (
+        SELECT program_id, GROUPING(program_id) AS is_total, COUNT(*) AS students
+        FROM students
+        GROUP BY GROUPING SETS ((program_id), ())
+    ),
+    evaluation_counts AS (
+        SELECT
+            s.program_id,
+            GROUPING(s.program_id) AS is_total,
+            COUNT(*) FILTER (WHERE ev.submission_date IS NOT NULL) AS evaluations,
+            COUNT(*) FILTER (WHERE ev.submission_date IS NOT NULL AND LOWER(ev.sentiment) = 'positive') AS positive,
+            COUNT(*) FILTER (WHERE ev.submission_date IS NOT NULL AND LOWER(ev.sentiment) = 'neutral') AS neutral,
+            COUNT(*) FILTER (WHERE ev.submission_date IS NOT NULL AND LOWER(ev.sentiment) = 'negative') AS negative
+        FROM evaluations ev
+        JOIN students s ON s.id = ev.student_id
+        WHERE NOT EXISTS (SELECT 1 FROM scope_period)
+        OR ev.evaluation_period_id = (SELECT id FROM scope_period)
+        GROUP BY GROUPING SETS ((s.program_id), ())
+    ),
+    enrollment_counts AS (
+        SELECT s.program_id, GROUPING(s.program_id) AS is_total, COUNT(*) AS enrollments
+        FROM enrollments en
+        JOIN students s ON s.id = en.student_id
+        WHERE NOT EXISTS (SELECT 1 FROM scope_period)
+        OR en.evaluation_period_id = (SELECT id FROM scope_period)
+        GROUP BY GROUPING SETS ((s.program_id), ())
+    )
+    SELECT
+        'program' AS scope,
+        p.id AS program_id,
+        p.program_code,
+        p.program_name,
+        COALESCE(cc.courses, 0) AS courses,
+        COALESCE(sc.students, 0) AS students,
+        COALESCE(ec.evaluations, 0) AS evaluations,
+        COALESCE(en.enrollments, 0) AS enrollments,
+        0 AS positive, 0 AS neutral, 0 AS negative,
+        NULL::INTEGER AS period_id, NULL::VARCHAR AS period_name, NULL::VARCHAR AS period_status,
+        0 AS total_users, 0 AS active_users,
+        0 AS role_students, 0 AS role_department_heads, 0 AS role_secretaries,
+        0 AS role_admins, 0 AS role_instructors,
+        0 AS total_programs, 0 AS total_class_sections
+    FROM programs p
+    LEFT JOIN course_counts cc ON cc.is_total = 0 AND cc.program_id = p.id
+    LEFT JOIN student_counts sc ON sc.is_total = 0 AND sc.program_id = p.id
+    LEFT JOIN evaluation_counts ec ON ec.is_total = 0 AND ec.program_id = p.id
+    LEFT JOIN enrollment_counts en ON en.is_total = 0 AND en.program_id = p.id
+
+    UNION ALL
+
+    SELECT
+        'total',
+        NULL, NULL, NULL,
+        COALESCE((SELECT courses FROM course_counts WHERE is_total = 1), 0),
+        COALESCE((SELECT students FROM student_counts WHERE is_total = 1), 0),
+        COALESCE((SELECT evaluations FROM evaluation_counts WHERE is_total = 1), 0),
+        COALESCE((SELECT enrollments FROM enrollment_counts WHERE is_total = 1), 0),
+        COALESCE((SELECT positive FROM evaluation_counts WHERE is_total = 1), 0),
+        COALESCE((SELECT neutral FROM evaluation_counts WHERE is_total = 1), 0),
+        COALESCE((SELECT negative FROM evaluation_counts WHERE is_total = 1), 0),
+        (SELECT id FROM scope_period),
+        (SELECT name FROM scope_period),
+        (SELECT status FROM scope_period),
+        uc.total_users, uc.active_users,
+        uc.students, uc.department_heads, uc.secretaries, uc.admins, uc.instructors,
+        (SELECT COUNT(*) FROM programs),
+        (SELECT COUNT(*) FROM class_sections)
+    FROM user_counts uc
+""")
+
+class DashboardStatsService:
+    """
+    Consolidated statistics for the admin dashboards
+    """
+
+    @staticmethod
+    def get_stats(db: Session, period_id: Optional[int] = None, use_active_period: bool = True) -> DashboardStats:
+        """
+        Compute dashboard statistics in one round-trip
+
+        Args:
+            db: Database session
+            period_id: Evaluation period to scope evaluation/enrollment counts to
+            use_active_period: When period_id is None, scope to the active period
+                               (False = count across all periods)
+
+        Returns:
+            DashboardStats with headline counts and per-program rows
+        """
+        rows = db.execute(DASHBOARD_STATS_QUERY, {
+            "period_id": period_id,
+            "use_active": use_active_period
+        }).fetchall()
+
+        stats = DashboardStats()
+        for row in rows:
+            if row.scope == "program":
+                stats.programs.append(ProgramStats(
+                    program_id=row.program_id,
+                    program_code=row.program_code,
+                    program_name=row.program_name,
+                    courses=row.courses,
+                    students=row.students,
+                    evaluations=row.evaluations,
+                    enrollments=row.enrollments
+                ))
+                continue
+
+            stats.period_id = row.period_id
+            stats.period_name = row.period_name
+            stats.period_status = row.period_status
+            stats.total_users = row.total_users
+            stats.active_users = row.active_users
+            stats.user_roles = UserRoleStats(
+                students=row.role_students,
+                department_heads=row.role_department_heads,
+                secretaries=row.role_secretaries,
+                admins=row.role_admins,
+                instructors=row.role_instructors
+            )
+            stats.total_courses = row.courses
+            stats.total_programs = row.total_programs
+            stats.total_class_sections = row.total_class_sections
+            stats.total_evaluations = row.evaluations
+            stats.total_enrollments = row.enrollments
+            stats.sentiment = SentimentStats(
+                positive=row.positive,
+                neutral=row.neutral,
+                negative=row.negative
+            )
+
+        stats.programs.sort(key=lambda p: p.program_code)
+        if stats.total_enrollments > 0:
+            stats.participation_rate = round(stats.total_evaluations / stats.total_enrollments * 100, 1)
+
+        return stats
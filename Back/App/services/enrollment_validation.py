@@ -5,11 +5,67 @@ Validates student information against official enrollment records
 
 from sqlalchemy.orm import Session
 from sqlalchemy import text
-from typing import Optional, Dict
+from typing import Optional, Dict, List, NamedTuple, Tuple
+from services.people_search import PeopleSearchService, SEARCH_MAX_RESULTS
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
+def normalize_name(name: Optional[str]) -> str:
+    """Lower-case and collapse whitespace for name comparison"""
+    return " ".join((name or "").lower().split())
+
+def names_match(provided: str, enrolled: str) -> bool:
+    """Normalized names match when either contains the other (nothing provided = match)"""
+    return not provided or enrolled in provided or provided in enrolled
+
+def _not_in_list_result(student_number: str) -> Dict:
+    return {
+        "valid": False,
+        "error": "STUDENT_NOT_IN_ENROLLMENT_LIST",
+        "message": f"Student number '{student_number}' not found in official enrollment list. Please contact registrar.",
+        "suggestion": "Student must be pre-registered in the enrollment list before creating an account."
+    }
+
+def _program_mismatch_result(
+    student_number: str,
+    enrolled_program: Tuple[int, str, str],
+    attempted_program: Tuple[int, str, str]
+) -> Dict:
+    """enrolled_program / attempted_program: (id, code, name)"""
+    return {
+        "valid": False,
+        "error": "PROGRAM_MISMATCH",
+        "message": f"Program mismatch! Student '{student_number}' is enrolled in {enrolled_program[1]}, not {attempted_program[1]}.",
+        "enrolled_program": {
+            "id": enrolled_program[0],
+            "code": enrolled_program[1],
+            "name": enrolled_program[2]
+        },
+        "attempted_program": {
+            "id": attempted_program[0],
+            "code": attempted_program[1],
+            "name": attempted_program[2]
+        },
+        "suggestion": f"Please select program: {enrolled_program[1]} - {enrolled_program[2]}"
+    }
+
+def _name_warnings(
+    first_name: Optional[str],
+    last_name: Optional[str],
+    enrolled_first_name: str,
+    enrolled_last_name: str,
+    first_name_ok: bool,
+    last_name_ok: bool
+) -> Optional[List[str]]:
+    warnings = []
+    if not first_name_ok:
+        warnings.append(f"First name mismatch: Provided '{first_name}', Expected '{enrolled_first_name}'")
+    if not last_name_ok:
+        warnings.append(f"Last name mismatch: Provided '{last_name}', Expected '{enrolled_last_name}'")
+    return warnings or None
+
 class EnrollmentValidationService:
     """
     Validates student data against official enrollment list
@@ -60,12 +116,7 @@ class EnrollmentValidationService:
         """), {"student_number": student_number}).fetchone()
         
         if not enrollment:
-            return {
-                "valid": False,
-                "error": "STUDENT_NOT_IN_ENROLLMENT_LIST",
-                "message": f"Student number '{student_number}' not found in official enrollment list. Please contact registrar.",
-                "suggestion": "Student must be pre-registered in the enrollment list before creating an account."
-            }
+            return _not_in_list_result(student_number)
         
         # Extract enrollment data (indexes updated - year_level removed from enrollment_list)
         # Query columns: id(0), student_number(1), first_name(2), last_name(3), middle_name(4), 
@@ -87,32 +138,18 @@ class EnrollmentValidationService:
                 WHERE id = :program_id
             """), {"program_id": program_id}).fetchone()
             
-            attempted_program = program_result[0] if program_result else "Unknown"
-            
-            return {
-                "valid": False,
-                "error": "PROGRAM_MISMATCH",
-                "message": f"Program mismatch! Student '{student_number}' is enrolled in {enrolled_program_code}, not {attempted_program}.",
-                "enrolled_program": {
-                    "id": enrolled_program_id,
-                    "code": enrolled_program_code,
-                    "name": enrolled_program_name
-                },
-                "attempted_program": {
-                    "id": program_id,
-                    "code": attempted_program,
-                    "name": program_result[1] if program_result else "Unknown"
-                },
-                "suggestion": f"Please select program: {enrolled_program_code} - {enrolled_program_name}"
-            }
+            return _program_mismatch_result(
+                student_number,
+                (enrolled_program_id, enrolled_program_code, enrolled_program_name),
+                (program_id, program_result[0], program_result[1]) if program_result else (program_id, "Unknown", "Unknown")
+            )
         
         # Validate name if provided (case-insensitive partial match)
-        name_warnings = []
-        if first_name and enrolled_first_name.lower() not in first_name.lower() and first_name.lower() not in enrolled_first_name.lower():
-            name_warnings.append(f"First name mismatch: Provided '{first_name}', Expected '{enrolled_first_name}'")
-        
-        if last_name and enrolled_last_name.lower() not in last_name.lower() and last_name.lower() not in enrolled_last_name.lower():
-            name_warnings.append(f"Last name mismatch: Provided '{last_name}', Expected '{enrolled_last_name}'")
+        name_warnings = _name_warnings(
+            first_name, last_name, enrolled_first_name, enrolled_last_name,
+            names_match(normalize_name(first_name), normalize_name(enrolled_first_name)),
+            names_match(normalize_name(last_name), normalize_name(enrolled_last_name))
+        )
         
         return {
             "valid": True,
@@ -128,7 +165,7 @@ class EnrollmentValidationService:
                 "college_code": enrolled_college,
                 "college_name": enrollment[8]
             },
-            "warnings": name_warnings if name_warnings else None,
+            "warnings": name_warnings,
             "message": "Student validated successfully against enrollment list"
         }
     
@@ -198,7 +235,7 @@ class EnrollmentValidationService:
         
         Args:
             db: Database session
-            query: Search by name or student number
+            query: Search by name, email or student number (ranked, capped at SEARCH_MAX_RESULTS)
             program_id: Filter by program
             college_code: Filter by college
             status: Filter by status (default: active)
@@ -234,14 +271,14 @@ class EnrollmentValidationService:
             sql += " AND e.status = :status"
             params["status"] = status
         
-        if query:
-            sql += """ AND (
-                LOWER(e.student_number) LIKE LOWER(:query) OR
-                LOWER(e.first_name) LIKE LOWER(:query) OR
-                LOWER(e.last_name) LIKE LOWER(:query) OR
-                LOWER(CONCAT(e.first_name, ' ', e.last_name)) LIKE LOWER(:query)
-            )"""
-            params["query"] = f"%{query}%"
+        search = PeopleSearchService.enrollment_list_clause(db, query)
+        if search:
+            search_condition, order_by, search_params = search
+            sql += f" AND {search_condition}"
+            params.update(search_params)
+            limit = min(limit, SEARCH_MAX_RESULTS)
+        else:
+            order_by = "e.college_code, e.student_number"
         
         if program_id:
             sql += " AND e.program_id = :program_id"
@@ -251,7 +288,7 @@ class EnrollmentValidationService:
             sql += " AND e.college_code = :college_code"
             params["college_code"] = college_code
         
-        sql += " ORDER BY e.college_code, e.student_number LIMIT :limit"
+        sql += f" ORDER BY {order_by} LIMIT :limit"
         params["limit"] = limit
         
         results = db.execute(text(sql), params).fetchall()
@@ -295,3 +332,155 @@ class EnrollmentValidationService:
             return result[0] > 0 if result else False
         except Exception:
             return False
+
+
+class EnrolledStudent(NamedTuple):
+    """One active enrollment_list row with pre-normalized names"""
+    id: int
+    student_number: str
+    first_name: str
+    last_name: str
+    middle_name: Optional[str]
+    email: Optional[str]
+    program_id: int
+    college_code: str
+    college_name: str
+    first_name_key: str
+    last_name_key: str
+
+
+class EnrollmentIndex:
+    """
+    Resident snapshot of the active enrollment list for bulk validation
+    
+    Loaded with one query and kept per process. get_enrollment_index() compares a
+    cheap fingerprint of enrollment_list and programs before every use and
+    reloads when it changed (upload_enrollment_list also invalidates it directly),
+    so validations are dictionary lookups instead of two queries per student.
+    """
+    
+    def __init__(self, students: Dict[str, EnrolledStudent], programs: Dict[int, Tuple[str, str]], version: tuple):
+        self.students = students
+        self.programs = programs
+        self.version = version
+    
+    @staticmethod
+    def fingerprint(db: Session) -> tuple:
+        """Changes whenever enrollment rows or programs are added, removed or edited"""
+        row = db.execute(text("""
+            SELECT
+                (SELECT COUNT(*) FROM enrollment_list),
+                (SELECT COUNT(*) FROM enrollment_list WHERE status = 'active'),
+                (SELECT MAX(id) FROM enrollment_list),
+                (SELECT MAX(updated_at) FROM enrollment_list),
+                (SELECT md5(string_agg(id || ':' || program_code || ':' || COALESCE(program_name, ''), ',' ORDER BY id)) FROM programs)
+        """)).fetchone()
+        return tuple(row)
+    
+    @classmethod
+    def load(cls, db: Session, version: Optional[tuple] = None) -> "EnrollmentIndex":
+        """Read every active enrollment row and program once"""
+        version = version or cls.fingerprint(db)
+        
+        rows = db.execute(text("""
+            SELECT id, student_number, first_name, last_name, middle_name, email,
+                   program_id, college_code, college_name
+            FROM enrollment_list
+            WHERE status = 'active'
+        """)).fetchall()
+        students = {
+            row[1]: EnrolledStudent(*row, normalize_name(row[2]), normalize_name(row[3]))
+            for row in rows
+        }
+        
+        programs = {
+            row[0]: (row[1], row[2])
+            for row in db.execute(text("SELECT id, program_code, program_name FROM programs")).fetchall()
+        }
+        
+        logger.info(f"Loaded enrollment index: {len(students)} active students")
+        return cls(students, programs, version)
+    
+    def validate_batch(self, rows: List[Tuple[Optional[str], Optional[int], Optional[str], Optional[str]]]) -> List[Dict]:
+        """
+        Validate many students at once
+        
+        Args:
+            rows: (student_number, program_id, first_name, last_name) per student;
+                  program_id None accepts the enrolled program
+        
+        Returns:
+            One result per row, equal to validate_student_enrollment() for the same input
+        """
+        # Exact student numbers, and only rows whose program exists - the per-row query
+        # matches student_number as given and INNER JOINs programs
+        records = [self.students.get(row[0]) for row in rows]
+        records = [record if record and record.program_id in self.programs else None for record in records]
+        
+        # Name checks for the whole batch in one pass over pre-normalized keys
+        first_ok = [
+            record is None or names_match(normalize_name(row[2]), record.first_name_key)
+            for row, record in zip(rows, records)
+        ]
+        last_ok = [
+            record is None or names_match(normalize_name(row[3]), record.last_name_key)
+            for row, record in zip(rows, records)
+        ]
+        
+        results = []
+        for (student_number, program_id, first_name, last_name), record, first_name_ok, last_name_ok in zip(rows, records, first_ok, last_ok):
+            if record is None:
+                results.append(_not_in_list_result(student_number))
+                continue
+            
+            enrolled_code, enrolled_name = self.programs[record.program_id]
+            if program_id is not None and record.program_id != program_id:
+                attempted_code, attempted_name = self.programs.get(program_id, ("Unknown", "Unknown"))
+                results.append(_program_mismatch_result(
+                    student_number,
+                    (record.program_id, enrolled_code, enrolled_name),
+                    (program_id, attempted_code, attempted_name)
+                ))
+                continue
+            
+            results.append({
+                "valid": True,
+                "enrollment": {
+                    "student_number": student_number,
+                    "first_name": record.first_name,
+                    "last_name": record.last_name,
+                    "middle_name": record.middle_name,
+                    "email": record.email,
+                    "program_id": record.program_id,
+                    "program_code": enrolled_code,
+                    "program_name": enrolled_name,
+                    "college_code": record.college_code,
+                    "college_name": record.college_name
+                },
+                "warnings": _name_warnings(
+                    first_name, last_name, record.first_name, record.last_name,
+                    first_name_ok, last_name_ok
+                ),
+                "message": "Student validated successfully against enrollment list"
+            })
+        
+        return results
+
+
+_enrollment_index: Optional[EnrollmentIndex] = None
+_enrollment_index_lock = threading.Lock()
+
+def get_enrollment_index(db: Session) -> EnrollmentIndex:
+    """Current enrollment index, reloaded only when the enrollment list changed"""
+    global _enrollment_index
+    version = EnrollmentIndex.fingerprint(db)
+    with _enrollment_index_lock:
+        if _enrollment_index is None or _enrollment_index.version != version:
+            _enrollment_index = EnrollmentIndex.load(db, version)
+        return _enrollment_index
+
+def invalidate_enrollment_index() -> None:
+    """Drop the resident index (call after changing enrollment_list)"""
+    global _enrollment_index
+    with _enrollment_index_lock:
+        _enrollment_index = None
@@ -0,0 +1,284 @@
+"""
+Evaluation Answers
+Canonical question order for the 31-question evaluation form and SQL aggregations
+over the compact evaluations.answers column.
+
+evaluations.ratings keeps the submitted JSONB (descriptive keys such as
+"relevance_subject_knowledge"); evaluations.answers (SMALLINT[31], migration 25)
+holds the same ratings in question order, written on submit and kept in sync by a
+trigger for other writers. Distributions and category averages are computed in
+one unnest ... WITH ORDINALITY query instead of mapping JSONB keys in Python.
+"""
+
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Question order - must match evaluation_answers_from_ratings() in migration 25
+QUESTION_KEYS = (
+    # Relevance of Course (1-6)
+    "relevance_subject_knowledge",
+    "relevance_practical_skills",
+    "relevance_team_work",
+    "relevance_leadership",
+    "relevance_communication",
+    "relevance_positive_attitude",
+    # Course Organization (7-11)
+    "org_curriculum",
+    "org_ilos_known",
+    "org_ilos_clear",
+    "org_ilos_relevant",
+    "org_no_overlapping",
+    # Teaching-Learning (12-18)
+    "teaching_tlas_useful",
+    "teaching_ila_useful",
+    "teaching_tlas_sequenced",
+    "teaching_applicable",
+    "teaching_motivated",
+    "teaching_team_work",
+    "teaching_independent",
+    # Assessment (19-24)
+    "assessment_start",
+    "assessment_all_topics",
+    "assessment_number",
+    "assessment_distribution",
+    "assessment_allocation",
+    "assessment_feedback",
+    # Learning Environment (25-30)
+    "environment_classrooms",
+    "environment_library",
+    "environment_laboratory",
+    "environment_computer",
+    "environment_internet",
+    "environment_facilities_availability",
+    # Counseling (31)
+    "counseling_available"
+)
+
+QUESTION_COUNT = len(QUESTION_KEYS)
+
+QUESTION_NUMBERS = {key: number for number, key in enumerate(QUESTION_KEYS, start=1)}
+
+QUESTION_TEXTS = {
+    "1": "The course helped me to develop relevant subject knowledge",
+    "2": "The course helped me to develop related practical skills",
+    "3": "The course helped me to develop team working skills",
+    "4": "The course helped me to develop leadership skills",
+    "5": "The course helped me to develop communication skills",
+    "6": "The course helped me to develop positive attitude on my program of study",
+    "7": "The course was implemented according to the approved curriculum",
+    "8": "Intended Learning Outcomes (ILOs) of the course were made known from the beginning",
+    "9": "Intended Learning Outcomes (ILOs) of the course were clear",
+    "10": "Intended Learning Outcomes (ILOs) of the course were relevant",
+    "11": "There were no overlapping of contents within a course",
+    "12": "Teaching - Learning Activities (TLAs) such as practical, educational tour etc. were useful and relevant",
+    "13": "Independent Learning (ILs) activities such as journal reading, research work, project, etc. were useful and relevant",
+    "14": "The TLAs within a course were sequenced in a logical manner",
+    "15": "Team teaching is done applicable",
+    "16": "The teachers motivated the students to learn",
+    "17": "The teachers provided adequate opportunities for team work",
+    "18": "The teachers provided adequate opportunities for independent learning",
+    "19": "Assessment methods to be used were told at the beginning of the course",
+    "20": "Assessments covered all the topics taught in the course",
+    "21": "The number of assessments was appropriate and adequate",
+    "22": "Distribution of assessments over a semester was appropriate",
+    "23": "Allocation of marks/grade among assessments was satisfactory",
+    "24": "The teachers provided timely feedback on student performance",
+    "25": "Available facilities in the classrooms were satisfactory",
+    "26": "Available library facilities were adequate",
+    "27": "Available laboratory facilities were adequate",
+    "28": "Access to computer facilities were sufficient",
+    "29": "There was sufficient access to internet and electronic databases",
+    "30": "Availability of facilities for recreation was adequate",
+    "31": "The teachers were available for consultation whenever needed"
+}
+
+CATEGORIES = {
+    "relevance_of_course": {
+        "name": "Relevance of Course",
+        "questions": ["1", "2", "3", "4", "5", "6"],
+        "description": "Development of skills and knowledge"
+    },
+    "course_organization": {
+        "name": "Course Organization and ILOs",
+        "questions": ["7", "8", "9", "10", "11"],
+        "description": "Course structure and learning outcomes"
+    },
+    "teaching_learning": {
+        "name": "Teaching - Learning",
+        "questions": ["12", "13", "14", "15", "16", "17", "18"],
+        "description": "Teaching methods and activities"
+    },
+    "assessment": {
+        "name": "Assessment",
+        "questions": ["19", "20", "21", "22", "23", "24"],
+        "description": "Assessment methods and feedback"
+    },
+    "learning_environment": {
+        "name": "Learning Environment",
+        "questions": ["25", "26", "27", "28", "29", "30"],
+        "description": "Facilities and learning resources"
+    },
+    "counseling": {
+        "name": "Counseling",
+        "questions": ["31"],
+        "description": "Consultation and support"
+    }
+}
+
+RATING_SCALE = ("1", "2", "3", "4")
+
+def ratings_to_answers(ratings: Optional[Dict[str, Any]]) -> Optional[List[Optional[int]]]:
+    """
+    Convert a ratings dict (descriptive or "1".."31" keys) to the answers array
+
+    Ratings outside 1-4 become None. Returns None when no question was answered.
+    """
+    if not ratings or not isinstance(ratings, dict):
+        return None
+
+    answers: List[Optional[int]] = [None] * QUESTION_COUNT
+    for key, value in ratings.items():
+        number = QUESTION_NUMBERS.get(key) or (int(key) if str(key).isdigit() else None)
+        if not number or number > QUESTION_COUNT:
+            continue
+        if isinstance(value, (int, float)) and not isinstance(value, bool) and value in (1, 2, 3, 4):
+            answers[number - 1] = int(value)
+
+    return answers if any(answer is not None for answer in answers) else None
+
+def answers_to_ratings(answers: Optional[List[Optional[int]]]) -> Dict[str, int]:
+    """Answers array -> {"1": 4, "2": 3, ...} (unanswered questions omitted)"""
+    return {
+        str(number): answer
+        for number, answer in enumerate(answers or [], start=1)
+        if answer is not None
+    }
+
+class EvaluationAnswerService:
+    """
+    SQL aggregations over evaluations.answers
+    """
+
+    @staticmethod
+    def answer_counts(
+        db: Session,
+        section_id: Optional[int] = None,
+        course_id: Optional[int] = None,
+        period_id: Optional[int] = None,
+        completed_only: bool = False,
+        enrolled_only: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Count answers per question and rating for the evaluations of a section or course
+
+        The evaluations are selected and aggregated in one statement; the summary
+        row (count, overall average) comes back alongside the per-question counts.
+
+        Args:
+            section_id: Evaluations of this class section
+            course_id: Evaluations of every section of this course
+            period_id: Only evaluations whose enrollment belongs to this period
+            completed_only: Only evaluations with status 'completed'
+            enrolled_only: Only evaluations with a matching enrollment (implied by period_id)
+
+        Returns:
+            {"total_evaluations": n, "average_overall": float|None,
+             "counts": {"1": {"1": c, ..., "4": c}, ..., "31": {...}}}
+        """
+        filters = []
+        params: Dict[str, Any] = {}
+        if section_id is not None:
+            filters.append("ev.class_section_id = :section_id")
+            params["section_id"] = section_id
+        if course_id is not None:
+            filters.append("ev.class_section_id IN (SELECT id FROM class_sections WHERE course_id = :course_id)")
+            params["course_id"] = course_id
+        if completed_only:
+            filters.append("ev.status = 'completed'")
+        if period_id or enrolled_only:
+            period_filter = "AND enr.evaluation_period_id = :period_id" if period_id else ""
+            filters.append(f"""EXISTS (
+                SELECT 1 FROM enrollments enr
+                WHERE enr.class_section_id = ev.class_section_id
+                AND enr.student_id = ev.student_id
+                {period_filter}
+            )""")
+            if period_id:
+                params["period_id"] = period_id
+        where = " AND ".join(filters) or "TRUE"
+
+        rows = db.execute(text(f"""
+            WITH selected AS (
+                SELECT ev.answers, ev.rating_overall
+                FROM evaluations ev
+                WHERE {where}
+            )
+            SELECT NULL AS question, NULL AS rating, COUNT(*) AS count, AVG(rating_overall) AS average
+            FROM selected
+            UNION ALL
+            SELECT a.question, a.rating, COUNT(*), NULL
+            FROM selected
+            CROSS JOIN LATERAL unnest(selected.answers) WITH ORDINALITY AS a(rating, question)
+            WHERE a.rating BETWEEN 1 AND 4
+            GROUP BY a.question, a.rating
+        """), params).fetchall()
+
+        counts = {str(number): {rating: 0 for rating in RATING_SCALE} for number in range(1, QUESTION_COUNT + 1)}
+        total, average = 0, None
+        for question, rating, count, row_average in rows:
+            if question is None:
+                total, average = count, row_average
+            else:
+                counts[str(question)][str(rating)] = count
+
+        return {
+            "total_evaluations": total,
+            "average_overall": float(average) if average is not None else None,
+            "counts": counts
+        }
+
+    @staticmethod
+    def question_distribution(counts: Dict[str, Dict[str, int]]) -> List[Dict[str, Any]]:
+        """Per-question distribution payload (count, percentage, average) from answer_counts()"""
+        questions = []
+        for number in range(1, QUESTION_COUNT + 1):
+            question_counts = counts[str(number)]
+            total = sum(question_counts.values())
+            questions.append({
+                "question_number": number,
+                "question_text": QUESTION_TEXTS[str(number)],
+                "distribution": {
+                    rating: {
+                        "count": question_counts[rating],
+                        "percentage": round(question_counts[rating] / total * 100, 1) if total else 0.0
+                    }
+                    for rating in RATING_SCALE
+                },
+                "total_responses": total,
+                "average": round(sum(int(rating) * question_counts[rating] for rating in RATING_SCALE) / total, 2) if total else 0.0
+            })
+        return questions
+
+    @staticmethod
+    def category_totals(counts: Dict[str, Dict[str, int]]) -> List[Tuple[str, Dict[str, Any], int, float]]:
+        """
+        Rating totals per category from answer_counts()
+
+        Returns:
+            [(category_id, category_info, rating_count, average)] for categories with ratings
+        """
+        totals = []
+        for category_id, category in CATEGORIES.items():
+            rating_count = 0
+            rating_sum = 0
+            for question in category["questions"]:
+                for rating in RATING_SCALE:
+                    rating_count += counts[question][rating]
+                    rating_sum += int(rating) * counts[question][rating]
+            if rating_count:
+                totals.append((category_id, category, rating_count, rating_sum / rating_count))
+        return totals
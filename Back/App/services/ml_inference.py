@@ -0,0 +1,314 @@
+"""
+ML Inference Worker
+Scores submitted evaluations (sentiment + anomaly) in one local process shared by the web workers.
+
+The worker owns the sklearn models (ml_services.loader) and listens on a Unix
+socket (ML_INFERENCE_SOCKET) for newline-delimited JSON requests. Concurrent
+requests from all web workers are micro-batched: a batch is scored as soon as it
+holds ML_BATCH_MAX_SIZE items or ML_BATCH_MAX_WAIT_MS after its first item arrived,
+with one vectorized SentimentAnalyzer.predict_batch call and one
+AnomalyDetector.detect_batch call, so throughput grows with the batch size
+instead of with one model call per request. The socket is created with mode 0600.
+
+Web workers call score_evaluation(). When the socket is missing or the worker does
+not answer within ML_INFERENCE_TIMEOUT_MS, the evaluation is scored in-process
+instead (same function, lazy-loaded models), and without models the sentiment
+falls back to the average rating. gunicorn.conf.py starts the worker next to the
+web workers; run it by hand for `uvicorn --workers`.
+
+Usage:
+    python -m services.ml_inference                              # serve on ML_INFERENCE_SOCKET
+    python -m services.ml_inference --max-batch 32 --max-wait-ms 10
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from ml_services.loader import get_anomaly_detector, get_sentiment_analyzer
+from utils.metrics import ML_BATCH_SIZE, ML_INFERENCE_DURATION
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import signal
+import subprocess
+import sys
+import time
+
+logger = logging.getLogger(__name__)
+
+ML_INFERENCE_SOCKET = os.getenv("ML_INFERENCE_SOCKET", "/tmp/coursefeedback-ml.sock")
+# Flush a batch at this many evaluations...
+ML_BATCH_MAX_SIZE = int(os.getenv("ML_BATCH_MAX_SIZE", "64"))
+# ...or this long after its first evaluation arrived
+ML_BATCH_MAX_WAIT_MS = int(os.getenv("ML_BATCH_MAX_WAIT_MS", "5"))
+# Web side: give up on the worker and score in-process after this long
+ML_INFERENCE_TIMEOUT_MS = int(os.getenv("ML_INFERENCE_TIMEOUT_MS", "2000"))
+
+class EvaluationScore(NamedTuple):
+    sentiment: str
+    sentiment_score: float
+    is_anomaly: bool
+    anomaly_score: float
+    anomaly_reason: Optional[str]
+    ml_used: bool       # The sentiment model scored the comment (not the rating fallback)
+    processed: bool     # The anomaly detector ran - period finalization need not score it again
+
+def rating_sentiment(average: float) -> Tuple[str, float]:
+    """Sentiment from the average rating when there is no usable comment or model"""
+    if average >= 3.5:
+        return "positive", 0.8
+    elif average >= 2.5:
+        return "neutral", 0.7
+    return "negative", 0.8
+
+# ===========================
+# SCORING
+# ===========================
+
+def score_batch(items: List[Tuple[Optional[str], Dict[str, Any]]]) -> List[EvaluationScore]:
+    """Score (comment, ratings) pairs - one sentiment and one anomaly detector call for the whole batch"""
+    analyzer = get_sentiment_analyzer()
+    detector = get_anomaly_detector()
+
+    sentiments: Dict[int, Tuple[str, float]] = {}
+    positions = [index for index, (comment, _) in enumerate(items) if comment and comment.strip()]
+    if analyzer is not None and positions:
+        started = time.perf_counter()
+        try:
+            predicted = analyzer.predict_batch([items[index][0] for index in positions])
+            sentiments = {index: (str(label), float(confidence)) for index, (label, confidence) in zip(positions, predicted)}
+        except Exception as e:
+            logger.warning(f"[ML-INFERENCE] Sentiment model failed, using rating-based sentiment: {e}")
+        ML_INFERENCE_DURATION.labels(model="sentiment").observe(time.perf_counter() - started)
+
+    # Evaluations without numeric ratings are not checked for anomalies
+    rated = [index for index, (_, ratings) in enumerate(items)
+             if any(isinstance(value, (int, float)) for value in ratings.values())]
+    anomalies: Dict[int, Tuple[bool, float, str]] = {}
+    if detector is not None and rated:
+        started = time.perf_counter()
+        anomalies = dict(zip(rated, detector.detect_batch([items[index][1] for index in rated])))
+        ML_INFERENCE_DURATION.labels(model="anomaly").observe(time.perf_counter() - started)
+
+    scores = []
+    for index, (comment, ratings) in enumerate(items):
+        values = [value for value in ratings.values() if isinstance(value, (int, float))]
+        ml_used = index in sentiments
+        if ml_used:
+            sentiment, confidence = sentiments[index]
+        elif values:
+            sentiment, confidence = rating_sentiment(sum(values) / len(values))
+        else:
+            sentiment, confidence = "neutral", 0.5
+
+        is_anomaly, anomaly_score, anomaly_reason = anomalies.get(index, (False, 0.0, None))
+        scores.append(EvaluationScore(sentiment, float(confidence), bool(is_anomaly), float(anomaly_score),
+                                      anomaly_reason, ml_used, detector is not None))
+    return scores
+
+# ===========================
+# WORKER (server side)
+# ===========================
+
+class MicroBatcher:
+    """Collects concurrent requests and scores them together (flush on size or wait time)"""
+
+    def __init__(self, max_size: int = ML_BATCH_MAX_SIZE, max_wait_ms: int = ML_BATCH_MAX_WAIT_MS):
+        self.max_size = max(1, max_size)
+        self.max_wait = max_wait_ms / 1000
+        self._pending: List[Tuple[Tuple[Optional[str], Dict[str, Any]], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # One scoring thread: batches run in order while the next one fills up
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ml-inference")
+        self.stats = {"batches": 0, "items": 0}
+
+    def submit(self, comment: Optional[str], ratings: Dict[str, Any]) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append(((comment, ratings), future))
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        self.stats["batches"] += 1
+        self.stats["items"] += len(batch)
+        ML_BATCH_SIZE.labels(pipeline="inference").observe(len(batch))
+
+        scoring = asyncio.get_running_loop().run_in_executor(self._executor, score_batch, [item for item, _ in batch])
+
+        def deliver(done: asyncio.Future) -> None:
+            error = done.exception()
+            for index, (_, future) in enumerate(batch):
+                if future.done():
+                    continue
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(done.result()[index])
+        scoring.add_done_callback(deliver)
+
+async def _handle_connection(batcher: MicroBatcher, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """One web worker connection: requests in, responses out (matched by id, any order)"""
+    write_lock = asyncio.Lock()
+
+    async def answer(request_id: Any, future: asyncio.Future) -> None:
+        try:
+            response = {"id": request_id, "score": (await future)._asdict()}
+        except Exception as e:
+            response = {"id": request_id, "error": str(e)}
+        async with write_lock:
+            writer.write(json.dumps(response).encode() + b"\n")
+            await writer.drain()
+
+    tasks = set()
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            request = json.loads(line)
+            task = asyncio.create_task(answer(request["id"], batcher.submit(request.get("comment"), request.get("ratings") or {})))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+    except (ConnectionError, json.JSONDecodeError) as e:
+        logger.warning(f"[ML-INFERENCE] Dropping connection: {e}")
+    finally:
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        writer.close()
+
+async def serve(socket_path: str = ML_INFERENCE_SOCKET, max_size: int = ML_BATCH_MAX_SIZE,
+                max_wait_ms: int = ML_BATCH_MAX_WAIT_MS) -> None:
+    """Run the inference worker until cancelled"""
+    from ml_services.loader import warm_up
+    status = await asyncio.to_thread(warm_up)
+    batcher = MicroBatcher(max_size, max_wait_ms)
+
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    server = await asyncio.start_unix_server(lambda r, w: _handle_connection(batcher, r, w), path=socket_path)
+    # Only this user (the web workers) may connect - the default path is in shared /tmp
+    os.chmod(socket_path, 0o600)
+    # terminate() from gunicorn: stop serving and remove the socket
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    logger.info(f"[ML-INFERENCE] Serving on {socket_path} (batch {max_size} / {max_wait_ms} ms, models {status})")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        logger.info(f"[ML-INFERENCE] Stopped after {batcher.stats['items']} evaluations in {batcher.stats['batches']} batches")
+
+def start_worker_process(socket_path: str = ML_INFERENCE_SOCKET) -> subprocess.Popen:
+    """Start the worker next to the API (gunicorn.conf.py); stop it with terminate()"""
+    app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return subprocess.Popen([sys.executable, "-m", "services.ml_inference", "--socket", socket_path], cwd=app_dir)
+
+# ===========================
+# CLIENT (web workers)
+# ===========================
+
+class InferenceClient:
+    """One multiplexed connection per web worker event loop"""
+
+    def __init__(self, socket_path: str = ML_INFERENCE_SOCKET):
+        self.socket_path = socket_path
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._futures: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        self._lock: Optional[asyncio.Lock] = None
+        self._reader_task: Optional[asyncio.Task] = None
+
+    def available(self) -> bool:
+        return os.path.exists(self.socket_path)
+
+    async def _connect(self) -> asyncio.StreamWriter:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._lock = asyncio.Lock()
+            self._writer = None
+        async with self._lock:
+            if self._writer is None or self._writer.is_closing():
+                self._futures = {}
+                reader, self._writer = await asyncio.open_unix_connection(self.socket_path)
+                self._reader_task = asyncio.create_task(self._read_responses(reader, self._futures))
+            return self._writer
+
+    async def _read_responses(self, reader: asyncio.StreamReader, futures: Dict[int, asyncio.Future]) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                response = json.loads(line)
+                future = futures.pop(response["id"], None)
+                if future is None or future.done():
+                    continue
+                if "error" in response:
+                    future.set_exception(RuntimeError(response["error"]))
+                else:
+                    future.set_result(EvaluationScore(**response["score"]))
+        except Exception as e:
+            logger.warning(f"[ML-INFERENCE] Lost connection to the worker: {e}")
+        finally:
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("ML inference worker closed the connection"))
+            futures.clear()
+            if self._writer is not None and self._futures is futures:
+                self._writer.close()
+                self._writer = None
+
+    async def score(self, comment: Optional[str], ratings: Dict[str, Any]) -> EvaluationScore:
+        writer = await self._connect()
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._futures[request_id] = future
+        try:
+            async with self._lock:
+                writer.write(json.dumps({"id": request_id, "comment": comment, "ratings": ratings}).encode() + b"\n")
+                await writer.drain()
+            return await future
+        finally:
+            self._futures.pop(request_id, None)
+
+inference_client = InferenceClient()
+
+async def score_evaluation(comment: Optional[str], ratings: Dict[str, Any]) -> EvaluationScore:
+    """Score one submission through the inference worker, or in-process when it is unavailable"""
+    if inference_client.available():
+        try:
+            return await asyncio.wait_for(inference_client.score(comment, ratings), ML_INFERENCE_TIMEOUT_MS / 1000)
+        except Exception as e:
+            logger.warning(f"[ML-INFERENCE] Worker unavailable, scoring in-process: {e!r}")
+    return (await asyncio.to_thread(score_batch, [(comment, ratings)]))[0]
+
+def main():
+    parser = argparse.ArgumentParser(description="Local ML inference worker with micro-batching")
+    parser.add_argument("--socket", default=ML_INFERENCE_SOCKET)
+    parser.add_argument("--max-batch", type=int, default=ML_BATCH_MAX_SIZE, help="Flush a batch at this many evaluations")
+    parser.add_argument("--max-wait-ms", type=int, default=ML_BATCH_MAX_WAIT_MS, help="Flush a batch this long after its first evaluation")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+    try:
+        asyncio.run(serve(args.socket, args.max_batch, args.max_wait_ms))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+
+if __name__ == "__main__":
+    main()
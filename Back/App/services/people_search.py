@@ -0,0 +1,149 @@
+"""
+People Search Service
+Index-backed type-ahead search over users and the enrollment list.
+
+Queries are routed to the cheapest index that can answer them (migration 24):
+- digits (and dashes): student number / school ID prefix on a b-tree
+- one or two characters: first name, last name or email prefix on b-trees
+- anything longer: every word must appear in person_search_text(...), answered by
+  a pg_trgm GIN index, plus typo-tolerant word-similarity matches
+Results are ranked (prefix hits first, then by similarity) and capped at
+SEARCH_MAX_RESULTS. Without pg_trgm the substring matching still works, unindexed.
+"""
+
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+SEARCH_MAX_RESULTS = int(os.getenv("SEARCH_MAX_RESULTS", "100"))
+
+# Below this length trigram indexes can't narrow a substring search
+TRIGRAM_MIN_LENGTH = 3
+
+IDENTIFIER_QUERY = re.compile(r"^[0-9][0-9-]*$")
+
+# Must match the index expressions in migration 24
+ENROLLMENT_SEARCH_TEXT = "person_search_text(e.first_name, e.last_name, e.student_number, e.email)"
+USER_SEARCH_TEXT = "person_search_text(users.first_name, users.last_name, users.school_id, users.email)"
+
+_trigram_available: Optional[bool] = None
+
+def normalize_query(query: Optional[str]) -> str:
+    """Lower-case and collapse whitespace"""
+    return " ".join((query or "").lower().split())
+
+def escape_like(value: str) -> str:
+    """Escape LIKE wildcards so user input only matches literally"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def trigram_available(db: Session) -> bool:
+    """Whether pg_trgm is installed (checked once per process)"""
+    global _trigram_available
+    if _trigram_available is None:
+        _trigram_available = bool(db.execute(
+            text("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')")
+        ).scalar())
+        if not _trigram_available:
+            logger.warning("pg_trgm is not installed - people search uses unindexed substring matching")
+    return _trigram_available
+
+def build_person_search(
+    query: Optional[str],
+    alias: str,
+    search_text: str,
+    identifier_conditions: List[str],
+    trigram: bool
+) -> Optional[Tuple[str, str, Dict[str, Any]]]:
+    """
+    Build the WHERE condition and ranking for a people search
+
+    Args:
+        query: Raw search text
+        alias: Table alias holding first_name / last_name / email
+        search_text: person_search_text(...) expression for the alias
+        identifier_conditions: Conditions on :search_prefix for numeric queries
+        trigram: Whether pg_trgm operators can be used
+
+    Returns:
+        (condition, order_by, params), or None for an empty query
+    """
+    normalized = normalize_query(query)
+    if not normalized:
+        return None
+
+    prefix = escape_like(normalized) + "%"
+
+    if IDENTIFIER_QUERY.match(normalized):
+        return (
+            "(" + " OR ".join(identifier_conditions) + ")",
+            f"{alias}.last_name, {alias}.first_name",
+            {"search_prefix": prefix}
+        )
+
+    name_prefix = (
+        f"(lower({alias}.last_name) LIKE :search_prefix"
+        f" OR lower({alias}.first_name) LIKE :search_prefix"
+        f" OR lower({alias}.email) LIKE :search_prefix)"
+    )
+
+    if len(normalized) < TRIGRAM_MIN_LENGTH:
+        return (
+            name_prefix,
+            f"{alias}.last_name, {alias}.first_name",
+            {"search_prefix": prefix}
+        )
+
+    params: Dict[str, Any] = {"search_prefix": prefix, "search_query": normalized}
+    term_conditions = []
+    for index, term in enumerate(normalized.split()):
+        params[f"search_term_{index}"] = f"%{escape_like(term)}%"
+        term_conditions.append(f"{search_text} LIKE :search_term_{index}")
+    all_terms = "(" + " AND ".join(term_conditions) + ")"
+
+    if trigram:
+        condition = f"({all_terms} OR :search_query <% {search_text})"
+        similarity = f"word_similarity(:search_query, {search_text}) DESC, "
+    else:
+        condition = all_terms
+        similarity = ""
+
+    order_by = (
+        f"CASE WHEN {name_prefix} THEN 0 WHEN {all_terms} THEN 1 ELSE 2 END, "
+        f"{similarity}{alias}.last_name, {alias}.first_name"
+    )
+    return condition, order_by, params
+
+class PeopleSearchService:
+    """
+    Ranked, limited search clauses for users and the enrollment list
+    """
+
+    @staticmethod
+    def enrollment_list_clause(db: Session, query: Optional[str]) -> Optional[Tuple[str, str, Dict[str, Any]]]:
+        """Search clause for enrollment_list aliased as e"""
+        return build_person_search(
+            query,
+            alias="e",
+            search_text=ENROLLMENT_SEARCH_TEXT,
+            identifier_conditions=["e.student_number LIKE :search_prefix"],
+            trigram=trigram_available(db)
+        )
+
+    @staticmethod
+    def user_clause(db: Session, query: Optional[str]) -> Optional[Tuple[str, str, Dict[str, Any]]]:
+        """Search clause for the users table (unaliased, usable with ORM queries)"""
+        return build_person_search(
+            query,
+            alias="users",
+            search_text=USER_SEARCH_TEXT,
+            identifier_conditions=[
+                "users.school_id LIKE :search_prefix",
+                "users.id IN (SELECT user_id FROM students WHERE student_number LIKE :search_prefix)"
+            ],
+            trigram=trigram_available(db)
+        )
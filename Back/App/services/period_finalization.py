@@ -0,0 +1,619 @@
+"""
+Evaluation Period Finalization
+Freezes the results of a closed evaluation period (migration 27).
+
+Closing a period (PUT /api/admin/evaluation-periods/{id}/status) queues
+finalize_period_in_background: submitted evaluations still pending ML processing
+are scored in a process pool (sentiment + anomaly), per-section results go to
+analysis_results and per-section/course/program/period aggregates to
+period_result_snapshots, then the period is archived (apply_period_status_in_background:
+read-only and moved when PERIOD_ARCHIVE_TABLESPACE is set). Progress is kept in
+evaluation_periods.finalization_progress with a heartbeat; a run whose heartbeat is
+older than PERIOD_FINALIZE_STALE_MINUTES (its worker died) can be queued again, and
+an advisory lock keeps two runs of one period, or a run and reopen(), from
+overlapping. Every progress update and the final write only apply while the period
+is still closed and its run still queued/running, so a run whose period was
+reopened stops without leaving results behind. Dashboards read the
+snapshots of finalized periods instead of recomputing them; reopening the period
+discards them.
+"""
+
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Any, Dict, List, Optional, Tuple
+from database.connection import SessionLocal
+from ml_services.loader import SENTIMENT_MODEL_PATH
+from services.evaluation_answers import EvaluationAnswerService, QUESTION_COUNT, QUESTION_KEYS, RATING_SCALE
+from services.ml_inference import rating_sentiment
+from services.period_partitions import ARCHIVED_STATUSES, PeriodPartitionService, apply_period_status_in_background
+from utils.metrics import ML_BATCH_SIZE, ML_INFERENCE_DURATION
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# Scoring processes (1 = score in the calling process)
+PERIOD_FINALIZE_WORKERS = int(os.getenv("PERIOD_FINALIZE_WORKERS", "2"))
+
+# Evaluations per scoring task
+PERIOD_FINALIZE_CHUNK_SIZE = int(os.getenv("PERIOD_FINALIZE_CHUNK_SIZE", "500"))
+
+# A queued/running finalization without progress for this long is treated as dead
+PERIOD_FINALIZE_STALE_MINUTES = int(os.getenv("PERIOD_FINALIZE_STALE_MINUTES", "30"))
+
+# pg_try_advisory_xact_lock(key, period_id) held for the length of a run
+FINALIZATION_LOCK_KEY = 7303801
+
+FINAL_ANALYSIS_TYPE = "period_final"
+
+class FinalizationCancelled(Exception):
+    """The period was reopened (or its run reset) while it was being finalized"""
+
+# Queued/running, and the last heartbeat (queue() or a progress update) is too old
+STALE_SQL = """(
+    finalization_status IN ('queued', 'running')
+    AND COALESCE((finalization_progress->>'heartbeat_at')::timestamptz, '-infinity')
+        < NOW() - make_interval(mins => :stale_minutes)
+)"""
+
+# ===========================
+# SCORING (runs in worker processes)
+# ===========================
+
+_sentiment_analyzer = None
+_anomaly_detector = None
+
+def _init_scoring_worker() -> None:
+    """Load the models once per worker process"""
+    global _sentiment_analyzer, _anomaly_detector
+    from ml_services.anomaly_detector import AnomalyDetector
+    _anomaly_detector = AnomalyDetector()
+
+    try:
+        from ml_services.sentiment_analyzer import SentimentAnalyzer
+        _sentiment_analyzer = SentimentAnalyzer(str(SENTIMENT_MODEL_PATH))
+    except Exception as e:
+        logger.warning(f"Sentiment model unavailable, using rating-based sentiment: {e}")
+        _sentiment_analyzer = None
+
+def score_evaluations(rows: List[Tuple[int, Optional[str], Optional[List[Optional[int]]]]]) -> List[Tuple]:
+    """
+    Score (id, text_feedback, answers) rows
+
+    Returns:
+        [(id, sentiment, sentiment_score, is_anomaly, anomaly_score, anomaly_reason)]
+    """
+    global _sentiment_analyzer
+    if _anomaly_detector is None:
+        _init_scoring_worker()
+
+    ML_BATCH_SIZE.labels(pipeline="finalization").observe(len(rows))
+    results = []
+    for evaluation_id, feedback, answers in rows:
+        ratings = {QUESTION_KEYS[index]: answer for index, answer in enumerate(answers or []) if answer is not None}
+
+        sentiment = None
+        if feedback and feedback.strip() and _sentiment_analyzer is not None:
+            try:
+                started = time.perf_counter()
+                sentiment, confidence = _sentiment_analyzer.predict(feedback)
+                ML_INFERENCE_DURATION.labels(model="sentiment").observe(time.perf_counter() - started)
+            except Exception as e:
+                logger.warning(f"Sentiment model failed, using rating-based sentiment: {e}")
+                _sentiment_analyzer = None
+        if sentiment is None:
+            if ratings:
+                sentiment, confidence = rating_sentiment(sum(ratings.values()) / len(ratings))
+            else:
+                sentiment, confidence = "neutral", 0.5
+
+        is_anomaly, anomaly_score, anomaly_reason = False, 0.0, None
+        if ratings:
+            started = time.perf_counter()
+            is_anomaly, anomaly_score, anomaly_reason = _anomaly_detector.detect(ratings)
+            ML_INFERENCE_DURATION.labels(model="anomaly").observe(time.perf_counter() - started)
+
+        results.append((evaluation_id, sentiment, float(confidence), bool(is_anomaly), float(anomaly_score), anomaly_reason))
+    return results
+
+# ===========================
+# PIPELINE
+# ===========================
+
+class PeriodFinalizationService:
+    """
+    Scores, aggregates and snapshots the results of closed evaluation periods
+    """
+
+    @staticmethod
+    def get_status(db: Session, period_id: int) -> Optional[Dict[str, Any]]:
+        """Finalization state of a period (None if the period does not exist)"""
+        row = db.execute(text(f"""
+            SELECT id, name, status, finalization_status, finalization_progress, finalized_at,
+                   {STALE_SQL}
+            FROM evaluation_periods
+            WHERE id = :period_id
+        """), {"period_id": period_id, "stale_minutes": PERIOD_FINALIZE_STALE_MINUTES}).fetchone()
+        if not row:
+            return None
+
+        return {
+            "period_id": row[0],
+            "period_name": row[1],
+            "period_status": row[2],
+            "finalization_status": row[3],
+            "progress": row[4] or {},
+            "finalized_at": row[5].isoformat() if row[5] else None,
+            "stale": row[6]
+        }
+
+    @staticmethod
+    def is_stale(db: Session, period_id: int) -> bool:
+        """Whether a queued/running finalization stopped reporting progress (its worker died)"""
+        return bool(db.execute(text(f"""
+            SELECT {STALE_SQL}
+            FROM evaluation_periods
+            WHERE id = :period_id
+        """), {"period_id": period_id, "stale_minutes": PERIOD_FINALIZE_STALE_MINUTES}).scalar())
+
+    @staticmethod
+    def _set_progress(db: Session, period_id: int, status: str, progress: Dict[str, Any]) -> bool:
+        """Record progress of a run (commits); False when the period was reopened meanwhile"""
+        updated = db.execute(text("""
+            UPDATE evaluation_periods
+            SET finalization_status = :status,
+                finalization_progress = CAST(:progress AS jsonb) || jsonb_build_object('heartbeat_at', NOW())
+            WHERE id = :period_id
+            AND finalization_status IN ('queued', 'running')
+            AND lower(status) = ANY(:archived_statuses)
+        """), {
+            "period_id": period_id,
+            "status": status,
+            "progress": json.dumps(progress),
+            "archived_statuses": list(ARCHIVED_STATUSES)
+        }).rowcount
+        db.commit()
+        return updated > 0
+
+    @staticmethod
+    def _report(db: Session, period_id: int, progress: Dict[str, Any]) -> None:
+        """Record progress of a running finalization, stopping it if the period was reopened"""
+        if not PeriodFinalizationService._set_progress(db, period_id, "running", progress):
+            raise FinalizationCancelled(period_id)
+
+    @staticmethod
+    def queue(db: Session, period_id: int) -> None:
+        """Mark a period as waiting for finalization (runs in the caller's transaction)"""
+        db.execute(text("""
+            UPDATE evaluation_periods
+            SET finalization_status = 'queued',
+                finalization_progress = CAST(:progress AS jsonb) || jsonb_build_object('heartbeat_at', NOW())
+            WHERE id = :period_id
+        """), {"period_id": period_id, "progress": json.dumps({"stage": "queued"})})
+
+    @staticmethod
+    def finalize(db: Session, period_id: int, workers: int = PERIOD_FINALIZE_WORKERS) -> Dict[str, Any]:
+        """
+        Score pending evaluations, write analysis_results and snapshots, then archive the
+        period's partitions (skipped if the period is already being finalized elsewhere,
+        stopped if it is reopened meanwhile)
+
+        Commits as it goes so progress is visible to GET .../finalization. The lock is
+        held until the partitions are archived, so reopen() can't interleave.
+
+        Returns:
+            {"period_id", "skipped", "scored", "sections", "snapshots", "period_status", "duration_seconds"}
+        """
+        # Transaction-level lock kept open on a connection of its own for the whole run
+        # (the session commits as it goes); a dead worker's lock goes with its connection
+        lock = db.get_bind().connect()
+        try:
+            locked = lock.execute(
+                text("SELECT pg_try_advisory_xact_lock(:key, :period_id)"),
+                {"key": FINALIZATION_LOCK_KEY, "period_id": period_id}
+            ).scalar()
+            if not locked:
+                logger.info(f"Evaluation period {period_id} is already being finalized - skipped")
+                return {"period_id": period_id, "skipped": True}
+
+            summary = PeriodFinalizationService._finalize_locked(db, period_id, workers)
+            if not summary["skipped"]:
+                apply_period_status_in_background(period_id, summary["period_status"])
+            return summary
+        finally:
+            lock.close()
+
+    @staticmethod
+    def _finalize_locked(db: Session, period_id: int, workers: int) -> Dict[str, Any]:
+        started = time.monotonic()
+        try:
+            # Periods created outside the API may still live in the default partition
+            PeriodPartitionService.ensure_partitions(db, period_id)
+            db.commit()
+
+            scored = PeriodFinalizationService._score_pending(db, period_id, workers)
+
+            PeriodFinalizationService._report(db, period_id, {"stage": "aggregating", "scored": scored})
+            sections, snapshots = PeriodFinalizationService._write_results(db, period_id)
+
+            summary = {
+                "period_id": period_id,
+                "skipped": False,
+                "scored": scored,
+                "sections": sections,
+                "snapshots": snapshots,
+                "duration_seconds": round(time.monotonic() - started, 2)
+            }
+            # Same transaction as the results: nothing is kept if the period was reopened
+            period_status = db.execute(text("""
+                UPDATE evaluation_periods
+                SET finalization_status = 'completed',
+                    finalization_progress = CAST(:progress AS jsonb),
+                    finalized_at = NOW()
+                WHERE id = :period_id
+                AND finalization_status IN ('queued', 'running')
+                AND lower(status) = ANY(:archived_statuses)
+                RETURNING lower(status)
+            """), {
+                "period_id": period_id,
+                "progress": json.dumps({"stage": "completed", **summary}),
+                "archived_statuses": list(ARCHIVED_STATUSES)
+            }).scalar()
+            if period_status is None:
+                raise FinalizationCancelled(period_id)
+            db.commit()
+
+            summary["period_status"] = period_status
+            logger.info(f"Finalized evaluation period {period_id}: {summary}")
+            return summary
+
+        except FinalizationCancelled:
+            db.rollback()
+            logger.info(f"Evaluation period {period_id} was reopened during finalization - stopped")
+            return {"period_id": period_id, "skipped": True}
+
+        except Exception as e:
+            db.rollback()
+            PeriodFinalizationService._set_progress(db, period_id, "failed", {"stage": "failed", "error": str(e)})
+            raise
+
+    @staticmethod
+    def _score_pending(db: Session, period_id: int, workers: int) -> int:
+        """Score submitted evaluations of the period still pending ML processing, chunk by chunk"""
+        total = db.execute(text("""
+            SELECT COUNT(*)
+            FROM evaluations
+            WHERE evaluation_period_id = :period_id
+            AND status = 'completed'
+            AND COALESCE(processing_status, 'pending') = 'pending'
+        """), {"period_id": period_id}).scalar() or 0
+
+        progress = {"stage": "scoring", "scored": 0, "total": total}
+        PeriodFinalizationService._report(db, period_id, progress)
+        if not total:
+            return 0
+
+        # Spawned, not forked: the calling web worker has threads (DB pool, audit writer, ...)
+        pool = ProcessPoolExecutor(
+            max_workers=workers, mp_context=get_context("spawn"), initializer=_init_scoring_worker
+        ) if workers > 1 else None
+        try:
+            last_id = 0
+            batch_size = PERIOD_FINALIZE_CHUNK_SIZE * max(workers, 1)
+            while True:
+                rows = db.execute(text("""
+                    SELECT id, text_feedback, answers
+                    FROM evaluations
+                    WHERE evaluation_period_id = :period_id
+                    AND status = 'completed'
+                    AND COALESCE(processing_status, 'pending') = 'pending'
+                    AND id > :last_id
+                    ORDER BY id
+                    LIMIT :limit
+                """), {"period_id": period_id, "last_id": last_id, "limit": batch_size}).fetchall()
+                if not rows:
+                    break
+                last_id = rows[-1][0]
+
+                chunks = [
+                    [tuple(row) for row in rows[start:start + PERIOD_FINALIZE_CHUNK_SIZE]]
+                    for start in range(0, len(rows), PERIOD_FINALIZE_CHUNK_SIZE)
+                ]
+                scored_chunks = pool.map(score_evaluations, chunks) if pool else map(score_evaluations, chunks)
+                results = [result for chunk in scored_chunks for result in chunk]
+
+                PeriodFinalizationService._save_scores(db, period_id, results)
+                progress["scored"] += len(results)
+                PeriodFinalizationService._report(db, period_id, progress)
+        finally:
+            if pool:
+                pool.shutdown()
+
+        return progress["scored"]
+
+    @staticmethod
+    def _save_scores(db: Session, period_id: int, results: List[Tuple]) -> None:
+        """Write one chunk of scores in a single UPDATE"""
+        ids, sentiments, scores, anomalies, anomaly_scores, reasons = (list(column) for column in zip(*results))
+        db.execute(text("""
+            UPDATE evaluations e
+            SET sentiment = s.sentiment,
+                sentiment_score = s.sentiment_score,
+                is_anomaly = s.is_anomaly,
+                anomaly_score = s.anomaly_score,
+                anomaly_reason = s.anomaly_reason,
+                processing_status = CASE WHEN s.is_anomaly THEN 'flagged' ELSE 'processed' END,
+                processed_at = NOW()
+            FROM unnest(
+                CAST(:ids AS INTEGER[]), CAST(:sentiments AS TEXT[]), CAST(:scores AS FLOAT[]),
+                CAST(:anomalies AS BOOLEAN[]), CAST(:anomaly_scores AS FLOAT[]), CAST(:reasons AS TEXT[])
+            ) AS s(id, sentiment, sentiment_score, is_anomaly, anomaly_score, anomaly_reason)
+            WHERE e.id = s.id
+            AND e.evaluation_period_id = :period_id
+        """), {
+            "period_id": period_id,
+            "ids": ids,
+            "sentiments": sentiments,
+            "scores": scores,
+            "anomalies": anomalies,
+            "anomaly_scores": anomaly_scores,
+            "reasons": reasons
+        })
+        db.commit()
+
+    @staticmethod
+    def _write_results(db: Session, period_id: int) -> Tuple[int, int]:
+        """
+        Replace the period's analysis_results and period_result_snapshots (in the caller's
+        transaction - finalize commits them together with the completed status)
+
+        Returns:
+            (section results written, snapshots written)
+        """
+        # Section, course, program and whole-period rows in one pass each (GROUPING SETS)
+        scope_columns = """
+            CASE
+                WHEN GROUPING(section_id) = 0 THEN 'section'
+                WHEN GROUPING(course_id) = 0 THEN 'course'
+                WHEN GROUPING(program_id) = 0 THEN 'program'
+                ELSE 'period'
+            END,
+            COALESCE(section_id, course_id, program_id, 0)
+        """
+        scoped_evaluations = """
+            WITH ev AS (
+                SELECT e.class_section_id AS section_id, cs.course_id, COALESCE(c.program_id, 0) AS program_id,
+                       e.sentiment, e.sentiment_score, e.is_anomaly, e.rating_overall, e.answers
+                FROM evaluations e
+                JOIN class_sections cs ON cs.id = e.class_section_id
+                JOIN courses c ON c.id = cs.course_id
+                WHERE e.evaluation_period_id = :period_id
+                AND e.status = 'completed'
+            )
+        """
+        params = {"period_id": period_id}
+
+        snapshots: Dict[Tuple[str, int], Dict[str, Any]] = {}
+
+        def snapshot(scope: str, scope_id: int) -> Dict[str, Any]:
+            if (scope, scope_id) not in snapshots:
+                snapshots[(scope, scope_id)] = {
+                    "scope": scope, "scope_id": scope_id,
+                    "total_evaluations": 0, "enrolled_students": 0,
+                    "positive_count": 0, "neutral_count": 0, "negative_count": 0, "anomaly_count": 0,
+                    "avg_overall_rating": None, "avg_sentiment_score": None,
+                    "counts": {str(number): {rating: 0 for rating in RATING_SCALE} for number in range(1, QUESTION_COUNT + 1)}
+                }
+            return snapshots[(scope, scope_id)]
+
+        for row in db.execute(text(f"""
+            {scoped_evaluations}
+            SELECT {scope_columns},
+                   COUNT(*),
+                   COUNT(*) FILTER (WHERE sentiment = 'positive'),
+                   COUNT(*) FILTER (WHERE sentiment = 'neutral'),
+                   COUNT(*) FILTER (WHERE sentiment = 'negative'),
+                   COUNT(*) FILTER (WHERE is_anomaly),
+                   AVG(rating_overall),
+                   AVG(sentiment_score)
+            FROM ev
+            GROUP BY GROUPING SETS ((section_id), (course_id), (program_id), ())
+        """), params).fetchall():
+            entry = snapshot(row[0], row[1])
+            entry.update({
+                "total_evaluations": row[2],
+                "positive_count": row[3],
+                "neutral_count": row[4],
+                "negative_count": row[5],
+                "anomaly_count": row[6],
+                "avg_overall_rating": float(row[7]) if row[7] is not None else None,
+                "avg_sentiment_score": float(row[8]) if row[8] is not None else None
+            })
+
+        for row in db.execute(text(f"""
+            {scoped_evaluations}
+            SELECT {scope_columns}, a.question, a.rating, COUNT(*)
+            FROM ev
+            CROSS JOIN LATERAL unnest(ev.answers) WITH ORDINALITY AS a(rating, question)
+            WHERE a.rating BETWEEN 1 AND 4
+            GROUP BY GROUPING SETS (
+                (section_id, a.question, a.rating),
+                (course_id, a.question, a.rating),
+                (program_id, a.question, a.rating),
+                (a.question, a.rating)
+            )
+        """), params).fetchall():
+            snapshot(row[0], row[1])["counts"][str(row[2])][str(row[3])] = row[4]
+
+        for row in db.execute(text(f"""
+            WITH en AS (
+                SELECT en.class_section_id AS section_id, cs.course_id, COALESCE(c.program_id, 0) AS program_id, en.student_id
+                FROM enrollments en
+                JOIN class_sections cs ON cs.id = en.class_section_id
+                JOIN courses c ON c.id = cs.course_id
+                WHERE en.evaluation_period_id = :period_id
+                AND en.status = 'active'
+            )
+            SELECT {scope_columns}, COUNT(DISTINCT student_id)
+            FROM en
+            GROUP BY GROUPING SETS ((section_id), (course_id), (program_id), ())
+        """), params).fetchall():
+            snapshot(row[0], row[1])["enrolled_students"] = row[2]
+
+        for entry in snapshots.values():
+            entry["category_averages"] = [{
+                "category_id": category_id,
+                "category_name": category["name"],
+                "average": round(average, 4),
+                "rating_count": rating_count
+            } for category_id, category, rating_count, average in EvaluationAnswerService.category_totals(entry["counts"])]
+
+        db.execute(text("DELETE FROM period_result_snapshots WHERE evaluation_period_id = :period_id"), params)
+        db.execute(text("""
+            DELETE FROM analysis_results
+            WHERE evaluation_period_id = :period_id
+            AND analysis_type = :analysis_type
+        """), {**params, "analysis_type": FINAL_ANALYSIS_TYPE})
+
+        if snapshots:
+            db.execute(text("""
+                INSERT INTO period_result_snapshots (
+                    evaluation_period_id, scope, scope_id, total_evaluations, enrolled_students,
+                    positive_count, neutral_count, negative_count, anomaly_count,
+                    avg_overall_rating, avg_sentiment_score, question_counts, category_averages, created_at
+                ) VALUES (
+                    :period_id, :scope, :scope_id, :total_evaluations, :enrolled_students,
+                    :positive_count, :neutral_count, :negative_count, :anomaly_count,
+                    :avg_overall_rating, :avg_sentiment_score,
+                    CAST(:question_counts AS jsonb), CAST(:category_averages AS jsonb), NOW()
+                )
+            """), [{
+                **{key: value for key, value in entry.items() if key not in ("counts", "category_averages")},
+                "period_id": period_id,
+                "question_counts": json.dumps(entry["counts"]),
+                "category_averages": json.dumps(entry["category_averages"])
+            } for entry in snapshots.values()])
+
+        sections = [entry for entry in snapshots.values() if entry["scope"] == "section"]
+        if sections:
+            db.execute(text("""
+                INSERT INTO analysis_results (
+                    class_section_id, evaluation_period_id, analysis_type, total_evaluations,
+                    positive_count, neutral_count, negative_count, anomaly_count,
+                    avg_overall_rating, avg_sentiment_score, detailed_results, analysis_date, created_at
+                ) VALUES (
+                    :scope_id, :period_id, :analysis_type, :total_evaluations,
+                    :positive_count, :neutral_count, :negative_count, :anomaly_count,
+                    :avg_overall_rating, :avg_sentiment_score, CAST(:detailed_results AS jsonb), NOW(), NOW()
+                )
+            """), [{
+                **{key: value for key, value in entry.items() if key not in ("counts", "category_averages", "scope")},
+                "period_id": period_id,
+                "analysis_type": FINAL_ANALYSIS_TYPE,
+                "detailed_results": json.dumps({
+                    "evaluation_period_id": period_id,
+                    "enrolled_students": entry["enrolled_students"],
+                    "category_averages": entry["category_averages"]
+                })
+            } for entry in sections])
+
+        return len(sections), len(snapshots)
+
+    @staticmethod
+    def reopen(db: Session, period_id: int) -> bool:
+        """
+        Discard a period's frozen results and make its evaluations writable again (commits)
+
+        Takes the finalization lock in the caller's transaction, so a queued run that
+        starts later sees the reset and stops.
+
+        Returns:
+            False (nothing changed) while a finalization of the period is running
+        """
+        locked = db.execute(
+            text("SELECT pg_try_advisory_xact_lock(:key, :period_id)"),
+            {"key": FINALIZATION_LOCK_KEY, "period_id": period_id}
+        ).scalar()
+        if not locked:
+            return False
+
+        db.execute(text("DELETE FROM period_result_snapshots WHERE evaluation_period_id = :period_id"), {"period_id": period_id})
+        db.execute(text("""
+            DELETE FROM analysis_results
+            WHERE evaluation_period_id = :period_id
+            AND analysis_type = :analysis_type
+        """), {"period_id": period_id, "analysis_type": FINAL_ANALYSIS_TYPE})
+        db.execute(text("""
+            UPDATE evaluation_periods
+            SET finalization_status = NULL,
+                finalization_progress = NULL,
+                finalized_at = NULL
+            WHERE id = :period_id
+        """), {"period_id": period_id})
+        PeriodPartitionService.set_read_only(db, period_id, False)
+        return True
+
+    @staticmethod
+    def get_snapshot(db: Session, period_id: Optional[int], scope: str, scope_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Frozen results of a finalized period for one scope (None when the period is not finalized)
+
+        Returns:
+            {"total_evaluations", "enrolled_students", "average_overall", "counts", ...} - counts as in
+            EvaluationAnswerService.answer_counts()
+        """
+        if not period_id:
+            return None
+
+        row = db.execute(text("""
+            SELECT s.total_evaluations, s.enrolled_students, s.positive_count, s.neutral_count,
+                   s.negative_count, s.anomaly_count, s.avg_overall_rating, s.avg_sentiment_score,
+                   s.question_counts, s.category_averages, p.finalized_at
+            FROM evaluation_periods p
+            LEFT JOIN period_result_snapshots s
+                ON s.evaluation_period_id = p.id
+                AND s.scope = :scope
+                AND s.scope_id = :scope_id
+            WHERE p.id = :period_id
+            AND p.finalized_at IS NOT NULL
+        """), {"period_id": period_id, "scope": scope, "scope_id": scope_id}).fetchone()
+        if not row:
+            return None
+
+        # Finalized, but nothing was enrolled or submitted in this scope
+        if row[0] is None:
+            empty = {str(number): {rating: 0 for rating in RATING_SCALE} for number in range(1, QUESTION_COUNT + 1)}
+            return {
+                "total_evaluations": 0, "enrolled_students": 0,
+                "positive_count": 0, "neutral_count": 0, "negative_count": 0, "anomaly_count": 0,
+                "average_overall": None, "avg_sentiment_score": None,
+                "counts": empty, "category_averages": [], "finalized_at": row[10]
+            }
+
+        return {
+            "total_evaluations": row[0],
+            "enrolled_students": row[1],
+            "positive_count": row[2],
+            "neutral_count": row[3],
+            "negative_count": row[4],
+            "anomaly_count": row[5],
+            "average_overall": row[6],
+            "avg_sentiment_score": row[7],
+            "counts": row[8],
+            "category_averages": row[9],
+            "finalized_at": row[10]
+        }
+
+def finalize_period_in_background(period_id: int) -> None:
+    """Finalize a closed period and archive its partitions (BackgroundTasks entry point)"""
+    db = SessionLocal()
+    try:
+        PeriodFinalizationService.finalize(db, period_id)
+    except Exception as e:
+        logger.error(f"Finalizing evaluation period {period_id} failed: {e}")
+    finally:
+        db.close()
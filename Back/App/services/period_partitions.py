@@ -0,0 +1,248 @@
+"""
+Evaluation Period Partitions
+Per-period partitions of evaluations and enrollments (migration 26).
+
+Every evaluation period gets its own partition of both tables, created in the
+same transaction as the period (see POST /api/admin/evaluation-periods), so
+queries filtered on evaluation_period_id only read that period. When
+PERIOD_ARCHIVE_TABLESPACE is set, closing a period moves its partitions to that
+tablespace and makes its evaluations read-only; reopening it reverses both.
+"""
+
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from typing import Any, Dict, List, Optional
+from database.connection import SessionLocal
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Tablespace for closed periods ("" = closed periods stay where they are)
+PERIOD_ARCHIVE_TABLESPACE = os.getenv("PERIOD_ARCHIVE_TABLESPACE", "")
+
+PARTITIONED_TABLES = ("evaluations", "enrollments")
+
+# Only evaluations are frozen: enrollments of an archived period are re-linked
+# when its sections are enrolled in a new period
+READ_ONLY_TABLES = ("evaluations",)
+
+ARCHIVED_STATUSES = ("closed", "archived")
+
+def partition_name(table: str, period_id: int) -> str:
+    """Partition of table holding one evaluation period's rows"""
+    return f"{table}_period_{int(period_id)}"
+
+def read_only_trigger_name(table: str, period_id: int) -> str:
+    return f"trg_{partition_name(table, period_id)}_read_only"
+
+class PeriodPartitionService:
+    """
+    Creation, archival and removal of per-period partitions
+    """
+
+    @staticmethod
+    def is_partitioned(db: Session) -> bool:
+        """Whether migration 26 has been applied"""
+        return bool(db.execute(text("""
+            SELECT EXISTS (SELECT 1 FROM pg_class WHERE oid = to_regclass('evaluations') AND relkind = 'p')
+        """)).scalar())
+
+    @staticmethod
+    def list_partitions(db: Session) -> List[Dict[str, Any]]:
+        """
+        Partitions of evaluations and enrollments
+
+        Returns:
+            [{"table", "name", "period_id", "tablespace", "read_only", "estimated_rows", "size_bytes"}]
+        """
+        rows = db.execute(text("""
+            SELECT
+                parent.relname,
+                c.relname,
+                substring(c.relname FROM '_period_([0-9]+)$')::INTEGER,
+                COALESCE(ts.spcname, 'pg_default'),
+                EXISTS (SELECT 1 FROM pg_trigger t WHERE t.tgrelid = c.oid AND t.tgname LIKE 'trg\\_%\\_read\\_only'),
+                GREATEST(c.reltuples, 0)::BIGINT,
+                pg_total_relation_size(c.oid)
+            FROM pg_inherits i
+            JOIN pg_class parent ON parent.oid = i.inhparent
+            JOIN pg_class c ON c.oid = i.inhrelid
+            LEFT JOIN pg_tablespace ts ON ts.oid = c.reltablespace
+            WHERE parent.relname IN ('evaluations', 'enrollments')
+            AND parent.relkind = 'p'
+            AND c.relkind = 'r'
+            ORDER BY parent.relname, c.relname
+        """)).fetchall()
+
+        return [{
+            "table": row[0],
+            "name": row[1],
+            "period_id": row[2],
+            "tablespace": row[3],
+            "read_only": row[4],
+            "estimated_rows": row[5],
+            "size_bytes": row[6]
+        } for row in rows]
+
+    @staticmethod
+    def ensure_partitions(db: Session, period_id: Optional[int] = None) -> int:
+        """
+        Create the partitions of one period, or of every period when period_id is None
+
+        Runs in the caller's transaction (no commit), so a new period and its
+        partitions are created together.
+
+        Returns:
+            Number of partitions created
+        """
+        if not PeriodPartitionService.is_partitioned(db):
+            return 0
+
+        if period_id is not None:
+            created = db.execute(
+                text("SELECT create_period_partitions(:period_id)"),
+                {"period_id": period_id}
+            ).scalar() or 0
+        else:
+            created = db.execute(text("""
+                SELECT COALESCE(SUM(create_period_partitions(id)), 0) FROM evaluation_periods
+            """)).scalar() or 0
+
+        if created:
+            logger.info(f"Created {created} evaluation period partition(s)")
+        return created
+
+    @staticmethod
+    def drop_partitions(db: Session, period_id: int) -> int:
+        """
+        Drop the (empty) partitions of a deleted period - runs in the caller's transaction
+
+        Returns:
+            Number of partitions dropped
+        """
+        dropped = 0
+        for table in PARTITIONED_TABLES:
+            name = partition_name(table, period_id)
+            if db.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name}).scalar():
+                db.execute(text(f'DROP TABLE "{name}"'))
+                dropped += 1
+        return dropped
+
+    @staticmethod
+    def set_read_only(db: Session, period_id: int, read_only: bool) -> None:
+        """Add or remove the trigger rejecting writes to a period's evaluations (commits)"""
+        for table in READ_ONLY_TABLES:
+            name = partition_name(table, period_id)
+            if not db.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name}).scalar():
+                continue
+            trigger = read_only_trigger_name(table, period_id)
+            db.execute(text(f'DROP TRIGGER IF EXISTS "{trigger}" ON "{name}"'))
+            if read_only:
+                db.execute(text(f"""
+                    CREATE TRIGGER "{trigger}"
+                    BEFORE INSERT OR UPDATE OR DELETE ON "{name}"
+                    FOR EACH ROW EXECUTE FUNCTION reject_archived_period_writes()
+                """))
+        db.commit()
+
+    @staticmethod
+    def read_only_period_ids(db: Session) -> List[int]:
+        """Periods whose evaluations are frozen (archived with PERIOD_ARCHIVE_TABLESPACE set)"""
+        return db.execute(text("""
+            SELECT substring(c.relname FROM '_period_([0-9]+)$')::INTEGER
+            FROM pg_trigger t
+            JOIN pg_class c ON c.oid = t.tgrelid
+            WHERE c.relname LIKE 'evaluations\\_period\\_%'
+            AND t.tgname LIKE 'trg\\_%\\_read\\_only'
+        """)).scalars().all()
+
+    @staticmethod
+    def move_to_tablespace(db: Session, period_id: int, tablespace: str) -> List[str]:
+        """
+        Move a period's partitions and their indexes to a tablespace (commits per table)
+
+        Rewrites each partition under an exclusive lock - run it in the background.
+
+        Returns:
+            Names of the partitions moved
+        """
+        moved = []
+        for table in PARTITIONED_TABLES:
+            name = partition_name(table, period_id)
+            current = db.execute(text("""
+                SELECT COALESCE(ts.spcname, 'pg_default')
+                FROM pg_class c
+                LEFT JOIN pg_tablespace ts ON ts.oid = c.reltablespace
+                WHERE c.oid = to_regclass(:name)
+            """), {"name": name}).scalar()
+            if current is None or current == tablespace:
+                continue
+
+            indexes = db.execute(text("""
+                SELECT indexrelid::regclass::TEXT FROM pg_index WHERE indrelid = to_regclass(:name)
+            """), {"name": name}).scalars().all()
+
+            db.execute(text(f'ALTER TABLE "{name}" SET TABLESPACE "{tablespace}"'))
+            for index in indexes:
+                db.execute(text(f'ALTER INDEX {index} SET TABLESPACE "{tablespace}"'))
+            db.commit()
+            moved.append(name)
+
+        if moved:
+            logger.info(f"Moved period {period_id} partitions to tablespace {tablespace}: {', '.join(moved)}")
+        return moved
+
+    @staticmethod
+    def archive_period(db: Session, period_id: int, tablespace: str = PERIOD_ARCHIVE_TABLESPACE) -> Dict[str, Any]:
+        """
+        Make a closed period's evaluations read-only and move its partitions to the archive tablespace
+
+        Returns:
+            {"period_id", "moved": [...]}
+        """
+        if not tablespace:
+            return {"period_id": period_id, "moved": []}
+
+        PeriodPartitionService.set_read_only(db, period_id, True)
+        return {"period_id": period_id, "moved": PeriodPartitionService.move_to_tablespace(db, period_id, tablespace)}
+
+    @staticmethod
+    def restore_period(db: Session, period_id: int) -> Dict[str, Any]:
+        """
+        Undo archive_period for a reopened period (writable again, back in pg_default)
+
+        Returns:
+            {"period_id", "moved": [...]}
+        """
+        PeriodPartitionService.set_read_only(db, period_id, False)
+        return {"period_id": period_id, "moved": PeriodPartitionService.move_to_tablespace(db, period_id, "pg_default")}
+
+    @staticmethod
+    def archive_closed_periods(db: Session, tablespace: str = PERIOD_ARCHIVE_TABLESPACE) -> List[Dict[str, Any]]:
+        """Archive every closed period (catches up on periods closed before the tablespace was configured)"""
+        if not tablespace:
+            return []
+
+        period_ids = db.execute(
+            text("SELECT id FROM evaluation_periods WHERE lower(status) = ANY(:statuses) ORDER BY id"),
+            {"statuses": list(ARCHIVED_STATUSES)}
+        ).scalars().all()
+        return [PeriodPartitionService.archive_period(db, period_id, tablespace) for period_id in period_ids]
+
+def apply_period_status_in_background(period_id: int, status: str) -> None:
+    """Archive or restore a period's partitions after a status change (BackgroundTasks entry point)"""
+    if not PERIOD_ARCHIVE_TABLESPACE:
+        return
+
+    db = SessionLocal()
+    try:
+        if status.lower() in ARCHIVED_STATUSES:
+            PeriodPartitionService.archive_period(db, period_id)
+        else:
+            PeriodPartitionService.restore_period(db, period_id)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Archiving partitions of evaluation period {period_id} failed: {e}")
+    finally:
+        db.close()
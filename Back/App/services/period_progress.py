@@ -0,0 +1,374 @@
+"""
+Evaluation Period Progress Counters
+Keeps evaluation_periods.total_students / total_evaluations / completed_evaluations
+and the per-program, per-year-level period_progress rows current.
+
+Counters are applied inside the caller's transaction (the caller commits), so they
+stay consistent with the enrollment or submission that changed them. reconcile()
+rebuilds them from the evaluations table to repair any drift.
+"""
+
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from typing import Optional, List, Dict
+import logging
+
+logger = logging.getLogger(__name__)
+
+class PeriodProgressService:
+    """
+    Maintains live evaluation progress counters for evaluation periods
+    """
+
+    @staticmethod
+    def record_new_evaluations(db: Session, period_id: int, evaluation_ids: List[int]) -> Dict:
+        """
+        Apply counter deltas for evaluation records just created for a period
+        (enroll-section / enroll-program-section). Must run before commit.
+
+        Args:
+            db: Database session
+            period_id: Evaluation period the records belong to
+            evaluation_ids: IDs of the newly inserted evaluation records
+
+        Returns:
+            Dictionary with the number of students and evaluations added
+        """
+        if not evaluation_ids:
+            return {"students_added": 0, "evaluations_added": 0}
+
+        # A student only adds to total_students if this batch is their first
+        # evaluation record in the period
+        deltas = db.execute(text("""
+            WITH new_evals AS (
+                SELECT ev.id, ev.student_id,
+                       COALESCE(s.program_id, 0) AS program_id,
+                       COALESCE(s.year_level, 0) AS year_level,
+                       (ev.submission_date IS NOT NULL) AS is_completed
+                FROM evaluations ev
+                JOIN students s ON s.id = ev.student_id
+                WHERE ev.id = ANY(:evaluation_ids)
+            ),
+            new_students AS (
+                SELECT DISTINCT n.student_id, n.program_id, n.year_level
+                FROM new_evals n
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM evaluations ev
+                    WHERE ev.evaluation_period_id = :period_id
+                    AND ev.student_id = n.student_id
+                    AND ev.id <> ALL(:evaluation_ids)
+                )
+            ),
+            deltas AS (
+                SELECT program_id, year_level,
+                       0 AS students,
+                       COUNT(*) AS evaluations,
+                       COUNT(*) FILTER (WHERE is_completed) AS completed
+                FROM new_evals
+                GROUP BY program_id, year_level
+                UNION ALL
+                SELECT program_id, year_level, COUNT(*), 0, 0
+                FROM new_students
+                GROUP BY program_id, year_level
+            ),
+            summed AS (
+                SELECT program_id, year_level,
+                       SUM(students) AS students,
+                       SUM(evaluations) AS evaluations,
+                       SUM(completed) AS completed
+                FROM deltas
+                GROUP BY program_id, year_level
+            ),
+            upserted AS (
+                INSERT INTO period_progress (
+                    evaluation_period_id, program_id, year_level,
+                    total_students, total_evaluations, completed_evaluations, updated_at
+                )
+                SELECT :period_id, program_id, year_level, students, evaluations, completed, NOW()
+                FROM summed
+                ON CONFLICT (evaluation_period_id, program_id, year_level) DO UPDATE SET
+                    total_students = period_progress.total_students + EXCLUDED.total_students,
+                    total_evaluations = period_progress.total_evaluations + EXCLUDED.total_evaluations,
+                    completed_evaluations = period_progress.completed_evaluations + EXCLUDED.completed_evaluations,
+                    updated_at = NOW()
+                RETURNING 1
+            )
+            SELECT
+                COALESCE(SUM(students), 0),
+                COALESCE(SUM(evaluations), 0),
+                COALESCE(SUM(completed), 0)
+            FROM summed
+        """), {
+            "period_id": period_id,
+            "evaluation_ids": list(evaluation_ids)
+        }).fetchone()
+
+        students_added = int(deltas[0])
+        evaluations_added = int(deltas[1])
+        completed_added = int(deltas[2])
+
+        db.execute(text("""
+            UPDATE evaluation_periods
+            SET total_students = COALESCE(total_students, 0) + :students,
+                total_evaluations = COALESCE(total_evaluations, 0) + :evaluations,
+                completed_evaluations = COALESCE(completed_evaluations, 0) + :completed
+            WHERE id = :period_id
+        """), {
+            "period_id": period_id,
+            "students": students_added,
+            "evaluations": evaluations_added,
+            "completed": completed_added
+        })
+
+        return {"students_added": students_added, "evaluations_added": evaluations_added}
+
+    @staticmethod
+    def record_submission(db: Session, period_id: int, student_id: int, created: bool = False) -> None:
+        """
+        Apply counter deltas for a submitted evaluation. Must run before commit.
+
+        Args:
+            db: Database session
+            period_id: Evaluation period of the submission
+            student_id: students.id of the submitter
+            created: True if the submission inserted a new record instead of
+                     completing a pending one (also counts toward totals)
+        """
+        new_student = False
+        if created:
+            other_records = db.execute(text("""
+                SELECT COUNT(*) FROM evaluations
+                WHERE evaluation_period_id = :period_id
+                AND student_id = :student_id
+            """), {"period_id": period_id, "student_id": student_id}).scalar() or 0
+            # The just-inserted record is the only one for this student
+            new_student = other_records <= 1
+
+        params = {
+            "period_id": period_id,
+            "student_id": student_id,
+            "students": 1 if new_student else 0,
+            "evaluations": 1 if created else 0
+        }
+
+        db.execute(text("""
+            INSERT INTO period_progress (
+                evaluation_period_id, program_id, year_level,
+                total_students, total_evaluations, completed_evaluations, updated_at
+            )
+            SELECT :period_id, COALESCE(s.program_id, 0), COALESCE(s.year_level, 0),
+                   :students, :evaluations, 1, NOW()
+            FROM students s
+            WHERE s.id = :student_id
+            ON CONFLICT (evaluation_period_id, program_id, year_level) DO UPDATE SET
+                total_students = period_progress.total_students + EXCLUDED.total_students,
+                total_evaluations = period_progress.total_evaluations + EXCLUDED.total_evaluations,
+                completed_evaluations = period_progress.completed_evaluations + 1,
+                updated_at = NOW()
+        """), params)
+
+        db.execute(text("""
+            UPDATE evaluation_periods
+            SET total_students = COALESCE(total_students, 0) + :students,
+                total_evaluations = COALESCE(total_evaluations, 0) + :evaluations,
+                completed_evaluations = COALESCE(completed_evaluations, 0) + 1
+            WHERE id = :period_id
+        """), params)
+
+    @staticmethod
+    def get_progress(db: Session, period_id: int, include_breakdown: bool = True) -> Optional[Dict]:
+        """
+        Read period progress from the maintained counters
+
+        Args:
+            db: Database session
+            period_id: Evaluation period ID
+            include_breakdown: Also return per-program and per-year-level rows
+
+        Returns:
+            Dictionary with headline numbers and breakdowns, or None if the period does not exist
+        """
+        period = db.execute(text("""
+            SELECT id, name, status, total_students, total_evaluations,
+                   completed_evaluations, progress_reconciled_at
+            FROM evaluation_periods
+            WHERE id = :period_id
+        """), {"period_id": period_id}).fetchone()
+
+        if not period:
+            return None
+
+        total_evaluations = period.total_evaluations or 0
+        completed = period.completed_evaluations or 0
+
+        progress = {
+            "period_id": period.id,
+            "period_name": period.name,
+            "status": period.status,
+            "total_students": period.total_students or 0,
+            "total_evaluations": total_evaluations,
+            "completed_evaluations": completed,
+            "pending_evaluations": max(0, total_evaluations - completed),
+            "completion_rate": round(completed / total_evaluations * 100, 1) if total_evaluations > 0 else 0,
+            "reconciled_at": period.progress_reconciled_at.isoformat() if period.progress_reconciled_at else None
+        }
+
+        if not include_breakdown:
+            return progress
+
+        rows = db.execute(text("""
+            SELECT pp.program_id, p.program_code, pp.year_level,
+                   pp.total_students, pp.total_evaluations, pp.completed_evaluations
+            FROM period_progress pp
+            LEFT JOIN programs p ON p.id = pp.program_id
+            WHERE pp.evaluation_period_id = :period_id
+            ORDER BY p.program_code, pp.year_level
+        """), {"period_id": period_id}).fetchall()
+
+        by_program = {}
+        by_year_level = {}
+        for row in rows:
+            program_key = row.program_code or "Unassigned"
+            for bucket, key in ((by_program, program_key), (by_year_level, row.year_level)):
+                entry = bucket.setdefault(key, {
+                    "total_students": 0,
+                    "total_evaluations": 0,
+                    "completed_evaluations": 0
+                })
+                entry["total_students"] += row.total_students
+                entry["total_evaluations"] += row.total_evaluations
+                entry["completed_evaluations"] += row.completed_evaluations
+
+        for bucket in (by_program, by_year_level):
+            for entry in bucket.values():
+                entry["completion_rate"] = round(
+                    entry["completed_evaluations"] / entry["total_evaluations"] * 100, 1
+                ) if entry["total_evaluations"] > 0 else 0
+
+        progress["by_program"] = by_program
+        progress["by_year_level"] = by_year_level
+        return progress
+
+    @staticmethod
+    def rebuild(db: Session, period_id: Optional[int] = None) -> None:
+        """
+        Recompute counters from the evaluations table inside the caller's
+        transaction (used after removals, which the delta methods don't cover)
+
+        Args:
+            db: Database session
+            period_id: Period to rebuild (None = all periods)
+        """
+        period_filter = "" if period_id is None else "WHERE p.id = :period_id"
+        params = {} if period_id is None else {"period_id": period_id}
+
+        db.execute(text(f"""
+            UPDATE evaluation_periods ep
+            SET total_students = agg.total_students,
+                total_evaluations = agg.total_evaluations,
+                completed_evaluations = agg.completed_evaluations,
+                progress_reconciled_at = NOW()
+            FROM (
+                SELECT
+                    p.id,
+                    COUNT(DISTINCT ev.student_id) AS total_students,
+                    COUNT(ev.id) AS total_evaluations,
+                    COUNT(ev.id) FILTER (WHERE ev.submission_date IS NOT NULL) AS completed_evaluations
+                FROM evaluation_periods p
+                LEFT JOIN evaluations ev ON ev.evaluation_period_id = p.id
+                {period_filter}
+                GROUP BY p.id
+            ) agg
+            WHERE ep.id = agg.id
+        """), params)
+
+        delete_filter = "" if period_id is None else "WHERE evaluation_period_id = :period_id"
+        db.execute(text(f"DELETE FROM period_progress {delete_filter}"), params)
+
+        insert_filter = "" if period_id is None else "AND ev.evaluation_period_id = :period_id"
+        db.execute(text(f"""
+            INSERT INTO period_progress (
+                evaluation_period_id, program_id, year_level,
+                total_students, total_evaluations, completed_evaluations, updated_at
+            )
+            SELECT
+                ev.evaluation_period_id,
+                COALESCE(s.program_id, 0),
+                COALESCE(s.year_level, 0),
+                COUNT(DISTINCT ev.student_id),
+                COUNT(*),
+                COUNT(*) FILTER (WHERE ev.submission_date IS NOT NULL),
+                NOW()
+            FROM evaluations ev
+            JOIN students s ON s.id = ev.student_id
+            WHERE ev.evaluation_period_id IS NOT NULL
+            {insert_filter}
+            GROUP BY ev.evaluation_period_id, COALESCE(s.program_id, 0), COALESCE(s.year_level, 0)
+        """), params)
+
+    @staticmethod
+    def reconcile(db: Session, period_id: Optional[int] = None) -> Dict:
+        """
+        Rebuild counters from the evaluations table and report drift.
+        Commits on success.
+
+        Args:
+            db: Database session
+            period_id: Period to reconcile (None = all periods)
+
+        Returns:
+            Dictionary with the periods checked and the ones that had drifted
+        """
+        period_filter = "" if period_id is None else "WHERE p.id = :period_id"
+        params = {} if period_id is None else {"period_id": period_id}
+
+        actual = db.execute(text(f"""
+            SELECT
+                p.id,
+                COALESCE(p.total_students, 0) AS stored_students,
+                COALESCE(p.total_evaluations, 0) AS stored_evaluations,
+                COALESCE(p.completed_evaluations, 0) AS stored_completed,
+                COUNT(DISTINCT ev.student_id) AS total_students,
+                COUNT(ev.id) AS total_evaluations,
+                COUNT(ev.id) FILTER (WHERE ev.submission_date IS NOT NULL) AS completed_evaluations
+            FROM evaluation_periods p
+            LEFT JOIN evaluations ev ON ev.evaluation_period_id = p.id
+            {period_filter}
+            GROUP BY p.id
+        """), params).fetchall()
+
+        drifted = []
+        for row in actual:
+            if (row.stored_students, row.stored_evaluations, row.stored_completed) != \
+               (row.total_students, row.total_evaluations, row.completed_evaluations):
+                drifted.append({
+                    "period_id": row.id,
+                    "stored": {
+                        "total_students": row.stored_students,
+                        "total_evaluations": row.stored_evaluations,
+                        "completed_evaluations": row.stored_completed
+                    },
+                    "actual": {
+                        "total_students": row.total_students,
+                        "total_evaluations": row.total_evaluations,
+                        "completed_evaluations": row.completed_evaluations
+                    }
+                })
+
+        try:
+            PeriodProgressService.rebuild(db, period_id)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to reconcile period progress: {e}")
+            raise
+
+        if drifted:
+            logger.warning(f"[PROGRESS] Repaired counter drift for {len(drifted)} period(s): {[d['period_id'] for d in drifted]}")
+
+        return {
+            "success": True,
+            "periods_checked": len(actual),
+            "periods_repaired": len(drifted),
+            "drift": drifted
+        }
@@ -8,11 +8,90 @@ from database.connection import get_db
 from sqlalchemy import text
 from datetime import datetime
 from typing import Optional, List, Dict
+from contextlib import contextmanager
 import logging
 import json
+import os
+import time
 
 logger = logging.getLogger(__name__)
 
+# Students listed per year level in an advancement plan (the rest are counted only)
+PLAN_SAMPLE_SIZE = 5
+
+# Students enrolled in the source period and the target period's class sections.
+# target_year is the year level the student will be in (advanced when :advance is set).
+TRANSITION_SOURCE_CTE = """
+    WITH source_students AS (
+        SELECT
+            s.id AS student_id,
+            s.program_id,
+            s.year_level,
+            CASE WHEN :advance AND s.year_level < 4
+                 THEN s.year_level + 1
+                 ELSE s.year_level
+            END AS target_year
+        FROM students s
+        WHERE s.is_active = true
+        AND EXISTS (
+            SELECT 1 FROM enrollments e
+            WHERE e.student_id = s.id
+            AND e.evaluation_period_id = :from_period_id
+        )
+    ),
+    target_sections AS (
+        SELECT cs.id AS class_section_id, c.program_id, c.year_level
+        FROM class_sections cs
+        JOIN courses c ON cs.course_id = c.id
+        WHERE cs.semester = :semester
+        AND cs.academic_year = :academic_year
+    )
+"""
+
+# Snapshot retention: snapshots older than ADVANCEMENT_SNAPSHOT_RETENTION_DAYS are pruned
+# when a new one is taken, but the latest ADVANCEMENT_SNAPSHOT_KEEP are always kept
+ADVANCEMENT_SNAPSHOT_RETENTION_DAYS = int(os.getenv("ADVANCEMENT_SNAPSHOT_RETENTION_DAYS", "365"))
+ADVANCEMENT_SNAPSHOT_KEEP = int(os.getenv("ADVANCEMENT_SNAPSHOT_KEEP", "5"))
+
+# Snapshot rows as a relation: one (student_id, year_level, is_active) per student
+SNAPSHOT_ROWS_CTE = """
+    WITH snap AS (
+        SELECT u.student_id, u.year_level, u.is_active
+        FROM advancement_snapshots a,
+             unnest(a.student_ids, a.year_levels, a.is_active) AS u(student_id, year_level, is_active)
+        WHERE a.id = :snapshot_id
+    )
+"""
+
+def _eligibility_filters(program_id: Optional[int] = None, current_year_level: Optional[int] = None):
+    """Extra WHERE conditions (and params) narrowing the students eligible for advancement"""
+    filters = ""
+    params = {}
+    
+    if program_id:
+        filters += " AND s.program_id = :program_id"
+        params['program_id'] = program_id
+    
+    if current_year_level:
+        filters += " AND s.year_level = :current_year_level"
+        params['current_year_level'] = current_year_level
+    
+    return filters, params
+
+class _PhaseTimer:
+    """Collects wall-clock milliseconds per named phase"""
+    
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+    
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = round((time.perf_counter() - started) * 1000, 1)
+
 class StudentAdvancementService:
     """
     Handles student year level advancement and enrollment transitions
@@ -23,118 +102,148 @@ class StudentAdvancementService:
         db,
         program_id: Optional[int] = None,
         current_year_level: Optional[int] = None,
-        dry_run: bool = True
+        dry_run: bool = True,
+        created_by: Optional[int] = None
     ) -> Dict:
         """
         Advance students to next year level after completing academic year
         
+        The plan is computed with one aggregate query. The advancement is one
+        statement: an UPDATE ... FROM over every eligible student whose RETURNING
+        rows (with the previous year level) feed the INSERT of the snapshot, so the
+        snapshot holds exactly the students that were advanced.
+        
         Args:
             db: Database session
             program_id: Filter by specific program (None = all programs)
             current_year_level: Filter by specific year level (None = all levels)
             dry_run: If True, only shows what would happen without making changes
+            created_by: User running the advancement (recorded on the snapshot)
         
         Returns:
-            Dictionary with advancement results
+            Dictionary with advancement results and per-phase timings
         """
-        
-        # Build query to find students eligible for advancement
-        query = """
-            SELECT 
-                s.id,
-                s.student_number,
-                s.year_level,
-                s.program_id,
-                u.first_name,
-                u.last_name,
-                p.program_name
-            FROM students s
-            JOIN users u ON s.user_id = u.id
-            JOIN programs p ON s.program_id = p.id
-            WHERE s.is_active = true
-            AND s.year_level < 4  -- Don't advance year 4 students
-        """
-        
-        params = {}
-        
-        if program_id:
-            query += " AND s.program_id = :program_id"
-            params['program_id'] = program_id
-        
-        if current_year_level:
-            query += " AND s.year_level = :current_year_level"
-            params['current_year_level'] = current_year_level
-        
-        query += " ORDER BY s.program_id, s.year_level, s.student_number"
-        
-        # Get eligible students
-        students = db.execute(text(query), params).fetchall()
-        
-        if not students:
+        timer = _PhaseTimer()
+        
+        # Eligible students: active, in a program, below year 4 (year 4 students don't advance)
+        filters, params = _eligibility_filters(program_id, current_year_level)
+        params["sample_size"] = PLAN_SAMPLE_SIZE
+        
+        with timer.phase("plan"):
+            plan_rows = db.execute(text(f"""
+                WITH eligible AS (
+                    SELECT
+                        s.year_level,
+                        s.student_number,
+                        u.first_name || ' ' || u.last_name AS name,
+                        p.program_name,
+                        ROW_NUMBER() OVER (
+                            PARTITION BY s.year_level
+                            ORDER BY s.program_id, s.student_number
+                        ) AS rn
+                    FROM students s
+                    JOIN users u ON s.user_id = u.id
+                    JOIN programs p ON s.program_id = p.id
+                    WHERE s.is_active = true
+                    AND s.year_level < 4
+                    {filters}
+                )
+                SELECT
+                    year_level,
+                    COUNT(*) AS student_count,
+                    json_agg(
+                        json_build_object(
+                            'student_number', student_number,
+                            'name', name,
+                            'program', program_name
+                        ) ORDER BY rn
+                    ) FILTER (WHERE rn <= :sample_size) AS sample
+                FROM eligible
+                GROUP BY year_level
+                ORDER BY year_level
+            """), params).fetchall()
+        
+        total_students = sum(row.student_count for row in plan_rows)
+        
+        if total_students == 0:
             return {
                 "success": True,
                 "dry_run": dry_run,
                 "students_advanced": 0,
+                "timings_ms": timer.timings,
                 "message": "No eligible students found for advancement"
             }
         
-        # Group by current year level for reporting
-        advancement_plan = {}
-        for student in students:
-            current_level = student[2]
-            new_level = current_level + 1
-            
-            if current_level not in advancement_plan:
-                advancement_plan[current_level] = {
-                    "from_year": current_level,
-                    "to_year": new_level,
-                    "students": []
-                }
-            
-            advancement_plan[current_level]["students"].append({
-                "id": student[0],
-                "student_number": student[1],
-                "name": f"{student[4]} {student[5]}",
-                "program": student[6]
-            })
+        # Group by current year level for reporting (students = first few, for preview)
+        advancement_plan = {
+            row.year_level: {
+                "from_year": row.year_level,
+                "to_year": row.year_level + 1,
+                "student_count": row.student_count,
+                "students": row.sample or []
+            }
+            for row in plan_rows
+        }
+        
+        students_advanced = total_students
         
         # Execute advancement if not dry run
         if not dry_run:
-            # Create snapshot BEFORE making changes
-            snapshot_result = StudentAdvancementService.create_advancement_snapshot(
-                db, 
-                description=f"Before advancing {len(students)} students"
-            )
-            snapshot_id = snapshot_result.get("snapshot_id")
-            
-            for student in students:
-                student_id = student[0]
-                new_year_level = student[2] + 1
-                
-                db.execute(text("""
-                    UPDATE students
-                    SET year_level = :new_year_level
-                    WHERE id = :student_id
-                """), {
-                    "new_year_level": new_year_level,
-                    "student_id": student_id
-                })
+            # Same students as the plan (joined to users and programs), snapshotted as they were
+            with timer.phase("advance"):
+                snapshot = db.execute(text(f"""
+                    WITH advanced AS (
+                        UPDATE students s
+                        SET year_level = s.year_level + 1
+                        FROM users u, programs p
+                        WHERE u.id = s.user_id
+                        AND p.id = s.program_id
+                        AND s.is_active = true
+                        AND s.year_level < 4
+                        {filters}
+                        RETURNING s.id, s.year_level - 1 AS year_level, s.is_active
+                    )
+                    INSERT INTO advancement_snapshots (
+                        description,
+                        created_by,
+                        student_count,
+                        student_ids,
+                        year_levels,
+                        is_active,
+                        created_at
+                    )
+                    SELECT
+                        'Before advancing ' || COUNT(*) || ' students',
+                        :created_by,
+                        COUNT(*),
+                        COALESCE(array_agg(id ORDER BY id), '{{}}'),
+                        COALESCE(array_agg(CAST(year_level AS SMALLINT) ORDER BY id), '{{}}'),
+                        COALESCE(array_agg(is_active ORDER BY id), '{{}}'),
+                        NOW()
+                    FROM advanced
+                    RETURNING id, student_count
+                """), {**params, "created_by": created_by}).fetchone()
+                StudentAdvancementService.prune_advancement_snapshots(db, commit=False)
+            snapshot_id = snapshot.id
+            students_advanced = snapshot.student_count
             
-            db.commit()
+            with timer.phase("commit"):
+                db.commit()
             
             # Log the advancement
-            logger.info(f"Advanced {len(students)} students to next year level (snapshot: {snapshot_id})")
+            logger.info(f"Advanced {students_advanced} students to next year level (snapshot: {snapshot_id})")
         
         result = {
             "success": True,
             "dry_run": dry_run,
-            "students_advanced": len(students),
+            "students_advanced": students_advanced,
             "advancement_plan": advancement_plan,
-            "message": f"{'Would advance' if dry_run else 'Advanced'} {len(students)} students"
+            "timings_ms": timer.timings,
+            "message": f"{'Would advance' if dry_run else 'Advanced'} {students_advanced} students"
         }
         
         # Include snapshot ID if real execution
-        if not dry_run and 'snapshot_id' in locals():
+        if not dry_run:
             result["snapshot_id"] = snapshot_id
             result["rollback_info"] = f"To rollback, use snapshot_id: {snapshot_id}"
         
@@ -153,6 +262,11 @@ class StudentAdvancementService:
         Copy enrollments from one evaluation period to the next
         Optionally advances year level for students (if 3 semesters completed)
         
+        Students enrolled in the source period are matched to the target period's
+        class sections by program and (possibly advanced) year level in one
+        INSERT ... SELECT; advancement is one UPDATE ... FROM. Dry run computes the
+        same plan with aggregate queries.
+        
         Args:
             db: Database session
             from_period_id: Source evaluation period
@@ -161,21 +275,23 @@ class StudentAdvancementService:
             dry_run: If True, only shows what would happen
         
         Returns:
-            Dictionary with enrollment creation results
+            Dictionary with enrollment creation results and per-phase timings
         """
+        timer = _PhaseTimer()
         
         # Get period details
-        from_period = db.execute(text("""
-            SELECT id, name, semester, academic_year
-            FROM evaluation_periods
-            WHERE id = :period_id
-        """), {"period_id": from_period_id}).fetchone()
-        
-        to_period = db.execute(text("""
-            SELECT id, name, semester, academic_year
-            FROM evaluation_periods
-            WHERE id = :period_id
-        """), {"period_id": to_period_id}).fetchone()
+        with timer.phase("resolve_periods"):
+            from_period = db.execute(text("""
+                SELECT id, name, semester, academic_year
+                FROM evaluation_periods
+                WHERE id = :period_id
+            """), {"period_id": from_period_id}).fetchone()
+            
+            to_period = db.execute(text("""
+                SELECT id, name, semester, academic_year
+                FROM evaluation_periods
+                WHERE id = :period_id
+            """), {"period_id": to_period_id}).fetchone()
         
         if not from_period:
             return {
@@ -196,107 +312,136 @@ class StudentAdvancementService:
         elif "3rd" in from_period[2] and "1st" in to_period[2]:
             is_new_academic_year = True
         
-        # Get students from previous period
-        students_to_enroll = db.execute(text("""
-            SELECT DISTINCT
-                s.id,
-                s.student_number,
-                s.year_level,
-                s.program_id,
-                u.first_name,
-                u.last_name
-            FROM students s
-            JOIN users u ON s.user_id = u.id
-            JOIN enrollments e ON s.id = e.student_id
-            WHERE e.evaluation_period_id = :from_period_id
-            AND s.is_active = true
-            ORDER BY s.program_id, s.year_level, s.student_number
-        """), {"from_period_id": from_period_id}).fetchall()
-        
-        if not students_to_enroll:
+        params = {
+            "from_period_id": from_period_id,
+            "to_period_id": to_period_id,
+            "advance": bool(auto_advance_year and is_new_academic_year),
+            "semester": to_period[2],
+            "academic_year": to_period[3]
+        }
+        
+        # Plan: students, advancement and target enrollments per program / target year
+        with timer.phase("plan"):
+            plan_rows = db.execute(text(f"""
+                {TRANSITION_SOURCE_CTE},
+                planned AS (
+                    SELECT
+                        ss.program_id,
+                        ss.target_year,
+                        COUNT(*) AS enrollments_planned,
+                        COUNT(*) FILTER (WHERE NOT EXISTS (
+                            SELECT 1 FROM enrollments e
+                            WHERE e.student_id = ss.student_id
+                            AND e.class_section_id = ts.class_section_id
+                        )) AS enrollments_new
+                    FROM source_students ss
+                    JOIN target_sections ts
+                        ON ts.program_id = ss.program_id
+                        AND ts.year_level = ss.target_year
+                    GROUP BY ss.program_id, ss.target_year
+                ),
+                students_by_group AS (
+                    SELECT
+                        program_id,
+                        target_year,
+                        COUNT(*) AS students,
+                        COUNT(*) FILTER (WHERE target_year > year_level) AS students_advanced
+                    FROM source_students
+                    GROUP BY program_id, target_year
+                )
+                SELECT
+                    sg.program_id,
+                    p.program_code,
+                    sg.target_year,
+                    sg.students,
+                    sg.students_advanced,
+                    COALESCE(pl.enrollments_planned, 0) AS enrollments_planned,
+                    COALESCE(pl.enrollments_new, 0) AS enrollments_new
+                FROM students_by_group sg
+                LEFT JOIN planned pl
+                    ON pl.program_id IS NOT DISTINCT FROM sg.program_id
+                    AND pl.target_year IS NOT DISTINCT FROM sg.target_year
+                LEFT JOIN programs p ON p.id = sg.program_id
+                ORDER BY p.program_code, sg.target_year
+            """), params).fetchall()
+        
+        students_affected = sum(row.students for row in plan_rows)
+        
+        if students_affected == 0:
             return {
                 "success": False,
                 "error": f"No students found in period {from_period_id}"
             }
         
-        # Determine which students should advance year level
-        students_to_advance = []
-        if auto_advance_year and is_new_academic_year:
-            students_to_advance = [s for s in students_to_enroll if s[2] < 4]
-        
-        # Get courses for each student based on their year level
-        enrollments_to_create = []
-        
-        for student in students_to_enroll:
-            student_id = student[0]
-            current_year = student[2]
-            target_year = current_year + 1 if student in students_to_advance else current_year
-            program_id = student[3]
-            
-            # Get class sections for target year level and new period
-            # Match courses to student's program and year level
-            sections = db.execute(text("""
-                SELECT cs.id, c.subject_code, c.subject_name
-                FROM class_sections cs
-                JOIN courses c ON cs.course_id = c.id
-                WHERE c.program_id = :program_id
-                AND c.year_level = :year_level
-                AND cs.semester = :semester
-                AND cs.academic_year = :academic_year
-            """), {
-                "program_id": program_id,
-                "year_level": target_year,
-                "semester": to_period[2],
-                "academic_year": to_period[3]
-            }).fetchall()
-            
-            for section in sections:
-                enrollments_to_create.append({
-                    "student_id": student_id,
-                    "student_number": student[1],
-                    "student_name": f"{student[4]} {student[5]}",
-                    "class_section_id": section[0],
-                    "course_code": section[1],
-                    "course_name": section[2],
-                    "evaluation_period_id": to_period_id,
-                    "year_level": target_year
-                })
+        students_advanced = sum(row.students_advanced for row in plan_rows)
+        enrollments_created = sum(row.enrollments_new for row in plan_rows)
+        
+        plan = [
+            {
+                "program_id": row.program_id,
+                "program_code": row.program_code,
+                "year_level": row.target_year,
+                "students": row.students,
+                "students_advanced": row.students_advanced,
+                "enrollments": row.enrollments_new,
+                "already_enrolled": row.enrollments_planned - row.enrollments_new
+            }
+            for row in plan_rows
+        ]
         
         # Execute enrollment creation if not dry run
         if not dry_run:
-            # Advance students first if needed
-            if students_to_advance:
-                for student in students_to_advance:
-                    db.execute(text("""
-                        UPDATE students
-                        SET year_level = year_level + 1
-                        WHERE id = :student_id
-                    """), {"student_id": student[0]})
-            
-            # Create enrollments
-            for enrollment in enrollments_to_create:
-                db.execute(text("""
+            # Enroll first: target year is computed from the current (pre-advancement) year level
+            with timer.phase("enroll"):
+                enrollments_created = db.execute(text(f"""
+                    {TRANSITION_SOURCE_CTE}
                     INSERT INTO enrollments (
                         student_id,
                         class_section_id,
                         evaluation_period_id,
                         status,
                         enrolled_at
-                    ) VALUES (
-                        :student_id,
-                        :class_section_id,
-                        :evaluation_period_id,
+                    )
+                    SELECT
+                        ss.student_id,
+                        ts.class_section_id,
+                        :to_period_id,
                         'active',
                         NOW()
+                    FROM source_students ss
+                    JOIN target_sections ts
+                        ON ts.program_id = ss.program_id
+                        AND ts.year_level = ss.target_year
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM enrollments e
+                        WHERE e.student_id = ss.student_id
+                        AND e.class_section_id = ts.class_section_id
                     )
                     ON CONFLICT DO NOTHING
-                """), enrollment)
+                """), params).rowcount
             
-            db.commit()
+            # Advance students if needed
+            if params["advance"]:
+                with timer.phase("advance"):
+                    students_advanced = db.execute(text("""
+                        UPDATE students s
+                        SET year_level = s.year_level + 1
+                        FROM (
+                            SELECT DISTINCT student_id
+                            FROM enrollments
+                            WHERE evaluation_period_id = :from_period_id
+                        ) src
+                        WHERE s.id = src.student_id
+                        AND s.is_active = true
+                        AND s.year_level < 4
+                    """), params).rowcount
             
-            logger.info(f"Created {len(enrollments_to_create)} enrollments for period {to_period_id}")
-            if students_to_advance:
-                logger.info(f"Advanced {len(students_to_advance)} students to next year level")
+            with timer.phase("commit"):
+                db.commit()
+            
+            logger.info(f"Created {enrollments_created} enrollments for period {to_period_id}")
+            if students_advanced:
+                logger.info(f"Advanced {students_advanced} students to next year level")
         
         return {
             "success": True,
@@ -304,13 +449,15 @@ class StudentAdvancementService:
             "from_period": from_period[1],
             "to_period": to_period[1],
             "is_new_academic_year": is_new_academic_year,
-            "students_advanced": len(students_to_advance),
-            "enrollments_created": len(enrollments_to_create),
-            "students_affected": len(students_to_enroll),
+            "students_advanced": students_advanced,
+            "enrollments_created": enrollments_created,
+            "students_affected": students_affected,
+            "plan": plan,
+            "timings_ms": timer.timings,
             "message": (
-                f"{'Would create' if dry_run else 'Created'} {len(enrollments_to_create)} enrollments "
-                f"for {len(students_to_enroll)} students. "
-                f"{'Would advance' if dry_run else 'Advanced'} {len(students_to_advance)} students to next year."
+                f"{'Would create' if dry_run else 'Created'} {enrollments_created} enrollments "
+                f"for {students_affected} students. "
+                f"{'Would advance' if dry_run else 'Advanced'} {students_advanced} students to next year."
             )
         }
     
@@ -369,101 +516,107 @@ class StudentAdvancementService:
     
     
     @staticmethod
-    def create_advancement_snapshot(db, description: str = "Manual snapshot") -> Dict:
+    def create_advancement_snapshot(
+        db,
+        description: str = "Manual snapshot",
+        eligible_only: bool = False,
+        program_id: Optional[int] = None,
+        current_year_level: Optional[int] = None,
+        created_by: Optional[int] = None,
+        commit: bool = True
+    ) -> Dict:
         """
         Create a snapshot of current student year levels before advancement
         This allows rollback if advancement was done by mistake
         
+        Only (student_id, year_level, is_active) is stored, as parallel arrays in
+        one advancement_snapshots row. Old snapshots are pruned afterwards.
+        
         Args:
             db: Database session
             description: Description of this snapshot
+            eligible_only: Only capture students an advancement with the same
+                           program_id / current_year_level filters would change
+            program_id: Program filter (with eligible_only)
+            current_year_level: Year level filter (with eligible_only)
+            created_by: User taking the snapshot
+            commit: Commit immediately (False = caller's transaction)
         
         Returns:
             Dictionary with snapshot ID and student count
         """
         
-        # Get all active students with their current year levels
-        students = db.execute(text("""
-            SELECT 
-                s.id,
-                s.student_number,
-                s.year_level,
-                s.program_id,
-                u.first_name,
-                u.last_name,
-                p.program_code
+        if eligible_only:
+            filters, params = _eligibility_filters(program_id, current_year_level)
+            scope = f"""
+                JOIN programs p ON s.program_id = p.id
+                WHERE s.is_active = true
+                AND s.year_level < 4
+                {filters}
+            """
+        else:
+            scope, params = "", {}
+        
+        snapshot = db.execute(text(f"""
+            INSERT INTO advancement_snapshots (
+                description,
+                created_by,
+                student_count,
+                student_ids,
+                year_levels,
+                is_active,
+                created_at
+            )
+            SELECT
+                :description,
+                :created_by,
+                COUNT(*),
+                COALESCE(array_agg(s.id ORDER BY s.id), '{{}}'),
+                COALESCE(array_agg(CAST(s.year_level AS SMALLINT) ORDER BY s.id), '{{}}'),
+                COALESCE(array_agg(s.is_active ORDER BY s.id), '{{}}'),
+                NOW()
             FROM students s
-            JOIN users u ON s.user_id = u.id
-            JOIN programs p ON s.program_id = p.id
-            WHERE s.is_active = true
-            ORDER BY s.id
-        """)).fetchall()
-        
-        # Create snapshot data
-        snapshot_data = []
-        for student in students:
-            snapshot_data.append({
-                "student_id": student[0],
-                "student_number": student[1],
-                "year_level": student[2],
-                "program_id": student[3],
-                "student_name": f"{student[4]} {student[5]}",
-                "program": student[6]
-            })
+            {scope}
+            RETURNING id, student_count, created_at
+        """), {**params, "description": description, "created_by": created_by}).fetchone()
         
-        # Store snapshot in audit_logs table with special action type
-        snapshot_json = json.dumps(snapshot_data, indent=2)
-        
-        result = db.execute(text("""
-            INSERT INTO audit_logs (
-                user_id,
-                action,
-                entity_type,
-                entity_id,
-                changes,
-                ip_address,
-                user_agent,
-                severity,
-                timestamp
-            ) VALUES (
-                1,
-                'ADVANCEMENT_SNAPSHOT',
-                'students',
-                NULL,
-                :snapshot_data,
-                'system',
-                'StudentAdvancementService',
-                'info',
-                NOW()
-            )
-            RETURNING id
-        """), {"snapshot_data": snapshot_json})
+        pruned = StudentAdvancementService.prune_advancement_snapshots(db, commit=False)
         
-        snapshot_id = result.fetchone()[0]
-        db.commit()
+        if commit:
+            db.commit()
         
-        logger.info(f"Created advancement snapshot {snapshot_id} with {len(snapshot_data)} students")
+        logger.info(f"Created advancement snapshot {snapshot.id} with {snapshot.student_count} students")
         
         return {
             "success": True,
-            "snapshot_id": snapshot_id,
-            "student_count": len(snapshot_data),
-            "timestamp": datetime.now().isoformat(),
+            "snapshot_id": snapshot.id,
+            "student_count": snapshot.student_count,
+            "timestamp": snapshot.created_at.isoformat(),
             "description": description,
-            "message": f"Created snapshot with {len(snapshot_data)} students"
+            "snapshots_pruned": pruned["snapshots_pruned"],
+            "message": f"Created snapshot with {snapshot.student_count} students"
         }
     
     
     @staticmethod
-    def rollback_advancement(db, snapshot_id: Optional[int] = None, dry_run: bool = True) -> Dict:
+    def rollback_advancement(
+        db,
+        snapshot_id: Optional[int] = None,
+        dry_run: bool = True,
+        user_id: Optional[int] = None
+    ) -> Dict:
         """
         Rollback student year levels to a previous snapshot
         Use this to undo accidental advancements
         
+        Restores year_level and is_active for every student whose values differ
+        from the snapshot, in a single UPDATE ... FROM.
+        
         Args:
             db: Database session
             snapshot_id: Specific snapshot to restore (None = latest snapshot)
             dry_run: If True, only shows what would happen
+            user_id: User performing the rollback (for the audit log)
         
         Returns:
             Dictionary with rollback results
@@ -471,23 +624,19 @@ class StudentAdvancementService:
         
         # Get the snapshot to restore
         if snapshot_id:
-            snapshot_query = text("""
-                SELECT id, changes, timestamp
-                FROM audit_logs
+            snapshot = db.execute(text("""
+                SELECT id, created_at
+                FROM advancement_snapshots
                 WHERE id = :snapshot_id
-                AND action = 'ADVANCEMENT_SNAPSHOT'
-            """)
-            snapshot = db.execute(snapshot_query, {"snapshot_id": snapshot_id}).fetchone()
+            """), {"snapshot_id": snapshot_id}).fetchone()
         else:
             # Get the most recent snapshot
-            snapshot_query = text("""
-                SELECT id, changes, timestamp
-                FROM audit_logs
-                WHERE action = 'ADVANCEMENT_SNAPSHOT'
-                ORDER BY timestamp DESC
+            snapshot = db.execute(text("""
+                SELECT id, created_at
+                FROM advancement_snapshots
+                ORDER BY created_at DESC, id DESC
                 LIMIT 1
-            """)
-            snapshot = db.execute(snapshot_query).fetchone()
+            """)).fetchone()
         
         if not snapshot:
             return {
@@ -495,99 +644,98 @@ class StudentAdvancementService:
                 "error": "No snapshot found to restore"
             }
         
-        snapshot_id = snapshot[0]
-        snapshot_data = json.loads(snapshot[1])
-        snapshot_timestamp = snapshot[2]
-        
-        # Get current student year levels
-        current_students = db.execute(text("""
-            SELECT id, year_level
-            FROM students
-            WHERE is_active = true
-        """)).fetchall()
-        
-        current_year_levels = {s[0]: s[1] for s in current_students}
-        
-        # Calculate what needs to be rolled back
-        students_to_rollback = []
-        rollback_plan = {}
-        
-        for student_data in snapshot_data:
-            student_id = student_data["student_id"]
-            old_year_level = student_data["year_level"]
-            current_year_level = current_year_levels.get(student_id)
-            
-            if current_year_level and current_year_level != old_year_level:
-                students_to_rollback.append({
-                    "student_id": student_id,
-                    "student_number": student_data["student_number"],
-                    "name": student_data["student_name"],
-                    "program": student_data["program"],
-                    "current_year": current_year_level,
-                    "rollback_to_year": old_year_level
-                })
-                
-                transition = f"{current_year_level}->{old_year_level}"
-                if transition not in rollback_plan:
-                    rollback_plan[transition] = []
-                rollback_plan[transition].append(student_data["student_name"])
+        snapshot_id = snapshot.id
+        snapshot_timestamp = snapshot.created_at
+        
+        # Plan: students whose year level / status differ from the snapshot, by transition
+        plan_rows = db.execute(text(f"""
+            {SNAPSHOT_ROWS_CTE},
+            changed AS (
+                SELECT
+                    s.year_level AS current_year,
+                    snap.year_level AS rollback_to_year,
+                    s.is_active IS DISTINCT FROM snap.is_active AS status_changed,
+                    u.first_name || ' ' || u.last_name AS name,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY s.year_level, snap.year_level
+                        ORDER BY s.student_number
+                    ) AS rn
+                FROM snap
+                JOIN students s ON s.id = snap.student_id
+                JOIN users u ON s.user_id = u.id
+                WHERE s.year_level IS DISTINCT FROM snap.year_level
+                OR s.is_active IS DISTINCT FROM snap.is_active
+            )
+            SELECT
+                current_year,
+                rollback_to_year,
+                COUNT(*) AS student_count,
+                COUNT(*) FILTER (WHERE status_changed) AS status_changes,
+                array_agg(name ORDER BY rn) FILTER (WHERE rn <= :sample_size) AS sample
+            FROM changed
+            GROUP BY current_year, rollback_to_year
+            ORDER BY current_year, rollback_to_year
+        """), {"snapshot_id": snapshot_id, "sample_size": PLAN_SAMPLE_SIZE}).fetchall()
+        
+        rollback_plan = {
+            f"{row.current_year}->{row.rollback_to_year}": {
+                "student_count": row.student_count,
+                "status_changes": row.status_changes,
+                "students": row.sample or []
+            }
+            for row in plan_rows
+        }
+        students_to_rollback = sum(row.student_count for row in plan_rows)
         
         # Execute rollback if not dry run
         if not dry_run and students_to_rollback:
-            for student in students_to_rollback:
-                db.execute(text("""
-                    UPDATE students
-                    SET year_level = :old_year_level
-                    WHERE id = :student_id
-                """), {
-                    "old_year_level": student["rollback_to_year"],
-                    "student_id": student["student_id"]
-                })
+            students_to_rollback = db.execute(text(f"""
+                {SNAPSHOT_ROWS_CTE}
+                UPDATE students s
+                SET year_level = snap.year_level,
+                    is_active = snap.is_active
+                FROM snap
+                WHERE s.id = snap.student_id
+                AND (
+                    s.year_level IS DISTINCT FROM snap.year_level
+                    OR s.is_active IS DISTINCT FROM snap.is_active
+                )
+            """), {"snapshot_id": snapshot_id}).rowcount
+            
+            db.execute(text("""
+                UPDATE advancement_snapshots
+                SET restored_at = NOW()
+                WHERE id = :snapshot_id
+            """), {"snapshot_id": snapshot_id})
             
             # Log the rollback
             db.execute(text("""
-                INSERT INTO audit_logs (
-                    user_id,
-                    action,
-                    entity_type,
-                    entity_id,
-                    changes,
-                    ip_address,
-                    user_agent,
-                    severity,
-                    timestamp
-                ) VALUES (
-                    1,
-                    'ADVANCEMENT_ROLLBACK',
-                    'students',
-                    :snapshot_id,
-                    :rollback_data,
-                    'system',
-                    'StudentAdvancementService',
-                    'warning',
-                    NOW()
-                )
+                INSERT INTO audit_logs (user_id, action, category, severity, status, details, created_at)
+                VALUES (:user_id, 'ADVANCEMENT_ROLLBACK', 'Student Management', 'Warning', 'Success',
+                        CAST(:details AS JSONB), NOW())
             """), {
-                "snapshot_id": snapshot_id,
-                "rollback_data": json.dumps({
-                    "students_affected": len(students_to_rollback),
-                    "rollback_plan": rollback_plan
+                "user_id": user_id,
+                "details": json.dumps({
+                    "snapshot_id": snapshot_id,
+                    "students_affected": students_to_rollback,
+                    "transitions": {
+                        transition: data["student_count"] for transition, data in rollback_plan.items()
+                    }
                 })
             })
             
             db.commit()
-            logger.warning(f"Rolled back {len(students_to_rollback)} students to snapshot {snapshot_id}")
+            logger.warning(f"Rolled back {students_to_rollback} students to snapshot {snapshot_id}")
         
         return {
             "success": True,
             "dry_run": dry_run,
             "snapshot_id": snapshot_id,
             "snapshot_timestamp": str(snapshot_timestamp),
-            "students_rolled_back": len(students_to_rollback),
+            "students_rolled_back": students_to_rollback,
             "rollback_plan": rollback_plan,
-            "students": students_to_rollback,
             "message": (
-                f"{'Would rollback' if dry_run else 'Rolled back'} {len(students_to_rollback)} students "
+                f"{'Would rollback' if dry_run else 'Rolled back'} {students_to_rollback} students "
                 f"to snapshot {snapshot_id} from {snapshot_timestamp}"
             )
         }
@@ -607,31 +755,70 @@ class StudentAdvancementService:
         """
         
         snapshots = db.execute(text("""
-            SELECT 
-                id,
-                timestamp,
-                changes
-            FROM audit_logs
-            WHERE action = 'ADVANCEMENT_SNAPSHOT'
-            ORDER BY timestamp DESC
+            SELECT id, created_at, description, student_count, restored_at
+            FROM advancement_snapshots
+            ORDER BY created_at DESC, id DESC
             LIMIT :limit
         """), {"limit": limit}).fetchall()
         
-        snapshot_list = []
-        for snapshot in snapshots:
-            snapshot_data = json.loads(snapshot[2])
-            snapshot_list.append({
-                "snapshot_id": snapshot[0],
-                "timestamp": str(snapshot[1]),
-                "student_count": len(snapshot_data),
-                "description": f"Snapshot of {len(snapshot_data)} students"
-            })
+        snapshot_list = [
+            {
+                "snapshot_id": snapshot.id,
+                "timestamp": str(snapshot.created_at),
+                "student_count": snapshot.student_count,
+                "description": snapshot.description or f"Snapshot of {snapshot.student_count} students",
+                "restored_at": str(snapshot.restored_at) if snapshot.restored_at else None
+            }
+            for snapshot in snapshots
+        ]
         
         return {
             "success": True,
             "snapshots": snapshot_list,
             "total": len(snapshot_list)
         }
+    
+    
+    @staticmethod
+    def prune_advancement_snapshots(
+        db,
+        retention_days: int = ADVANCEMENT_SNAPSHOT_RETENTION_DAYS,
+        keep_latest: int = ADVANCEMENT_SNAPSHOT_KEEP,
+        commit: bool = True
+    ) -> Dict:
+        """
+        Delete snapshots past the retention window
+        
+        Args:
+            db: Database session
+            retention_days: Snapshots older than this many days are deleted
+            keep_latest: The most recent N snapshots are always kept
+            commit: Commit immediately (False = caller's transaction)
+        
+        Returns:
+            Dictionary with the number of snapshots pruned
+        """
+        
+        pruned = db.execute(text("""
+            DELETE FROM advancement_snapshots
+            WHERE created_at < NOW() - make_interval(days => :retention_days)
+            AND id NOT IN (
+                SELECT id FROM advancement_snapshots
+                ORDER BY created_at DESC, id DESC
+                LIMIT :keep_latest
+            )
+        """), {"retention_days": retention_days, "keep_latest": keep_latest}).rowcount
+        
+        if commit:
+            db.commit()
+        
+        if pruned:
+            logger.info(f"Pruned {pruned} advancement snapshots older than {retention_days} days")
+        
+        return {
+            "success": True,
+            "snapshots_pruned": pruned
+        }
 
 
 def run_year_end_advancement(db, dry_run: bool = True) -> Dict:
@@ -676,11 +863,11 @@ def run_year_end_advancement(db, dry_run: bool = True) -> Dict:
             print("\nAdvancement Details:")
             for year, details in result["advancement_plan"].items():
                 print(f"\n  Year {details['from_year']} -> Year {details['to_year']}:")
-                print(f"  {len(details['students'])} students")
-                for student in details["students"][:5]:  # Show first 5
+                print(f"  {details['student_count']} students")
+                for student in details["students"]:  # First few only
                     print(f"    • {student['student_number']} - {student['name']} ({student['program']})")
-                if len(details["students"]) > 5:
-                    print(f"    ... and {len(details['students']) - 5} more")
+                if details["student_count"] > len(details["students"]):
+                    print(f"    ... and {details['student_count'] - len(details['students'])} more")
     else:
         print(f"\n❌ Error: {result.get('error', 'Unknown error')}")
     
@@ -0,0 +1,54 @@
+"""
+Unit Tests for the Enrollment Index (bulk import validation)
+Course Feedback Evaluation System
+"""
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.enrollment_validation import EnrollmentIndex, EnrolledStudent, normalize_name
+
+def enrolled(student_number, program_id, first_name="Juan", last_name="Dela Cruz"):
+    return EnrolledStudent(
+        len(student_number), student_number, first_name, last_name, None, None,
+        program_id, "CCS", "College of Computer Studies",
+        normalize_name(first_name), normalize_name(last_name)
+    )
+
+class TestEnrollmentIndex:
+    """validate_batch must agree with the per-row validate_student_enrollment query"""
+
+    @pytest.fixture
+    def index(self):
+        students = {
+            "2024-00001": enrolled("2024-00001", 1),
+            "2024-00002": enrolled("2024-00002", 99),  # program row deleted
+        }
+        return EnrollmentIndex(students, {1: ("BSIT", "BS Information Technology")}, version=())
+
+    def test_valid_student(self, index):
+        """Test Case: Enrolled student in an existing program validates"""
+        result = index.validate_batch([("2024-00001", None, "Juan", "Dela Cruz")])[0]
+        assert result["valid"] is True
+        assert result["enrollment"]["program_code"] == "BSIT"
+        assert not result["warnings"]
+
+    def test_missing_program_not_in_list(self, index):
+        """Test Case: Enrollment whose program no longer exists is rejected (per-row path INNER JOINs programs)"""
+        result = index.validate_batch([("2024-00002", None, "Juan", "Dela Cruz")])[0]
+        assert result["valid"] is False
+        assert result["error"] == "STUDENT_NOT_IN_ENROLLMENT_LIST"
+
+    def test_student_number_not_stripped(self, index):
+        """Test Case: Student numbers match exactly, as in the per-row query"""
+        results = index.validate_batch([(" 2024-00001 ", None, None, None), (None, None, None, None)])
+        assert [result["error"] for result in results] == ["STUDENT_NOT_IN_ENROLLMENT_LIST"] * 2
+
+    def test_program_mismatch(self, index):
+        """Test Case: Assigning another program reports both programs"""
+        result = index.validate_batch([("2024-00001", 7, "Juan", "Dela Cruz")])[0]
+        assert result["valid"] is False
+        assert result["error"] == "PROGRAM_MISMATCH"
+        assert result["attempted_program"]["code"] == "Unknown"
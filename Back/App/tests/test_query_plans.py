@@ -0,0 +1,43 @@
+"""
+Query Plan Regression Tests
+EXPLAIN checks for the heavy analytics endpoints (see benchmarks/query_plans.py)
+
+Needs a local database seeded with benchmarks.generate_data, so the tests only run
+when QUERY_PLAN_TESTS=1:
+    QUERY_PLAN_TESTS=1 pytest tests/test_query_plans.py -v
+"""
+import os
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.query_plans import HOT_QUERIES, cost_regression, load_baseline, plan_violations, run_plans
+
+pytestmark = pytest.mark.skipif(os.getenv("QUERY_PLAN_TESTS") != "1", reason="Set QUERY_PLAN_TESTS=1 with a seeded local database")
+
+@pytest.fixture(scope="module")
+def plan_results():
+    """Every hot endpoint called and EXPLAINed once for the module"""
+    return {result.query.name: result for result in run_plans()}
+
+@pytest.fixture(scope="module")
+def baseline():
+    return load_baseline()
+
+@pytest.mark.parametrize("name", [query.name for query in HOT_QUERIES])
+class TestHotQueryPlans:
+    """Plans of the SQL each endpoint actually sends"""
+
+    def test_endpoint_responds(self, plan_results, name):
+        assert plan_results[name].status_code == 200
+        assert plan_results[name].statements, "No SELECT captured"
+
+    def test_no_seq_scan_on_large_tables(self, plan_results, name):
+        assert plan_violations(plan_results[name]) == []
+
+    def test_cost_within_baseline(self, plan_results, baseline, name):
+        if name not in baseline.get("queries", {}):
+            pytest.skip("No baseline recorded - run python -m benchmarks.query_plans --save-baseline")
+        assert cost_regression(plan_results[name], baseline) is None
@@ -14,10 +14,10 @@ from ml_services.sentiment_analyzer import SentimentAnalyzer
 class TestSentimentAnalyzer:
     """Test cases for SVM-based sentiment analysis"""
     
-    @pytest.fixture
-    def analyzer(self):
-        """Initialize sentiment analyzer for testing and train with sample data"""
-        analyzer_instance = SentimentAnalyzer()
+    @pytest.fixture(params=["svc", "linear", "linear-hashing"])
+    def analyzer(self, request):
+        """Initialize sentiment analyzer for testing (every engine) and train with sample data"""
+        analyzer_instance = SentimentAnalyzer(engine=request.param)
         
         # Training data
         train_texts = [
@@ -119,5 +119,35 @@ class TestSentimentAnalyzer:
             assert sentiment in ['positive', 'neutral', 'negative'], "Invalid sentiment"
             assert 0 <= confidence <= 1, "Invalid confidence score"
 
+    def test_batch_matches_single_predictions(self, analyzer):
+        """Test Case: Vectorized batch gives the same results as predict(), empty texts included"""
+        texts = [
+            "Excellent course",
+            "",
+            "Poor teaching",
+            "   ",
+            "Average content"
+        ]
+        
+        results = analyzer.predict_batch(texts)
+        for text, (sentiment, confidence) in zip(texts, results):
+            expected_sentiment, expected_confidence = analyzer.predict(text)
+            assert sentiment == expected_sentiment, f"Batch sentiment differs for: {text!r}"
+            assert confidence == pytest.approx(expected_confidence), f"Batch confidence differs for: {text!r}"
+
+    def test_save_and_load_keeps_engine(self, analyzer, tmp_path):
+        """Test Case: A saved model loads with its engine and predicts the same"""
+        analyzer.model_dir = tmp_path
+        texts = ["Excellent course", "Poor teaching", "Average content"]
+        
+        loaded = SentimentAnalyzer(model_path=analyzer.save_model("sentiment.pkl"))
+        assert loaded.engine == analyzer.engine, "Engine not restored"
+        assert loaded.predict_batch(texts) == analyzer.predict_batch(texts), "Loaded model predicts differently"
+    
+    def test_unknown_engine(self):
+        """Test Case: Reject an unknown engine name"""
+        with pytest.raises(ValueError):
+            SentimentAnalyzer(engine="rbf-fast")
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
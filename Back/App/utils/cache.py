@@ -1,49 +1,131 @@
 """
 Simple in-memory caching utilities
 Provides LRU cache decorators for frequently accessed data
+
+Every API worker has its own cache. clear_all_caches() also bumps the
+cache_generation row (migration 28), and each worker re-reads it at most every
+CACHE_GENERATION_CHECK_SECONDS on lookup and drops its entries when it changed -
+so a write served by one worker reaches the others within a few seconds. Other
+per-process caches (e.g. the active period resolver) follow the same signal by
+registering with on_clear(). clear_all_caches(activated_period_id=...) also
+records an activation, and on_activation() callbacks (the dashboard warm-up) run
+in each worker that picks it up.
 """
 from functools import lru_cache, wraps
+from collections import Counter
 from datetime import datetime, timedelta
-from typing import Any, Callable
+from typing import Any, Callable, List, Optional
 import hashlib
+import inspect
 import json
+import logging
+import os
+import threading
+import time
+from utils.metrics import CACHE_REQUESTS, CACHE_EVICTIONS
+
+logger = logging.getLogger(__name__)
+
+# How often a worker checks whether another worker cleared the caches
+CACHE_GENERATION_CHECK_SECONDS = float(os.getenv("CACHE_GENERATION_CHECK_SECONDS", "2"))
 
 # Simple time-based cache
 _time_cache = {}
 _cache_timestamps = {}
+_cache_namespaces = {}  # key -> namespace (metrics labels)
+
+# cache_generation this worker's entries were cached under
+_generation = {"value": None, "checked": 0.0, "failing": False}
+_generation_lock = threading.Lock()
 
-def timed_cache(seconds: int = 300):
+# Run whenever this worker's caches are dropped (see on_clear)
+_clear_callbacks: List[Callable[[], None]] = []
+# Run with the period ID when another worker activated a period (see on_activation)
+_activation_callbacks: List[Callable[[int], None]] = []
+
+# Arguments left out of cache keys (per-request objects such as the DB session)
+UNCACHED_ARGS = ("db",)
+
+def timed_cache(seconds: int = 300, namespace: str = "default"):
     """
     Cache decorator with time-based expiration
+    Works on plain and async functions (including FastAPI route handlers); the
+    key is built from the call's arguments, without the DB session.
     Args:
         seconds: Cache duration in seconds (default 5 minutes)
+        namespace: Label for the cache_requests/cache_evictions metrics
     """
     def decorator(func: Callable) -> Callable:
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            # Create cache key from function name and arguments
-            cache_key = f"{func.__name__}:{hash_args(args, kwargs)}"
-            current_time = datetime.now()
-            
-            # Check if cached value exists and is not expired
-            if cache_key in _time_cache:
-                cached_time = _cache_timestamps.get(cache_key)
-                if cached_time and (current_time - cached_time).total_seconds() < seconds:
-                    return _time_cache[cache_key]
-            
-            # Call function and cache result
-            result = func(*args, **kwargs)
+        signature = inspect.signature(func)
+        prefix = f"{func.__module__}.{func.__qualname__}:"
+
+        def make_key(args, kwargs) -> str:
+            bound = signature.bind_partial(*args, **kwargs)
+            bound.apply_defaults()
+            key_args = {name: value for name, value in bound.arguments.items() if name not in UNCACHED_ARGS}
+            return prefix + hash_args((), key_args)
+
+        def lookup(cache_key: str):
+            sync_generation()
+            cached_time = _cache_timestamps.get(cache_key)
+            if cached_time and (datetime.now() - cached_time).total_seconds() < seconds and cache_key in _time_cache:
+                CACHE_REQUESTS.labels(namespace=namespace, result="hit").inc()
+                return True, _time_cache[cache_key]
+            CACHE_REQUESTS.labels(namespace=namespace, result="miss").inc()
+            if cached_time:
+                CACHE_EVICTIONS.labels(namespace=namespace, reason="expired").inc()
+            return False, None
+
+        def store(cache_key: str, result: Any) -> None:
             _time_cache[cache_key] = result
-            _cache_timestamps[cache_key] = current_time
-            
-            return result
-        
-        # Add cache clearing method
-        wrapper.clear_cache = lambda: _time_cache.clear()
+            _cache_timestamps[cache_key] = datetime.now()
+            _cache_namespaces[cache_key] = namespace
+
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                cache_key = make_key(args, kwargs)
+                hit, result = lookup(cache_key)
+                if hit:
+                    return result
+                result = await func(*args, **kwargs)
+                store(cache_key, result)
+                return result
+        else:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                cache_key = make_key(args, kwargs)
+                hit, result = lookup(cache_key)
+                if hit:
+                    return result
+                result = func(*args, **kwargs)
+                store(cache_key, result)
+                return result
+
+        def invalidate(*args, **kwargs) -> None:
+            """Drop the entry for one set of arguments"""
+            if _drop(make_key(args, kwargs)):
+                CACHE_EVICTIONS.labels(namespace=namespace, reason="invalidated").inc()
+
+        def clear_cache() -> None:
+            """Drop every entry of this function"""
+            dropped = sum(_drop(key) for key in list(_time_cache) if key.startswith(prefix))
+            if dropped:
+                CACHE_EVICTIONS.labels(namespace=namespace, reason="cleared").inc(dropped)
+
+        # Add cache clearing methods
+        wrapper.invalidate = invalidate
+        wrapper.clear_cache = clear_cache
         return wrapper
     
     return decorator
 
+def _drop(cache_key: str) -> bool:
+    """Remove one entry; True if it existed"""
+    _cache_timestamps.pop(cache_key, None)
+    _cache_namespaces.pop(cache_key, None)
+    return _time_cache.pop(cache_key, _drop) is not _drop
+
 def hash_args(args, kwargs) -> str:
     """Create a hash from function arguments"""
     try:
@@ -55,9 +137,9 @@ def hash_args(args, kwargs) -> str:
         return str(hash((args, tuple(sorted(kwargs.items())))))
 
 # Pre-configured cache decorators for common use cases
-dashboard_cache = timed_cache(seconds=300)  # 5 minutes for dashboards
-stats_cache = timed_cache(seconds=600)      # 10 minutes for statistics
-sentiment_cache = timed_cache(seconds=900)  # 15 minutes for sentiment analysis
+dashboard_cache = timed_cache(seconds=300, namespace="dashboard")  # 5 minutes for dashboards
+stats_cache = timed_cache(seconds=600, namespace="stats")          # 10 minutes for statistics
+sentiment_cache = timed_cache(seconds=900, namespace="sentiment")  # 15 minutes for sentiment analysis
 
 # LRU cache for frequently accessed data
 @lru_cache(maxsize=100)
@@ -90,12 +172,105 @@ def cached_user_lookup(user_id: int):
     db.close()
     return dict(user._mapping) if user else None
 
-def clear_all_caches():
-    """Clear all caches - call when data is modified"""
+def _clear_local(reason: str) -> None:
+    """Drop every entry of this worker"""
+    for namespace, dropped in Counter(_cache_namespaces.values()).items():
+        CACHE_EVICTIONS.labels(namespace=namespace, reason=reason).inc(dropped)
     _time_cache.clear()
     _cache_timestamps.clear()
+    _cache_namespaces.clear()
     cached_course_lookup.cache_clear()
     cached_user_lookup.cache_clear()
+    for callback in _clear_callbacks:
+        callback()
+
+def on_clear(callback: Callable[[], None]) -> None:
+    """Also run callback whenever this worker's caches are cleared, here or by another worker"""
+    _clear_callbacks.append(callback)
+
+def on_activation(callback: Callable[[int], None]) -> None:
+    """Run callback(period_id) when this worker sees a period activation made by another worker"""
+    _activation_callbacks.append(callback)
+
+def _read_generation(bump: bool = False, activated_period_id: Optional[int] = None):
+    """
+    Current cache_generation row (incremented first when bump)
+
+    Returns:
+        (generation, activated_period_id, activated_generation), or None without the row
+    """
+    from database.connection import engine
+    from sqlalchemy import text
+
+    with engine.begin() as conn:
+        if bump:
+            return conn.execute(text("""
+                UPDATE cache_generation
+                SET generation = generation + 1,
+                    activated_period_id = COALESCE(CAST(:activated_period_id AS INTEGER), activated_period_id),
+                    activated_generation = CASE
+                        WHEN CAST(:activated_period_id AS INTEGER) IS NULL THEN activated_generation
+                        ELSE generation + 1
+                    END,
+                    updated_at = CURRENT_TIMESTAMP
+                RETURNING generation, activated_period_id, activated_generation
+            """), {"activated_period_id": activated_period_id}).fetchone()
+        return conn.execute(text("""
+            SELECT generation, activated_period_id, activated_generation FROM cache_generation
+        """)).fetchone()
+
+def sync_generation() -> None:
+    """
+    Drop this worker's entries if another worker cleared the caches
+
+    Reads cache_generation at most every CACHE_GENERATION_CHECK_SECONDS. When it
+    can't be read, the entries are dropped anyway, so without the signal nothing
+    is served for longer than the check interval.
+    """
+    if time.monotonic() - _generation["checked"] < CACHE_GENERATION_CHECK_SECONDS:
+        return
+    with _generation_lock:
+        if time.monotonic() - _generation["checked"] < CACHE_GENERATION_CHECK_SECONDS:
+            return
+        try:
+            row = _read_generation()
+            _generation["failing"] = False
+        except Exception as e:
+            if not _generation["failing"]:
+                logger.warning(f"[CACHE] Can't read cache_generation, caching for {CACHE_GENERATION_CHECK_SECONDS}s at most: {e}")
+            _generation["failing"] = True
+            row = None
+        previous = _generation["value"]
+        current = row[0] if row else None
+        if current is None or current != previous:
+            _clear_local("remote")
+        _generation["value"] = current
+        _generation["checked"] = time.monotonic()
+
+        # A period was activated since this worker last looked: warm it here as well
+        if previous is not None and row and row[1] is not None and row[2] is not None and row[2] > previous:
+            for callback in _activation_callbacks:
+                try:
+                    callback(row[1])
+                except Exception as e:
+                    logger.warning(f"[CACHE] Activation callback failed: {e}")
+
+def clear_all_caches(activated_period_id: Optional[int] = None):
+    """
+    Clear all caches in every worker - call after the data change is committed
+
+    Args:
+        activated_period_id: Period just activated - the other workers run their
+            on_activation callbacks for it (this worker warms it itself)
+    """
+    with _generation_lock:
+        _clear_local("cleared")
+        try:
+            row = _read_generation(bump=True, activated_period_id=activated_period_id)
+            _generation["value"] = row[0] if row else None
+            _generation["checked"] = time.monotonic()
+        except Exception as e:
+            logger.warning(f"[CACHE] Can't bump cache_generation, other workers keep their entries until they expire: {e}")
     print("[CACHE] All caches cleared")
 
 def get_cache_stats():
@@ -0,0 +1,128 @@
+"""
+Prometheus metrics for the API
+Defines the request, database, cache, rate-limit, ML, startup and email metrics served at /metrics
+
+Uses prometheus_client. With several uvicorn workers set PROMETHEUS_MULTIPROC_DIR
+to an empty directory shared by the workers (see Procfile): every worker writes its
+samples there and /metrics aggregates all of them, whichever worker answers.
+Without prometheus_client installed the metrics are no-ops and /metrics returns 503.
+"""
+from typing import Optional
+import os
+
+try:
+    from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, multiprocess
+    from prometheus_client.openmetrics.exposition import generate_latest, CONTENT_TYPE_LATEST
+    METRICS_AVAILABLE = True
+except ImportError:
+    METRICS_AVAILABLE = False
+    CONTENT_TYPE_LATEST = "text/plain; charset=utf-8"
+
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+# Bearer token required by /metrics (unset = open, e.g. behind a private network)
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+class _NoopMetric:
+    """Stand-in when prometheus_client is not installed"""
+    def labels(self, *args, **kwargs):
+        return self
+    def inc(self, amount=1):
+        pass
+    def dec(self, amount=1):
+        pass
+    def set(self, value):
+        pass
+    def observe(self, value):
+        pass
+
+def _metric(kind: str, name: str, documentation: str, labelnames=(), **kwargs):
+    """Create a "counter", "gauge" or "histogram" (a no-op without prometheus_client)"""
+    if not METRICS_AVAILABLE:
+        return _NoopMetric()
+    metric_class = {"counter": Counter, "gauge": Gauge, "histogram": Histogram}[kind]
+    return metric_class(name, documentation, labelnames, **kwargs)
+
+# Buckets in seconds: API and ML calls are milliseconds to seconds, SQL mostly sub-millisecond to 100s of ms
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+BATCH_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+# API
+HTTP_REQUEST_DURATION = _metric(
+    "histogram", "http_request_duration_seconds", "Request latency by route template",
+    ("method", "route", "status"), buckets=LATENCY_BUCKETS
+)
+HTTP_REQUESTS_IN_PROGRESS = _metric(
+    "gauge", "http_requests_in_progress", "Requests being handled", ("method",), multiprocess_mode="livesum"
+)
+RATE_LIMIT_REJECTIONS = _metric(
+    "counter", "rate_limit_rejections", "Requests rejected by the rate limiter", ("limit",)
+)
+
+# Database
+DB_POOL_CONNECTIONS = _metric(
+    "gauge", "db_pool_connections", "Connection pool state (checked_out, checked_in, overflow, size)",
+    ("pool", "state"), multiprocess_mode="livesum"
+)
+DB_QUERY_DURATION = _metric(
+    "histogram", "db_query_duration_seconds", "SQL statement duration", ("operation",), buckets=QUERY_BUCKETS
+)
+
+# Caches
+CACHE_REQUESTS = _metric(
+    "counter", "cache_requests", "Cache lookups by result (hit, miss)", ("namespace", "result")
+)
+CACHE_EVICTIONS = _metric(
+    "counter", "cache_evictions", "Cache entries dropped (expired, invalidated, cleared)", ("namespace", "reason")
+)
+
+# ML
+ML_INFERENCE_DURATION = _metric(
+    "histogram", "ml_inference_duration_seconds", "Time per sentiment/anomaly prediction", ("model",),
+    buckets=LATENCY_BUCKETS
+)
+ML_BATCH_SIZE = _metric(
+    "histogram", "ml_inference_batch_size", "Evaluations scored per batch", ("pipeline",), buckets=BATCH_BUCKETS
+)
+
+# Startup
+STARTUP_PHASE_DURATION = _metric(
+    "gauge", "app_startup_phase_seconds", "Time a worker spent in each startup phase", ("phase",),
+    multiprocess_mode="max"
+)
+
+# Email
+EMAIL_QUEUE_DEPTH = _metric(
+    "gauge", "email_queue_depth", "Emails waiting to be sent", multiprocess_mode="livesum"
+)
+
+def update_pool_metrics() -> None:
+    """Record the connection pool state of this worker"""
+    from database.connection import engine, read_engine
+    pools = {"primary": engine}
+    if read_engine is not engine:
+        pools["read"] = read_engine
+    for name, pool_engine in pools.items():
+        pool = pool_engine.pool
+        if not hasattr(pool, "checkedout"):
+            continue
+        DB_POOL_CONNECTIONS.labels(pool=name, state="checked_out").set(pool.checkedout())
+        DB_POOL_CONNECTIONS.labels(pool=name, state="checked_in").set(pool.checkedin())
+        DB_POOL_CONNECTIONS.labels(pool=name, state="overflow").set(max(0, pool.overflow()))
+        DB_POOL_CONNECTIONS.labels(pool=name, state="size").set(pool.size())
+
+def render_metrics() -> Optional[bytes]:
+    """OpenMetrics text of every worker (None when prometheus_client is missing)"""
+    if not METRICS_AVAILABLE:
+        return None
+    if PROMETHEUS_MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry)
+
+def mark_worker_dead() -> None:
+    """Drop this worker's live gauges from the multiprocess directory (call on shutdown)"""
+    if METRICS_AVAILABLE and PROMETHEUS_MULTIPROC_DIR:
+        multiprocess.mark_process_dead(os.getpid())
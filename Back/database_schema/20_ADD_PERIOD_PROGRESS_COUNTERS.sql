@@ -0,0 +1,74 @@
+-- Migration 20: Live progress counters for evaluation periods
+-- evaluation_periods.total_students / completed_evaluations become maintained counters
+-- and period_progress holds the per-program / per-year-level breakdown.
+-- Counters are updated in the same transaction as enrollment and submission;
+-- reconcile_period_progress.py rebuilds them from evaluations to repair drift.
+
+-- 1. Headline counters on evaluation_periods
+ALTER TABLE evaluation_periods
+ADD COLUMN IF NOT EXISTS total_evaluations INTEGER DEFAULT 0;
+
+ALTER TABLE evaluation_periods
+ADD COLUMN IF NOT EXISTS progress_reconciled_at TIMESTAMP;
+
+COMMENT ON COLUMN evaluation_periods.total_students IS 'Distinct students with evaluation records in this period (maintained counter)';
+COMMENT ON COLUMN evaluation_periods.total_evaluations IS 'Evaluation records (pending + submitted) in this period (maintained counter)';
+COMMENT ON COLUMN evaluation_periods.completed_evaluations IS 'Submitted evaluations in this period (maintained counter)';
+
+-- 2. Breakdown by program and year level
+-- program_id 0 is used for students without a program so the unique key can be upserted
+CREATE TABLE IF NOT EXISTS period_progress (
+    id SERIAL PRIMARY KEY,
+    evaluation_period_id INTEGER NOT NULL REFERENCES evaluation_periods(id) ON DELETE CASCADE,
+    program_id INTEGER NOT NULL DEFAULT 0,
+    year_level INTEGER NOT NULL DEFAULT 0,
+    total_students INTEGER NOT NULL DEFAULT 0,
+    total_evaluations INTEGER NOT NULL DEFAULT 0,
+    completed_evaluations INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(evaluation_period_id, program_id, year_level)
+);
+
+CREATE INDEX IF NOT EXISTS idx_period_progress_period ON period_progress(evaluation_period_id);
+
+COMMENT ON TABLE period_progress IS 'Per-program and per-year-level evaluation progress for each period, maintained on enrollment and submission';
+
+-- 3. Seed counters from existing data
+UPDATE evaluation_periods ep
+SET total_students = COALESCE(agg.total_students, 0),
+    total_evaluations = COALESCE(agg.total_evaluations, 0),
+    completed_evaluations = COALESCE(agg.completed_evaluations, 0),
+    progress_reconciled_at = NOW()
+FROM evaluation_periods p
+LEFT JOIN (
+    SELECT
+        evaluation_period_id,
+        COUNT(DISTINCT student_id) AS total_students,
+        COUNT(*) AS total_evaluations,
+        COUNT(*) FILTER (WHERE submission_date IS NOT NULL) AS completed_evaluations
+    FROM evaluations
+    WHERE evaluation_period_id IS NOT NULL
+    GROUP BY evaluation_period_id
+) agg ON agg.evaluation_period_id = p.id
+WHERE ep.id = p.id;
+
+INSERT INTO period_progress (
+    evaluation_period_id, program_id, year_level,
+    total_students, total_evaluations, completed_evaluations
+)
+SELECT
+    ev.evaluation_period_id,
+    COALESCE(s.program_id, 0),
+    COALESCE(s.year_level, 0),
+    COUNT(DISTINCT ev.student_id),
+    COUNT(*),
+    COUNT(*) FILTER (WHERE ev.submission_date IS NOT NULL)
+FROM evaluations ev
+JOIN students s ON s.id = ev.student_id
+WHERE ev.evaluation_period_id IS NOT NULL
+GROUP BY ev.evaluation_period_id, COALESCE(s.program_id, 0), COALESCE(s.year_level, 0)
+ON CONFLICT (evaluation_period_id, program_id, year_level) DO UPDATE SET
+    total_students = EXCLUDED.total_students,
+    total_evaluations = EXCLUDED.total_evaluations,
+    completed_evaluations = EXCLUDED.completed_evaluations,
+    updated_at = NOW();
@@ -0,0 +1,40 @@
+-- Migration 21: Compact advancement snapshots
+-- Replaces the pretty-printed JSON snapshots that StudentAdvancementService wrote to audit_logs.
+-- A snapshot is one row holding parallel arrays (student_ids[i], year_levels[i], is_active[i]):
+-- only the students an advancement touches are captured, and the arrays are TOAST-compressed.
+-- Rollback unnests the arrays in a single UPDATE ... FROM.
+
+CREATE TABLE IF NOT EXISTS advancement_snapshots (
+    id SERIAL PRIMARY KEY,
+    description VARCHAR(200),
+    created_by INTEGER REFERENCES users(id) ON DELETE SET NULL,
+    student_count INTEGER NOT NULL DEFAULT 0,
+    student_ids INTEGER[] NOT NULL DEFAULT '{}',
+    year_levels SMALLINT[] NOT NULL DEFAULT '{}',
+    is_active BOOLEAN[] NOT NULL DEFAULT '{}',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    restored_at TIMESTAMP,
+    CONSTRAINT advancement_snapshots_arrays_check CHECK (
+        cardinality(student_ids) = student_count
+        AND cardinality(year_levels) = student_count
+        AND cardinality(is_active) = student_count
+    )
+);
+
+CREATE INDEX IF NOT EXISTS idx_advancement_snapshots_created_at ON advancement_snapshots(created_at DESC);
+
+-- lz4 is faster than the default pglz for these large integer arrays (PostgreSQL 14+)
+DO $$
+BEGIN
+    IF current_setting('server_version_num')::INTEGER >= 140000 THEN
+        ALTER TABLE advancement_snapshots ALTER COLUMN student_ids SET COMPRESSION lz4;
+        ALTER TABLE advancement_snapshots ALTER COLUMN year_levels SET COMPRESSION lz4;
+        ALTER TABLE advancement_snapshots ALTER COLUMN is_active SET COMPRESSION lz4;
+    END IF;
+EXCEPTION WHEN OTHERS THEN
+    RAISE NOTICE 'lz4 compression not available, using default: %', SQLERRM;
+END $$;
+
+COMMENT ON TABLE advancement_snapshots IS 'Pre-advancement student year levels for rollback (parallel arrays, one row per snapshot)';
+COMMENT ON COLUMN advancement_snapshots.student_ids IS 'Student IDs, sorted; year_levels/is_active hold the values at the same index';
+COMMENT ON COLUMN advancement_snapshots.restored_at IS 'Last time this snapshot was rolled back to';
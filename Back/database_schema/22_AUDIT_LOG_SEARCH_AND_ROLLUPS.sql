@@ -0,0 +1,68 @@
+-- Migration 22: Audit log keyset pagination, full-text search and daily rollups
+-- GET /api/admin/audit-logs pages by (created_at, id) and searches a GIN-indexed tsvector
+-- built from action, category and the flattened details values.
+-- GET /api/admin/audit-logs/stats reads per-day counts from audit_log_daily_stats.
+--
+-- On a large production table, run the CREATE INDEX statements with CONCURRENTLY
+-- (outside a transaction) to avoid blocking audit writes.
+
+-- 1. Keyset pagination: newest first, id breaks ties within the same timestamp
+CREATE INDEX IF NOT EXISTS idx_audit_logs_created_at_id ON audit_logs (created_at DESC, id DESC);
+
+-- 2. Search document: action + category + every scalar value inside details
+-- ('simple' config: no stemming, so action codes are matched as written).
+-- The text is indexed twice - as parsed, and split on punctuation - so that
+-- partial emails / codes ("juan.cruz@lpu", "BSCS-1A") match their pieces.
+CREATE OR REPLACE FUNCTION audit_log_search_vector(p_action TEXT, p_category TEXT, p_details JSONB)
+RETURNS tsvector
+LANGUAGE sql
+IMMUTABLE
+PARALLEL SAFE
+AS $$
+    SELECT to_tsvector('simple'::regconfig, doc)
+        || to_tsvector('simple'::regconfig, regexp_replace(doc, '[^[:alnum:]]+', ' ', 'g'))
+    FROM (
+        SELECT
+            COALESCE(p_action, '') || ' ' ||
+            COALESCE(p_category, '') || ' ' ||
+            COALESCE((
+                SELECT string_agg(value #>> '{}', ' ')
+                FROM jsonb_path_query(
+                    COALESCE(p_details, '{}'::jsonb),
+                    'strict $.** ? (@.type() != "object" && @.type() != "array")'
+                ) AS value
+            ), '') AS doc
+    ) AS search_text
+$$;
+
+COMMENT ON FUNCTION audit_log_search_vector(TEXT, TEXT, JSONB) IS 'Full-text search document for an audit log row (must match the expression used by the audit log search API)';
+
+CREATE INDEX IF NOT EXISTS idx_audit_logs_search
+ON audit_logs USING GIN (audit_log_search_vector(action, category, details));
+
+-- 3. Daily rollups for the stats cards
+-- Closed days only; today's counts are read live from audit_logs
+CREATE TABLE IF NOT EXISTS audit_log_daily_stats (
+    day DATE NOT NULL,
+    category VARCHAR(50) NOT NULL DEFAULT '',
+    severity VARCHAR(20) NOT NULL DEFAULT '',
+    status VARCHAR(20) NOT NULL DEFAULT '',
+    event_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, category, severity, status)
+);
+
+COMMENT ON TABLE audit_log_daily_stats IS 'Audit log counts per day, category, severity and status (refreshed incrementally by AuditLogService)';
+
+-- 4. Seed rollups from existing logs
+INSERT INTO audit_log_daily_stats (day, category, severity, status, event_count)
+SELECT
+    CAST(created_at AS DATE),
+    COALESCE(category, ''),
+    COALESCE(severity, ''),
+    COALESCE(status, ''),
+    COUNT(*)
+FROM audit_logs
+WHERE created_at < CURRENT_DATE
+GROUP BY 1, 2, 3, 4
+ON CONFLICT (day, category, severity, status) DO UPDATE SET
+    event_count = EXCLUDED.event_count;
@@ -0,0 +1,124 @@
+-- Migration 23: Monthly partitioning of audit_logs
+-- audit_logs becomes a table partitioned by RANGE (created_at) with one partition
+-- per month (audit_logs_pYYYY_MM) plus audit_logs_default as a safety net.
+-- Old months are detached, archived to Database_Backups/audit_logs and dropped by
+-- AuditLogPartitionService (services/audit_partitions.py), so indexes and vacuum
+-- work only ever cover the retained months.
+--
+-- Idempotent: the conversion is skipped when audit_logs is already partitioned.
+-- The conversion copies every row; run it in a maintenance window on large tables.
+
+-- 1. Partition helper: create monthly partitions from a month through N months ahead.
+-- Rows that already landed in the default partition for a new month are moved
+-- into it, so the job can always catch up.
+CREATE OR REPLACE FUNCTION create_audit_log_partitions(p_from DATE, p_months_ahead INTEGER DEFAULT 3)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_month DATE := date_trunc('month', p_from)::DATE;
+    v_last DATE := (date_trunc('month', CURRENT_DATE) + make_interval(months => p_months_ahead))::DATE;
+    v_name TEXT;
+    v_created INTEGER := 0;
+BEGIN
+    WHILE v_month <= v_last LOOP
+        v_name := 'audit_logs_p' || to_char(v_month, 'YYYY_MM');
+
+        IF to_regclass(v_name) IS NULL THEN
+            EXECUTE format('CREATE TABLE %I (LIKE audit_logs INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', v_name);
+
+            IF to_regclass('audit_logs_default') IS NOT NULL THEN
+                EXECUTE format(
+                    'WITH moved AS (DELETE FROM audit_logs_default WHERE created_at >= %L AND created_at < %L RETURNING *)
+                     INSERT INTO %I SELECT * FROM moved',
+                    v_month, (v_month + INTERVAL '1 month')::DATE, v_name
+                );
+            END IF;
+
+            EXECUTE format(
+                'ALTER TABLE audit_logs ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                v_name, v_month, (v_month + INTERVAL '1 month')::DATE
+            );
+            v_created := v_created + 1;
+        END IF;
+
+        v_month := (v_month + INTERVAL '1 month')::DATE;
+    END LOOP;
+
+    RETURN v_created;
+END;
+$$;
+
+COMMENT ON FUNCTION create_audit_log_partitions(DATE, INTEGER) IS 'Create monthly audit_logs partitions from p_from through p_months_ahead months after the current month';
+
+-- 2. Convert the existing heap into a partitioned table
+DO $$
+DECLARE
+    v_first DATE;
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_class WHERE relname = 'audit_logs' AND relkind = 'p') THEN
+        RAISE NOTICE 'audit_logs is already partitioned';
+        RETURN;
+    END IF;
+
+    -- Columns added over time (03, 15) - make sure the copy below finds them all
+    ALTER TABLE audit_logs ADD COLUMN IF NOT EXISTS user_agent TEXT;
+    ALTER TABLE audit_logs ADD COLUMN IF NOT EXISTS entity_type VARCHAR(50);
+    ALTER TABLE audit_logs ADD COLUMN IF NOT EXISTS entity_id INTEGER;
+    ALTER TABLE audit_logs ADD COLUMN IF NOT EXISTS timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
+
+    ALTER TABLE audit_logs RENAME TO audit_logs_unpartitioned;
+
+    -- Free the index names for the partitioned table
+    DROP INDEX IF EXISTS idx_audit_logs_user_id, idx_audit_logs_action, idx_audit_logs_category,
+        idx_audit_logs_severity, idx_audit_logs_created_at, idx_audit_logs_status,
+        idx_audit_logs_entity_type, idx_audit_logs_entity_id, idx_audit_logs_entity,
+        idx_audit_logs_user, idx_audit_logs_created_at_id, idx_audit_logs_search,
+        ix_audit_logs_id, ix_audit_logs_created_at;
+
+    -- The partition key must be part of the primary key
+    CREATE TABLE audit_logs (
+        id INTEGER NOT NULL DEFAULT nextval('audit_logs_id_seq'),
+        user_id INTEGER REFERENCES users(id) ON DELETE SET NULL,
+        action VARCHAR(100) NOT NULL,
+        category VARCHAR(50) NOT NULL,
+        severity VARCHAR(20) DEFAULT 'Info',
+        status VARCHAR(20) DEFAULT 'Success',
+        ip_address VARCHAR(50),
+        user_agent TEXT,
+        details JSONB,
+        created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        entity_type VARCHAR(50),
+        entity_id INTEGER,
+        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (id, created_at)
+    ) PARTITION BY RANGE (created_at);
+
+    -- Keep the id sequence when the old table is dropped
+    ALTER SEQUENCE audit_logs_id_seq OWNED BY audit_logs.id;
+
+    CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT;
+
+    SELECT COALESCE(MIN(created_at)::DATE, CURRENT_DATE) INTO v_first FROM audit_logs_unpartitioned;
+    PERFORM create_audit_log_partitions(v_first, 3);
+
+    INSERT INTO audit_logs (id, user_id, action, category, severity, status, ip_address,
+                            user_agent, details, created_at, entity_type, entity_id, timestamp)
+    SELECT id, user_id, action, category, severity, status, ip_address,
+           user_agent, details, COALESCE(created_at, timestamp, CURRENT_TIMESTAMP), entity_type, entity_id, timestamp
+    FROM audit_logs_unpartitioned;
+
+    DROP TABLE audit_logs_unpartitioned;
+END $$;
+
+-- 3. Indexes (defined on the parent, created on every partition)
+CREATE INDEX IF NOT EXISTS idx_audit_logs_created_at_id ON audit_logs (created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_audit_logs_user ON audit_logs (user_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_audit_logs_action ON audit_logs (action, created_at);
+CREATE INDEX IF NOT EXISTS idx_audit_logs_category ON audit_logs (category);
+CREATE INDEX IF NOT EXISTS idx_audit_logs_severity ON audit_logs (severity, status);
+CREATE INDEX IF NOT EXISTS idx_audit_logs_entity ON audit_logs (entity_type, entity_id);
+CREATE INDEX IF NOT EXISTS idx_audit_logs_search
+ON audit_logs USING GIN (audit_log_search_vector(action, category, details));
+
+COMMENT ON TABLE audit_logs IS 'Comprehensive audit trail of all system activities (partitioned by month on created_at)';
@@ -0,0 +1,54 @@
+-- Migration 24: Indexed type-ahead search for users and the enrollment list
+-- Used by PeopleSearchService (services/people_search.py) for
+-- GET /api/admin/users?search= and GET /api/admin/enrollment-list/search?query=
+--
+-- Numeric queries are student-number / school-id prefixes (b-tree, text_pattern_ops);
+-- one- and two-letter queries are name/email prefixes (b-tree); longer queries are
+-- substring + fuzzy matches on a trigram GIN index when pg_trgm is available.
+
+-- 1. Search document: names, identifier and email, lower-cased
+CREATE OR REPLACE FUNCTION person_search_text(p_first_name TEXT, p_last_name TEXT, p_identifier TEXT, p_email TEXT)
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE
+PARALLEL SAFE
+AS $$
+    SELECT lower(
+        COALESCE(p_first_name, '') || ' ' ||
+        COALESCE(p_last_name, '') || ' ' ||
+        COALESCE(p_identifier, '') || ' ' ||
+        COALESCE(p_email, '')
+    )
+$$;
+
+COMMENT ON FUNCTION person_search_text(TEXT, TEXT, TEXT, TEXT) IS 'Search document for a person (must match the expressions used by PeopleSearchService)';
+
+-- 2. Prefix indexes (LIKE 'abc%' needs text_pattern_ops outside the C collation)
+CREATE INDEX IF NOT EXISTS idx_enrollment_list_student_number_prefix ON enrollment_list (student_number text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_enrollment_list_last_name_prefix ON enrollment_list (lower(last_name) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_enrollment_list_first_name_prefix ON enrollment_list (lower(first_name) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_enrollment_list_email_prefix ON enrollment_list (lower(email) text_pattern_ops);
+
+CREATE INDEX IF NOT EXISTS idx_users_school_id_prefix ON users (school_id text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_users_last_name_prefix ON users (lower(last_name) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_users_first_name_prefix ON users (lower(first_name) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_users_email_prefix ON users (lower(email) text_pattern_ops);
+
+CREATE INDEX IF NOT EXISTS idx_students_student_number_prefix ON students (student_number text_pattern_ops);
+
+-- 3. Trigram indexes for substring and typo-tolerant matching
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm') THEN
+        RAISE NOTICE 'pg_trgm is not available - longer searches fall back to unindexed substring matching';
+        RETURN;
+    END IF;
+
+    CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+    CREATE INDEX IF NOT EXISTS idx_enrollment_list_search_trgm
+    ON enrollment_list USING GIN (person_search_text(first_name, last_name, student_number, email) gin_trgm_ops);
+
+    CREATE INDEX IF NOT EXISTS idx_users_search_trgm
+    ON users USING GIN (person_search_text(first_name, last_name, school_id, email) gin_trgm_ops);
+END $$;
@@ -0,0 +1,85 @@
+-- Migration 25: Compact answers array alongside evaluations.ratings
+-- evaluations.answers holds the 31 Likert ratings (1-4) in question order so
+-- analytics can aggregate with unnest(answers) WITH ORDINALITY instead of
+-- parsing JSONB keys in Python. Used by EvaluationAnswerService
+-- (services/evaluation_answers.py). ratings stays the source of record.
+--
+-- Question order must match QUESTION_KEYS in services/evaluation_answers.py.
+
+-- 1. Column
+ALTER TABLE evaluations ADD COLUMN IF NOT EXISTS answers SMALLINT[];
+
+COMMENT ON COLUMN evaluations.answers IS 'Ratings 1-4 for questions 1..31 in order (NULL = unanswered), derived from ratings';
+
+-- 2. ratings JSONB -> answers array (descriptive keys, or "1".."31" for older rows)
+CREATE OR REPLACE FUNCTION evaluation_answers_from_ratings(p_ratings JSONB)
+RETURNS SMALLINT[]
+LANGUAGE sql
+IMMUTABLE
+PARALLEL SAFE
+AS $$
+    SELECT CASE WHEN COUNT(a.rating) = 0 THEN NULL ELSE array_agg(a.rating ORDER BY k.question) END
+    FROM unnest(ARRAY[
+        'relevance_subject_knowledge', 'relevance_practical_skills', 'relevance_team_work',
+        'relevance_leadership', 'relevance_communication', 'relevance_positive_attitude',
+        'org_curriculum', 'org_ilos_known', 'org_ilos_clear', 'org_ilos_relevant', 'org_no_overlapping',
+        'teaching_tlas_useful', 'teaching_ila_useful', 'teaching_tlas_sequenced', 'teaching_applicable',
+        'teaching_motivated', 'teaching_team_work', 'teaching_independent',
+        'assessment_start', 'assessment_all_topics', 'assessment_number',
+        'assessment_distribution', 'assessment_allocation', 'assessment_feedback',
+        'environment_classrooms', 'environment_library', 'environment_laboratory',
+        'environment_computer', 'environment_internet', 'environment_facilities_availability',
+        'counseling_available'
+    ]) WITH ORDINALITY AS k(key, question)
+    CROSS JOIN LATERAL (
+        SELECT COALESCE(p_ratings -> k.key, p_ratings -> k.question::TEXT) AS value
+    ) v
+    CROSS JOIN LATERAL (
+        SELECT CASE WHEN jsonb_typeof(v.value) = 'number' THEN
+            CASE WHEN v.value::TEXT::NUMERIC IN (1, 2, 3, 4) THEN v.value::TEXT::NUMERIC::SMALLINT END
+        END AS rating
+    ) a
+    WHERE jsonb_typeof(p_ratings) = 'object'
+$$;
+
+COMMENT ON FUNCTION evaluation_answers_from_ratings(JSONB) IS 'Evaluation ratings JSONB -> SMALLINT[31] in question order (must match EvaluationAnswerService)';
+
+-- 3. Shape check (validated after the backfill)
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'chk_evaluations_answers_length') THEN
+        ALTER TABLE evaluations ADD CONSTRAINT chk_evaluations_answers_length
+        CHECK (answers IS NULL OR array_length(answers, 1) = 31) NOT VALID;
+    END IF;
+END $$;
+
+-- 4. Backfill existing evaluations
+UPDATE evaluations
+SET answers = evaluation_answers_from_ratings(ratings)
+WHERE answers IS NULL
+AND ratings IS NOT NULL;
+
+ALTER TABLE evaluations VALIDATE CONSTRAINT chk_evaluations_answers_length;
+
+-- 5. Keep answers in sync for writers that only set ratings
+CREATE OR REPLACE FUNCTION sync_evaluation_answers()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        IF NEW.answers IS NULL THEN
+            NEW.answers := evaluation_answers_from_ratings(NEW.ratings);
+        END IF;
+    ELSIF NEW.ratings IS DISTINCT FROM OLD.ratings AND NEW.answers IS NOT DISTINCT FROM OLD.answers THEN
+        NEW.answers := evaluation_answers_from_ratings(NEW.ratings);
+    END IF;
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_evaluations_sync_answers ON evaluations;
+CREATE TRIGGER trg_evaluations_sync_answers
+BEFORE INSERT OR UPDATE OF ratings, answers ON evaluations
+FOR EACH ROW
+EXECUTE FUNCTION sync_evaluation_answers();
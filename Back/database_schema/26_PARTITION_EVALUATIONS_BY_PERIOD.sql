@@ -0,0 +1,188 @@
+-- Migration 26: List partitioning of evaluations and enrollments by evaluation period
+-- Both tables become PARTITION BY LIST (evaluation_period_id) with:
+--   <table>_period_<id>   one partition per evaluation period
+--   <table>_unassigned    rows without a period (enrollments not yet linked to one)
+--   <table>_default       safety net for periods created outside the API
+-- Queries filtered on evaluation_period_id only touch that period's partition.
+-- Partitions are created with the period (PeriodPartitionService.ensure_partitions,
+-- services/period_partitions.py). Closed periods can be moved to an archive
+-- tablespace and made read-only (PERIOD_ARCHIVE_TABLESPACE).
+--
+-- The partition key has to be part of any primary key or unique constraint on the
+-- parent, and evaluation_period_id is nullable, so the parent has no primary key:
+-- every partition gets PRIMARY KEY (id) instead (ids still come from one sequence),
+-- and existing unique constraints are extended with evaluation_period_id.
+--
+-- Idempotent: a table that is already partitioned is skipped. The conversion
+-- copies every row; run it in a maintenance window on large tables.
+
+-- 1. Partition helpers
+CREATE OR REPLACE FUNCTION create_period_partition(p_table TEXT, p_period_id INTEGER)
+RETURNS BOOLEAN
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_name TEXT := p_table || '_period_' || p_period_id;
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_class WHERE oid = to_regclass(p_table) AND relkind = 'p')
+       OR to_regclass(v_name) IS NOT NULL THEN
+        RETURN FALSE;
+    END IF;
+
+    EXECUTE format('CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', v_name, p_table);
+    EXECUTE format('ALTER TABLE %I ADD PRIMARY KEY (id)', v_name);
+
+    -- Rows that landed in the default partition before the period had its own
+    IF to_regclass(p_table || '_default') IS NOT NULL THEN
+        EXECUTE format(
+            'WITH moved AS (DELETE FROM %I WHERE evaluation_period_id = %s RETURNING *)
+             INSERT INTO %I SELECT * FROM moved',
+            p_table || '_default', p_period_id, v_name
+        );
+    END IF;
+
+    EXECUTE format('ALTER TABLE %I ATTACH PARTITION %I FOR VALUES IN (%s)', p_table, v_name, p_period_id);
+    RETURN TRUE;
+END;
+$$;
+
+COMMENT ON FUNCTION create_period_partition(TEXT, INTEGER) IS 'Create the partition of evaluations or enrollments for one evaluation period';
+
+CREATE OR REPLACE FUNCTION create_period_partitions(p_period_id INTEGER)
+RETURNS INTEGER
+LANGUAGE sql
+AS $$
+    SELECT create_period_partition('evaluations', p_period_id)::INTEGER
+         + create_period_partition('enrollments', p_period_id)::INTEGER
+$$;
+
+COMMENT ON FUNCTION create_period_partitions(INTEGER) IS 'Create the evaluations and enrollments partitions for an evaluation period (returns the number created)';
+
+-- Installed on the evaluations partition of an archived period
+CREATE OR REPLACE FUNCTION reject_archived_period_writes()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    RAISE EXCEPTION '% belongs to an archived evaluation period and is read-only', TG_TABLE_NAME
+        USING ERRCODE = 'read_only_sql_transaction',
+              HINT = 'Reopen the evaluation period to change its evaluations';
+END;
+$$;
+
+-- 2. Convert the existing heaps into partitioned tables
+DO $$
+DECLARE
+    v_table TEXT;
+    v_old TEXT;
+    v_seq TEXT;
+    v_statements TEXT[];
+    v_statement TEXT;
+    v_rls BOOLEAN;
+    v_unique RECORD;
+BEGIN
+    FOREACH v_table IN ARRAY ARRAY['evaluations', 'enrollments'] LOOP
+        IF EXISTS (SELECT 1 FROM pg_class WHERE oid = to_regclass(v_table) AND relkind = 'p') THEN
+            RAISE NOTICE '% is already partitioned', v_table;
+            CONTINUE;
+        END IF;
+
+        v_old := v_table || '_unpartitioned';
+        v_seq := pg_get_serial_sequence(v_table, 'id');
+        v_statements := ARRAY[]::TEXT[];
+
+        IF EXISTS (SELECT 1 FROM pg_attribute WHERE attrelid = v_table::regclass AND attname = 'id' AND attidentity <> '') THEN
+            RAISE EXCEPTION '%.id is an identity column - convert it to a serial column first', v_table;
+        END IF;
+
+        -- Indexes, foreign keys and triggers are captured now (their definitions name
+        -- the table) and recreated on the partitioned table once the old one is gone.
+        -- Per-partition primary keys replace the index on id alone.
+        SELECT v_statements || COALESCE(array_agg(pg_get_indexdef(i.indexrelid)), ARRAY[]::TEXT[])
+        INTO v_statements
+        FROM pg_index i
+        WHERE i.indrelid = v_table::regclass
+        AND NOT i.indisunique
+        AND NOT (i.indnatts = 1 AND i.indkey[0] = (
+            SELECT attnum FROM pg_attribute WHERE attrelid = v_table::regclass AND attname = 'id'
+        ));
+
+        -- Unique constraints/indexes must include the partition key
+        FOR v_unique IN
+            SELECT c.relname AS name,
+                   string_agg(quote_ident(a.attname), ', ' ORDER BY k.ord) AS columns,
+                   bool_or(a.attname = 'evaluation_period_id') AS has_period,
+                   bool_or(k.attnum = 0) OR i.indpred IS NOT NULL AS unsupported
+            FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            CROSS JOIN LATERAL unnest(i.indkey::SMALLINT[]) WITH ORDINALITY AS k(attnum, ord)
+            LEFT JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = k.attnum
+            WHERE i.indrelid = v_table::regclass
+            AND i.indisunique
+            AND NOT i.indisprimary
+            GROUP BY c.relname, i.indpred
+        LOOP
+            IF v_unique.unsupported THEN
+                RAISE NOTICE 'Unique index % on % uses expressions or a predicate - not recreated', v_unique.name, v_table;
+            ELSE
+                v_statements := v_statements || format(
+                    'CREATE UNIQUE INDEX %I ON %I (%s)',
+                    v_unique.name, v_table,
+                    v_unique.columns || CASE WHEN v_unique.has_period THEN '' ELSE ', evaluation_period_id' END
+                );
+            END IF;
+        END LOOP;
+
+        SELECT v_statements || COALESCE(array_agg(format('ALTER TABLE %I ADD CONSTRAINT %I %s', v_table, conname, pg_get_constraintdef(oid))), ARRAY[]::TEXT[])
+        INTO v_statements
+        FROM pg_constraint
+        WHERE conrelid = v_table::regclass
+        AND contype = 'f';
+
+        SELECT v_statements || COALESCE(array_agg(pg_get_triggerdef(oid)), ARRAY[]::TEXT[])
+        INTO v_statements
+        FROM pg_trigger
+        WHERE tgrelid = v_table::regclass
+        AND NOT tgisinternal;
+
+        SELECT relrowsecurity INTO v_rls FROM pg_class WHERE oid = v_table::regclass;
+        IF EXISTS (SELECT 1 FROM pg_policies WHERE tablename = v_table) THEN
+            RAISE NOTICE 'Row level security policies on % are not copied - recreate them on the partitioned table', v_table;
+        END IF;
+
+        EXECUTE format('ALTER TABLE %I RENAME TO %I', v_table, v_old);
+        EXECUTE format(
+            'CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING COMMENTS) PARTITION BY LIST (evaluation_period_id)',
+            v_table, v_old
+        );
+
+        -- Keep the id sequence when the old table is dropped
+        IF v_seq IS NOT NULL THEN
+            EXECUTE format('ALTER SEQUENCE %s OWNED BY %I.id', v_seq, v_table);
+        END IF;
+
+        EXECUTE format('CREATE TABLE %I PARTITION OF %I FOR VALUES IN (NULL)', v_table || '_unassigned', v_table);
+        EXECUTE format('ALTER TABLE %I ADD PRIMARY KEY (id)', v_table || '_unassigned');
+        EXECUTE format('CREATE TABLE %I PARTITION OF %I DEFAULT', v_table || '_default', v_table);
+        EXECUTE format('ALTER TABLE %I ADD PRIMARY KEY (id)', v_table || '_default');
+
+        PERFORM create_period_partition(v_table, id) FROM evaluation_periods ORDER BY id;
+
+        EXECUTE format('INSERT INTO %I SELECT * FROM %I', v_table, v_old);
+        EXECUTE format('DROP TABLE %I', v_old);
+
+        FOREACH v_statement IN ARRAY v_statements LOOP
+            EXECUTE v_statement;
+        END LOOP;
+
+        IF v_rls THEN
+            EXECUTE format('ALTER TABLE %I ENABLE ROW LEVEL SECURITY', v_table);
+        END IF;
+
+        EXECUTE format('ANALYZE %I', v_table);
+        EXECUTE format('COMMENT ON TABLE %I IS %L', v_table, 'Partitioned by LIST (evaluation_period_id), one partition per evaluation period');
+    END LOOP;
+END $$;
+
+-- 3. Every existing period has its partitions (a no-op right after the conversion)
+SELECT create_period_partitions(id) FROM evaluation_periods;
@@ -0,0 +1,52 @@
+-- Migration 27: Frozen results for closed evaluation periods
+-- Closing a period runs PeriodFinalizationService (services/period_finalization.py):
+-- every submitted evaluation is scored (sentiment + anomaly), per-section results are
+-- written to analysis_results and per-section/course/program/period aggregates to
+-- period_result_snapshots. Dashboards read those rows for finalized periods instead
+-- of recomputing them from evaluations.
+
+-- 1. Finalization state on evaluation_periods
+ALTER TABLE evaluation_periods
+ADD COLUMN IF NOT EXISTS finalization_status VARCHAR(20);
+
+ALTER TABLE evaluation_periods
+ADD COLUMN IF NOT EXISTS finalization_progress JSONB;
+
+ALTER TABLE evaluation_periods
+ADD COLUMN IF NOT EXISTS finalized_at TIMESTAMP;
+
+COMMENT ON COLUMN evaluation_periods.finalization_status IS 'NULL, queued, running, completed or failed';
+COMMENT ON COLUMN evaluation_periods.finalization_progress IS 'Current stage and counts of the finalization run';
+COMMENT ON COLUMN evaluation_periods.finalized_at IS 'Set once the period results are frozen; cleared when the period is reopened';
+
+-- 2. Period-scoped analysis_results
+ALTER TABLE analysis_results
+ADD COLUMN IF NOT EXISTS evaluation_period_id INTEGER REFERENCES evaluation_periods(id) ON DELETE CASCADE;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_analysis_results_period_section_type
+ON analysis_results(evaluation_period_id, class_section_id, analysis_type)
+WHERE evaluation_period_id IS NOT NULL;
+
+-- 3. Aggregates per scope
+-- scope_id is the section, course or program id (0 = no program, and for scope 'period')
+CREATE TABLE IF NOT EXISTS period_result_snapshots (
+    id SERIAL PRIMARY KEY,
+    evaluation_period_id INTEGER NOT NULL REFERENCES evaluation_periods(id) ON DELETE CASCADE,
+    scope VARCHAR(20) NOT NULL CHECK (scope IN ('section', 'course', 'program', 'period')),
+    scope_id INTEGER NOT NULL DEFAULT 0,
+    total_evaluations INTEGER NOT NULL DEFAULT 0,
+    enrolled_students INTEGER NOT NULL DEFAULT 0,
+    positive_count INTEGER NOT NULL DEFAULT 0,
+    neutral_count INTEGER NOT NULL DEFAULT 0,
+    negative_count INTEGER NOT NULL DEFAULT 0,
+    anomaly_count INTEGER NOT NULL DEFAULT 0,
+    avg_overall_rating FLOAT,
+    avg_sentiment_score FLOAT,
+    question_counts JSONB NOT NULL DEFAULT '{}'::jsonb,
+    category_averages JSONB NOT NULL DEFAULT '[]'::jsonb,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(evaluation_period_id, scope, scope_id)
+);
+
+COMMENT ON TABLE period_result_snapshots IS 'Frozen per-section/course/program/period results of a finalized evaluation period';
+COMMENT ON COLUMN period_result_snapshots.question_counts IS '{"1": {"1": n, "2": n, "3": n, "4": n}, ..., "31": {...}} as returned by EvaluationAnswerService.answer_counts';
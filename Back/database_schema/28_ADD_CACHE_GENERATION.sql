@@ -0,0 +1,23 @@
+-- Migration 28: Cross-worker cache invalidation
+-- Each API worker keeps its own in-memory response cache (utils/cache.py).
+-- clear_all_caches() bumps this counter after a write; every worker compares it
+-- with the generation its entries were cached under (at most every
+-- CACHE_GENERATION_CHECK_SECONDS) and drops its entries when it changed.
+-- Activating a period also records the period and the generation it was
+-- activated at, so the other workers warm its dashboards too.
+
+CREATE TABLE IF NOT EXISTS cache_generation (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    generation BIGINT NOT NULL DEFAULT 0,
+    activated_period_id INTEGER,
+    activated_generation BIGINT,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+ALTER TABLE cache_generation ADD COLUMN IF NOT EXISTS activated_period_id INTEGER;
+ALTER TABLE cache_generation ADD COLUMN IF NOT EXISTS activated_generation BIGINT;
+
+INSERT INTO cache_generation (id, generation) VALUES (TRUE, 0)
+ON CONFLICT (id) DO NOTHING;
+
+COMMENT ON TABLE cache_generation IS 'Single-row counter bumped by clear_all_caches(); API workers drop their cached responses when it changes';
@@ -0,0 +1,61 @@
+# Gunicorn configuration (used by the Procfile)
+# Uvicorn workers under a gunicorn master with preload_app: the app and the ML models
+# are loaded once in the master and shared copy-on-write by the forked workers,
+# instead of every worker importing sklearn and loading its own model copies.
+#
+#   gunicorn -c gunicorn.conf.py            (from Back/)
+#
+# WEB_CONCURRENCY sets the worker count, ML_PRELOAD_MODELS=0 leaves the models
+# to be loaded lazily in each worker. The ML inference worker (services/ml_inference.py)
+# scores submissions for all web workers; ML_INFERENCE_WORKER=0 scores in-process instead.
+# One audit log maintenance scheduler (maintain_audit_log_partitions.py --loop) runs next to
+# the workers while AUDIT_LOG_MAINTENANCE_INTERVAL_HOURS > 0.
+import os
+
+chdir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "App")
+wsgi_app = "main:app"
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = int(os.getenv("WEB_CONCURRENCY", "4"))
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+keepalive = 30
+timeout = 120
+preload_app = True
+
+ML_PRELOAD_MODELS = os.getenv("ML_PRELOAD_MODELS", "1") == "1"
+ML_INFERENCE_WORKER = os.getenv("ML_INFERENCE_WORKER", "1") == "1"
+AUDIT_LOG_MAINTENANCE_INTERVAL_HOURS = int(os.getenv("AUDIT_LOG_MAINTENANCE_INTERVAL_HOURS", "24"))
+
+def when_ready(server):
+    """Runs in the master after the app is imported and before any worker is forked"""
+    if ML_INFERENCE_WORKER:
+        from services.ml_inference import start_worker_process
+        server.ml_inference = start_worker_process()
+        server.log.info(f"Started ML inference worker (pid {server.ml_inference.pid})")
+    if AUDIT_LOG_MAINTENANCE_INTERVAL_HOURS > 0:
+        from services.audit_partitions import start_scheduler_process
+        server.maintenance_scheduler = start_scheduler_process()
+        server.log.info(f"Started audit log maintenance scheduler (pid {server.maintenance_scheduler.pid})")
+    if ML_PRELOAD_MODELS:
+        from ml_services.loader import preload_models
+        server.log.info(f"Preloaded ML models: {preload_models()}")
+
+def on_exit(server):
+    """Stop the ML inference worker and the maintenance scheduler with the master"""
+    for name in ("ml_inference", "maintenance_scheduler"):
+        process = getattr(server, name, None)
+        if process and process.poll() is None:
+            process.terminate()
+            process.wait(timeout=10)
+
+def post_fork(server, worker):
+    """Connections must not be shared across processes - start each worker with empty pools"""
+    from database.connection import engine, read_engine
+    engine.dispose(close=False)
+    if read_engine is not engine:
+        read_engine.dispose(close=False)
+
+def child_exit(server, worker):
+    """Drop the exited worker's live gauges from PROMETHEUS_MULTIPROC_DIR"""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useMemo } from 'react'
+import React, { useState, useEffect, useMemo, useRef } from 'react'
 import { useNavigate } from 'react-router-dom'
 import { isSystemAdmin } from '../../utils/roleUtils'
 import { useAuth } from '../../context/AuthContext'
@@ -27,6 +27,8 @@ export default function AuditLogViewer() {
   const [currentPage, setCurrentPage] = useState(1)
   const [totalPages, setTotalPages] = useState(1)
   const [logsPerPage, setLogsPerPage] = useState(15)
+  // Keyset cursors by page number (valid only for the filters they were fetched with)
+  const pageCursors = useRef({ filtersKey: null, cursors: {} })
   
   // API State
   const [auditLogs, setAuditLogs] = useState([])
@@ -125,6 +127,16 @@ export default function AuditLogViewer() {
           }
         }
         
+        // Continue from the previous page's cursor when we have one (avoids deep OFFSET scans)
+        const { page, ...filterParams } = params
+        const filtersKey = JSON.stringify(filterParams)
+        if (pageCursors.current.filtersKey !== filtersKey) {
+          pageCursors.current = { filtersKey, cursors: {} }
+        }
+        if (pageCursors.current.cursors[currentPage]) {
+          params.cursor = pageCursors.current.cursors[currentPage]
+        }
+        
         const response = await adminAPI.getAuditLogs(params)
         
         if (response?.success) {
@@ -132,6 +144,9 @@ export default function AuditLogViewer() {
           // Update total pages from backend pagination
           if (response.pagination) {
             setTotalPages(response.pagination.total_pages)
+            if (response.pagination.next_cursor) {
+              pageCursors.current.cursors[currentPage + 1] = response.pagination.next_cursor
+            }
           }
         } else {
           setError('Failed to load audit logs')
@@ -144,7 +159,7 @@ export default function AuditLogViewer() {
       }
     }
     fetchLogs()
-  }, [currentPage, actionFilter, categoryFilter, statusFilter, userFilter, searchTerm, dateFilter, customStartDate, customEndDate])
+  }, [currentPage, logsPerPage, actionFilter, categoryFilter, statusFilter, userFilter, searchTerm, dateFilter, customStartDate, customEndDate])
 
   // Reset to page 1 when filters change
   useEffect(() => {
@@ -488,16 +488,16 @@ export default function StudentManagement() {
                     {advancementResult.advancement_plan && Object.entries(advancementResult.advancement_plan).map(([fromYear, data]) => (
                       <div key={fromYear} className="bg-white rounded-lg p-4">
                         <h4 className="font-semibold text-gray-800 mb-2">
-                          Year {data.from_year} → Year {data.to_year}: {data.students.length} students
+                          Year {data.from_year} → Year {data.to_year}: {data.student_count} students
                         </h4>
                         <div className="text-sm text-gray-600">
-                          {data.students.slice(0, 5).map((student, idx) => (
+                          {data.students.map((student, idx) => (
                             <div key={idx} className="py-1">
                               • {student.student_number} - {student.name} ({student.program})
                             </div>
                           ))}
-                          {data.students.length > 5 && (
-                            <div className="py-1 text-gray-500">... and {data.students.length - 5} more</div>
+                          {data.student_count > data.students.length && (
+                            <div className="py-1 text-gray-500">... and {data.student_count - data.students.length} more</div>
                           )}
                         </div>
                       </div>
@@ -861,17 +861,17 @@ export default function StudentManagement() {
                     {rollbackResult.rollback_plan && Object.keys(rollbackResult.rollback_plan).length > 0 && (
                       <div className="bg-white rounded-lg p-4">
                         <h4 className="font-semibold text-gray-800 mb-2">Rollback Details:</h4>
-                        {Object.entries(rollbackResult.rollback_plan).map(([transition, students]) => (
+                        {Object.entries(rollbackResult.rollback_plan).map(([transition, data]) => (
                           <div key={transition} className="mb-2">
                             <p className="text-sm font-semibold text-gray-700">
-                              Year {transition}: {students.length} students
+                              Year {transition}: {data.student_count} students
                             </p>
                             <div className="text-xs text-gray-600 ml-4">
-                              {students.slice(0, 3).map((name, idx) => (
+                              {data.students.slice(0, 3).map((name, idx) => (
                                 <div key={idx}>• {name}</div>
                               ))}
-                              {students.length > 3 && (
-                                <div className="text-gray-500">... and {students.length - 3} more</div>
+                              {data.student_count > 3 && (
+                                <div className="text-gray-500">... and {data.student_count - 3} more</div>
                               )}
                             </div>
                           </div>
@@ -42,21 +42,16 @@ export default function Dashboard() {
       if (!currentUser) return
       
       try {
-        let programsResponse, yearLevelsResponse, periodsResponse
-        
-        if (currentUser.role === 'secretary') {
-          [programsResponse, yearLevelsResponse, periodsResponse] = await Promise.all([
-            secretaryAPI.getPrograms(),
-            secretaryAPI.getYearLevels(),
-            secretaryAPI.getEvaluationPeriods()
-          ])
-        } else if (currentUser.role === 'department_head') {
-          [programsResponse, yearLevelsResponse, periodsResponse] = await Promise.all([
-            deptHeadAPI.getPrograms(),
-            deptHeadAPI.getYearLevels(),
-            deptHeadAPI.getEvaluationPeriods()
-          ])
-        }
+        const roleAPI = currentUser.role === 'secretary' ? secretaryAPI
+          : currentUser.role === 'department_head' ? deptHeadAPI
+          : null
+        if (!roleAPI) return
+
+        // Programs, year levels and periods come back together in one bundled request
+        const bundleResponse = await roleAPI.getDashboardBundle(['programs', 'year-levels', 'evaluation-periods'])
+        const programsResponse = bundleResponse?.data?.widgets?.programs
+        const yearLevelsResponse = bundleResponse?.data?.widgets?.['year-levels']
+        const periodsResponse = bundleResponse?.data?.widgets?.['evaluation-periods']
         
         if (programsResponse?.data) {
           setProgramOptions(transformPrograms(programsResponse.data))
@@ -121,21 +116,24 @@ export default function Dashboard() {
       const periodIdToUse = selectedPeriod || activePeriod
       if (periodIdToUse) filters.period_id = periodIdToUse
       
-      let dashboardResponse, evaluationsResponse
-      if (currentUser.role === 'secretary') {
-        [dashboardResponse, evaluationsResponse] = await Promise.all([
-          secretaryAPI.getDashboard(filters),
-          secretaryAPI.getEvaluations({ ...filters, page: 1, page_size: 50 }) // Limit for performance
-        ])
-      } else if (currentUser.role === 'department_head') {
-        [dashboardResponse, evaluationsResponse] = await Promise.all([
-          deptHeadAPI.getDashboard(filters),
-          deptHeadAPI.getEvaluations({ ...filters, page: 1, page_size: 50 }) // Limit for performance
-        ])
-      } else {
+      const roleAPI = currentUser.role === 'secretary' ? secretaryAPI
+        : currentUser.role === 'department_head' ? deptHeadAPI
+        : null
+      if (!roleAPI) {
         throw new Error(`Unsupported staff role: ${currentUser.role}`)
       }
       
+      // Dashboard and evaluations in one bundled request (evaluations limited for performance)
+      const bundleResponse = await roleAPI.getDashboardBundle(['dashboard', 'evaluations'], { ...filters, page: 1, page_size: 50 })
+      const widgets = bundleResponse?.data?.widgets || {}
+      // Without evaluations only the year-level chart is empty; without the dashboard there is nothing to show
+      const dashboardError = bundleResponse?.data?.errors?.dashboard
+      if (dashboardError) {
+        throw new Error(dashboardError.detail || 'Failed to load dashboard')
+      }
+      const dashboardResponse = widgets.dashboard
+      const evaluationsResponse = widgets.evaluations
+      
       return {
         dashboard: dashboardResponse?.data || dashboardResponse,
         evaluations: Array.isArray(evaluationsResponse) ? evaluationsResponse : (evaluationsResponse?.data || [])
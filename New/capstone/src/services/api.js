@@ -489,7 +489,8 @@ export const adminAPI = {
 
   /**
    * Get audit logs with filters
-   * @param {Object} params - Query parameters (page, action, severity, user_id, start_date, end_date)
+   * @param {Object} params - Query parameters (page, action, severity, category, status, user, user_id, search,
+   *   start_date, end_date, cursor = pagination.next_cursor of the previous page, count_mode = exact|estimated|auto)
    * @returns {Promise} Audit logs with pagination
    */
   getAuditLogs: async (params = {}) => {
@@ -498,9 +499,15 @@ export const adminAPI = {
     if (params.page_size) queryParams.append('page_size', params.page_size)
     if (params.action) queryParams.append('action', params.action)
     if (params.severity) queryParams.append('severity', params.severity)
+    if (params.category) queryParams.append('category', params.category)
+    if (params.status) queryParams.append('status', params.status)
+    if (params.user) queryParams.append('user', params.user)
     if (params.user_id) queryParams.append('user_id', params.user_id)
+    if (params.search) queryParams.append('search', params.search)
     if (params.start_date) queryParams.append('start_date', params.start_date)
     if (params.end_date) queryParams.append('end_date', params.end_date)
+    if (params.cursor) queryParams.append('cursor', params.cursor)
+    if (params.count_mode) queryParams.append('count_mode', params.count_mode)
     
     return apiClient.get(`/admin/audit-logs?${queryParams.toString()}`)
   },
@@ -1335,6 +1342,19 @@ export const deptHeadAPI = {
     return apiClient.get(`/dept-head/dashboard?${queryParams.toString()}`)
   },
 
+  /**
+   * Get several dashboard widgets in one request
+   * @param {Array<string>} widgets - Widget names (dashboard, completion-rates, sentiment-analysis,
+   *   anomalies, ml-insights-summary, programs, year-levels, evaluations, evaluation-periods); empty = all
+   * @param {Object} filters - Shared query parameters (period_id, time_range, page, page_size)
+   * @returns {Promise} { period_id, widgets: { [name]: response }, errors: { [name]: error } }
+   */
+  getDashboardBundle: async (widgets = [], filters = {}) => {
+    const queryParams = new URLSearchParams({ ...filters })
+    if (widgets.length > 0) queryParams.set('widgets', widgets.join(','))
+    return apiClient.get(`/dept-head/dashboard-bundle?${queryParams.toString()}`)
+  },
+
   /**
    * Get department evaluations with filters
    * @param {Object} params - Query parameters (page, page_size, semester, academic_year, course_id, etc.)
@@ -1608,6 +1628,19 @@ export const secretaryAPI = {
     return apiClient.get(`/secretary/dashboard?${queryParams.toString()}`)
   },
 
+  /**
+   * Get several dashboard widgets in one request
+   * @param {Array<string>} widgets - Widget names (dashboard, completion-rates, sentiment-analysis,
+   *   anomalies, ml-insights-summary, programs, year-levels, evaluations, evaluation-periods); empty = all
+   * @param {Object} filters - Shared query parameters (period_id, time_range, page, page_size)
+   * @returns {Promise} { period_id, widgets: { [name]: response }, errors: { [name]: error } }
+   */
+  getDashboardBundle: async (widgets = [], filters = {}) => {
+    const queryParams = new URLSearchParams({ ...filters })
+    if (widgets.length > 0) queryParams.set('widgets', widgets.join(','))
+    return apiClient.get(`/secretary/dashboard-bundle?${queryParams.toString()}`)
+  },
+
   /**
    * Get department courses (secretary can view)
    * @param {Object} params - Query parameters (search, status, semester, etc.)